@@ -23,7 +23,7 @@ from app.models.event_model import Event, EventCategory, EventMailTemplate, Even
 from app.models.follows_model import Follow
 from app.models.notification_model import Notification
 from app.models.organization_model import Organization, organization_members
-from app.models.profile_model import Profile, Tag, Education, JobExperience
+from app.models.profile_model import Profile, ProfileStats, Tag, Education, JobExperience
 from app.models.review_model import Review
 from app.models.skill_model import Skill
 from app.models.user_model import User, Role, AuthMailTemplate
@@ -31,7 +31,7 @@ from app.models.onboarding_model import UserOnboarding
 from app.models.email_template_model import EmailTemplate
 from app.models.communication_log_model import CommunicationLog
 from app.models.chat_model import Conversation, Message, ConversationParticipant
-from app.models.ai_model import EventEmbedding, ExpertEmbedding
+from app.models.ai_model import EmbeddingCacheEntry, EmbeddingCheckpoint, EmbeddingJob, EventEmbedding, ExpertEmbedding
 
 
 # add your model's MetaData object here
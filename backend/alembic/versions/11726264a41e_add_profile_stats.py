@@ -0,0 +1,55 @@
+"""add_profile_stats
+
+Revision ID: 11726264a41e
+Revises: 1e19d826e10f
+Create Date: 2026-10-17 09:12:40.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '11726264a41e'
+down_revision: Union[str, None] = '1e19d826e10f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('profile_stats',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('reviews_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('following_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('sponsor_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Backfill from source tables; later drift is fixed by
+    # app.services.profile_stats_service.rebuild_profile_stats
+    op.execute("""
+        INSERT INTO profile_stats (user_id, reviews_count, rating_sum, followers_count, following_count, sponsor_count)
+        SELECT u.id,
+               COALESCE(r.n, 0), COALESCE(r.s, 0),
+               COALESCE(fr.n, 0), COALESCE(fg.n, 0),
+               COALESCE(sp.n, 0)
+        FROM users u
+        LEFT JOIN (SELECT reviewee_id AS uid, COUNT(*) AS n, SUM(rating) AS s FROM reviews
+                   WHERE deleted_at IS NULL AND reviewee_id IS NOT NULL GROUP BY reviewee_id) r ON r.uid = u.id
+        LEFT JOIN (SELECT followee_id AS uid, COUNT(*) AS n FROM follows
+                   WHERE followee_id IS NOT NULL GROUP BY followee_id) fr ON fr.uid = u.id
+        LEFT JOIN (SELECT follower_id AS uid, COUNT(*) AS n FROM follows GROUP BY follower_id) fg ON fg.uid = u.id
+        LEFT JOIN (SELECT user_id AS uid, COUNT(*) AS n FROM event_participants
+                   WHERE role = 'sponsor' AND status = 'accepted' GROUP BY user_id) sp ON sp.uid = u.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('profile_stats')
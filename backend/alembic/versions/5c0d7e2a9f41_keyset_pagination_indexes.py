@@ -0,0 +1,40 @@
+"""keyset_pagination_indexes
+
+Revision ID: 5c0d7e2a9f41
+Revises: bb482a3fab5b
+Create Date: 2026-10-17 14:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0d7e2a9f41'
+down_revision: Union[str, None] = 'bb482a3fab5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_events_start_datetime_id', 'events', ['start_datetime', 'id'], unique=False)
+    op.create_index('ix_notifications_recipient_created_at_id', 'notifications', ['recipient_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_audit_logs_created_at_id', 'audit_logs', ['created_at', 'id'], unique=False)
+    op.create_index('ix_messages_conversation_created_at_id', 'messages', ['conversation_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_conversations_activity_id', 'conversations', [sa.text('coalesce(updated_at, created_at)'), 'id'], unique=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'], unique=False)
+    op.create_index('ix_organizations_created_at_id', 'organizations', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_organizations_created_at_id', table_name='organizations')
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.drop_index('ix_conversations_activity_id', table_name='conversations')
+    op.drop_index('ix_messages_conversation_created_at_id', table_name='messages')
+    op.drop_index('ix_audit_logs_created_at_id', table_name='audit_logs')
+    op.drop_index('ix_notifications_recipient_created_at_id', table_name='notifications')
+    op.drop_index('ix_events_start_datetime_id', table_name='events')
@@ -0,0 +1,66 @@
+"""text_search_indexes
+
+Revision ID: 7a1c3e9b5d20
+Revises: 5c0d7e2a9f41
+Create Date: 2026-10-17 16:40:12.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a1c3e9b5d20'
+down_revision: Union[str, None] = '5c0d7e2a9f41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _document(*weighted: tuple[str, str]) -> str:
+    # Must stay identical to SearchDocument.vector() in app/core/search.py
+    return " || ".join(
+        f"setweight(to_tsvector('simple'::regconfig, coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted
+    )
+
+
+SEARCH_INDEXES = [
+    ('ix_events_search', 'events', _document(('title', 'A'), ('description', 'B'))),
+    ('ix_profiles_search', 'profiles', _document(('full_name', 'A'), ('title', 'B'), ('bio', 'C'), ('availability', 'D'))),
+    ('ix_organizations_search', 'organizations', _document(('name', 'A'), ('description', 'B'))),
+]
+
+# Substring / similarity matching; only created where pg_trgm can be installed
+TRIGRAM_INDEXES = [
+    ('ix_events_title_trgm', 'events', 'title'),
+    ('ix_profiles_full_name_trgm', 'profiles', 'full_name'),
+    ('ix_organizations_name_trgm', 'organizations', 'name'),
+    ('ix_skills_name_trgm', 'skills', 'name'),
+    ('ix_tags_name_trgm', 'tags', 'name'),
+]
+
+
+def _has_trigram() -> bool:
+    bind = op.get_bind()
+    return bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).scalar() is not None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, expr in SEARCH_INDEXES:
+        op.create_index(name, table, [sa.text(f"({expr})")], unique=False, postgresql_using='gin')
+
+    if _has_trigram():
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, column in TRIGRAM_INDEXES:
+            op.create_index(name, table, [sa.text(f"{column} gin_trgm_ops")], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(TRIGRAM_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    for name, table, _ in reversed(SEARCH_INDEXES):
+        op.drop_index(name, table_name=table)
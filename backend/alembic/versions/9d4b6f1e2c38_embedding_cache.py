@@ -0,0 +1,37 @@
+"""embedding_cache
+
+Revision ID: 9d4b6f1e2c38
+Revises: 7a1c3e9b5d20
+Create Date: 2026-10-17 17:21:48.903114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4b6f1e2c38'
+down_revision: Union[str, None] = '7a1c3e9b5d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('embedding_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('provider', sa.Text(), nullable=False),
+    sa.Column('model_name', sa.Text(), nullable=False),
+    sa.Column('task_type', sa.Text(), nullable=False),
+    sa.Column('source_text', sa.Text(), nullable=False),
+    sa.Column('embedding', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('embedding_cache')
@@ -0,0 +1,59 @@
+"""conversation_participant_key
+
+Revision ID: a6d3e9f15c42
+Revises: f3a7d2c81b09
+Create Date: 2026-10-18 09:12:37.504318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d3e9f15c42'
+down_revision: Union[str, None] = 'f3a7d2c81b09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversations', sa.Column('participant_key', postgresql.UUID(as_uuid=True), nullable=True))
+    # Key the most recently active two-person chat of every pair, preferring
+    # chats not started for a proposal (same key as conversation_service.participant_key)
+    op.execute(
+        """
+        WITH pairs AS (
+            SELECT conversation_id, min(user_id::text) AS lo, max(user_id::text) AS hi
+            FROM conversation_participants
+            GROUP BY conversation_id
+            HAVING count(*) = 2
+        ),
+        ranked AS (
+            SELECT p.conversation_id,
+                   md5(p.lo || ':' || p.hi)::uuid AS participant_key,
+                   row_number() OVER (
+                       PARTITION BY p.lo, p.hi
+                       ORDER BY EXISTS (SELECT 1 FROM event_proposals ep WHERE ep.conversation_id = c.id),
+                                coalesce(c.updated_at, c.created_at) DESC,
+                                c.id
+                   ) AS rn
+            FROM pairs p
+            JOIN conversations c ON c.id = p.conversation_id
+        )
+        UPDATE conversations c
+        SET participant_key = r.participant_key
+        FROM ranked r
+        WHERE r.conversation_id = c.id AND r.rn = 1
+        """
+    )
+    op.create_unique_constraint('conversations_participant_key_key', 'conversations', ['participant_key'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('conversations_participant_key_key', 'conversations', type_='unique')
+    op.drop_column('conversations', 'participant_key')
@@ -0,0 +1,33 @@
+"""notification_broadcast_claims
+
+Revision ID: a8d3f6b2c417
+Revises: e1c7a9d4b256
+Create Date: 2026-10-20 09:41:05.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d3f6b2c417'
+down_revision: Union[str, None] = 'e1c7a9d4b256'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notification_broadcasts', sa.Column('last_recipient_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('notification_broadcasts', sa.Column('lease_until', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('notification_broadcasts', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('notification_broadcasts', 'attempts')
+    op.drop_column('notification_broadcasts', 'lease_until')
+    op.drop_column('notification_broadcasts', 'last_recipient_id')
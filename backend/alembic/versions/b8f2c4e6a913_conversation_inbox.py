@@ -0,0 +1,68 @@
+"""conversation_inbox
+
+Revision ID: b8f2c4e6a913
+Revises: a6d3e9f15c42
+Create Date: 2026-10-18 11:03:55.281604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f2c4e6a913'
+down_revision: Union[str, None] = 'a6d3e9f15c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('conversations', sa.Column('last_message_id', postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column('conversations', sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_foreign_key(
+        'fk_conversations_last_message_id', 'conversations', 'messages',
+        ['last_message_id'], ['id'], ondelete='SET NULL',
+    )
+    op.add_column('conversation_participants', sa.Column('unread_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill: latest message per conversation, and what each participant
+    # has not read yet (messages from others after their last_read_at)
+    op.execute(
+        """
+        UPDATE conversations c
+        SET last_message_id = m.id, last_message_at = m.created_at
+        FROM (
+            SELECT DISTINCT ON (conversation_id) conversation_id, id, created_at
+            FROM messages
+            ORDER BY conversation_id, created_at DESC, id DESC
+        ) m
+        WHERE m.conversation_id = c.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE conversation_participants cp
+        SET unread_count = u.unread
+        FROM (
+            SELECT p.conversation_id, p.user_id, count(*) AS unread
+            FROM conversation_participants p
+            JOIN messages m ON m.conversation_id = p.conversation_id
+            WHERE m.sender_id <> p.user_id
+              AND (p.last_read_at IS NULL OR m.created_at > p.last_read_at)
+            GROUP BY p.conversation_id, p.user_id
+        ) u
+        WHERE cp.conversation_id = u.conversation_id AND cp.user_id = u.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('conversation_participants', 'unread_count')
+    op.drop_constraint('fk_conversations_last_message_id', 'conversations', type_='foreignkey')
+    op.drop_column('conversations', 'last_message_at')
+    op.drop_column('conversations', 'last_message_id')
@@ -0,0 +1,32 @@
+"""email_outbox_delivery_state
+
+Revision ID: bb482a3fab5b
+Revises: 11726264a41e
+Create Date: 2026-10-17 10:03:27.541906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bb482a3fab5b'
+down_revision: Union[str, None] = '11726264a41e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('communication_logs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('communication_logs', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_communication_logs_next_attempt_at'), 'communication_logs', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_communication_logs_next_attempt_at'), table_name='communication_logs')
+    op.drop_column('communication_logs', 'next_attempt_at')
+    op.drop_column('communication_logs', 'attempts')
@@ -0,0 +1,39 @@
+"""embedding_checkpoints
+
+Revision ID: c2e8a4d7f613
+Revises: 9d4b6f1e2c38
+Create Date: 2026-10-17 18:05:31.227740
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8a4d7f613'
+down_revision: Union[str, None] = '9d4b6f1e2c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('embedding_checkpoints',
+    sa.Column('source', sa.String(), nullable=False),
+    sa.Column('last_key', sa.UUID(), nullable=True),
+    sa.Column('processed', sa.Integer(), nullable=False),
+    sa.Column('embedded', sa.Integer(), nullable=False),
+    sa.Column('skipped', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('source')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('embedding_checkpoints')
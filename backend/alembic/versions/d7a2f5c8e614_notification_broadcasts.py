@@ -0,0 +1,45 @@
+"""notification_broadcasts
+
+Revision ID: d7a2f5c8e614
+Revises: c4d9e1a7b350
+Create Date: 2026-10-18 17:05:12.904377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a2f5c8e614'
+down_revision: Union[str, None] = 'c4d9e1a7b350'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('notification_broadcasts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('created_by_id', sa.UUID(), nullable=True),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('link_url', sa.String(), nullable=True),
+    sa.Column('target_role', sa.String(), nullable=True),
+    sa.Column('target_user_id', sa.UUID(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('sent', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('notification_broadcasts')
@@ -0,0 +1,32 @@
+"""vector_index_versions
+
+Revision ID: e1c7a9d4b256
+Revises: d7a2f5c8e614
+Create Date: 2026-10-19 10:12:48.315902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1c7a9d4b256'
+down_revision: Union[str, None] = 'd7a2f5c8e614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('vector_index_versions',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('vector_index_versions')
@@ -0,0 +1,43 @@
+"""embedding_jobs
+
+Revision ID: e5b1c9a04d72
+Revises: c2e8a4d7f613
+Create Date: 2026-10-17 19:12:08.514302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1c9a04d72'
+down_revision: Union[str, None] = 'c2e8a4d7f613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('embedding_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('entity_type', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.UUID(), nullable=False),
+    sa.Column('source_text', sa.Text(), nullable=False),
+    sa.Column('source_hash', sa.String(length=32), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('available_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('entity_type', 'entity_id', name='uq_embedding_jobs_entity')
+    )
+    op.create_index('ix_embedding_jobs_due', 'embedding_jobs', ['status', 'available_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embedding_jobs_due', table_name='embedding_jobs')
+    op.drop_table('embedding_jobs')
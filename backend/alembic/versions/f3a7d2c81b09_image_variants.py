@@ -0,0 +1,39 @@
+"""image_variants
+
+Revision ID: f3a7d2c81b09
+Revises: e5b1c9a04d72
+Create Date: 2026-10-17 21:40:52.118934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a7d2c81b09'
+down_revision: Union[str, None] = 'e5b1c9a04d72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('logo_variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('events', sa.Column('cover_variants', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('organizations', sa.Column('logo_variants', sa.JSON(), nullable=True))
+    op.add_column('organizations', sa.Column('cover_variants', sa.JSON(), nullable=True))
+    op.add_column('profiles', sa.Column('avatar_variants', sa.JSON(), nullable=True))
+    op.add_column('profiles', sa.Column('cover_variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('profiles', 'cover_variants')
+    op.drop_column('profiles', 'avatar_variants')
+    op.drop_column('organizations', 'cover_variants')
+    op.drop_column('organizations', 'logo_variants')
+    op.drop_column('events', 'cover_variants')
+    op.drop_column('events', 'logo_variants')
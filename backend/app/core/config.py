@@ -4,15 +4,35 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
     DATABASE_URL: str = "" # Default to empty to force .env loading. Do not use sqlite:///./test.db
+    ASYNC_DATABASE_URL: str = "" # async handlers; derived from DATABASE_URL (asyncpg / aiosqlite) when empty
     SECRET_KEY: str = "dev-secret"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     RESEND_API_KEY: str = ""
     SENDER_EMAIL: str = "ATAS <onboarding@resend.dev>"
+    EMAIL_TRANSPORT: str = "resend" # resend | smtp | file
+    EMAIL_WORKER_ENABLED: bool = True
+    EMAIL_WORKER_CONCURRENCY: int = 4
+    EMAIL_BATCH_SIZE: int = 100
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_FILE_PATH: str = "outbox_emails.jsonl" # file transport
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 1025
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
     FRONTEND_BASE_URL: str = "http://localhost:3000" # Defaults to localhost, override with env var in production
     CLOUDINARY_API_KEY: str = ""
     CLOUDINARY_API_SECRET: str = ""
     CLOUDINARY_CLOUD_NAME: str = ""
+
+    # Media uploads: checked for size and type, then streamed to the storage backend
+    STORAGE_BACKEND: str = "cloudinary" # cloudinary | local
+    MEDIA_ROOT: str = "media" # local backend: files are written and served from here
+    MEDIA_BASE_URL: str = "http://localhost:8000/media" # local backend: public URL of MEDIA_ROOT
+    UPLOAD_MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_DOCUMENT_BYTES: int = 25 * 1024 * 1024
+    UPLOAD_MAX_DIRECT_BYTES: int = 100 * 1024 * 1024 # client-direct signed uploads
+    UPLOAD_SIGNATURE_TTL_SECONDS: int = 900
     GOOGLE_CLIENT_ID: str = ""
     GOOGLE_CLIENT_SECRET: str = ""
     GOOGLE_REDIRECT_URI: str = "http://localhost:8000/api/v1/auth/google/callback"
@@ -22,9 +42,58 @@ class Settings(BaseSettings):
     AI_MODEL: str = "gemini-1.5-flash"
     GEMINI_API_KEY: str = ""
     GROQ_API_KEY: str = ""
+    VECTOR_INDEX_BACKEND: str = "memory" # memory | hnsw | pgvector
+    # How often a worker checks whether another worker changed the in-memory index; 0 checks on every search
+    VECTOR_INDEX_REFRESH_SECONDS: float = 5
+
+    # Text embedding cache (per process, optionally backed by the embedding_cache table); TTL 0 disables it
+    EMBEDDING_CACHE_TTL_SECONDS: int = 86400
+    EMBEDDING_CACHE_MAX_SIZE: int = 2048
+    EMBEDDING_CACHE_PERSIST: bool = False
+
+    # Bulk (re-)embedding: rows per provider batch, parallel single calls where there is no batch API
+    EMBEDDING_BATCH_SIZE: int = 64
+    EMBEDDING_BATCH_CONCURRENCY: int = 4
+    EMBEDDING_MAX_RETRIES: int = 5
+
+    # Embedding job queue (embedding_jobs, drained by the scheduler); failed jobs back off, then stop after MAX_ATTEMPTS
+    EMBEDDING_JOBS_INTERVAL_SECONDS: int = 10
+    EMBEDDING_JOB_MAX_ATTEMPTS: int = 5
+    EMBEDDING_JOB_LEASE_SECONDS: int = 300
+
+    # Authenticated-principal cache (per process); TTL 0 disables it
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+
+    # Rendered attendance QR images (per process, LRU); 0 disables it
+    QR_CACHE_MAX_SIZE: int = 512
+
+    # Event-loop guard: log sync DB calls made on the loop, and stalls longer than this (0 disables)
+    LOOP_BLOCK_WARN_MS: int = 250
+
+    # Background scheduler (leader-elected via Postgres advisory lock)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_TRANSITIONS_INTERVAL_SECONDS: int = 60
+    SCHEDULER_REMINDERS_INTERVAL_SECONDS: int = 60
+
+    # Real-time notifications (SSE fan-out across workers)
+    SSE_PUBSUB_BACKEND: str = "memory" # memory | postgres | redis
+    SSE_MAX_QUEUE: int = 100 # per connection; oldest messages are dropped beyond this
+    SSE_REPLAY_LIMIT: int = 100 # notifications replayed after Last-Event-ID
+    NOTIFICATION_BULK_CHUNK_SIZE: int = 1000 # rows per multi-row INSERT (and per broadcast commit)
+    NOTIFICATION_BROADCASTS_INTERVAL_SECONDS: int = 30 # scheduler pass for queued and abandoned broadcasts
+    NOTIFICATION_BROADCAST_LEASE_SECONDS: int = 120 # renewed per chunk; an expired lease means the worker died
+    NOTIFICATION_BROADCAST_MAX_ATTEMPTS: int = 5
+    REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Chat WebSocket (same pub/sub backend as SSE, separate channel)
+    CHAT_WS_BATCH_MS: int = 20 # events arriving within this window share one frame
+    CHAT_WS_BATCH_MAX: int = 50
 
     # GetStream Chat
     GET_STREAM_API_KEY: str = ""
     GET_STREAM_SECRET_KEY: str = ""
+    STREAM_SYNC_BATCH_SIZE: int = 50 # messages mirrored per worker round
+    STREAM_SYNC_MAX_ATTEMPTS: int = 8
 
 settings = Settings()
@@ -0,0 +1,122 @@
+"""
+Detection of blocking work on the event loop.
+
+`async def` handlers run on the event loop shared by every request and open
+SSE stream, so anything synchronous they do (a query on the sync Session, a
+blocking HTTP call) stalls all of them. Two checks log such calls:
+
+- a listener on sync engines warns when a statement is executed on the loop
+  thread, once per calling line (use `get_async_db` or a thread instead);
+- `LoopWatchdog`, a thread that notices when the loop has not ticked for
+  LOOP_BLOCK_WARN_MS and logs the stack the loop is stuck in.
+
+Both only log. LOOP_BLOCK_WARN_MS = 0 turns them off.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_reported_call_sites: set[tuple[str, int]] = set()
+
+
+def on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _caller() -> Optional[traceback.FrameSummary]:
+    # Innermost frame in app code, outside this module
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith(_APP_DIR) and frame.filename != __file__:
+            return frame
+    return None
+
+
+def _warn_sync_execute(conn, cursor, statement, parameters, context, executemany):
+    # Async engines run their sync core on the loop by design
+    if conn.dialect.is_async or not on_event_loop():
+        return
+    caller = _caller()
+    site = (caller.filename, caller.lineno) if caller else ("?", 0)
+    if site in _reported_call_sites:
+        return
+    _reported_call_sites.add(site)
+    where = f"{os.path.relpath(site[0], os.path.dirname(_APP_DIR))}:{site[1]} in {caller.name}" if caller else "unknown caller"
+    logger.warning(f"Blocking database call on the event loop at {where}: {statement.split(None, 1)[0]} ...")
+
+
+def install_sync_db_guard() -> None:
+    if settings.LOOP_BLOCK_WARN_MS > 0 and not event.contains(Engine, "before_cursor_execute", _warn_sync_execute):
+        event.listen(Engine, "before_cursor_execute", _warn_sync_execute)
+
+
+class LoopWatchdog:
+    """Logs the loop thread's stack whenever the loop stops ticking for `threshold_ms`"""
+
+    def __init__(self, threshold_ms: int | None = None):
+        self.threshold = (settings.LOOP_BLOCK_WARN_MS if threshold_ms is None else threshold_ms) / 1000
+        self.interval = self.threshold / 4
+        self.stalls = 0
+        self.longest_ms = 0
+        self._beat = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    async def start(self) -> None:
+        if self.threshold <= 0 or self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self) -> None:
+        reported = None
+        while not self._stop.wait(self.interval):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            if stalled < self.threshold:
+                continue
+            if reported != beat:
+                # First sight of this stall: where is the loop stuck?
+                reported = beat
+                self.stalls += 1
+                frame = sys._current_frames().get(self._loop_thread)
+                stack = "".join(traceback.format_stack(frame)[-6:]) if frame else ""
+                logger.warning(f"Event loop blocked for over {stalled * 1000:.0f} ms in:\n{stack}")
+            self.longest_ms = max(self.longest_ms, int(stalled * 1000))
+
+    def stats(self) -> dict:
+        return {"threshold_ms": int(self.threshold * 1000), "stalls": self.stalls, "longest_ms": self.longest_ms}
+
+
+loop_watchdog = LoopWatchdog()
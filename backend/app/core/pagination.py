@@ -0,0 +1,136 @@
+"""
+Keyset (cursor) pagination.
+
+A cursor is an opaque token holding the `(sort_key, id)` of the last row of a
+page. The next page is fetched with a seek predicate on that pair instead of
+OFFSET, so deep pages cost the same as the first one and rows inserted in the
+meantime do not shift the results.
+
+List endpoints accept `cursor` next to their existing page parameters and
+return the cursor for the following page in the `X-Next-Cursor` header
+(absent on the last page):
+
+    query, page_size = paginate(query, Model.created_at, Model.id, cursor, page, page_size, descending=True)
+    items = query.all()
+    set_next_cursor(response, items, page_size, lambda m: (m.created_at, m.id))
+
+With `with_total=true` an endpoint answers `{items, total}` instead of a bare
+list; `fetch_page` gets the total from `COUNT(*) OVER()` on the page query
+itself, so no separate count statement is needed.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> list:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, uuid.UUID):
+        return ["uuid", str(value)]
+    return ["v", value]
+
+
+def _decode_value(kind: str, value: Any) -> Any:
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "uuid":
+        return uuid.UUID(value)
+    return value
+
+
+def encode_cursor(sort_value: Any, row_id: Any) -> str:
+    raw = json.dumps([_encode_value(sort_value), _encode_value(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (sort_kind, sort_value), (id_kind, id_value) = json.loads(base64.urlsafe_b64decode(padded))
+        return _decode_value(sort_kind, sort_value), _decode_value(id_kind, id_value)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def seek(sort_key, id_column, cursor: str, descending: bool = False):
+    """Predicate selecting rows strictly after the cursor in (sort_key, id) order"""
+    sort_value, row_id = decode_cursor(cursor)
+    if descending:
+        return or_(sort_key < sort_value, and_(sort_key == sort_value, id_column < row_id))
+    return or_(sort_key > sort_value, and_(sort_key == sort_value, id_column > row_id))
+
+
+def paginate(
+    query: Query,
+    sort_key,
+    id_column,
+    cursor: str | None,
+    page: int = 1,
+    page_size: int = 20,
+    descending: bool = False,
+    default_page_size: int = 20,
+) -> tuple[Query, int]:
+    """Order by (sort_key, id) and apply either the cursor or the page offset.
+
+    Returns the limited query and the effective page size.
+    """
+    if page < 1:
+        page = 1
+    if page_size < 1:
+        page_size = default_page_size
+    if descending:
+        query = query.order_by(sort_key.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_key.asc(), id_column.asc())
+    if cursor:
+        query = query.filter(seek(sort_key, id_column, cursor, descending))
+    else:
+        query = query.offset((page - 1) * page_size)
+    return query.limit(page_size), page_size
+
+
+def set_next_cursor(
+    response: Response,
+    items: Sequence,
+    page_size: int,
+    key: Callable[[Any], tuple[Any, Any]],
+) -> str | None:
+    """Expose the cursor for the page after `items` (only when the page is full)"""
+    if len(items) < page_size or not items:
+        return None
+    next_cursor = encode_cursor(*key(items[-1]))
+    response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return next_cursor
+
+
+def fetch_page(
+    base: Query,
+    page_query: Query,
+    with_total: bool = False,
+    cursor: str | None = None,
+) -> tuple[list, int | None]:
+    """Rows of `page_query` (from paginate(base, ...)) and, if asked, the total
+    number of rows matching `base`.
+
+    The total rides along as a window column. It needs a fallback count
+    when the page is empty (offset past the end) or a cursor is in use,
+    because the seek predicate hides the rows before the cursor.
+    """
+    if not with_total:
+        return page_query.all(), None
+    if cursor:
+        return page_query.all(), base.order_by(None).count()
+    rows = page_query.add_columns(func.count().over()).all()
+    if not rows:
+        return [], base.order_by(None).count()
+    return [row[0] for row in rows], int(rows[0][-1])
@@ -0,0 +1,209 @@
+"""
+In-process background scheduler (APScheduler).
+
+Every replica starts the scheduler, but jobs only do work on the leader:
+the replica holding a session-level Postgres advisory lock on a dedicated
+connection. If the leader dies its connection closes, the lock is released
+and another replica takes over on its next tick.
+
+Per-job timings, results and backlog sizes are kept in memory and exposed
+through `GET /api/v1/admin/scheduler/status`.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.database.database import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary app-wide key for pg_try_advisory_lock
+SCHEDULER_LOCK_KEY = 724_311_905
+
+
+class LeaderLock:
+    """Holds a Postgres advisory lock on its own connection while leader"""
+
+    def __init__(self, key: int = SCHEDULER_LOCK_KEY, bind=None):
+        self.key = key
+        self.bind = bind or engine
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def is_leader(self) -> bool:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute(text("SELECT 1"))
+                    return True
+                except Exception as e:
+                    logger.warning(f"Scheduler lost its leader connection: {e}")
+                    self._close()
+            try:
+                conn = self.bind.connect().execution_options(isolation_level="AUTOCOMMIT")
+                acquired = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": self.key}).scalar()
+            except Exception as e:
+                logger.error(f"Scheduler leader election failed: {e}")
+                return False
+            if acquired:
+                self._conn = conn
+                logger.info("This node is now the scheduler leader")
+                return True
+            conn.close()
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": self.key})
+                except Exception:
+                    pass
+                self._close()
+
+    def _close(self) -> None:
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+
+class JobRunner:
+    """Registry of periodic jobs with leader gating and run metrics"""
+
+    def __init__(self, leader: Optional[LeaderLock] = None, session_factory=SessionLocal):
+        self.leader = leader or LeaderLock()
+        self.session_factory = session_factory
+        self.scheduler: Optional[BackgroundScheduler] = None
+        self.jobs: dict[str, dict] = {}
+
+    def add_job(
+        self,
+        name: str,
+        func: Callable,
+        interval_seconds: int,
+        backlog: Optional[Callable] = None,
+    ) -> None:
+        """func(db) -> dict | list runs the job; backlog(db) -> dict sizes the pending work"""
+        self.jobs[name] = {
+            "func": func,
+            "backlog_func": backlog,
+            "interval_seconds": interval_seconds,
+            "runs": 0,
+            "failures": 0,
+            "skipped_not_leader": 0,
+            "last_started_at": None,
+            "last_duration_ms": None,
+            "last_result": None,
+            "last_error": None,
+            "backlog": None,
+        }
+
+    def run_job(self, name: str, force: bool = False) -> Optional[dict]:
+        job = self.jobs[name]
+        if not force and not self.leader.is_leader():
+            job["skipped_not_leader"] += 1
+            return None
+        db = self.session_factory()
+        started = time.perf_counter()
+        job["last_started_at"] = datetime.now(timezone.utc).isoformat()
+        try:
+            if job["backlog_func"] is not None:
+                job["backlog"] = job["backlog_func"](db)
+            result = job["func"](db)
+            if isinstance(result, list):
+                result = {"processed": len(result)}
+            job["last_result"] = result
+            job["last_error"] = None
+            job["runs"] += 1
+            return result
+        except Exception as e:
+            db.rollback()
+            job["failures"] += 1
+            job["last_error"] = str(e)
+            logger.error(f"Scheduled job '{name}' failed: {e}")
+            return None
+        finally:
+            job["last_duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            db.close()
+
+    def start(self) -> None:
+        if self.scheduler is not None:
+            return
+        self.scheduler = BackgroundScheduler(timezone="UTC")
+        for name, job in self.jobs.items():
+            self.scheduler.add_job(
+                self.run_job,
+                "interval",
+                args=[name],
+                id=name,
+                seconds=job["interval_seconds"],
+                max_instances=1,
+                coalesce=True,
+                next_run_time=datetime.now(timezone.utc),
+            )
+        self.scheduler.start()
+        logger.info(f"Background scheduler started with jobs: {', '.join(self.jobs)}")
+
+    def shutdown(self) -> None:
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+        self.leader.release()
+
+    def status(self) -> dict:
+        return {
+            "running": self.scheduler is not None,
+            "leader": self.leader._conn is not None,
+            "jobs": {
+                name: {k: v for k, v in job.items() if k not in ("func", "backlog_func")}
+                for name, job in self.jobs.items()
+            },
+        }
+
+
+def _register_default_jobs(runner: JobRunner) -> None:
+    from app.services import embedding_jobs, event_scheduler_service, notification_broadcast
+    from app.services.profile_stats_service import rebuild_profile_stats
+
+    runner.add_job(
+        "event_transitions",
+        event_scheduler_service.run_event_transitions,
+        settings.SCHEDULER_TRANSITIONS_INTERVAL_SECONDS,
+        backlog=event_scheduler_service.event_transition_backlog,
+    )
+    runner.add_job(
+        "event_reminders",
+        event_scheduler_service.process_due_reminders,
+        settings.SCHEDULER_REMINDERS_INTERVAL_SECONDS,
+        backlog=event_scheduler_service.reminder_backlog,
+    )
+    runner.add_job(
+        "embedding_jobs",
+        embedding_jobs.process_embedding_jobs,
+        settings.EMBEDDING_JOBS_INTERVAL_SECONDS,
+        backlog=embedding_jobs.embedding_job_backlog,
+    )
+    runner.add_job(
+        "notification_broadcasts",
+        notification_broadcast.process_notification_broadcasts,
+        settings.NOTIFICATION_BROADCASTS_INTERVAL_SECONDS,
+        backlog=notification_broadcast.notification_broadcast_backlog,
+    )
+    runner.add_job(
+        "profile_stats_reconcile",
+        lambda db: {"repaired": rebuild_profile_stats(db)},
+        24 * 60 * 60,
+    )
+
+
+scheduler = JobRunner()
+_register_default_jobs(scheduler)
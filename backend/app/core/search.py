@@ -0,0 +1,118 @@
+"""
+Text search over events, profiles and organizations.
+
+Each searchable model declares a `SearchDocument`: weighted text columns
+plus a short "name" column. The weighted columns are folded into a tsvector
+expression that has a GIN expression index, so a search is an indexed `@@`
+match instead of the sequential scan `ILIKE '%q%'` forces. Every term is
+matched as a word prefix, so partial input while typing still hits.
+
+When the pg_trgm extension is installed, the name column is also matched by
+substring and trigram similarity (typos, mid-word fragments). The migration
+backs this with `gin_trgm_ops` indexes. On other databases (SQLite) search
+falls back to ILIKE.
+
+    predicate, rank = text_search(db, q, EVENT_SEARCH)
+    query = query.filter(predicate).order_by(rank.desc())
+"""
+
+import re
+from dataclasses import dataclass
+from functools import reduce
+from typing import Any
+
+from sqlalchemy import case, false, func, literal, or_, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# 'simple' does no stemming or stop words, which suits names in any language.
+# Rendered inline so the same SQL works in index DDL and in queries.
+SEARCH_CONFIG = text("'simple'::regconfig")
+
+WEIGHTS = ("A", "B", "C", "D")
+
+_TERM = re.compile(r"[^\W_]+")
+
+# bind url -> whether pg_trgm is installed there
+_trigram_support: dict[str, bool] = {}
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    weighted: tuple  # ((column, "A".."D"), ...)
+    name: Any  # column used for trigram / substring matching
+
+    def __post_init__(self):
+        for _, weight in self.weighted:
+            if weight not in WEIGHTS:
+                raise ValueError(f"Invalid search weight: {weight!r}")
+
+    def vector(self):
+        """The indexed tsvector expression; index and queries must build it identically.
+
+        Constants are rendered inline like the config: with server-side
+        binding (psycopg 3) a bound parameter never matches the index
+        expression, and a weight bound as varchar has no setweight() at all.
+        """
+        parts = [
+            func.setweight(
+                func.to_tsvector(SEARCH_CONFIG, func.coalesce(column, text("''")), type_=TSVECTOR),
+                text(f"'{weight}'"),
+                type_=TSVECTOR,
+            )
+            for column, weight in self.weighted
+        ]
+        return reduce(lambda a, b: a.op("||", return_type=TSVECTOR)(b), parts)
+
+
+def search_terms(q: str) -> list[str]:
+    return _TERM.findall((q or "").lower())
+
+
+def prefix_tsquery(terms: list[str]):
+    """AND of word prefixes: "data sci" -> data:* & sci:*"""
+    return func.to_tsquery(SEARCH_CONFIG, " & ".join(f"{t}:*" for t in terms))
+
+
+def has_trigram_support(db) -> bool:
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+    key = str(bind.engine.url)
+    if key not in _trigram_support:
+        _trigram_support[key] = db.execute(
+            text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        ).scalar() is not None
+    return _trigram_support[key]
+
+
+def text_search(db, q: str, document: SearchDocument):
+    """(predicate, rank) for matching `q` against `document`.
+
+    `db` is the Session the query runs on (a Query's `.session` works too).
+    """
+    terms = search_terms(q)
+    if db.get_bind().dialect.name != "postgresql":
+        return _ilike_search(q, document)
+    if not terms:
+        # Only punctuation: nothing the index can match
+        return false(), literal(0.0)
+
+    vector = document.vector()
+    tsquery = prefix_tsquery(terms)
+    predicate = vector.op("@@")(tsquery)
+    rank = func.ts_rank_cd(vector, tsquery)
+    if has_trigram_support(db):
+        predicate = or_(predicate, document.name.ilike(f"%{q}%"), document.name.op("%")(q))
+        rank = rank + func.similarity(document.name, q)
+    return predicate, rank
+
+
+def _ilike_search(q: str, document: SearchDocument):
+    pattern = f"%{q}%"
+    predicate = or_(*(column.ilike(pattern) for column, _ in document.weighted))
+    rank = case(
+        (document.name.ilike(f"{q}%"), 2.0),
+        (document.name.ilike(pattern), 1.0),
+        else_=0.0,
+    )
+    return predicate, rank
@@ -0,0 +1,26 @@
+import argparse
+import json
+import logging
+
+from app.database.database import SessionLocal
+from app.services.image_service import backfill_image_derivatives
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate thumbnails and WebP variants for stored images that have none")
+    parser.add_argument("--batch-size", type=int, default=50, help="rows per batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="images fetched and resized at once")
+    parser.add_argument("--limit", type=int, default=None, help="stop after this many images; rerun to continue")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    db = SessionLocal()
+    try:
+        stats = backfill_image_derivatives(db, batch_size=args.batch_size, concurrency=args.concurrency, limit=args.limit)
+        print(json.dumps(stats))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 from app.core.config import settings
 
 # --- SQLAlchemy Setup ---
@@ -56,3 +59,57 @@ def get_db():
         except Exception:
             # Suppress errors during session close (e.g. if connection was already closed)
             pass
+
+
+# --- Async access for `async def` handlers ---
+# A sync Session used inside `async def` blocks the event loop (and every open
+# SSE stream) for each query; such handlers take `get_async_db` instead.
+
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """The same database with its async driver (asyncpg / aiosqlite)"""
+    parsed = make_url(url)
+    parsed = parsed.set(drivername=_ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername))
+    if parsed.drivername == "postgresql+asyncpg":
+        # libpq options asyncpg does not take; sslmode maps onto its `ssl`
+        query = dict(parsed.query)
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        query.pop("channel_binding", None)
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+_async_engine = None
+_async_session_factory = None
+
+
+def get_async_engine():
+    # Created on first use so sync-only processes (scripts, the scheduler) never load the async driver
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url = settings.ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+        if os.environ.get("TESTING") == "1":
+            # Pooled asyncpg connections belong to one event loop; test clients start several
+            _async_engine = create_async_engine(url, poolclass=NullPool)
+        else:
+            _async_engine = create_async_engine(url, pool_pre_ping=True, pool_recycle=300)
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+    return _async_engine
+
+
+def async_session() -> AsyncSession:
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def get_async_db():
+    async with async_session() as db:
+        yield db
+
+
+async def dispose_async_engine() -> None:
+    if _async_engine is not None:
+        await _async_engine.dispose()
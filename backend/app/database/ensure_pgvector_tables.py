@@ -8,6 +8,9 @@ DDL = [
     "CREATE TABLE IF NOT EXISTS event_embeddings (event_id UUID PRIMARY KEY, embedding VECTOR(768), source_text TEXT)",
     "CREATE INDEX IF NOT EXISTS expert_embeddings_embedding_idx ON expert_embeddings USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)",
     "CREATE INDEX IF NOT EXISTS event_embeddings_embedding_idx ON event_embeddings USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)",
+    # Searches order by `<->` (L2), which the cosine indexes above cannot serve
+    "CREATE INDEX IF NOT EXISTS expert_embeddings_embedding_l2_idx ON expert_embeddings USING ivfflat (embedding vector_l2_ops) WITH (lists = 100)",
+    "CREATE INDEX IF NOT EXISTS event_embeddings_embedding_l2_idx ON event_embeddings USING ivfflat (embedding vector_l2_ops) WITH (lists = 100)",
 ]
 
 
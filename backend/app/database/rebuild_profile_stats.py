@@ -0,0 +1,15 @@
+from app.database.database import SessionLocal
+from app.services.profile_stats_service import rebuild_profile_stats
+
+
+def main():
+    db = SessionLocal()
+    try:
+        count = rebuild_profile_stats(db)
+    finally:
+        db.close()
+    print(f"Repaired profile_stats for {count} users")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import argparse
+import json
+import logging
+
+from app.database.database import SessionLocal
+from app.services.embedding_pipeline import SOURCES, reindex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed events and experts whose source text or embedding model changed")
+    parser.add_argument("--source", choices=[*SOURCES, "all"], default="all")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows per provider batch (default EMBEDDING_BATCH_SIZE)")
+    parser.add_argument("--limit", type=int, default=None, help="stop after scanning this many rows; rerun to continue")
+    parser.add_argument("--force", action="store_true", help="re-embed unchanged rows too")
+    parser.add_argument("--restart", action="store_true", help="ignore an unfinished checkpoint and start from the first row")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    names = list(SOURCES) if args.source == "all" else [args.source]
+    db = SessionLocal()
+    try:
+        for name in names:
+            stats = reindex(db, name, chunk_size=args.chunk_size, force=args.force, restart=args.restart, limit=args.limit)
+            print(json.dumps(stats))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database.database import get_db
+from app.database.database import async_session, get_db
 from app.models.user_model import User, Role
 from app.core.security import decode_access_token
+from app.services.principal_cache import principal_cache
 from typing import Optional
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -12,6 +14,16 @@ oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", aut
 
 from fastapi import Query
 
+def _load_user(db: Session, user_id: uuid.UUID) -> User | None:
+    """Authenticated user for this request, from the principal cache when possible"""
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal.bind(db)
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        principal_cache.put(user)
+    return user
+
 def get_current_user_sse(
     token: str | None = Depends(oauth2_scheme_optional),
     db: Session = Depends(get_db),
@@ -39,7 +51,7 @@ def get_current_user_sse(
              raise HTTPException(status_code=401, detail="Invalid token payload")
              
         user_id = uuid.UUID(user_id_str)
-        user = db.query(User).filter(User.id == user_id).first()
+        user = _load_user(db, user_id)
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
             
@@ -72,7 +84,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         user_id = uuid.UUID(user_id_str)
     except ValueError:
         raise credentials_exception
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _load_user(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -94,18 +106,34 @@ def get_current_user_optional(token: Optional[str] = Depends(oauth2_scheme_optio
         user_id = uuid.UUID(user_id_str)
     except ValueError:
         return None
-    user = db.query(User).filter(User.id == user_id).first()
-    return user
+    return _load_user(db, user_id)
+
+async def authenticate_websocket(token: str | None) -> uuid.UUID | None:
+    """User id for a WebSocket's `token` query param, or None. Runs on the event loop."""
+    payload = decode_access_token(token) if token else None
+    if payload is None or payload.get("sub") is None:
+        return None
+    try:
+        user_id = uuid.UUID(payload["sub"])
+    except ValueError:
+        return None
+    if principal_cache.get(user_id) is not None:
+        return user_id
+    async with async_session() as db:
+        return await db.scalar(select(User.id).where(User.id == user_id))
 
 def require_roles(required: list[str]):
     def _dep(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> User:
-        roles = (
-            db.query(Role)
-            .join(Role.users)
-            .filter(User.id == current_user.id)
-            .all()
-        )
-        names = {r.name for r in roles}
+        principal = principal_cache.get(current_user.id)
+        if principal is not None and principal.roles is not None:
+            names = principal.roles
+        else:
+            names = {
+                name for (name,) in db.query(Role.name)
+                .join(Role.users)
+                .filter(User.id == current_user.id)
+            }
+            principal_cache.set_roles(current_user.id, names)
         if required and not any(name in names for name in required):
             raise HTTPException(status_code=403, detail="Insufficient role")
         return current_user
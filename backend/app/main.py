@@ -25,14 +25,89 @@ app = FastAPI(
 def startup_db():
     Base.metadata.create_all(bind=engine)
 
+@app.on_event("startup")
+def startup_vector_index():
+    # Warm the in-process expert vector index (no-op for the pgvector backend)
+    from app.database.database import SessionLocal
+    from app.services.vector_index import load_expert_index
+    db = SessionLocal()
+    try:
+        load_expert_index(db)
+    except Exception as e:
+        logger.warning(f"Could not load expert vector index at startup: {e}")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+async def startup_email_worker():
+    # Drain the email outbox in the background (disabled under tests)
+    if os.environ.get("TESTING") == "1" or not settings.EMAIL_WORKER_ENABLED:
+        return
+    from app.services.email_outbox import outbox_worker
+    await outbox_worker.start()
+
+@app.on_event("startup")
+async def startup_sse():
+    # Subscribe to the SSE pub/sub backend so this worker receives fan-out
+    from app.services.sse_manager import sse_manager
+    try:
+        await sse_manager.start()
+    except Exception as e:
+        logger.warning(f"Could not start SSE pub/sub backend at startup: {e}")
+
+@app.on_event("startup")
+async def startup_chat():
+    # Chat WebSocket fan-out, and the GetStream mirror of sent messages (disabled under tests)
+    from app.services.chat_realtime import chat_hub
+    try:
+        await chat_hub.start()
+    except Exception as e:
+        logger.warning(f"Could not start chat pub/sub backend at startup: {e}")
+    from app.services.stream_sync import stream_configured, stream_sync_worker
+    if os.environ.get("TESTING") != "1" and stream_configured():
+        await stream_sync_worker.start()
+
+@app.on_event("startup")
+async def startup_loop_guard():
+    # Log sync DB calls and other blocking work on the event loop
+    from app.core.loop_guard import install_sync_db_guard, loop_watchdog
+    install_sync_db_guard()
+    await loop_watchdog.start()
+
+@app.on_event("startup")
+def startup_scheduler():
+    # Event transitions / reminders; only the advisory-lock leader does work
+    if os.environ.get("TESTING") == "1" or not settings.SCHEDULER_ENABLED:
+        return
+    from app.core.scheduler import scheduler
+    scheduler.start()
+
 @app.on_event("shutdown")
 async def shutdown_event():
+    from app.core.scheduler import scheduler
+    scheduler.shutdown()
+
+    # Stop the email outbox worker; unsent rows stay PENDING for the next start
+    from app.services.email_outbox import outbox_worker
+    await outbox_worker.stop()
+
     # Close SSE connections
     from app.services.sse_manager import sse_manager
     await sse_manager.broadcast_shutdown()
+
+    # Unsent GetStream mirrors stay queued for the next start
+    from app.services.chat_realtime import chat_hub
+    from app.services.stream_sync import stream_sync_worker
+    await chat_hub.stop()
+    await stream_sync_worker.stop()
     
+    from app.core.loop_guard import loop_watchdog
+    await loop_watchdog.stop()
+
     # Close database connections gracefully to prevent "stuck" reloads
     engine.dispose()
+    from app.database.database import dispose_async_engine
+    await dispose_async_engine()
 
 # CORS Middleware
 app.add_middleware(
@@ -49,6 +124,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 logging.basicConfig(level=logging.INFO)
@@ -70,6 +146,15 @@ app.include_router(notification_router.router, prefix="/api/v1", tags=["Notifica
 from app.routers import ai_router
 app.include_router(ai_router.router, prefix="/api/v1/ai", tags=["AI"])
 
+from app.routers import storage_router
+app.include_router(storage_router.router, prefix="/api/v1", tags=["Storage"])
+
+if settings.STORAGE_BACKEND.strip().lower() == "local":
+    # Local media storage serves its own files
+    from urllib.parse import urlparse
+    from fastapi.staticfiles import StaticFiles
+    app.mount(urlparse(settings.MEDIA_BASE_URL).path or "/media", StaticFiles(directory=settings.MEDIA_ROOT, check_dir=False), name="media")
+
 if os.environ.get("PYTEST_CURRENT_TEST"):
     SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
     engine = create_engine(
@@ -11,7 +11,7 @@ from app.models.user_model import User
 from app.models.email_template_model import EmailTemplate
 from app.models.communication_log_model import CommunicationLog
 from app.models.chat_model import Conversation, Message, ConversationParticipant
-from app.models.ai_model import EventEmbedding, ExpertEmbedding
+from app.models.ai_model import EmbeddingCacheEntry, EmbeddingCheckpoint, EmbeddingJob, EventEmbedding, ExpertEmbedding
 
 __all__ = [
     "AuditLog",
@@ -29,6 +29,9 @@ __all__ = [
     "Conversation",
     "Message",
     "ConversationParticipant",
+    "EmbeddingCacheEntry",
+    "EmbeddingCheckpoint",
+    "EmbeddingJob",
     "EventEmbedding",
     "ExpertEmbedding",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, ForeignKey, DateTime, func, JSON
+from sqlalchemy import BigInteger, Column, String, Text, ForeignKey, DateTime, Integer, func, JSON, UniqueConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from app.database.database import Base
 import uuid
@@ -43,3 +43,64 @@ class EventEmbedding(Base):
     model_name = Column(Text, default='text-embedding-3-small')
     embedding_version = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class EmbeddingCacheEntry(Base):
+    """Persistent tier of the text embedding cache (see services/embedding_cache.py)"""
+    __tablename__ = "embedding_cache"
+
+    # sha256 of (provider, model, task_type, normalized text)
+    cache_key = Column(String(64), primary_key=True)
+    provider = Column(Text, nullable=False)
+    model_name = Column(Text, nullable=False)
+    task_type = Column(Text, nullable=False)
+    source_text = Column(Text, nullable=False)
+    embedding = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class EmbeddingCheckpoint(Base):
+    """Resume point of a bulk re-embedding run, one row per source (see services/embedding_pipeline.py)"""
+    __tablename__ = "embedding_checkpoints"
+
+    source = Column(String, primary_key=True)
+    last_key = Column(UUID(as_uuid=True), nullable=True)
+    processed = Column(Integer, nullable=False, default=0)
+    embedded = Column(Integer, nullable=False, default=0)
+    skipped = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+class EmbeddingJob(Base):
+    """Pending (re-)embedding of one event or expert (see services/embedding_jobs.py).
+
+    One row per entity: enqueueing again replaces the source text, so a row
+    edited several times before the worker runs is embedded once.
+    """
+    __tablename__ = "embedding_jobs"
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", name="uq_embedding_jobs_entity"),
+        Index("ix_embedding_jobs_due", "status", "available_at"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    entity_type = Column(String, nullable=False)  # embedding_pipeline.SOURCES key: "events" | "experts"
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    source_text = Column(Text, nullable=False)
+    source_hash = Column(String(32), nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending | failed | done
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())  # done: when embedded
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class VectorIndexVersion(Base):
+    """Change counter of an in-process vector index (see services/vector_index.py).
+
+    Bumped in the same transaction as every embedding change, so workers can
+    tell their copy of the index is stale and reload it.
+    """
+    __tablename__ = "vector_index_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
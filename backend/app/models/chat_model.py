@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Table
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Boolean, Table, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -13,6 +13,8 @@ class ConversationParticipant(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
     
     last_read_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Messages from others since last_read_at (kept by app.services.conversation_service.record_message)
+    unread_count = Column(Integer, nullable=False, default=0, server_default='0')
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -24,16 +26,39 @@ class Conversation(Base):
     __tablename__ = 'conversations'
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Canonical 1:1 chat of a pair of users (app.services.conversation_service); NULL for other chats
+    participant_key = Column(UUID(as_uuid=True), nullable=True, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+    # Inbox preview (kept by app.services.conversation_service.record_message)
+    last_message_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey('messages.id', ondelete='SET NULL', use_alter=True, name='fk_conversations_last_message_id'),
+        nullable=True,
+    )
+    last_message_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relationships
     participants = relationship("ConversationParticipant", back_populates="conversation", cascade="all, delete-orphan")
-    messages = relationship("Message", back_populates="conversation", order_by="desc(Message.created_at)", cascade="all, delete-orphan")
+    messages = relationship(
+        "Message",
+        back_populates="conversation",
+        foreign_keys="Message.conversation_id",
+        order_by="desc(Message.created_at)",
+        cascade="all, delete-orphan",
+    )
+    last_message = relationship("Message", foreign_keys=[last_message_id], post_update=True)
+
+# Keyset pagination of conversation lists by last activity (app.core.pagination)
+Index('ix_conversations_activity_id', func.coalesce(Conversation.updated_at, Conversation.created_at), Conversation.id)
 
 
 class Message(Base):
     __tablename__ = 'messages'
+    __table_args__ = (
+        # Keyset pagination (app.core.pagination)
+        Index('ix_messages_conversation_created_at_id', 'conversation_id', 'created_at', 'id'),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     conversation_id = Column(UUID(as_uuid=True), ForeignKey('conversations.id', ondelete='CASCADE'), nullable=False)
@@ -45,5 +70,23 @@ class Message(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    conversation = relationship("Conversation", back_populates="messages")
+    conversation = relationship("Conversation", back_populates="messages", foreign_keys=[conversation_id])
     sender = relationship("User")
+
+
+class StreamSyncJob(Base):
+    """Pending mirror of one message to GetStream (see services/stream_sync.py).
+
+    Inserted in the message's transaction; deleted once GetStream has it.
+    """
+    __tablename__ = 'stream_sync_jobs'
+    __table_args__ = (
+        Index('ix_stream_sync_jobs_due', 'status', 'available_at'),
+    )
+
+    message_id = Column(UUID(as_uuid=True), ForeignKey('messages.id', ondelete='CASCADE'), primary_key=True)
+    status = Column(String, nullable=False, default="pending") # pending | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, String, DateTime, Enum, JSON, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Enum, JSON, ForeignKey, Text, Integer
 from sqlalchemy.sql import func
 from app.database.database import Base
 import enum
@@ -25,6 +25,10 @@ class CommunicationLog(Base):
     status = Column(Enum(CommunicationStatus), default=CommunicationStatus.PENDING, index=True)
     error_message = Column(Text, nullable=True)
     metadata_payload = Column(JSON, nullable=True) # Store extra info like template_id, variables
+
+    # Outbox delivery state (see app/services/email_outbox.py)
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True, index=True) # Retry / claim lease
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
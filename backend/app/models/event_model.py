@@ -1,12 +1,13 @@
 # model/event_model.py
 
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, DateTime, Text, Enum, Float, UniqueConstraint, Table
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, DateTime, Text, Enum, Float, UniqueConstraint, Table, Index
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func, select
-from sqlalchemy.orm import relationship, column_property
+from sqlalchemy.orm import relationship, column_property, validates
 import enum
 import uuid
 from app.database.database import Base
+from app.core.search import SearchDocument
 
 class EventFormat(enum.Enum):
     panel_discussion = "panel_discussion"
@@ -71,6 +72,10 @@ class EventParticipantStatus(enum.Enum):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (
+        # Keyset pagination (app.core.pagination)
+        Index("ix_events_start_datetime_id", "start_datetime", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     organizer_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -80,6 +85,9 @@ class Event(Base):
     description = Column(Text, nullable=True)
     logo_url = Column(String, nullable=True)
     cover_url = Column(String, nullable=True)
+    # Resized WebP copies keyed by size in px (see services/image_service.py)
+    logo_variants = Column(JSONB(none_as_null=True), nullable=True)
+    cover_variants = Column(JSONB(none_as_null=True), nullable=True)
     meeting_url = Column(String, nullable=True)
     payment_qr_url = Column(String, nullable=True)
     format = Column(Enum(EventFormat), nullable=False)
@@ -116,11 +124,22 @@ class Event(Base):
     def organizer_avatar(self):
         return self.organizer.avatar_url if self.organizer else None
 
+    @validates("logo_url", "cover_url")
+    def _reset_image_variants(self, key, value):
+        # Derivatives belong to the replaced image; uploads set the new ones after the URL
+        if value != getattr(self, key):
+            setattr(self, key.replace("_url", "_variants"), None)
+        return value
+
     # Relationships
     categories = relationship("EventCategory", backref="event", cascade="all, delete-orphan")
     pictures = relationship("EventPicture", backref="event", cascade="all, delete-orphan")
     participants = relationship("EventParticipant", back_populates="event", cascade="all, delete-orphan")
 
+EVENT_SEARCH = SearchDocument(weighted=((Event.title, "A"), (Event.description, "B")), name=Event.title)
+# tsvector and GIN are Postgres-only; other databases search with ILIKE
+Index("ix_events_search", EVENT_SEARCH.vector(), postgresql_using="gin").ddl_if(dialect="postgresql")
+
 class EventCategory(Base):
     __tablename__ = "event_categories"
     
@@ -309,16 +328,19 @@ event_checklist_item_files = Table(
 )
 
 
+# Participant statuses counted as "registered" (also used by app.services.event_read_model)
+COUNTED_PARTICIPANT_STATUSES = [
+    EventParticipantStatus.accepted,
+    EventParticipantStatus.attended,
+    EventParticipantStatus.pending # Optional: Include pending if "Registered" typically means signed up
+]
+
 # Inject participant_count property to Event model
 # Counts all participants who are accepted or attended (or organizer)
 Event.participant_count = column_property(
     select(func.count(EventParticipant.id))
     .where(EventParticipant.event_id == Event.id)
-    .where(EventParticipant.status.in_([
-        EventParticipantStatus.accepted,
-        EventParticipantStatus.attended,
-        EventParticipantStatus.pending # Optional: Include pending if "Registered" typically means signed up
-    ]))
+    .where(EventParticipant.status.in_(COUNTED_PARTICIPANT_STATUSES))
     .correlate_except(EventParticipant)
     .scalar_subquery()
 )
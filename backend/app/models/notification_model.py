@@ -1,7 +1,7 @@
 # model/notification_model.py
 
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum, Boolean, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 import enum
@@ -17,6 +17,10 @@ class NotificationType(enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Keyset pagination (app.core.pagination)
+        Index("ix_notifications_recipient_created_at_id", "recipient_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     recipient_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -27,3 +31,26 @@ class Notification(Base):
     is_read = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class NotificationBroadcast(Base):
+    """An admin broadcast delivered in the background (see services/notification_broadcast.py)"""
+    __tablename__ = "notification_broadcasts"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    created_by_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    title = Column(String, nullable=False)
+    content = Column(Text, nullable=False)
+    link_url = Column(String, nullable=True)
+    target_role = Column(String, nullable=True)
+    target_user_id = Column(UUID(as_uuid=True), nullable=True)
+    status = Column(String, nullable=False, default="queued") # queued | running | completed | failed
+    total = Column(Integer, nullable=False, default=0) # recipients when queued
+    sent = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    last_recipient_id = Column(UUID(as_uuid=True), nullable=True) # resume point: last user id of the last committed chunk
+    lease_until = Column(DateTime(timezone=True), nullable=True) # a running broadcast past its lease is re-claimed
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,13 +1,14 @@
 # model/organization.py
 
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum, Table, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Enum, Table, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 import enum
 import uuid
 from app.database.database import Base
+from app.core.search import SearchDocument
 
 class OrganizationType(enum.Enum):
     company = "company"
@@ -42,12 +43,19 @@ organization_members = Table(
 
 class Organization(Base):
     __tablename__ = "organizations"
+    __table_args__ = (
+        # Keyset pagination (app.core.pagination)
+        Index("ix_organizations_created_at_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     name = Column(String, nullable=False)
     logo_url = Column(String, nullable=True)
     cover_url = Column(String, nullable=True)
+    # Resized WebP copies keyed by size in px (see services/image_service.py)
+    logo_variants = Column(JSON(none_as_null=True), nullable=True)
+    cover_variants = Column(JSON(none_as_null=True), nullable=True)
     description = Column(Text, nullable=True)
     type = Column(Enum(OrganizationType), default=OrganizationType.community, nullable=False)
     website_url = Column(String, nullable=True)
@@ -64,3 +72,17 @@ class Organization(Base):
     
     members = relationship("User", secondary=organization_members, back_populates="organizations")
     owner = relationship("User", foreign_keys=[owner_id])
+
+    @validates("logo_url", "cover_url")
+    def _reset_image_variants(self, key, value):
+        # Derivatives belong to the replaced image; uploads set the new ones after the URL
+        if value != getattr(self, key):
+            setattr(self, key.replace("_url", "_variants"), None)
+        return value
+
+ORGANIZATION_SEARCH = SearchDocument(
+    weighted=((Organization.name, "A"), (Organization.description, "B")),
+    name=Organization.name,
+)
+# tsvector and GIN are Postgres-only; other databases search with ILIKE
+Index("ix_organizations_search", ORGANIZATION_SEARCH.vector(), postgresql_using="gin").ddl_if(dialect="postgresql")
@@ -1,13 +1,14 @@
 # model/profile_model.py
 
 
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, DateTime, Text, Enum, Table, Float, JSON
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, DateTime, Text, Enum, Table, Float, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 import enum
 import uuid
 from app.database.database import Base
+from app.core.search import SearchDocument
 
 class ProfileVisibility(enum.Enum):
     public = "public"
@@ -39,6 +40,9 @@ class Profile(Base):
     bio = Column(Text, nullable=True)
     avatar_url = Column(String, nullable=True)
     cover_url = Column(String, nullable=True)
+    # Resized WebP copies keyed by size in px (see services/image_service.py)
+    avatar_variants = Column(JSON(none_as_null=True), nullable=True)
+    cover_variants = Column(JSON(none_as_null=True), nullable=True)
     linkedin_url = Column(String, nullable=True)
     github_url = Column(String, nullable=True)
     instagram_url = Column(String, nullable=True)
@@ -76,6 +80,20 @@ class Profile(Base):
     def job_experiences(self):
         return self.user.job_experiences if self.user else []
 
+    @validates("avatar_url", "cover_url")
+    def _reset_image_variants(self, key, value):
+        # Derivatives belong to the replaced image; uploads set the new ones after the URL
+        if value != getattr(self, key):
+            setattr(self, key.replace("_url", "_variants"), None)
+        return value
+
+PROFILE_SEARCH = SearchDocument(
+    weighted=((Profile.full_name, "A"), (Profile.title, "B"), (Profile.bio, "C"), (Profile.availability, "D")),
+    name=Profile.full_name,
+)
+# tsvector and GIN are Postgres-only; other databases search with ILIKE
+Index("ix_profiles_search", PROFILE_SEARCH.vector(), postgresql_using="gin").ddl_if(dialect="postgresql")
+
 class Tag(Base):
     __tablename__ = "tags"
     
@@ -118,3 +136,23 @@ class JobExperience(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User", back_populates="job_experiences")
+
+class ProfileStats(Base):
+    """Denormalized profile aggregates.
+
+    Kept in sync on flush by app.services.profile_stats_service and rebuilt
+    in bulk by its reconciliation job.
+    """
+    __tablename__ = "profile_stats"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    reviews_count = Column(Integer, nullable=False, default=0, server_default='0')
+    rating_sum = Column(Integer, nullable=False, default=0, server_default='0')
+    followers_count = Column(Integer, nullable=False, default=0, server_default='0')
+    following_count = Column(Integer, nullable=False, default=0, server_default='0')
+    sponsor_count = Column(Integer, nullable=False, default=0, server_default='0')
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.reviews_count if self.reviews_count else 0.0
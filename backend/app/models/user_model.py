@@ -1,6 +1,6 @@
 # model/user_model.py
 
-from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, DateTime, Text, Enum, Table, text
+from sqlalchemy import Column, String, Boolean, Integer, ForeignKey, DateTime, Text, Enum, Table, text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -25,6 +25,10 @@ user_roles = Table(
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        # Keyset pagination (app.core.pagination)
+        Index("ix_users_created_at_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email = Column(String, unique=True, nullable=False)
@@ -57,6 +61,10 @@ class User(Base):
     def avatar_url(self):
         return self.profile.avatar_url if self.profile else None
 
+    @property
+    def avatar_variants(self):
+        return self.profile.avatar_variants if self.profile else None
+
     @property
     def visibility(self):
         # Return string value of enum if possible, or just the enum
@@ -1,16 +1,25 @@
 # app/routers/admin_router.py
 
 
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, select
 from typing import List
 import app.database.database
-from app.database.database import get_db
+from app.database.database import get_async_db, get_db
 from app.dependencies import require_roles
 from app.models.user_model import User, Role, user_roles
+from app.models.profile_model import Profile
 from app.models.audit_log_model import AuditLog
 from app.services.audit_service import log_admin_action
+from app.services.export_service import EXPORT_FORMAT_PATTERN, export_response
+from app.services.event_read_model import event_list_query, fetch_events
+from app.services.embedding_jobs import enqueue_event
+from app.core.pagination import fetch_page, paginate, set_next_cursor
+from app.core.search import text_search
+from app.schemas.pagination_schema import Page
 from pydantic import BaseModel
 import csv
 import io
@@ -24,6 +33,7 @@ from app.models.email_template_model import EmailTemplate as EmailTemplateModel
 from app.schemas.email_schema import EmailTemplateCreate, EmailTemplateUpdate
 from app.seeders.email_template_seeder import seed_default_email_templates
 from app.models.event_model import (
+    EVENT_SEARCH,
     Event,
     EventParticipant,
     EventParticipantRole,
@@ -37,7 +47,7 @@ from app.models.event_model import (
     Category
 )
 from app.schemas.event_schema import EventUpdate, EventDetails, EventCreate
-from app.services.cloudinary_service import upload_file
+from app.services import image_service, storage_service
 
 router = APIRouter()
 
@@ -150,16 +160,10 @@ def admin_update_event(
         raise HTTPException(status_code=400, detail="End datetime must be after start datetime")
         
     db.add(event)
+    # Re-embedded by the embedding job queue, off the request path
+    enqueue_event(db, event)
     db.commit()
     db.refresh(event)
-    
-    # Re-index for search if needed (best effort)
-    try:
-        from app.services.ai_service import upsert_event_embedding
-        src = f"{event.title}\n{event.description or ''}\nformat:{event.format} type:{event.type}"
-        upsert_event_embedding(db, event.id, src)
-    except Exception:
-        pass
 
     return event
 
@@ -180,7 +184,7 @@ def admin_update_event_payment_qr(
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    url = upload_file(file, "payment_qrs")
+    url = anyio.from_thread.run(storage_service.save, file, "payment_qrs")
     event.payment_qr_url = url
     db.add(event)
     db.commit()
@@ -200,10 +204,10 @@ def admin_list_events(
     current_user: User = Depends(require_roles(["admin"]))
 ):
     """Admin endpoint to list all events with filters"""
-    query = db.query(Event)
+    query = event_list_query(db)
     
     if q:
-        query = query.filter(Event.title.ilike(f"%{q}%"))
+        query = query.filter(text_search(db, q, EVENT_SEARCH)[0])
     if status:
         query = query.filter(Event.status == status)
     if type:
@@ -213,11 +217,10 @@ def admin_list_events(
     if organizer_id:
         query = query.filter(Event.organizer_id == organizer_id)
     
-    return (
+    return fetch_events(
         query.order_by(Event.created_at.desc())
         .offset((page - 1) * page_size)
         .limit(page_size)
-        .all()
     )
 
 @router.post("/events", response_model=EventDetails)
@@ -325,15 +328,9 @@ def admin_publish_event(
         event.registration_status = EventRegistrationStatus.opened
         
     db.add(event)
+    enqueue_event(db, event)
     db.commit()
     db.refresh(event)
-    
-    try:
-        from app.services.ai_service import upsert_event_embedding
-        src = f"{event.title}\n{event.description or ''}\nformat:{event.format} type:{event.type}"
-        upsert_event_embedding(db, event.id, src)
-    except Exception:
-        db.rollback()
         
     log_admin_action(db, current_user.id, "event.publish", "event", event.id)
     return event
@@ -407,8 +404,9 @@ def admin_update_event_logo(
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    url = upload_file(file, "event_logos")
-    event.logo_url = url
+    image = anyio.from_thread.run(image_service.save_image, file, "event_logos")
+    event.logo_url = image.url
+    event.logo_variants = image.variants
     db.add(event)
     db.commit()
     db.refresh(event)
@@ -431,8 +429,9 @@ def admin_update_event_cover(
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    url = upload_file(file, "event_covers")
-    event.cover_url = url
+    image = anyio.from_thread.run(image_service.save_image, file, "event_covers")
+    event.cover_url = image.url
+    event.cover_variants = image.variants
     db.add(event)
     db.commit()
     db.refresh(event)
@@ -442,7 +441,59 @@ def admin_update_event_cover(
 def read_admin_root():
     return {"message": "Welcome to the ATAS Admin API!"}
 
-from app.models.organization_model import Organization, OrganizationVisibility, OrganizationType, OrganizationStatus
+@router.get("/scheduler/status")
+def admin_scheduler_status(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(["admin"])),
+):
+    """Background job timings and current backlog sizes"""
+    from app.core.scheduler import scheduler
+    from app.services.event_scheduler_service import event_transition_backlog, reminder_backlog
+    status = scheduler.status()
+    status["backlog"] = {**event_transition_backlog(db), **reminder_backlog(db)}
+    return status
+
+@router.get("/auth/principal-cache/stats")
+def admin_principal_cache_stats(
+    current_user: User = Depends(require_roles(["admin"])),
+):
+    """Hit/miss counters of the authenticated-principal cache on the worker serving this request"""
+    from app.services.principal_cache import principal_cache
+    return principal_cache.stats()
+
+@router.get("/ai/embedding-cache/stats")
+def admin_embedding_cache_stats(
+    current_user: User = Depends(require_roles(["admin"])),
+):
+    """Hit/miss counters of the text embedding cache on the worker serving this request"""
+    from app.services.embedding_cache import embedding_cache
+    return embedding_cache.stats()
+
+@router.get("/events/attendance/qr-cache/stats")
+def admin_qr_cache_stats(
+    current_user: User = Depends(require_roles(["admin"])),
+):
+    """Hit/miss counters of the rendered attendance QR cache on the worker serving this request"""
+    from app.services.qr_service import qr_cache
+    return qr_cache.stats()
+
+@router.get("/runtime/event-loop/stats")
+def admin_event_loop_stats(
+    current_user: User = Depends(require_roles(["admin"])),
+):
+    """Event-loop stalls seen by the watchdog on the worker serving this request"""
+    from app.core.loop_guard import loop_watchdog
+    return loop_watchdog.stats()
+
+@router.get("/chat/realtime/stats")
+def admin_chat_realtime_stats(
+    current_user: User = Depends(require_roles(["admin"])),
+):
+    """Chat WebSocket subscriptions and backpressure on the worker serving this request"""
+    from app.services.chat_realtime import chat_hub
+    return chat_hub.stats()
+
+from app.models.organization_model import ORGANIZATION_SEARCH, Organization, OrganizationVisibility, OrganizationType, OrganizationStatus
 from app.schemas.organization_schema import OrganizationResponse, OrganizationUpdate
 
 @router.get("/organizations", response_model=List[OrganizationResponse])
@@ -462,7 +513,7 @@ def admin_list_organizations(
     query = query.filter(Organization.deleted_at.is_(None))
     
     if q:
-        query = query.filter(Organization.name.ilike(f"%{q}%"))
+        query = query.filter(text_search(db, q, ORGANIZATION_SEARCH)[0])
     if type:
         query = query.filter(Organization.type == type)
     if status:
@@ -486,7 +537,7 @@ def admin_count_organizations(
     query = db.query(Organization)
     query = query.filter(Organization.deleted_at.is_(None))
     if q:
-        query = query.filter(Organization.name.ilike(f"%{q}%"))
+        query = query.filter(text_search(db, q, ORGANIZATION_SEARCH)[0])
     if type:
         query = query.filter(Organization.type == type)
     if status:
@@ -597,43 +648,57 @@ def admin_delete_organization(
     
     return {"status": "success", "message": "Organization deleted"}
 
-@router.get("/audit-logs", response_model=List[dict])
+class AuditLogFilters:
+    """Filters shared by GET /audit-logs and GET /audit-logs/count"""
+
+    def __init__(
+        self,
+        action: str | None = None,
+        actor_user_id: str | None = None,
+        target_type: str | None = None,
+        target_id: str | None = None,
+        start_after: __import__("datetime").datetime | None = None,
+        end_before: __import__("datetime").datetime | None = None,
+    ):
+        self.action = action
+        self.actor_user_id = actor_user_id
+        self.target_type = target_type
+        self.target_id = target_id
+        self.start_after = start_after
+        self.end_before = end_before
+
+    def apply(self, q):
+        if self.action:
+            q = q.filter(AuditLog.action == self.action)
+        if self.actor_user_id:
+            q = q.filter(AuditLog.user_id == self.actor_user_id)
+        if self.target_type:
+            q = q.filter(AuditLog.target_type == self.target_type)
+        if self.target_id:
+            q = q.filter(AuditLog.target_id == self.target_id)
+        if self.start_after is not None:
+            q = q.filter(AuditLog.created_at >= self.start_after)
+        if self.end_before is not None:
+            q = q.filter(AuditLog.created_at <= self.end_before)
+        return q
+
+
+@router.get("/audit-logs", response_model=List[dict] | Page[dict])
 def list_audit_logs(
-    action: str | None = None,
-    actor_user_id: str | None = None,
-    target_type: str | None = None,
-    target_id: str | None = None,
-    start_after: __import__("datetime").datetime | None = None,
-    end_before: __import__("datetime").datetime | None = None,
+    response: Response,
+    filters: AuditLogFilters = Depends(),
     page: int = 1,
     page_size: int = 20,
+    cursor: str | None = None,
+    with_total: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(["admin"]))
 ):
-    q = db.query(AuditLog)
-    if action:
-        q = q.filter(AuditLog.action == action)
-    if actor_user_id:
-        q = q.filter(AuditLog.user_id == actor_user_id)
-    if target_type:
-        q = q.filter(AuditLog.target_type == target_type)
-    if target_id:
-        q = q.filter(AuditLog.target_id == target_id)
-    if start_after is not None:
-        q = q.filter(AuditLog.created_at >= start_after)
-    if end_before is not None:
-        q = q.filter(AuditLog.created_at <= end_before)
-    if page < 1:
-        page = 1
-    if page_size < 1:
-        page_size = 20
-    items = (
-        q.order_by(AuditLog.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
-    return [
+    q = filters.apply(db.query(AuditLog))
+    page_q, page_size = paginate(q, AuditLog.created_at, AuditLog.id, cursor, page, page_size, descending=True)
+    items, total = fetch_page(q, page_q, with_total, cursor)
+    set_next_cursor(response, items, page_size, lambda i: (i.created_at, i.id))
+    logs = [
         {
             "id": str(i.id),
             "actor_user_id": str(i.user_id) if i.user_id else None,
@@ -645,32 +710,17 @@ def list_audit_logs(
         }
         for i in items
     ]
+    if with_total:
+        return {"items": logs, "total": total}
+    return logs
 
 @router.get("/audit-logs/count")
 def count_audit_logs(
-    action: str | None = None,
-    actor_user_id: str | None = None,
-    target_type: str | None = None,
-    target_id: str | None = None,
-    start_after: __import__("datetime").datetime | None = None,
-    end_before: __import__("datetime").datetime | None = None,
+    filters: AuditLogFilters = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(["admin"]))
 ):
-    q = db.query(AuditLog)
-    if action:
-        q = q.filter(AuditLog.action == action)
-    if actor_user_id:
-        q = q.filter(AuditLog.user_id == actor_user_id)
-    if target_type:
-        q = q.filter(AuditLog.target_type == target_type)
-    if target_id:
-        q = q.filter(AuditLog.target_id == target_id)
-    if start_after is not None:
-        q = q.filter(AuditLog.created_at >= start_after)
-    if end_before is not None:
-        q = q.filter(AuditLog.created_at <= end_before)
-    total = q.with_entities(AuditLog.id).distinct().count()
+    total = filters.apply(db.query(AuditLog.id)).count()
     return {"total_count": total}
 
 
@@ -908,52 +958,46 @@ class EmailTemplateBroadcastRequest(BaseModel):
 @router.post("/email-templates/broadcast")
 async def broadcast_email_template(
     body: EmailTemplateBroadcastRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_roles(["admin"]))
 ):
     name = (body.template_name or body.template_id or "").strip()
     if not name:
         raise HTTPException(status_code=400, detail="template_name or template_id required")
 
-    query = db.query(User)
+    query = select(User.email).where(User.email.isnot(None), User.email != "")
     if body.target_user_id:
-        query = query.filter(User.id == body.target_user_id)
+        query = query.where(User.id == body.target_user_id)
     elif body.target_role:
         query = (
             query
             .join(user_roles, user_roles.c.user_id == User.id)
             .join(Role, Role.id == user_roles.c.role_id)
-            .filter(func.lower(Role.name) == func.lower(body.target_role))
+            .where(func.lower(Role.name) == func.lower(body.target_role))
         )
 
-    users = query.all()
-    subject, html = _render_template(db, name, body.variables or {})
-
-    # Try sending emails (best-effort)
-    import resend
-    from app.core.config import settings
-    resend.api_key = settings.RESEND_API_KEY
-    sent = 0
-    for u in users:
-        if not u.email:
-            continue
-        params = {"from": settings.SENDER_EMAIL, "to": [u.email], "subject": subject, "html": html}
-        try:
-            resend.Emails.send(params)
-            sent += 1
-        except Exception:
-            # Silent fail per user; continue
-            pass
+    emails = (await db.scalars(query)).all()
+    subject, html = await db.run_sync(_render_template, name, body.variables or {})
+
+    # Queue emails; the outbox worker sends them in batches
+    from app.services.email_service import enqueue_email
+
+    def queue_all(sync_db: Session) -> None:
+        for email in emails:
+            enqueue_email(email, subject, html, {"type": "broadcast", "template_name": name}, db=sync_db)
+
+    await db.run_sync(queue_all)
+    await db.commit()
 
     details_json = json.dumps({
         "template_name": name,
         "variables": body.variables or {},
         "target_role": body.target_role,
         "target_user_id": str(body.target_user_id) if body.target_user_id else None,
-        "recipient_count": sent,
+        "recipient_count": len(emails),
     })
-    log_admin_action(db, current_user.id, "broadcast_email_template", "system", current_user.id, details_json)
-    return {"count": sent}
+    await db.run_sync(log_admin_action, current_user.id, "broadcast_email_template", "system", current_user.id, details_json)
+    return {"count": len(emails)}
 
 
 class EmailTemplateTestSendRequest(BaseModel):
@@ -971,12 +1015,9 @@ def test_send_email_template(
     if not body.to_email:
         raise HTTPException(status_code=400, detail="to_email required")
     subject, html = _render_template(db, template_id, body.variables or {})
-    import resend
-    from app.core.config import settings
-    resend.api_key = settings.RESEND_API_KEY
-    params = {"from": settings.SENDER_EMAIL, "to": [body.to_email], "subject": f"[Test] {subject}", "html": html}
+    from app.services.email_service import enqueue_email
     try:
-        resend.Emails.send(params)
+        enqueue_email(body.to_email, f"[Test] {subject}", html, {"type": "template_test", "template_id": template_id})
         log_admin_action(db, current_user.id, "email_template.test_send", "user", current_user.id, json.dumps({"template_id": template_id, "to_email": body.to_email}))
         return {"message": "ok"}
     except Exception:
@@ -993,7 +1034,7 @@ def list_pending_roles(db: Session = Depends(get_db), current_user: User = Depen
 # --- Admin Media Upload Endpoints ---
 
 from fastapi import UploadFile, File
-from app.services import profile_service, cloudinary_service
+from app.services import profile_service
 
 @router.put("/users/{user_id}/avatar")
 def admin_update_user_avatar(
@@ -1034,8 +1075,9 @@ def admin_update_org_logo(
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
     
-    url = cloudinary_service.upload_file(logo, "org_logos")
-    org.logo_url = url
+    image = anyio.from_thread.run(image_service.save_image, logo, "org_logos")
+    org.logo_url = image.url
+    org.logo_variants = image.variants
     db.commit()
     db.refresh(org)
     log_admin_action(db, current_user.id, "organization.update_logo", "organization", org.id)
@@ -1052,8 +1094,9 @@ def admin_update_org_cover(
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
     
-    url = cloudinary_service.upload_file(cover, "org_covers")
-    org.cover_url = url
+    image = anyio.from_thread.run(image_service.save_image, cover, "org_covers")
+    org.cover_url = image.url
+    org.cover_variants = image.variants
     db.commit()
     db.refresh(org)
     log_admin_action(db, current_user.id, "organization.update_cover", "organization", org.id)
@@ -1157,135 +1200,78 @@ def admin_delete_category(
 
 @router.get("/export/users")
 def export_users_csv(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(["admin"]))
 ):
-    """Export all users to CSV"""
-    from io import StringIO
-    import csv
-    
-    # Fetch all users with profiles
-    users = db.query(User).options(joinedload(User.profile)).all()
-    
-    # Create CSV in memory
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow(['ID', 'Email', 'Full Name', 'Status', 'Verified', 'Roles', 'Created At'])
-    
-    # Write data
-    for user in users:
-        roles = ','.join([r.name for r in user.roles]) if user.roles else ''
-        full_name = user.profile.full_name if user.profile else ''
-        writer.writerow([
-            str(user.id),
-            user.email,
-            full_name,
-            user.status.value if user.status else '',
-            user.is_verified,
-            roles,
-            user.created_at.isoformat() if user.created_at else ''
-        ])
-    
-    output.seek(0)
-    log_admin_action(db, current_user.id, "users.export", "system", None)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=users_export.csv"}
+    """Export all users (CSV by default; also ndjson/parquet, optionally gzipped)"""
+    roles = (
+        select(func.string_agg(Role.name, ','))
+        .select_from(user_roles.join(Role, Role.id == user_roles.c.role_id))
+        .where(user_roles.c.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    stmt = (
+        select(User.id, User.email, Profile.full_name, User.status, User.is_verified, roles, User.created_at)
+        .outerjoin(Profile, Profile.user_id == User.id)
+        .order_by(User.id)
+    )
+    log_admin_action(db, current_user.id, "users.export", "system", current_user.id, details=f"format={format} gzip={gzip}")
+    return export_response(
+        db, stmt,
+        ['ID', 'Email', 'Full Name', 'Status', 'Verified', 'Roles', 'Created At'],
+        lambda row: row,
+        "users_export", fmt=format, compress=gzip,
     )
 
 
 @router.get("/export/events")
 def export_events_csv(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(["admin"]))
 ):
-    """Export all events to CSV"""
-    from io import StringIO
-    import csv
-    
-    events = db.query(Event).all()
-    
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        'ID', 'Title', 'Format', 'Type', 'Status', 'Visibility',
-        'Start Date', 'End Date', 'Organizer ID', 'Organization ID',
-        'Registration Type', 'Max Participants', 'Created At'
-    ])
-    
-    # Write data
-    for event in events:
-        writer.writerow([
-            str(event.id),
-            event.title,
-            event.format.value if event.format else '',
-            event.type.value if event.type else '',
-            event.status.value if event.status else '',
-            event.visibility.value if event.visibility else '',
-            event.start_datetime.isoformat() if event.start_datetime else '',
-            event.end_datetime.isoformat() if event.end_datetime else '',
-            str(event.organizer_id) if event.organizer_id else '',
-            str(event.organization_id) if event.organization_id else '',
-            event.registration_type.value if event.registration_type else '',
-            event.max_participant or '',
-            event.created_at.isoformat() if event.created_at else ''
-        ])
-    
-    output.seek(0)
-    log_admin_action(db, current_user.id, "events.export", "system", None)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=events_export.csv"}
+    """Export all events (CSV by default; also ndjson/parquet, optionally gzipped)"""
+    stmt = select(
+        Event.id, Event.title, Event.format, Event.type, Event.status, Event.visibility,
+        Event.start_datetime, Event.end_datetime, Event.organizer_id, Event.organization_id,
+        Event.registration_type, Event.max_participant, Event.created_at,
+    ).order_by(Event.id)
+    log_admin_action(db, current_user.id, "events.export", "system", current_user.id, details=f"format={format} gzip={gzip}")
+    return export_response(
+        db, stmt,
+        [
+            'ID', 'Title', 'Format', 'Type', 'Status', 'Visibility',
+            'Start Date', 'End Date', 'Organizer ID', 'Organization ID',
+            'Registration Type', 'Max Participants', 'Created At'
+        ],
+        lambda row: row,
+        "events_export", fmt=format, compress=gzip,
     )
 
 
 @router.get("/export/organizations")
 def export_organizations_csv(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(["admin"]))
 ):
-    """Export all organizations to CSV"""
-    from io import StringIO
-    import csv
-    
-    orgs = db.query(Organization).all()
-    
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        'ID', 'Name', 'Type', 'Status', 'Visibility',
-        'Owner ID', 'Location', 'Website', 'Created At'
-    ])
-    
-    # Write data
-    for org in orgs:
-        writer.writerow([
-            str(org.id),
-            org.name,
-            org.type.value if org.type else '',
-            org.status.value if org.status else '',
-            org.visibility.value if org.visibility else '',
-            str(org.owner_id) if org.owner_id else '',
-            org.location or '',
-            org.website_url or '',
-            org.created_at.isoformat() if org.created_at else ''
-        ])
-    
-    output.seek(0)
-    log_admin_action(db, current_user.id, "organizations.export", "system", None)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=organizations_export.csv"}
+    """Export all organizations (CSV by default; also ndjson/parquet, optionally gzipped)"""
+    stmt = select(
+        Organization.id, Organization.name, Organization.type, Organization.status, Organization.visibility,
+        Organization.owner_id, Organization.location, Organization.website_url, Organization.created_at,
+    ).order_by(Organization.id)
+    log_admin_action(db, current_user.id, "organizations.export", "system", current_user.id, details=f"format={format} gzip={gzip}")
+    return export_response(
+        db, stmt,
+        [
+            'ID', 'Name', 'Type', 'Status', 'Visibility',
+            'Owner ID', 'Location', 'Website', 'Created At'
+        ],
+        lambda row: row,
+        "organizations_export", fmt=format, compress=gzip,
     )
@@ -8,8 +8,9 @@ from app.models.event_model import (
     EventVisibility, EventStatus, EventRegistrationStatus, 
     EventParticipantRole, EventParticipantStatus, EventRegistrationType
 )
-from app.models.chat_model import Conversation, ConversationParticipant, Message
+from app.models.chat_model import Message
 from app.schemas.booking_schema import BookingCreate, BookingResponse
+from app.services.conversation_service import get_or_create_direct_conversation, record_message
 import uuid
 from datetime import timezone
 
@@ -87,36 +88,21 @@ def create_booking(
     db.add(p_exp)
     
     # 4. Create or Reuse Conversation & Initial Message
-    # Try to find an existing 1:1 conversation between organizer and expert
-    existing_conv_id_subq = db.query(ConversationParticipant.conversation_id)\
-        .filter(ConversationParticipant.user_id == current_user.id).subquery()
-    existing_conv = db.query(Conversation)\
-        .join(ConversationParticipant, ConversationParticipant.conversation_id == Conversation.id)\
-        .filter(
-            ConversationParticipant.user_id == expert.id,
-            Conversation.id.in_(existing_conv_id_subq)
-        ).first()
-    if existing_conv:
-        conversation = existing_conv
-    else:
-        conversation = Conversation()
-        db.add(conversation)
-        db.flush()  # get id
-        # Add participants to conversation
-        db.add(ConversationParticipant(conversation_id=conversation.id, user_id=current_user.id))
-        db.add(ConversationParticipant(conversation_id=conversation.id, user_id=expert.id))
+    # The organizer and expert share one 1:1 conversation
+    conversation_id = get_or_create_direct_conversation(db, current_user.id, expert.id)
     
     # Link conversation to the Expert's participant record (so they see it in requests)
-    p_exp.conversation_id = conversation.id
+    p_exp.conversation_id = conversation_id
     
     # Send Initial Message if provided
     if body.message:
         msg = Message(
-            conversation_id=conversation.id,
+            conversation_id=conversation_id,
             sender_id=current_user.id,
             content=body.message
         )
         db.add(msg)
+        record_message(db, msg)
         
     db.commit()
     db.refresh(event)
@@ -129,5 +115,5 @@ def create_booking(
         start_datetime=event.start_datetime,
         end_datetime=event.end_datetime,
         status="pending",
-        conversation_id=conversation.id
+        conversation_id=conversation_id
     )
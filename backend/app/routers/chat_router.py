@@ -1,18 +1,23 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, and_, desc, or_
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query, WebSocket, WebSocketDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import func, and_, desc, or_, select
 from typing import List
 import uuid
 import asyncio
 
-from app.database.database import get_db
+from app.database.database import async_session, get_async_db, get_db
 from app.models.chat_model import Conversation, ConversationParticipant, Message
 from app.models.user_model import User
 from app.schemas.chat_schema import ConversationCreate, ConversationResponse, MessageCreate, MessageResponse, ParticipantResponse
-from app.dependencies import get_current_user
+from app.dependencies import authenticate_websocket, get_current_user
+from app.services.chat_realtime import ChatSocket, chat_hub, message_event, read_event, typing_event
+from app.services.conversation_service import get_or_create_direct_conversation, mark_read, record_message
 from app.services.stream_service import get_stream_service
+from app.services.stream_sync import enqueue_message_sync, stream_sync_worker
 from app.core.config import settings
+from app.core.pagination import seek, set_next_cursor
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
@@ -135,28 +140,15 @@ def create_or_get_conversation(
     all_participant_ids.add(current_user.id)
     sorted_ids = sorted(list(all_participant_ids))
     
-    # Check if a conversation with EXACT match of participants exists
-    # This is a bit complex in SQL, usually easier to just query 1-on-1s. 
-    # For MVP 1-on-1: find convs where this user is part of, then check if other is part of.
-    
-    # Basic Check for 1-on-1
+    # 1-on-1 chats are unique per pair: one indexed get-or-create
     if len(sorted_ids) == 2:
         other_user_id = [id for id in sorted_ids if id != current_user.id][0]
-        
-        # Find existing shared conversation
-        existing = db.query(Conversation).join(ConversationParticipant).filter(
-            ConversationParticipant.user_id == current_user.id
-        ).all()
-        
-        for conv in existing:
-            # Check if other user is also in this conv
-            participants = db.query(ConversationParticipant).filter(ConversationParticipant.conversation_id == conv.id).all()
-            p_ids = sorted([p.user_id for p in participants])
-            
-            if p_ids == sorted_ids:
-                return _format_conversation_response(conv, current_user.id, db)
-
-    # Create new conversation
+        conversation_id = get_or_create_direct_conversation(db, current_user.id, other_user_id)
+        db.commit()
+        conv = db.query(Conversation).options(*_CONVERSATION_LOAD).filter(Conversation.id == conversation_id).one()
+        return _format_conversation_response(conv, current_user.id)
+
+    # Group chats: always a new conversation
     new_conv = Conversation()
     db.add(new_conv)
     db.commit()
@@ -168,61 +160,80 @@ def create_or_get_conversation(
         db.add(participant)
     
     db.commit()
-    return _format_conversation_response(new_conv, current_user.id, db)
+    db.refresh(new_conv)
+    return _format_conversation_response(new_conv, current_user.id)
 
 
 @router.get("/conversations", response_model=List[ConversationResponse])
 def get_conversations(
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Get all conversations for the current user.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
     """
-    # 1. Get conversation IDs for the user
-    user_convs = db.query(ConversationParticipant.conversation_id)\
-        .filter(ConversationParticipant.user_id == current_user.id)\
-        .subquery()
-
-    # 2. Get conversations ordered by updated_at
-    conversations = db.query(Conversation)\
-        .filter(Conversation.id.in_(user_convs))\
-        .order_by(desc(Conversation.updated_at))\
-        .offset(skip).limit(limit).all()
+    # One query over the inbox projection; participants and the last message are eager-loaded
+    activity = func.coalesce(Conversation.updated_at, Conversation.created_at)
+    query = (
+        db.query(Conversation)
+        .join(
+            ConversationParticipant,
+            and_(
+                ConversationParticipant.conversation_id == Conversation.id,
+                ConversationParticipant.user_id == current_user.id,
+            ),
+        )
+        .options(*_CONVERSATION_LOAD)
+        .order_by(activity.desc(), Conversation.id.desc())
+    )
+    if cursor:
+        query = query.filter(seek(activity, Conversation.id, cursor, descending=True))
+    else:
+        query = query.offset(skip)
+    conversations = query.limit(limit).all()
+    set_next_cursor(response, conversations, limit, lambda c: (c.updated_at or c.created_at, c.id))
 
-    return [_format_conversation_response(c, current_user.id, db) for c in conversations]
+    return [_format_conversation_response(c, current_user.id) for c in conversations]
 
 
 @router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
 def get_messages(
     conversation_id: uuid.UUID,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     # Verify participant
     _check_participant(conversation_id, current_user.id, db)
 
-    messages = db.query(Message)\
-        .filter(Message.conversation_id == conversation_id)\
-        .order_by(desc(Message.created_at))\
-        .offset(skip).limit(limit).all()
+    query = (
+        db.query(Message)
+        .filter(Message.conversation_id == conversation_id)
+        .order_by(desc(Message.created_at), desc(Message.id))
+    )
+    if cursor:
+        query = query.filter(seek(Message.created_at, Message.id, cursor, descending=True))
+    else:
+        query = query.offset(skip)
+    messages = query.limit(limit).all()
+    set_next_cursor(response, messages, limit, lambda m: (m.created_at, m.id))
         
-    # Mark read (simple version: update last_read_at for participant)
-    # We don't update individual message is_read usually in this model if we use last_read_at,
-    # but let's do simple update for MVP
-    
-    # Update participant last_read_at
-    participant = db.query(ConversationParticipant).filter(
-        ConversationParticipant.conversation_id == conversation_id,
-        ConversationParticipant.user_id == current_user.id
-    ).first()
-    if participant:
-        participant.last_read_at = func.now()
-        db.commit()
+    # Mark read: last_read_at moves on and the unread counter starts over
+    read_at = mark_read(db, conversation_id, current_user.id)
+    if read_at is None:
+        # Left the conversation since the check above
+        db.rollback()
+        raise HTTPException(status_code=403, detail="Not a participant")
+    db.commit()
+    chat_hub.publish(conversation_id, read_event(conversation_id, current_user.id, read_at.isoformat()))
 
     return [_format_message_response(m) for m in messages]
 
@@ -231,11 +242,22 @@ def get_messages(
 async def send_message(
     conversation_id: uuid.UUID,
     msg_in: MessageCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user)
 ):
+    # On the event loop: query through the AsyncSession only, and leave
+    # current_user's lazy attributes alone (they would load synchronously)
+    from app.models.notification_model import NotificationType
+    from app.models.event_model import EventParticipant, EventProposal
+
     # Verify participant
-    _check_participant(conversation_id, current_user.id, db)
+    participant_ids = (
+        await db.scalars(
+            select(ConversationParticipant.user_id).where(ConversationParticipant.conversation_id == conversation_id)
+        )
+    ).all()
+    if current_user.id not in participant_ids:
+        raise HTTPException(status_code=403, detail="Not a participant")
 
     new_msg = Message(
         conversation_id=conversation_id,
@@ -243,63 +265,52 @@ async def send_message(
         content=msg_in.content
     )
     db.add(new_msg)
-    
-    # Update conversation updated_at
-    conv = db.query(Conversation).filter(Conversation.id == conversation_id).first()
-    conv.updated_at = func.now()
-    
-    db.commit()
-    db.refresh(new_msg)
+    # Last message, activity time and the others' unread counters, atomically with the insert
+    await db.run_sync(record_message, new_msg)
+    # The GetStream mirror is queued with the message and sent by a background worker
+    await db.run_sync(enqueue_message_sync, new_msg.id)
+    await db.commit()
+    stream_sync_worker.notify()
+    new_msg = await db.get(
+        Message,
+        new_msg.id,
+        options=[selectinload(Message.sender).selectinload(User.profile)],
+        populate_existing=True,
+    )
+    response = _format_message_response(new_msg)
+    await chat_hub.publish_async(conversation_id, message_event(response.model_dump(mode="json")))
 
     # --- Notification Logic ---
     # Notify other participants
-    from app.models.notification_model import Notification, NotificationType
-    from app.models.event_model import EventParticipant, EventProposal
-
-    other_participants = db.query(ConversationParticipant).filter(
-        ConversationParticipant.conversation_id == conversation_id,
-        ConversationParticipant.user_id != current_user.id
-    ).all()
+    other_participants = [uid for uid in participant_ids if uid != current_user.id]
 
     # Try to find context (EventParticipant) to generate smart links
     # 1. Is this conversation linked to a specific EventParticipant?
-    linked_participant = db.query(EventParticipant).filter(EventParticipant.conversation_id == conversation_id).first()
+    linked_participant = (
+        await db.scalars(select(EventParticipant).where(EventParticipant.conversation_id == conversation_id).limit(1))
+    ).first()
     
     # 2. Or an EventProposal?
     linked_proposal = None
     if not linked_participant:
-        linked_proposal = db.query(EventProposal).filter(EventProposal.conversation_id == conversation_id).first()
+        linked_proposal = (
+            await db.scalars(select(EventProposal).where(EventProposal.conversation_id == conversation_id).limit(1))
+        ).first()
 
-    sender_name = current_user.email
-    if current_user.profile and current_user.profile.full_name:
-        sender_name = current_user.profile.full_name
+    sender = new_msg.sender
+    sender_name = sender.email
+    if sender.profile and sender.profile.full_name:
+        sender_name = sender.profile.full_name
 
     from app.services.notification_service import NotificationService
 
-    # --- Sync to GetStream ---
-    try:
-        stream_service = get_stream_service()
-        channel_id = f"legacy_{str(conversation_id)}"
-        
-        # Run sync call in thread to avoid blocking async loop
-        await asyncio.to_thread(
-            stream_service.send_message,
-            channel_type="messaging",
-            channel_id=channel_id,
-            user_id=str(current_user.id),
-            text=new_msg.content
-        )
-    except Exception as e:
-        # Log error but don't fail the request
-        print(f"Failed to sync message to GetStream: {e}")
-
-    for p in other_participants:
+    for recipient_id in other_participants:
         # Determine Link
         link = "/dashboard" # Default
         
         if linked_participant:
             # If the recipient IS the participant user, link to their request detail
-            if p.user_id == linked_participant.user_id:
+            if recipient_id == linked_participant.user_id:
                 link = f"/dashboard/requests/{linked_participant.id}"
             else:
                 # Recipient is likely organizer
@@ -311,7 +322,7 @@ async def send_message(
 
         elif linked_proposal:
              # If conversation linked to proposal directly
-             if linked_proposal.created_by_user_id == p.user_id:
+             if linked_proposal.created_by_user_id == recipient_id:
                   # Recipient is the proposer
                    pass 
              else:
@@ -319,16 +330,99 @@ async def send_message(
                   link = f"/dashboard?eventId={linked_proposal.event_id}&tab=proposals"
 
         # Use NotificationService to create AND broadcast via SSE
-        NotificationService.create_notification(
+        await NotificationService.create_notification_async(
             db=db,
-            recipient_id=p.user_id,
+            recipient_id=recipient_id,
             actor_id=current_user.id,
             type=NotificationType.chat,
             content=f"New message from {sender_name}: {new_msg.content[:50]}...",
             link_url=link
         )
     
-    return _format_message_response(new_msg)
+    return response
+
+
+# ==================== Real-time (WebSocket) ====================
+
+@router.websocket("/ws")
+async def chat_websocket(websocket: WebSocket, token: str | None = Query(None)):
+    """
+    Live events of the conversations a client has open (see app.services.chat_realtime).
+    Authenticate with `?token=<access token>`. Client frames:
+    {"type": "subscribe" | "unsubscribe" | "typing" | "read", "conversation_id": "..."}.
+    Server frames are JSON arrays of events.
+    """
+    user_id = await authenticate_websocket(token)
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+    socket = await chat_hub.connect(user_id)
+    sender = asyncio.create_task(_send_batches(websocket, socket))
+    try:
+        while True:
+            try:
+                frame = await websocket.receive_json()
+            except ValueError:
+                socket.offer({"type": "error", "detail": "Frames must be JSON"})
+                continue
+            await _handle_client_frame(socket, frame)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        chat_hub.disconnect(socket)
+
+
+async def _send_batches(websocket: WebSocket, socket: ChatSocket):
+    window = settings.CHAT_WS_BATCH_MS / 1000
+    try:
+        while True:
+            await websocket.send_json(await socket.next_batch(window, settings.CHAT_WS_BATCH_MAX))
+    except (WebSocketDisconnect, RuntimeError):
+        pass  # closed; the receive loop cleans up
+
+
+async def _handle_client_frame(socket: ChatSocket, frame) -> None:
+    kind = frame.get("type") if isinstance(frame, dict) else None
+    try:
+        conversation_id = uuid.UUID(str(frame.get("conversation_id")))
+    except (AttributeError, ValueError):
+        socket.offer({"type": "error", "detail": "conversation_id is required"})
+        return
+    ref = {"conversation_id": str(conversation_id)}
+
+    if kind == "subscribe":
+        async with async_session() as db:
+            allowed = await db.scalar(
+                select(ConversationParticipant.user_id).where(
+                    ConversationParticipant.conversation_id == conversation_id,
+                    ConversationParticipant.user_id == socket.user_id,
+                )
+            )
+        if allowed is None:
+            socket.offer({"type": "error", "detail": "Not a participant", **ref})
+            return
+        chat_hub.subscribe(socket, conversation_id)
+        socket.offer({"type": "subscribed", **ref})
+    elif kind == "unsubscribe":
+        chat_hub.unsubscribe(socket, conversation_id)
+    elif conversation_id not in socket.subscriptions:
+        socket.offer({"type": "error", "detail": "Not subscribed", **ref})
+    elif kind == "typing":
+        await chat_hub.publish_async(conversation_id, typing_event(conversation_id, socket.user_id))
+    elif kind == "read":
+        async with async_session() as db:
+            read_at = await db.run_sync(mark_read, conversation_id, socket.user_id)
+            await db.commit()
+        if read_at is None:
+            # Removed from the conversation while still subscribed
+            chat_hub.unsubscribe(socket, conversation_id)
+            socket.offer({"type": "error", "detail": "Not a participant", **ref})
+            return
+        await chat_hub.publish_async(conversation_id, read_event(conversation_id, socket.user_id, read_at.isoformat()))
+    else:
+        socket.offer({"type": "error", "detail": f"Unknown frame type: {kind}", **ref})
 
 
 # --- Helpers ---
@@ -341,16 +435,18 @@ def _check_participant(conversation_id: uuid.UUID, user_id: uuid.UUID, db: Sessi
     if not exists:
         raise HTTPException(status_code=403, detail="Not a participant")
 
-def _format_conversation_response(conv: Conversation, current_user_id: uuid.UUID, db: Session) -> ConversationResponse:
-    # Get Participants
-    participants_db = db.query(ConversationParticipant).options(joinedload(ConversationParticipant.user).joinedload(User.profile)).filter(
-        ConversationParticipant.conversation_id == conv.id
-    ).all()
-    
+# What _format_conversation_response reads
+_CONVERSATION_LOAD = (
+    selectinload(Conversation.participants).joinedload(ConversationParticipant.user).joinedload(User.profile),
+    joinedload(Conversation.last_message).joinedload(Message.sender).joinedload(User.profile),
+)
+
+
+def _format_conversation_response(conv: Conversation, current_user_id: uuid.UUID) -> ConversationResponse:
     participants_resp = []
-    my_last_read = None
+    unread = 0
     
-    for p in participants_db:
+    for p in conv.participants:
         # User details
         u = p.user
         full_name = u.profile.full_name if u.profile else u.email
@@ -360,37 +456,20 @@ def _format_conversation_response(conv: Conversation, current_user_id: uuid.UUID
             user_id=p.user_id,
             full_name=full_name,
             avatar_url=avatar_url,
+            avatar_variants=u.avatar_variants,
             last_read_at=p.last_read_at
         ))
         
         if p.user_id == current_user_id:
-            my_last_read = p.last_read_at
-            
-    # Get Last Message
-    last_msg = db.query(Message).filter(Message.conversation_id == conv.id).order_by(desc(Message.created_at)).first()
-    last_msg_resp = _format_message_response(last_msg) if last_msg else None
-    
-    # Count Unread
-    unread = 0
-    if my_last_read:
-        unread = db.query(Message).filter(
-            Message.conversation_id == conv.id,
-            Message.created_at > my_last_read,
-            Message.sender_id != current_user_id
-        ).count()
-    elif last_msg: 
-        # If never read, all are unread
-        unread = db.query(Message).filter(
-            Message.conversation_id == conv.id, 
-            Message.sender_id != current_user_id
-        ).count()
+            unread = p.unread_count
 
     return ConversationResponse(
         id=conv.id,
         created_at=conv.created_at,
         updated_at=conv.updated_at,
         participants=participants_resp,
-        last_message=last_msg_resp,
+        last_message=_format_message_response(conv.last_message) if conv.last_message else None,
+        last_message_at=conv.last_message_at,
         unread_count=unread
     )
 
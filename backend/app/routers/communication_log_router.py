@@ -6,8 +6,7 @@ from app.models.communication_log_model import CommunicationLog, CommunicationSt
 from app.schemas.communication_log_schema import CommunicationLogResponse
 from app.dependencies import get_current_user, require_roles
 from app.models.user_model import User
-import resend
-from app.core.config import settings
+from app.services.email_outbox import outbox_worker
 import logging
 
 router = APIRouter(prefix="/admin/communications", tags=["Admin Communications"])
@@ -18,8 +17,6 @@ logger = logging.getLogger(__name__)
 # For now I will just check if user is authenticated and is admin.
 # Adjust per your auth implementation.
 
-resend.api_key = settings.RESEND_API_KEY
-
 @router.get("/", response_model=list[CommunicationLogResponse])
 def get_logs(
     skip: int = 0,
@@ -45,29 +42,13 @@ def resend_log(log_id: str, db: Session = Depends(get_db), admin: User = Depends
     if log.status == CommunicationStatus.SENT:
         pass
 
-    # Basic Resend Logic using stored HTML
-    # We are updating the EXISTING log record for simplicity of the UI (Retry -> Success)
-    # Ideally should be a new log, but let's keep it simple as requested.
-    
-    try:
-        if not log.recipient or not log.subject or not log.content:
-            raise HTTPException(status_code=400, detail="Missing data in log to resend")
-        params = {
-            "from": settings.SENDER_EMAIL,
-            "to": [log.recipient],
-            "subject": log.subject,
-            "html": log.content,
-        }
-        log.status = CommunicationStatus.PENDING
-        db.commit()
-        resend.Emails.send(params)
-        log.status = CommunicationStatus.SENT
-        log.error_message = None
-        db.commit()
-        return {"message": "Email resent successfully", "status": "sent"}
-    except Exception as e:
-        logger.error(f"Resend failed for {log_id}: {e}")
-        log.status = CommunicationStatus.FAILED
-        log.error_message = str(e)
-        db.commit()
-        raise HTTPException(status_code=500, detail=f"Failed to resend: {e}")
+    # Requeue the EXISTING log record so the UI shows Retry -> Sent on the same row
+    if not log.recipient or not log.subject or not log.content:
+        raise HTTPException(status_code=400, detail="Missing data in log to resend")
+    log.status = CommunicationStatus.PENDING
+    log.attempts = 0
+    log.next_attempt_at = None
+    log.error_message = None
+    db.commit()
+    outbox_worker.notify()
+    return {"message": "Email queued for resend", "status": "pending"}
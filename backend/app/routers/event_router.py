@@ -1,3 +1,4 @@
+import anyio
 from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile, Request, Form
 from fastapi.responses import Response
 import uuid
@@ -8,10 +9,12 @@ import csv
 import io
 from fastapi.responses import Response, StreamingResponse
 from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func, select
-from app.database.database import get_db
+from app.database.database import get_async_db, get_db
 from app.models.event_model import (
+    EVENT_SEARCH,
     Event,
     EventFormat,
     EventCategory,
@@ -44,7 +47,8 @@ from app.services.email_service import (
     send_event_reminder_email,
     send_event_proposal_comment_email,
 )
-from app.services.cloudinary_service import upload_file
+from app.services import image_service, qr_service, storage_service
+from app.services.conversation_service import get_or_create_direct_conversation
 from app.schemas.event_schema import (
     EventDetails,
     EventCreate,
@@ -84,18 +88,24 @@ from app.schemas.event_schema import (
 from typing import List
 from sqlalchemy import text
 from app.services.ai_service import generate_text_embedding, _vec_to_pg
+from app.services.embedding_jobs import awaiting_embedding, enqueue_event
 from app.dependencies import get_current_user, get_current_user_optional
 from app.dependencies import require_roles
 from app.models.user_model import User, Role, user_roles
 from app.models.event_model import EventReminder
 from app.models.event_model import EventChecklistItem
 from app.core.config import settings
-from app.services.cloudinary_service import upload_file
 from app.services.user_service import create_user
 from app.schemas.user_schema import UserCreate
 from app.models.profile_model import Profile
 import os
 from app.services.audit_service import log_admin_action
+from app.services.event_scheduler_service import process_due_reminders, run_event_transitions
+from app.services.export_service import EXPORT_FORMAT_PATTERN, export_response
+from app.services.event_read_model import attach_event_aggregates, event_list_query, fetch_events
+from app.core.pagination import fetch_page, paginate, set_next_cursor
+from app.core.search import text_search
+from app.schemas.pagination_schema import Page
 
 router = APIRouter()
 
@@ -116,8 +126,10 @@ def _parse_role(value: str) -> EventParticipantRole:
     s = aliases.get(s, s)
     return EventParticipantRole(s)
 
-def _make_user_attendance_token(event_id: uuid.UUID, user_id: uuid.UUID, minutes_valid: int = 15) -> tuple[str, datetime]:
-    exp = datetime.utcnow() + timedelta(minutes=minutes_valid)
+def _make_user_attendance_token(
+    event_id: uuid.UUID, user_id: uuid.UUID, minutes_valid: int = 15, expires_at: datetime | None = None
+) -> tuple[str, datetime]:
+    exp = expires_at or datetime.now(timezone.utc) + timedelta(minutes=minutes_valid)
     payload = f"{event_id}|{user_id}|{int(exp.timestamp())}"
     signature = hmac.new(settings.SECRET_KEY.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).digest()
     token = f"{base64.urlsafe_b64encode(payload.encode('utf-8')).decode('utf-8').rstrip('=')}.{base64.urlsafe_b64encode(signature).decode('utf-8').rstrip('=')}"
@@ -134,196 +146,140 @@ def _verify_user_attendance_token(token: str) -> tuple[uuid.UUID, uuid.UUID]:
         raise HTTPException(status_code=400, detail="Invalid token signature")
     event_id_str, user_id_str, exp_ts_str = payload_raw.split("|")
     exp_ts = int(exp_ts_str)
-    if int(datetime.utcnow().timestamp()) > exp_ts:
+    if int(datetime.now(timezone.utc).timestamp()) > exp_ts:
         raise HTTPException(status_code=400, detail="Token expired")
     return uuid.UUID(event_id_str), uuid.UUID(user_id_str)
 
+class EventListFilters:
+    """Filters shared by GET /events and GET /events/count"""
+
+    def __init__(
+        self,
+        category_id: uuid.UUID | None = Query(None),
+        category_name: str | None = Query(None),
+        upcoming: bool | None = Query(None),
+        q_text: str | None = Query(None),
+        type: EventType | None = Query(None),
+        format: EventFormat | None = Query(None),
+        visibility: EventVisibility | None = Query(None),
+        registration_type: EventRegistrationType | None = Query(None),
+        registration_status: EventRegistrationStatus | None = Query(None),
+        organizer_id: uuid.UUID | None = Query(None),
+        start_after: datetime | None = Query(None),
+        end_before: datetime | None = Query(None),
+        include_all_visibility: bool = False,
+        status: EventStatus | None = Query(None),
+        include_all_status: bool = False,
+        friends_only: bool = Query(False),
+    ):
+        self.category_id = category_id
+        self.category_name = category_name
+        self.upcoming = upcoming
+        self.q_text = q_text
+        self.type = type
+        self.format = format
+        self.visibility = visibility
+        self.registration_type = registration_type
+        self.registration_status = registration_status
+        self.organizer_id = organizer_id
+        self.start_after = start_after
+        self.end_before = end_before
+        self.include_all_visibility = include_all_visibility
+        self.status = status
+        self.include_all_status = include_all_status
+        self.friends_only = friends_only
+
+    def apply(self, query, db: Session, current_user: User | None):
+        """Filtered query, or None when the filters cannot match anything"""
+        # Exclude soft-deleted events
+        query = query.filter(Event.deleted_at.is_(None))
+
+        if self.friends_only:
+            if not current_user:
+                # "Your Friend Event" needs a user context; no results without one
+                return None
+            from app.models.follows_model import Follow
+            # Events organized by users the current user follows
+            followed_user_ids = select(Follow.followee_id).where(
+                Follow.follower_id == current_user.id,
+                Follow.followee_id.isnot(None),
+            )
+            query = query.filter(Event.organizer_id.in_(followed_user_ids))
+
+        # Public only by default; include_all_visibility lifts that, an explicit visibility still applies
+        if self.visibility is not None:
+            query = query.filter(Event.visibility == self.visibility)
+        elif not self.include_all_visibility:
+            query = query.filter(Event.visibility == EventVisibility.public)
+
+        # Default: only published events, unless explicitly requesting otherwise
+        if not self.include_all_status:
+            if self.status is None:
+                # If searching for past events (end_before is set), allow ended/closed events too
+                if self.end_before is not None:
+                    query = query.filter(Event.status.in_([EventStatus.published, EventStatus.ended, EventStatus.closed]))
+                else:
+                    query = query.filter(Event.status == EventStatus.published)
+            else:
+                query = query.filter(Event.status == self.status)
+
+        if self.upcoming:
+            query = query.filter(Event.start_datetime >= func.now())
+        if self.q_text:
+            query = query.filter(text_search(db, self.q_text, EVENT_SEARCH)[0])
+        if self.type is not None:
+            query = query.filter(Event.type == self.type)
+        if self.format is not None:
+            query = query.filter(Event.format == self.format)
+        if self.registration_type is not None:
+            query = query.filter(Event.registration_type == self.registration_type)
+        if self.registration_status is not None:
+            query = query.filter(Event.registration_status == self.registration_status)
+        if self.organizer_id is not None:
+            query = query.filter(Event.organizer_id == self.organizer_id)
+        if self.start_after is not None:
+            query = query.filter(Event.start_datetime >= self.start_after)
+        if self.end_before is not None:
+            query = query.filter(Event.end_datetime <= self.end_before)
+        # EXISTS instead of a join, so rows never need DISTINCT
+        if self.category_id is not None:
+            query = query.filter(Event.categories.any(EventCategory.category_id == self.category_id))
+        elif self.category_name is not None:
+            query = query.filter(Event.categories.any(
+                EventCategory.category.has(func.lower(Category.name) == func.lower(self.category_name))
+            ))
+        return query
+
+
 @router.get("/events/count", response_model=dict)
 def count_events(
-    q_text: str | None = Query(None),
-    status: EventStatus | None = Query(None),
-    type: EventType | None = Query(None),
-    format: EventFormat | None = Query(None),
-    registration_type: EventRegistrationType | None = Query(None),
-    registration_status: EventRegistrationStatus | None = Query(None),
-    category_id: uuid.UUID | None = Query(None),
-    category_name: str | None = Query(None),
-    organizer_id: uuid.UUID | None = Query(None),
-    visibility: EventVisibility | None = Query(None),
-    upcoming: bool = Query(False),
-    start_after: datetime | None = Query(None),
-    end_before: datetime | None = Query(None),
-    include_all_visibility: bool = Query(False),
+    filters: EventListFilters = Depends(),
     db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional),
 ):
-    query = db.query(Event)
-    query = query.filter(Event.deleted_at.is_(None))
+    query = filters.apply(db.query(Event.id), db, current_user)
+    return {"total_count": query.count() if query is not None else 0}
 
-    if not include_all_visibility:
-        if visibility is None:
-            query = query.filter(Event.visibility == EventVisibility.public)
-        else:
-            query = query.filter(Event.visibility == visibility)
-    elif visibility is not None:
-        query = query.filter(Event.visibility == visibility)
-
-    if upcoming:
-        query = query.filter(Event.start_datetime >= func.now())
-    if start_after:
-        query = query.filter(Event.start_datetime >= start_after)
-    if end_before:
-        query = query.filter(Event.end_datetime <= end_before)
-
-    if q_text:
-        query = query.filter(Event.title.ilike(f"%{q_text}%"))
-    
-    if status:
-        query = query.filter(Event.status == status)
-    else:
-        # Default behavior: match get_all_events
-        # If searching for past events (end_before is set), allow ended/closed events too
-        if end_before is not None:
-             query = query.filter(Event.status.in_([EventStatus.published, EventStatus.ended, EventStatus.closed]))
-        else:
-             query = query.filter(Event.status == EventStatus.published)
-
-    if type:
-        query = query.filter(Event.type == type)
-    if format:
-        query = query.filter(Event.format == format)
-    if registration_type:
-        query = query.filter(Event.registration_type == registration_type)
-    if registration_status:
-        query = query.filter(Event.registration_status == registration_status)
-    
-    if organizer_id:
-        query = query.filter(Event.organizer_id == organizer_id)
-
-    if category_id is not None:
-        query = (
-            query.join(EventCategory, EventCategory.event_id == Event.id)
-            .filter(EventCategory.category_id == category_id)
-            .distinct()
-        )
-    elif category_name is not None:
-        query = (
-            query.join(EventCategory, EventCategory.event_id == Event.id)
-            .join(Category, Category.id == EventCategory.category_id)
-            .filter(func.lower(Category.name) == func.lower(category_name))
-            .distinct()
-        )
-
-    return {"total_count": query.count()}
-
-@router.get("/events", response_model=List[EventDetails])
+@router.get("/events", response_model=List[EventDetails] | Page[EventDetails])
 def get_all_events(
-    db: Session = Depends(get_db),
-    category_id: uuid.UUID | None = Query(None),
-    category_name: str | None = Query(None),
-    upcoming: bool | None = Query(None),
-    q_text: str | None = Query(None),
-    type: EventType | None = Query(None),
-    format: EventFormat | None = Query(None),
-    visibility: EventVisibility | None = Query(None),
-    registration_type: EventRegistrationType | None = Query(None),
-    registration_status: EventRegistrationStatus | None = Query(None),
-    organizer_id: uuid.UUID | None = Query(None),
-    start_after: datetime | None = Query(None),
-    end_before: datetime | None = Query(None),
+    response: Response,
+    filters: EventListFilters = Depends(),
     page: int = 1,
     page_size: int = 20,
-    include_all_visibility: bool = False, # New param
-    status: EventStatus | None = Query(None),
-    include_all_status: bool = False,
+    cursor: str | None = Query(None, description="Opaque cursor from X-Next-Cursor; replaces page"),
+    with_total: bool = Query(False, description="Respond with {items, total} instead of a list"),
+    db: Session = Depends(get_db),
     current_user: User | None = Depends(get_current_user_optional),
-    friends_only: bool = Query(False),
 ):
-    query = db.query(Event)
-    # Exclude soft-deleted events
-    query = query.filter(Event.deleted_at.is_(None))
-
-    if friends_only:
-        if not current_user:
-            # If not logged in, return empty or throw? Returning empty seems safer for public page resilience.
-            # Alternatively, ignore the filter. But "Your Friend Event" implies specific user context.
-            # Let's return empty list to signify no results for this filter.
-            return []
-        
-        from app.models.follows_model import Follow
-        # Get IDs of users/orgs the current user follows
-        followed_user_ids = db.query(Follow.followee_id).filter(
-            Follow.follower_id == current_user.id,
-            Follow.followee_id.isnot(None)
-        ).subquery()
-        
-        # Filter events where organizer is in followed list
-        query = query.filter(Event.organizer_id.in_(select(followed_user_ids)))
-    
-    if not include_all_visibility:
-        if visibility is None:
-            query = query.filter(Event.visibility == EventVisibility.public)
-        else:
-            query = query.filter(Event.visibility == visibility)
-    # If include_all_visibility is True, we skip the visibility filter (unless specific visibility is requested? No, let's say it overrides default)
-    # But if visibility IS provided, we should probably respect it?
-    # Let's say: if include_all_visibility is True, we IGNORE the default "public only".
-    # If visibility param IS provided, we still filter by it.
-    if include_all_visibility:
-        if visibility is not None:
-             query = query.filter(Event.visibility == visibility)
-
-    # Default: only published events, unless explicitly requesting otherwise
-    if not include_all_status:
-        if status is None:
-            # If searching for past events (end_before is set), allow ended/closed events too
-            if end_before is not None:
-                query = query.filter(Event.status.in_([EventStatus.published, EventStatus.ended, EventStatus.closed]))
-            else:
-                query = query.filter(Event.status == EventStatus.published)
-        else:
-            query = query.filter(Event.status == status)
-    
-    if upcoming:
-        query = query.filter(Event.start_datetime >= func.now())
-    if q_text:
-        query = query.filter(Event.title.ilike(f"%{q_text}%"))
-    if type is not None:
-        query = query.filter(Event.type == type)
-    if format is not None:
-        query = query.filter(Event.format == format)
-    if registration_type is not None:
-        query = query.filter(Event.registration_type == registration_type)
-    if registration_status is not None:
-        query = query.filter(Event.registration_status == registration_status)
-    if organizer_id is not None:
-        query = query.filter(Event.organizer_id == organizer_id)
-    if start_after is not None:
-        query = query.filter(Event.start_datetime >= start_after)
-    if end_before is not None:
-        query = query.filter(Event.end_datetime <= end_before)
-    if category_id is not None:
-        query = (
-            query.join(EventCategory, EventCategory.event_id == Event.id)
-            .filter(EventCategory.category_id == category_id)
-            .distinct()
-        )
-    elif category_name is not None:
-        query = (
-            query.join(EventCategory, EventCategory.event_id == Event.id)
-            .join(Category, Category.id == EventCategory.category_id)
-            .filter(func.lower(Category.name) == func.lower(category_name))
-            .distinct()
-        )
-    if page < 1:
-        page = 1
-    if page_size < 1:
-        page_size = 20
-    events = (
-        query.order_by(Event.start_datetime.asc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+    query = filters.apply(event_list_query(db), db, current_user)
+    if query is None:
+        return {"items": [], "total": 0} if with_total else []
+    page_query, page_size = paginate(query, Event.start_datetime, Event.id, cursor, page, page_size)
+    events, total = fetch_page(query, page_query, with_total, cursor)
+    attach_event_aggregates(db, events)
+    set_next_cursor(response, events, page_size, lambda e: (e.start_datetime, e.id))
+    if with_total:
+        return {"items": events, "total": total}
     return events
 
 @router.get("/events/semantic-search", response_model=List[EventDetails])
@@ -354,16 +310,26 @@ def semantic_search_events(
             db.rollback()
             event_ids = []
 
-    q = db.query(Event).filter(Event.deleted_at.is_(None))
+    q = event_list_query(db).filter(Event.deleted_at.is_(None))
     q = q.filter(Event.visibility == EventVisibility.public)
     if event_ids:
-        items = q.filter(Event.id.in_(event_ids)).all()
+        items = fetch_events(q.filter(Event.id.in_(event_ids)))
         order = {eid: idx for idx, eid in enumerate(event_ids)}
         items.sort(key=lambda e: order.get(e.id, 10**9))
-        return items[:top_k]
+        items = items[:top_k]
+        if q_text and len(items) < top_k:
+            # Events created or edited since their last embedding are matched by text until their job runs
+            predicate, rank = text_search(db, q_text, EVENT_SEARCH)
+            items += fetch_events(
+                q.filter(predicate, awaiting_embedding("events", Event.id), Event.id.notin_([e.id for e in items]))
+                .order_by(rank.desc(), Event.start_datetime.asc())
+                .limit(top_k - len(items))
+            )
+        return items
     elif q_text:
-        q = q.filter(Event.title.ilike(f"%{q_text}%"))
-    return q.order_by(Event.start_datetime.asc()).limit(top_k).all()
+        predicate, rank = text_search(db, q_text, EVENT_SEARCH)
+        return fetch_events(q.filter(predicate).order_by(rank.desc(), Event.start_datetime.asc()).limit(top_k))
+    return fetch_events(q.order_by(Event.start_datetime.asc()).limit(top_k))
 
 @router.get("/semantic/events", response_model=List[EventDetails])
 def semantic_search_events_alias(
@@ -399,7 +365,7 @@ def get_my_event_history(
     if role_filter is not None and role_filter not in allowed_filters:
         raise HTTPException(status_code=400, detail="Invalid role_filter")
 
-    query = db.query(Event)
+    query = event_list_query(db)
 
     # Always past events for history
     query = query.filter(Event.end_datetime < func.now(), Event.deleted_at.is_(None))
@@ -433,10 +399,7 @@ def get_my_event_history(
             # No role_filter provided: include any attended role
             pass
 
-    events = (
-        query.order_by(Event.end_datetime.desc()).distinct().all()
-    )
-    return events
+    return fetch_events(query.order_by(Event.end_datetime.desc()).distinct())
 
 
 
@@ -608,6 +571,9 @@ def create_event(
         pass
 
     db.add(db_event)
+    db.flush()
+    # Embedded by the embedding job queue, off the request path
+    enqueue_event(db, db_event)
     db.commit()
     db.refresh(db_event)
 
@@ -656,13 +622,6 @@ def create_event(
         db.commit()
         db.refresh(db_event)
 
-    try:
-        from app.services.ai_service import upsert_event_embedding
-        src = f"{db_event.title}\n{db_event.description or ''}\nformat:{db_event.format} type:{db_event.type}"
-        upsert_event_embedding(db, db_event.id, src)
-    except Exception:
-        pass
-
     return db_event
 
 
@@ -689,35 +648,11 @@ def get_request_details(
     # --- Chat Logic: Ensure Conversation Exists ---
     if not participant.conversation_id:
         # Ensure a single consistent 1:1 conversation for organizer and invitee
-        from app.models.chat_model import Conversation, ConversationParticipant as ChatParticipant
-        event = db.query(Event).filter(Event.id == participant.event_id).first()
-        organizer_id = event.organizer_id
-        # Try to reuse existing conversation between organizer and invitee
-        organizer_convs = db.query(ChatParticipant.conversation_id)\
-            .filter(ChatParticipant.user_id == organizer_id).subquery()
-        existing_conv = db.query(Conversation)\
-            .join(ChatParticipant, ChatParticipant.conversation_id == Conversation.id)\
-            .filter(
-                ChatParticipant.user_id == participant.user_id,
-                Conversation.id.in_(organizer_convs)
-            ).first()
-        if existing_conv:
-            participant.conversation_id = existing_conv.id
-            db.add(participant)
-            db.commit()
-            db.refresh(participant)
-        else:
-            # Create new conversation if none exists
-            new_conv = Conversation()
-            db.add(new_conv)
-            db.commit()
-            db.refresh(new_conv)
-            db.add(ChatParticipant(conversation_id=new_conv.id, user_id=organizer_id))
-            db.add(ChatParticipant(conversation_id=new_conv.id, user_id=participant.user_id))
-            participant.conversation_id = new_conv.id
-            db.add(participant)
-            db.commit()
-            db.refresh(participant)
+        organizer_id = db.query(Event.organizer_id).filter(Event.id == participant.event_id).scalar()
+        participant.conversation_id = get_or_create_direct_conversation(db, organizer_id, participant.user_id)
+        db.add(participant)
+        db.commit()
+        db.refresh(participant)
 
     return participant
 
@@ -725,11 +660,13 @@ def get_request_details(
 @router.get("/events/{event_id}/export-participants", response_class=StreamingResponse)
 def export_event_participants_csv(
     event_id: uuid.UUID,
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    gzip: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Export all participants of an event as a CSV file.
+    Export all participants of an event (CSV by default; also ndjson/parquet, optionally gzipped).
     Only the organizer can export.
     """
     event = db.query(Event).filter(Event.id == event_id).first()
@@ -739,71 +676,63 @@ def export_event_participants_csv(
     if event.organizer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only the organizer can export participants")
         
-    # Fetch participants with profile data
-    participants = (
-        db.query(EventParticipant, User, Profile)
+    # Participants with profile data, streamed as plain rows
+    stmt = (
+        select(
+            EventParticipant.name,
+            EventParticipant.email,
+            EventParticipant.role,
+            EventParticipant.status,
+            EventParticipant.join_method,
+            EventParticipant.created_at,
+            EventParticipant.payment_status,
+            User.id.label("user_id"),
+            User.email.label("user_email"),
+            Profile.full_name,
+        )
         .outerjoin(User, EventParticipant.user_id == User.id)
         .outerjoin(Profile, User.id == Profile.user_id)
-        .filter(EventParticipant.event_id == event_id)
+        .where(EventParticipant.event_id == event_id)
         .order_by(EventParticipant.created_at.desc())
-        .all()
     )
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Header
-    writer.writerow([
-        "Name", 
-        "Email", 
-        "Role", 
-        "Status", 
-        "Join Method", 
-        "Registration Date", 
-        "Check-in Status",
-        "Payment Status"
-    ])
-    
-    for participant, user, profile in participants:
+
+    def participant_row(row):
         # Determine display name
-        display_name = participant.name
+        display_name = row.name
         if not display_name:
-            if profile and profile.full_name:
-                display_name = profile.full_name
-            elif user:
+            if row.full_name:
+                display_name = row.full_name
+            elif row.user_id:
                 display_name = "User"
             else:
                 display_name = "Unknown"
-                
-        # Determine email
-        email = participant.email
-        if not email and user:
-            email = user.email
-            
-        registration_date = participant.created_at.strftime("%Y-%m-%d %H:%M:%S") if participant.created_at else ""
-        
-        writer.writerow([
+        return [
             display_name,
-            email or "",
-            participant.role.value if participant.role else "",
-            participant.status.value if participant.status else "",
-            participant.join_method or "",
-            registration_date,
-            "Attended" if participant.status == EventParticipantStatus.attended else "Not Checked-in",
-            participant.payment_status.value if participant.payment_status else "N/A"
-        ])
-        
-    output.seek(0)
-    
-    filename = f"participants_{event.title.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.csv"
-    
-    response = StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv"
+            row.email or row.user_email or "",
+            row.role,
+            row.status,
+            row.join_method or "",
+            row.created_at.strftime("%Y-%m-%d %H:%M:%S") if row.created_at else "",
+            "Attended" if row.status == EventParticipantStatus.attended else "Not Checked-in",
+            row.payment_status or "N/A",
+        ]
+
+    filename = f"participants_{event.title.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}"
+    return export_response(
+        db, stmt,
+        [
+            "Name", 
+            "Email", 
+            "Role", 
+            "Status", 
+            "Join Method", 
+            "Registration Date", 
+            "Check-in Status",
+            "Payment Status"
+        ],
+        participant_row,
+        filename, fmt=format, compress=gzip,
     )
-    response.headers["Content-Disposition"] = f"attachment; filename={filename}"
-    return response
 
 
 # --- Publish/Unpublish & Registration Management ---
@@ -824,14 +753,9 @@ def publish_event(
     if getattr(event, "registration_status", None) is None:
         event.registration_status = EventRegistrationStatus.opened
     db.add(event)
+    enqueue_event(db, event)
     db.commit()
     db.refresh(event)
-    try:
-        from app.services.ai_service import upsert_event_embedding
-        src = f"{event.title}\n{event.description or ''}\nformat:{event.format} type:{event.type}"
-        upsert_event_embedding(db, event.id, src)
-    except Exception:
-        db.rollback()
     log_admin_action(db, current_user.id, "event.publish", "event", event.id)
     return event
 
@@ -991,6 +915,7 @@ def list_my_events(
             my_role=EventParticipantRole.organizer,
             my_status=EventParticipantStatus.accepted,
             cover_url=e.cover_url,
+            cover_variants=e.cover_variants,
             venue_remark=e.venue_remark,
             format=e.format,
             participant_count=e.participant_count,
@@ -1013,6 +938,7 @@ def list_my_events(
                 my_role=link.role,
                 my_status=link.status,
                 cover_url=e.cover_url,
+                cover_variants=e.cover_variants,
                 venue_remark=e.venue_remark,
                 format=e.format,
                 participant_count=e.participant_count,
@@ -1127,59 +1053,19 @@ def run_due_event_reminders(
     current_user: User = Depends(get_current_user),
 ):
     """Process and send due reminders for the current user.
-    Sends both in-app notification and email (best-effort).
+    Sends both in-app notification and email (queued via the outbox).
+    Reminders for all users are also sent by the background scheduler.
     """
-    now = datetime.now(timezone.utc)
-    due = (
+    processed_ids = process_due_reminders(db, user_id=current_user.id, max_reminders=limit)
+    if not processed_ids:
+        return []
+    return (
         db.query(EventReminder)
-        .filter(
-            EventReminder.user_id == current_user.id,
-            EventReminder.is_sent == False,
-            EventReminder.remind_at <= now,
-        )
+        .filter(EventReminder.id.in_(processed_ids))
         .order_by(EventReminder.remind_at.asc())
-        .limit(limit)
         .all()
     )
 
-    processed: list[EventReminder] = []
-    for r in due:
-        event = db.query(Event).filter(Event.id == r.event_id).first()
-        if event is None:
-            # Skip invalid
-            r.is_sent = True
-            r.sent_at = now
-            db.add(r)
-            continue
-
-        NotificationService.create_notification(
-            db=db,
-            recipient_id=r.user_id,
-            actor_id=r.user_id,
-            type=NotificationType.event,
-            content=f"Reminder: '{event.title}' starts at {event.start_datetime}",
-            link_url=f"/main/events/{event.id}",
-        )
-
-        # Email best-effort
-        user = db.query(User).filter(User.id == r.user_id).first()
-        if user and user.email:
-            try:
-                send_event_reminder_email(email=user.email, event=event, when_label=r.option)
-            except Exception:
-                pass
-
-        r.is_sent = True
-        r.sent_at = now
-        db.add(r)
-        processed.append(r)
-
-    db.commit()
-    # Refresh processed reminders
-    for pr in processed:
-        db.refresh(pr)
-    return processed
-
 
 @router.get("/events/checklist/me", response_model=list[EventChecklistItemResponse])
 def list_my_checklist_items(
@@ -1520,10 +1406,7 @@ def walk_in_attendance(
             raise HTTPException(status_code=400, detail="Payment receipt is required for paid events")
         
         # Upload receipt
-        try:
-            payment_proof_url = upload_file(receipt, "receipts")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail="Failed to upload receipt")
+        payment_proof_url = anyio.from_thread.run(storage_service.save, receipt, "receipts")
 
         status = EventParticipantStatus.pending
         payment_status = "pending"
@@ -1799,11 +1682,7 @@ def upload_payment_proof(
          raise HTTPException(status_code=404, detail="You are not a participant")
 
     # Upload file
-    from app.services import cloudinary_service
-    try:
-        url = cloudinary_service.upload_file(file, "payment_proofs")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    url = anyio.from_thread.run(storage_service.save, file, "payment_proofs")
 
     participant.payment_proof_url = url
     # If currently rejected or something, maybe reset?
@@ -1859,6 +1738,7 @@ def invite_event_participants_bulk(
             raise HTTPException(status_code=403, detail="Not allowed to invite participants")
 
     created: list[EventParticipant] = []
+    notifications: list[dict] = []
     for item in body.items:
         try:
             role_enum = _parse_role(item.role)
@@ -1882,14 +1762,13 @@ def invite_event_participants_bulk(
                 if item.description is not None:
                     existing.description = item.description
                 db.add(existing)
-                NotificationService.create_notification(
-                    db=db,
+                notifications.append(dict(
                     recipient_id=item.user_id,
                     actor_id=current_user.id,
                     type=NotificationType.event,
                     content=f"Your role for '{event.title}' has been updated to {role_enum.value}",
                     link_url=f"/main/events/{event.id}",
-                )
+                ))
                 created.append(existing)
                 continue
 
@@ -1918,25 +1797,29 @@ def invite_event_participants_bulk(
             participant.conversation_id = new_conv.id
 
         db.add(participant)
-        # Create notification per invitee
-        NotificationService.create_notification(
-            db=db,
+        # Notification per invitee, inserted together below
+        notifications.append(dict(
             recipient_id=item.user_id,
             actor_id=current_user.id,
             type=NotificationType.event,
             content=f"You have been invited to '{event.title}' as {role_enum.value}",
             link_url=f"/main/events/{event.id}",
-        )
+        ))
         created.append(participant)
 
-    db.commit()
+    # Queue invitation emails in the same commit; the outbox worker sends them
+    recipient_emails = dict(
+        db.query(User.id, User.email).filter(User.id.in_([p.user_id for p in created])).all()
+    ) if created else {}
+    for p in created:
+        if recipient_emails.get(p.user_id):
+            send_event_invitation_email(email=recipient_emails[p.user_id], event=event, role=p.role, description=p.description, db=db)
+
+    # One commit for participants, notifications and emails; then one SSE batch
+    NotificationService.create_notifications_bulk(db, notifications)
     # Refresh all created participants
     for p in created:
         db.refresh(p)
-        # Send email best-effort
-        recipient = db.query(User).filter(User.id == p.user_id).first()
-        if recipient and recipient.email:
-            send_event_invitation_email(email=recipient.email, event=event, role=p.role, description=p.description)
 
     return created
 
@@ -2378,13 +2261,8 @@ def list_event_proposals(
             
     return proposals
 
-@router.post("/events/{event_id}/proposals", response_model=EventProposalResponse)
-async def create_event_proposal(
-    event_id: uuid.UUID,
-    request: Request,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+def _proposal_event(db: Session, event_id: uuid.UUID, current_user: User) -> Event:
+    """The event, if current_user (organizer, committee or speaker) may add proposals to it"""
     event = db.query(Event).filter(Event.id == event_id).first()
     if event is None:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -2399,6 +2277,32 @@ async def create_event_proposal(
         )
         if my_participation is None or my_participation.role not in (EventParticipantRole.committee, EventParticipantRole.speaker):
             raise HTTPException(status_code=403, detail="Not allowed to create proposals")
+    return event
+
+
+@router.post("/events/{event_id}/proposals/upload-url")
+def create_event_proposal_upload_url(
+    event_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Signed form for uploading a proposal file straight to storage.
+    The client sends the file there and passes the returned URL as
+    `file_url` to POST /events/{event_id}/proposals.
+    """
+    _proposal_event(db, event_id, current_user)
+    return storage_service.sign_upload("event_proposals")
+
+
+@router.post("/events/{event_id}/proposals", response_model=EventProposalResponse)
+async def create_event_proposal(
+    event_id: uuid.UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    event = await db.run_sync(_proposal_event, event_id, current_user)
 
     content_type = request.headers.get("content-type", "")
     title: str | None = None
@@ -2423,7 +2327,7 @@ async def create_event_proposal(
         file_url = payload.get("file_url")
 
     if upload and not file_url:
-        file_url = upload_file(upload, "event_proposals")
+        file_url = await storage_service.save(upload, "event_proposals")
     final_title = title or event.title
     final_description = description or event.description
 
@@ -2435,11 +2339,8 @@ async def create_event_proposal(
         file_url=file_url,
     )
     db.add(proposal)
-    db.flush()
 
     # --- Chat Logic: Auto-create Conversation ---
-    # Determine organizer ID
-    event = db.query(Event).filter(Event.id == event_id).first()
     organizer_id = event.organizer_id
     
     # Simple logic: create a new conversation for this proposal
@@ -2451,7 +2352,7 @@ async def create_event_proposal(
     if current_user.id != organizer_id:
         new_conv = Conversation()
         db.add(new_conv)
-        db.flush()
+        await db.flush()
         
         # Add Participants: Organizer & Proposer
         p_ids = {organizer_id, current_user.id}
@@ -2460,13 +2361,9 @@ async def create_event_proposal(
             db.add(cp)
         
         proposal.conversation_id = new_conv.id
-        
-        db.commit()
-    else:
-        # Just commit the proposal without a conversation
-        db.commit()
-        
-    db.refresh(proposal)
+
+    await db.commit()
+    await db.refresh(proposal)
     return proposal
 
 @router.get("/events/{event_id}/proposals/{proposal_id}/comments", response_model=List[EventProposalCommentResponse])
@@ -2654,10 +2551,7 @@ def register_walk_in(
              raise HTTPException(status_code=400, detail="Payment proof is required for paid events")
         
         # Upload file
-        try:
-            payment_proof_url = upload_file(file, "payment_proofs")
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+        payment_proof_url = anyio.from_thread.run(storage_service.save, file, "payment_proofs")
 
         status = EventParticipantStatus.pending 
         payment_status = EventPaymentStatus.pending
@@ -2756,7 +2650,7 @@ def create_event_proposal_comment(
         )
         if owner and owner.email:
             try:
-                send_event_proposal_comment_email(email=owner.email, event=event, proposal=proposal, comment_content=body.content)
+                send_event_proposal_comment_email(email=owner.email, event=event, proposal=proposal, comment_content=body.content, db=db)
             except Exception:
                 pass
     db.commit()
@@ -2989,8 +2883,9 @@ def update_event_logo(
         if my_participation is None or my_participation.role != EventParticipantRole.committee:
             raise HTTPException(status_code=403, detail="Not allowed to update event logo")
 
-    url = upload_file(file, "event_logos")
-    event.logo_url = url
+    image = anyio.from_thread.run(image_service.save_image, file, "event_logos")
+    event.logo_url = image.url
+    event.logo_variants = image.variants
     db.add(event)
     db.commit()
     db.refresh(event)
@@ -3021,8 +2916,9 @@ def update_event_cover(
         if my_participation is None or my_participation.role != EventParticipantRole.committee:
             raise HTTPException(status_code=403, detail="Not allowed to update event cover")
 
-    url = upload_file(file, "event_covers")
-    event.cover_url = url
+    image = anyio.from_thread.run(image_service.save_image, file, "event_covers")
+    event.cover_url = image.url
+    event.cover_variants = image.variants
     db.add(event)
     db.commit()
     db.refresh(event)
@@ -3044,7 +2940,7 @@ def update_event_payment_qr(
     if event.organizer_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only organizer can upload payment QR")
 
-    url = upload_file(file, "event_payment_qr")
+    url = anyio.from_thread.run(storage_service.save, file, "event_payment_qr")
     event.payment_qr_url = url
     db.add(event)
     db.commit()
@@ -3052,8 +2948,10 @@ def update_event_payment_qr(
     return event
 
 
-def _make_attendance_token(event_id: uuid.UUID, minutes_valid: int = 15) -> tuple[str, datetime]:
-    exp = datetime.now(timezone.utc) + timedelta(minutes=minutes_valid)
+def _make_attendance_token(
+    event_id: uuid.UUID, minutes_valid: int = 15, expires_at: datetime | None = None
+) -> tuple[str, datetime]:
+    exp = expires_at or datetime.now(timezone.utc) + timedelta(minutes=minutes_valid)
     payload = f"{event_id}|{int(exp.timestamp())}"
     signature = hmac.new(settings.SECRET_KEY.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).digest()
     token = f"{base64.urlsafe_b64encode(payload.encode('utf-8')).decode('utf-8').rstrip('=')}.{base64.urlsafe_b64encode(signature).decode('utf-8').rstrip('=')}"
@@ -3116,44 +3014,49 @@ def generate_event_attendance_qr(
     return AttendanceQRResponse(token=token, expires_at=exp)
 
 
-@router.get("/events/{event_id}/attendance/qr.png")
-def get_event_attendance_qr_png(
+def _attendance_qr_access(db: Session, event_id: uuid.UUID, user_id: uuid.UUID):
+    """The event's attendance settings and the user's participation, in one query"""
+    row = (
+        db.query(
+            Event.organizer_id,
+            Event.is_attendance_enabled,
+            Event.registration_status,
+            EventParticipant.id.label("participant_id"),
+            EventParticipant.role,
+        )
+        .outerjoin(
+            EventParticipant,
+            (EventParticipant.event_id == Event.id) & (EventParticipant.user_id == user_id),
+        )
+        .filter(Event.id == event_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return row
+
+
+@router.get("/events/{event_id}/attendance/qr.{fmt}")
+def get_event_attendance_qr_image(
     event_id: uuid.UUID,
+    fmt: qr_service.QRFormat,
+    request: Request,
     minutes_valid: int = Query(15, ge=1, le=180),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Return a PNG QR image for a short-lived attendance token.
-    Only organizer or committee can generate.
+    """Return a PNG or SVG QR image for the current attendance token.
+    Only organizer or committee can generate. The token rotates every
+    `minutes_valid` minutes; the response is cacheable until then.
     """
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if event is None:
-        raise HTTPException(status_code=404, detail="Event not found")
-
+    access = _attendance_qr_access(db, event_id, current_user.id)
     # Organizer or committee only
-    if event.organizer_id != current_user.id:
-        my_participation = (
-            db.query(EventParticipant)
-            .filter(
-                EventParticipant.event_id == event.id,
-                EventParticipant.user_id == current_user.id,
-            )
-            .first()
-        )
-        if my_participation is None or my_participation.role != EventParticipantRole.committee:
-            raise HTTPException(status_code=403, detail="Not allowed to generate attendance QR")
+    if access.organizer_id != current_user.id and access.role != EventParticipantRole.committee:
+        raise HTTPException(status_code=403, detail="Not allowed to generate attendance QR")
 
-    token, _ = _make_attendance_token(event_id, minutes_valid=minutes_valid)
-
-    try:
-        import qrcode
-        img = qrcode.make(token)
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        png_bytes = buf.getvalue()
-        return Response(content=png_bytes, media_type="image/png")
-    except ImportError:
-        raise HTTPException(status_code=500, detail="qrcode library not installed. Please add 'qrcode' and 'Pillow' to requirements.")
+    expires_at, rollover = qr_service.rotation_window(minutes_valid)
+    token, _ = _make_attendance_token(event_id, expires_at=expires_at)
+    return qr_service.qr_response(request, token, fmt, rollover)
 
 
 @router.post("/events/attendance/scan", response_model=EventParticipantDetails)
@@ -3428,65 +3331,13 @@ def run_event_scheduler(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Run event status transitions:
+    """Run event status transitions now:
     - Close registration at start time for published events
     - End events after end time and mark absent for accepted audiences
-    Organizer-only for now. In production, wire to a backend scheduler.
+    The same job runs periodically on the background scheduler.
     """
-    # Only admins/organizers could be allowed; for now allow any authenticated user
-    now = datetime.now(timezone.utc)
-    updated = 0
-
-    # Close registration
-    to_close = (
-        db.query(Event)
-        .filter(
-            Event.status == EventStatus.published,
-            Event.start_datetime <= now,
-        )
-        .limit(limit)
-        .all()
-    )
-    for e in to_close:
-        if getattr(e, "registration_status", None) == EventRegistrationStatus.opened:
-            e.registration_status = EventRegistrationStatus.closed
-            db.add(e)
-            updated += 1
-
-    # End events and mark absents
-    to_end = (
-        db.query(Event)
-        .filter(
-            Event.status == EventStatus.published,
-            Event.end_datetime < now,
-        )
-        .limit(limit)
-        .all()
-    )
-    for e in to_end:
-        e.status = EventStatus.ended
-        db.add(e)
-        audience_roles = [
-            EventParticipantRole.audience,
-            EventParticipantRole.student,
-            EventParticipantRole.teacher,
-        ]
-        not_attended = (
-            db.query(EventParticipant)
-            .filter(
-                EventParticipant.event_id == e.id,
-                EventParticipant.role.in_(audience_roles),
-                EventParticipant.status == EventParticipantStatus.accepted,
-            )
-            .all()
-        )
-        for p in not_attended:
-            p.status = EventParticipantStatus.absent
-            db.add(p)
-        updated += 1
-
-    db.commit()
-    return {"updated": updated}
+    counts = run_event_transitions(db, max_events=limit)
+    return {"updated": counts["registration_closed"] + counts["events_ended"], **counts}
 
 
 # --- Event Checklist (Organizer/Committee) ---
@@ -3962,34 +3813,25 @@ def generate_user_attendance_qr(
     return AttendanceQRResponse(token=token, expires_at=exp)
 
 
-@router.get("/events/{event_id}/attendance/user_qr.png")
-def get_user_attendance_qr_png(
+@router.get("/events/{event_id}/attendance/user_qr.{fmt}")
+def get_user_attendance_qr_image(
     event_id: uuid.UUID,
+    fmt: qr_service.QRFormat,
+    request: Request,
     minutes_valid: int = Query(15, ge=1, le=180),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if event is None:
-        raise HTTPException(status_code=404, detail="Event not found")
-    if not getattr(event, "is_attendance_enabled", True):
+    access = _attendance_qr_access(db, event_id, current_user.id)
+    if not access.is_attendance_enabled:
         raise HTTPException(status_code=400, detail="Attendance is disabled for this event")
-    if getattr(event, "registration_status", None) != EventRegistrationStatus.opened:
+    if access.registration_status != EventRegistrationStatus.opened:
         raise HTTPException(status_code=400, detail="Registration is closed; attendance scanning is disabled")
-    participant = (
-        db.query(EventParticipant)
-        .filter(EventParticipant.event_id == event.id, EventParticipant.user_id == current_user.id)
-        .first()
-    )
-    if participant is None:
+    if access.participant_id is None:
         raise HTTPException(status_code=403, detail="Not a participant of this event")
-    token, _ = _make_user_attendance_token(event.id, current_user.id, minutes_valid=minutes_valid)
-    import qrcode, io
-    img = qrcode.make(token)
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    png_bytes = buf.getvalue()
-    return Response(content=png_bytes, media_type="image/png")
+    expires_at, rollover = qr_service.rotation_window(minutes_valid)
+    token, _ = _make_user_attendance_token(event_id, current_user.id, expires_at=expires_at)
+    return qr_service.qr_response(request, token, fmt, rollover)
 
 
 @router.post("/events/{event_id}/attendance/scan_user", response_model=EventParticipantDetails)
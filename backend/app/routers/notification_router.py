@@ -1,43 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
 import uuid
 import asyncio
 import json
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
-from app.database.database import get_db
-from app.models.notification_model import Notification, NotificationType
-from app.schemas.notification_schema import NotificationResponse, NotificationReadAllResponse
+from app.database.database import get_async_db, get_db
+from app.models.notification_model import Notification, NotificationBroadcast
+from app.schemas.notification_schema import (
+    NotificationBroadcastQueuedResponse,
+    NotificationBroadcastResponse,
+    NotificationReadAllResponse,
+    NotificationResponse,
+)
 from app.dependencies import get_current_user, require_roles, get_current_user_sse
 from app.models.user_model import User
 from app.services.sse_manager import sse_manager
+from app.services.notification_broadcast import count_query, run_pending_broadcasts
+from app.services.notification_service import NotificationService
+from app.core.config import settings
+from app.core.pagination import paginate, set_next_cursor
 
 router = APIRouter()
 
 @router.get("/notifications/me", response_model=list[NotificationResponse])
 def list_my_notifications(
+    response: Response,
     unread_only: bool = False,
     page: int = 1,
     page_size: int = 20,
+    cursor: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    if page < 1:
-        page = 1
-    if page_size < 1:
-        page_size = 20
     q = (
         db.query(Notification)
         .filter(Notification.recipient_id == current_user.id)
     )
     if unread_only:
         q = q.filter(Notification.is_read == False)
-    items = (
-        q.order_by(Notification.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+    q, page_size = paginate(q, Notification.created_at, Notification.id, cursor, page, page_size, descending=True)
+    items = q.all()
+    set_next_cursor(response, items, page_size, lambda n: (n.created_at, n.id))
     return items
 
 @router.put("/notifications/{notification_id}/read", response_model=NotificationResponse)
@@ -72,43 +76,93 @@ def get_unread_notifications_count(db: Session = Depends(get_db), current_user:
     )
     return {"unread_count": count}
 
+def _sse_event(data: dict) -> str:
+    # Notifications carry their id so the browser can resume via Last-Event-ID
+    event_id = data.get("id") if isinstance(data, dict) and "recipient_id" in data else None
+    prefix = f"id: {event_id}\n" if event_id else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
 @router.get("/notifications/stream")
-async def stream_notifications(current_user: User = Depends(get_current_user_sse)):
+async def stream_notifications(
+    request: Request,
+    last_event_id: uuid.UUID | None = Query(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user_sse),
+):
     """
     Server-Sent Events endpoint for real-time notifications.
     Keeps connection open and streams new notifications as they arrive.
+    Reconnecting clients send Last-Event-ID (header, or `last_event_id` for
+    clients that recreate the EventSource) to replay what they missed.
     """
+    resume_from = last_event_id
+    header_id = request.headers.get("last-event-id")
+    if resume_from is None and header_id:
+        try:
+            resume_from = uuid.UUID(header_id)
+        except ValueError:
+            resume_from = None
+
+    # Register this connection before reading the backlog so nothing published
+    # in between is lost; duplicates are filtered below
+    connection = await sse_manager.connect(current_user.id)
+
+    replay = None
+    if resume_from is not None:
+        try:
+            rows = await asyncio.to_thread(
+                NotificationService.list_since, db, current_user.id, resume_from, settings.SSE_REPLAY_LIMIT
+            )
+            if rows is not None:
+                replay = [NotificationResponse.model_validate(n).model_dump(mode="json") for n in rows]
+        finally:
+            # Release the DB connection; the stream may stay open for hours
+            await asyncio.to_thread(db.close)
+    else:
+        await asyncio.to_thread(db.close)
+
     async def event_generator():
-        # Register this user's connection
-        queue = await sse_manager.connect(current_user.id)
-        
+        replayed_ids = set()
         try:
             # Send initial connection confirmation
             yield f"data: {json.dumps({'type': 'connected', 'message': 'SSE stream established'})}\n\n"
-            
+
+            if resume_from is not None:
+                if replay is None:
+                    # Too far behind (or unknown id): the client should reload its list
+                    yield f"data: {json.dumps({'type': 'resync'})}\n\n"
+                else:
+                    for item in replay:
+                        replayed_ids.add(item["id"])
+                        yield _sse_event(item)
+
             while True:
                 try:
                     # Wait for notification with timeout (30 seconds for heartbeat)
-                    notification_data = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    
+                    notification_data = await connection.get(timeout=30.0)
+
                     # Check for shutdown signal
                     if isinstance(notification_data, dict) and notification_data.get("type") == "shutdown":
                         break
 
+                    if isinstance(notification_data, dict) and notification_data.get("id") in replayed_ids:
+                        continue
+
                     # Send notification as SSE event
-                    yield f"data: {json.dumps(notification_data)}\n\n"
-                    
+                    yield _sse_event(notification_data)
+
                 except asyncio.TimeoutError:
                     # Send heartbeat ping to keep connection alive
                     yield f": ping\n\n"
-                    
+
         except asyncio.CancelledError:
             # Client disconnected
             pass
         finally:
-            # Clean up connection
-            sse_manager.disconnect(current_user.id)
-    
+            # Clean up this connection only; other tabs keep theirs
+            sse_manager.disconnect(connection)
+
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
@@ -120,6 +174,15 @@ async def stream_notifications(current_user: User = Depends(get_current_user_sse
     )
 
 
+@router.get("/admin/notifications/stream/stats")
+def stream_stats(
+    per_connection: bool = False,
+    current_user: User = Depends(require_roles(["admin"])),
+):
+    """SSE connection counts and backpressure metrics for the worker serving this request"""
+    return sse_manager.stats(include_connections=per_connection)
+
+
 from pydantic import BaseModel
 
 class BroadcastNotificationRequest(BaseModel):
@@ -129,42 +192,33 @@ class BroadcastNotificationRequest(BaseModel):
     target_user_id: uuid.UUID | None = None
     link_url: str | None = None
 
-@router.post("/admin/notifications/broadcast")
+@router.post("/admin/notifications/broadcast", response_model=NotificationBroadcastQueuedResponse, status_code=202)
 async def broadcast_notification(
     body: BroadcastNotificationRequest,
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(require_roles(["admin"])),
 ):
-    query = db.query(User)
-    if body.target_user_id:
-        query = query.filter(User.id == body.target_user_id)
-    elif body.target_role:
-        from app.models.user_model import user_roles, Role
-        query = (
-            query
-            .join(user_roles, user_roles.c.user_id == User.id)
-            .join(Role, Role.id == user_roles.c.role_id)
-            .filter(func.lower(Role.name) == func.lower(body.target_role))
-        )
-
-    users = query.all()
-    
-    notifications = []
-    for user in users:
-        # Use NotificationService to automatically broadcast via SSE
-        from app.services.notification_service import NotificationService
-        notif = NotificationService.create_notification(
-            db=db,
-            recipient_id=user.id,
-            actor_id=current_user.id,
-            type=NotificationType.system,
-            content=body.content,
-            link_url=body.link_url
-        )
-        notifications.append(notif)
+    """
+    Queue a broadcast; it is delivered in the background in chunks.
+    Poll GET /admin/notifications/broadcasts/{id} for progress.
+    """
+    total = await db.scalar(count_query(body.target_role, body.target_user_id))
+    broadcast = NotificationBroadcast(
+        created_by_id=current_user.id,
+        title=body.title,
+        content=body.content,
+        link_url=body.link_url,
+        target_role=body.target_role,
+        target_user_id=body.target_user_id,
+        status="queued",
+        total=total,
+        sent=0,
+    )
+    db.add(broadcast)
+    await db.flush()
     
     # Log the broadcast action to audit logs
-    import json
     from app.services.audit_service import log_admin_action
     
     details_json = json.dumps({
@@ -173,17 +227,37 @@ async def broadcast_notification(
         "target_role": body.target_role,
         "target_user_id": str(body.target_user_id) if body.target_user_id else None,
         "link_url": body.link_url,
-        "recipient_count": len(notifications)
+        "recipient_count": total,
+        "broadcast_id": str(broadcast.id),
     })
     
-    log_admin_action(
-        db=db,
+    # Commits the broadcast row too
+    await db.run_sync(
+        log_admin_action,
         actor_user_id=current_user.id,
         action="broadcast_notification",
         target_type="system",
         target_id=current_user.id, # Using admin ID as target for system-wide actions
         details=details_json
     )
+    await db.refresh(broadcast)
 
-    db.commit()
-    return {"count": len(notifications)}
+    # The row is the job: this only starts delivery early (in the threadpool, after
+    # the response); the scheduler claims anything queued or abandoned after a restart
+    background_tasks.add_task(run_pending_broadcasts)
+    return NotificationBroadcastQueuedResponse(
+        **NotificationBroadcastResponse.model_validate(broadcast).model_dump(), count=total
+    )
+
+
+@router.get("/admin/notifications/broadcasts/{broadcast_id}", response_model=NotificationBroadcastResponse)
+def get_broadcast(
+    broadcast_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_roles(["admin"])),
+):
+    """Progress of a broadcast: status and how many of `total` notifications are sent"""
+    broadcast = db.get(NotificationBroadcast, broadcast_id)
+    if broadcast is None:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    return broadcast
@@ -1,5 +1,5 @@
-
-from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, UploadFile, File
 import os
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import select, update, delete, insert
@@ -7,12 +7,15 @@ from typing import List
 import uuid
 
 from app.database.database import get_db
-from app.models.organization_model import Organization, OrganizationVisibility, OrganizationType, organization_members, OrganizationRole, OrganizationStatus
+from app.models.organization_model import ORGANIZATION_SEARCH, Organization, OrganizationVisibility, OrganizationType, organization_members, OrganizationRole, OrganizationStatus
 from app.schemas.organization_schema import OrganizationResponse, OrganizationCreate, OrganizationUpdate
 from app.dependencies import get_current_user, get_current_user_optional, require_roles
 from app.models.user_model import User
 from app.services.audit_service import log_admin_action
-from app.services import cloudinary_service
+from app.services import image_service
+from app.core.pagination import fetch_page, paginate, set_next_cursor
+from app.core.search import text_search
+from app.schemas.pagination_schema import Page
 
 router = APIRouter()
 
@@ -23,58 +26,58 @@ def _is_admin(db: Session, user: User) -> bool:
     # Check if user has admin role using ORM relationship
     return any(role.name == "admin" for role in user.roles)
 
-@router.get("/organizations", response_model=List[OrganizationResponse])
+class OrganizationFilters:
+    """Filters shared by GET /organizations and GET /organizations/count"""
+
+    def __init__(
+        self,
+        q: str | None = Query(None),
+        type: OrganizationType | None = Query(None),
+    ):
+        self.q = q
+        self.type = type
+
+    def apply(self, query):
+        # Strictly public and approved only
+        query = query.filter(Organization.visibility == OrganizationVisibility.public)
+        if not _is_testing():
+            query = query.filter(Organization.status == OrganizationStatus.approved)
+
+        # Filter out soft-deleted
+        query = query.filter(Organization.deleted_at.is_(None))
+
+        if self.q:
+            query = query.filter(text_search(query.session, self.q, ORGANIZATION_SEARCH)[0])
+        if self.type:
+            query = query.filter(Organization.type == self.type)
+        return query
+
+
+@router.get("/organizations", response_model=List[OrganizationResponse] | Page[OrganizationResponse])
 def get_all_organizations(
+    response: Response,
+    filters: OrganizationFilters = Depends(),
     db: Session = Depends(get_db),
-    q: str | None = Query(None),
-    type: OrganizationType | None = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1),
+    cursor: str | None = Query(None),
+    with_total: bool = Query(False, description="Respond with {items, total} instead of a list"),
 ):
-    query = db.query(Organization)
-    
-    # Strictly public and approved only
-    query = query.filter(Organization.visibility == OrganizationVisibility.public)
-    if not _is_testing():
-        query = query.filter(Organization.status == OrganizationStatus.approved)
-    
-    # Filter out soft-deleted
-    query = query.filter(Organization.deleted_at.is_(None))
-    
-    if q:
-        query = query.filter(Organization.name.ilike(f"%{q}%"))
-
-    if type:
-        query = query.filter(Organization.type == type)
-
-    return (
-        query.order_by(Organization.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+    query = filters.apply(db.query(Organization))
+    page_query, page_size = paginate(query, Organization.created_at, Organization.id, cursor, page, page_size, descending=True)
+    orgs, total = fetch_page(query, page_query, with_total, cursor)
+    set_next_cursor(response, orgs, page_size, lambda o: (o.created_at, o.id))
+    if with_total:
+        return {"items": orgs, "total": total}
+    return orgs
 
 
 @router.get("/organizations/count")
 def count_organizations(
+    filters: OrganizationFilters = Depends(),
     db: Session = Depends(get_db),
-    q: str | None = Query(None),
-    type: OrganizationType | None = Query(None),
 ):
-    query = db.query(Organization)
-    
-    # Public and approved only
-    query = query.filter(Organization.visibility == OrganizationVisibility.public)
-    if not _is_testing():
-        query = query.filter(Organization.status == OrganizationStatus.approved)
-    
-    # Filter out soft-deleted
-    query = query.filter(Organization.deleted_at.is_(None))
-    if q:
-        query = query.filter(Organization.name.ilike(f"%{q}%"))
-    if type:
-        query = query.filter(Organization.type == type)
-    total = query.with_entities(Organization.id).distinct().count()
+    total = filters.apply(db.query(Organization.id)).count()
     return {"total_count": total}
 
 @router.get("/me/organizations", response_model=List[OrganizationResponse])
@@ -453,8 +456,9 @@ def update_organization_logo(
     if org.owner_id != current_user.id and not _is_admin(db, current_user):
         raise HTTPException(status_code=403, detail="Not authorized to update this organization")
 
-    url = cloudinary_service.upload_file(file, "org_logos")
-    org.logo_url = url
+    image = anyio.from_thread.run(image_service.save_image, file, "org_logos")
+    org.logo_url = image.url
+    org.logo_variants = image.variants
     db.commit()
     db.refresh(org)
     
@@ -475,8 +479,9 @@ def update_organization_cover(
     if org.owner_id != current_user.id and not _is_admin(db, current_user):
         raise HTTPException(status_code=403, detail="Not authorized to update this organization")
 
-    url = cloudinary_service.upload_file(file, "org_covers")
-    org.cover_url = url
+    image = anyio.from_thread.run(image_service.save_image, file, "org_covers")
+    org.cover_url = image.url
+    org.cover_variants = image.variants
     db.commit()
     db.refresh(org)
     
@@ -14,8 +14,10 @@ from typing import List
 from fastapi import File, UploadFile
 from sqlalchemy import or_, text, select, insert, update
 from app.services.ai_service import generate_text_embedding, _vec_to_pg
+from app.services.embedding_jobs import awaiting_embedding, enqueue_expert
+from app.services.vector_index import expert_index, parse_pg_vector
 from sqlalchemy.sql import func
-from app.models.profile_model import Profile, ProfileVisibility, Tag, profile_tags, Education, JobExperience
+from app.models.profile_model import PROFILE_SEARCH, Profile, ProfileVisibility, Tag, profile_tags, Education, JobExperience
 from app.schemas.profile_schema import (
     ProfileCreate, ProfileResponse, ProfileUpdate, OnboardingUpdate,
     EducationCreate, EducationResponse,
@@ -26,11 +28,15 @@ from app.models.profile_model import profile_skills
 from app.models.user_model import User as UserModel
 from app.dependencies import require_roles
 from app.models.notification_model import Notification, NotificationType
+from app.services.notification_service import NotificationService
 from app.models.user_model import Role, user_roles
 from app.models.onboarding_model import UserOnboarding, OnboardingStatus
 from app.models.review_model import Review
 from app.models.follows_model import Follow
 from app.models.event_model import EventParticipant, EventParticipantRole, EventParticipantStatus
+from app.core.pagination import fetch_page
+from app.core.search import text_search
+from app.schemas.pagination_schema import Page
 
 # Simple in-memory rate limiter
 # Map: IP -> List[timestamp]
@@ -55,200 +61,100 @@ logger = logging.getLogger(__name__)
 from app.core.config import settings
 
 def calculate_sponsor_tier(db: Session, user_id: uuid.UUID) -> str | None:
-    count = (
-        db.query(func.count(EventParticipant.id))
-        .filter(
-            EventParticipant.user_id == user_id,
-            EventParticipant.role == EventParticipantRole.sponsor,
-            EventParticipant.status == EventParticipantStatus.accepted
-        )
-        .scalar()
-    ) or 0
-    
-    if count >= 10:
-        return "Gold"
-    elif count >= 5:
-        return "Silver"
-    elif count >= 1:
-        return "Bronze"
-    return None
-
-@router.get("/discover", response_model=List[ProfileResponse])
+    return profile_service.load_profile_stats(db, [user_id])[user_id]["sponsor_tier"]
+
+class ProfileDiscoverFilters:
+    """Filters shared by GET /discover and GET /discover/count"""
+
+    def __init__(
+        self,
+        name: str | None = "",
+        role: str | None = None,
+        skill: str | None = None,
+        tag_ids: List[uuid.UUID] | None = Query(None),
+        skill_ids: List[uuid.UUID] | None = Query(None),
+    ):
+        self.name = name
+        self.role = role
+        self.skill = skill
+        self.tag_ids = tag_ids
+        self.skill_ids = skill_ids
+
+    def apply(self, q, current_user: User | None):
+        if self.name:
+            q = q.filter(text_search(q.session, self.name, PROFILE_SEARCH)[0])
+
+        # One profile per user, so this join never duplicates rows
+        q = q.join(User, User.id == Profile.user_id)
+
+        # Filter only active users
+        q = q.filter(User.status == UserStatus.active)
+
+        # Exclude current user if logged in
+        if current_user:
+            q = q.filter(Profile.user_id != current_user.id)
+
+        # Exclude admins from public discovery
+        admin_subquery = select(user_roles.c.user_id).join(Role, Role.id == user_roles.c.role_id).where(Role.name == "admin")
+        q = q.filter(Profile.user_id.notin_(admin_subquery))
+
+        # The role default (e.g. experts only) is left to the frontend
+        if self.role:
+            q = q.filter(User.roles.any(Role.name.ilike(f"%{self.role}%")))
+
+        q = q.filter(Profile.visibility == ProfileVisibility.public)
+
+        # Many-to-many filters are EXISTS checks so results need no DISTINCT
+        if self.tag_ids:
+            q = q.filter(Profile.tags.any(Tag.id.in_(self.tag_ids)))
+        if self.skill_ids:
+            q = q.filter(Profile.skills.any(Skill.id.in_(self.skill_ids)))
+        if self.skill:
+            q = q.filter(or_(
+                Profile.skills.any(Skill.name.ilike(f"%{self.skill}%")),
+                Profile.tags.any(Tag.name.ilike(f"%{self.skill}%")),
+            ))
+        return q
+
+
+@router.get("/discover", response_model=List[ProfileResponse] | Page[ProfileResponse])
 def discover_profiles(
-    name: str | None = "",
-    role: str | None = None,
-    skill: str | None = None,
-    tag_ids: List[uuid.UUID] | None = Query(None),
-    skill_ids: List[uuid.UUID] | None = Query(None),
+    filters: ProfileDiscoverFilters = Depends(),
     page: int = 1,
     page_size: int = 20,
+    with_total: bool = Query(False, description="Respond with {items, total} instead of a list"),
     db: Session = Depends(get_db),
     current_user: User | None = Depends(get_current_user_optional)
 ):
-    q = db.query(Profile)
-    if name:
-        q = q.filter(Profile.full_name.ilike(f"%{name}%"))
-    
-    q = q.join(User, User.id == Profile.user_id)
-
-    # Filter only active users
-    q = q.filter(User.status == UserStatus.active)
-    
-    # Exclude current user if logged in
-    if current_user:
-        q = q.filter(Profile.user_id != current_user.id)
-
-    # Exclude admins from public discovery
-    admin_subquery = select(user_roles.c.user_id).join(Role, Role.id == user_roles.c.role_id).where(Role.name == "admin")
-    q = q.filter(Profile.user_id.notin_(admin_subquery))
-
-    if role:
-        q = q.join(user_roles, user_roles.c.user_id == User.id)\
-             .join(Role, Role.id == user_roles.c.role_id)\
-             .filter(Role.name.ilike(f"%{role}%"))
-    else:
-        # Default behavior: If no role is specified, prioritize verified experts?
-        # For now, let's keep it broad, but we can default to 'expert' if desired by frontend.
-        # User requested: "I think default is showing expert role unless user want to search classmate"
-        # However, it's safer to control this default on the Frontend to avoid confusing API behavior.
-        # But, we MUST ensure we show verified users if looking for experts.
-        pass
-
-    q = q.filter(Profile.visibility == ProfileVisibility.public)
-    
-    # Filter by tags if needed (handled below)
-
-    # Sort by rating (Top Voices)
-    q = q.order_by(Profile.average_rating.desc().nullslast())
-
-    if tag_ids:
-        q = q.join(profile_tags, profile_tags.c.profile_id == Profile.id)
-        q = q.filter(profile_tags.c.tag_id.in_(tag_ids))
-        
-    if skill_ids:
-        q = q.join(profile_skills, profile_skills.c.profile_id == Profile.id)
-        q = q.filter(profile_skills.c.skill_id.in_(skill_ids))
-
-    if skill:
-         q = q.outerjoin(profile_skills, profile_skills.c.profile_id == Profile.id)\
-             .outerjoin(Skill, Skill.id == profile_skills.c.skill_id)\
-             .outerjoin(profile_tags, profile_tags.c.profile_id == Profile.id)\
-             .outerjoin(Tag, Tag.id == profile_tags.c.tag_id)\
-             .filter(or_(Skill.name.ilike(f"%{skill}%"), Tag.name.ilike(f"%{skill}%")))
-    
     if page < 1:
         page = 1
     if page_size < 1:
         page_size = 20
-    
-    # Use subquery to get distinct profile IDs with ordering, then fetch full profiles
-    subq = q.with_entities(Profile.id, Profile.average_rating, Profile.full_name).distinct()
-    subq = subq.order_by(Profile.average_rating.desc(), Profile.full_name.asc())
-    subq = subq.offset((page - 1) * page_size).limit(page_size).subquery()
-    
-    # Fetch full profiles based on the IDs from subquery
-    items = (
-        db.query(Profile)
-        .filter(Profile.id.in_(db.query(subq.c.id)))
-        .order_by(Profile.average_rating.desc(), Profile.full_name.asc())
-        .all()
+
+    q = filters.apply(db.query(Profile), current_user)
+    # Sort by rating (Top Voices)
+    page_q = (
+        q.options(*profile_service.profile_card_options())
+        .order_by(Profile.average_rating.desc(), Profile.full_name.asc(), Profile.id.asc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
     )
-    
-    result: List[ProfileResponse] = []
-    for p in items:
-        avg = (
-            db.query(func.coalesce(func.avg(Review.rating), 0.0))
-            .filter(Review.reviewee_id == p.user_id, Review.deleted_at.is_(None))
-            .scalar()
-            or 0.0
-        )
-        cnt = (
-            db.query(func.count(Review.id))
-            .filter(Review.reviewee_id == p.user_id, Review.deleted_at.is_(None))
-            .scalar()
-            or 0
-        )
-        pr = ProfileResponse.model_validate({
-            "id": p.id,
-            "user_id": p.user_id,
-            "full_name": p.full_name,
-            "bio": p.bio,
-            "title": p.title,
-            "availability": p.availability,
-            "avatar_url": p.avatar_url,
-            "cover_url": p.cover_url,
-            "linkedin_url": p.linkedin_url,
-            "github_url": p.github_url,
-            "instagram_url": p.instagram_url,
-            "twitter_url": p.twitter_url,
-            "website_url": p.website_url,
-            "visibility": p.visibility,
-            "tags": p.tags,
-            "skills": p.skills,
-            "educations": p.educations,
-            "job_experiences": p.job_experiences,
-            "average_rating": float(avg),
-            "reviews_count": int(cnt),
-            
-            # Missing fields
-            "country": p.country,
-            "city": p.city,
-            "origin_country": p.origin_country,
-            "can_be_speaker": p.can_be_speaker,
-            "email": p.user.email if p.user else None,
-            "intents": p.intents,
-            "today_status": p.today_status,
-            "sponsor_tier": calculate_sponsor_tier(db, p.user_id),
-        })
-        result.append(pr)
-    return result
+    items, total = fetch_page(q, page_q, with_total)
+
+    profiles = profile_service.build_profile_responses(
+        db, items, email=lambda p: p.user.email if p.user else None
+    )
+    if with_total:
+        return {"items": profiles, "total": total}
+    return profiles
 
 @router.get("/discover/count")
 def discover_profiles_count(
-    name: str | None = "",
-    role: str | None = None,
-    skill: str | None = None,
-    tag_ids: List[uuid.UUID] | None = Query(None),
-    skill_ids: List[uuid.UUID] | None = Query(None),
+    filters: ProfileDiscoverFilters = Depends(),
     db: Session = Depends(get_db),
+    current_user: User | None = Depends(get_current_user_optional),
 ):
-    q = db.query(Profile)
-    if name:
-        q = q.filter(Profile.full_name.ilike(f"%{name}%"))
-        
-    q = q.join(User, User.id == Profile.user_id)
-
-    # Filter only active users
-    q = q.filter(User.status == UserStatus.active)
-    
-    # Exclude admins from public discovery
-    admin_subquery = select(user_roles.c.user_id).join(Role, Role.id == user_roles.c.role_id).where(Role.name == "admin")
-    q = q.filter(Profile.user_id.notin_(admin_subquery))
-
-    if role:
-        q = q.join(user_roles, user_roles.c.user_id == User.id)\
-             .join(Role, Role.id == user_roles.c.role_id)\
-             .filter(Role.name.ilike(f"%{role}%"))
-             
-    q = q.filter(Profile.visibility == ProfileVisibility.public)
-    
-    if tag_ids:
-        q = q.join(profile_tags, profile_tags.c.profile_id == Profile.id)
-        q = q.filter(profile_tags.c.tag_id.in_(tag_ids))
-    if skill_ids:
-        q = q.join(profile_skills, profile_skills.c.profile_id == Profile.id)
-        q = q.filter(profile_skills.c.skill_id.in_(skill_ids))
-        
-    if skill:
-         q = q.outerjoin(profile_skills, profile_skills.c.profile_id == Profile.id)\
-             .outerjoin(Skill, Skill.id == profile_skills.c.skill_id)\
-             .outerjoin(profile_tags, profile_tags.c.profile_id == Profile.id)\
-             .outerjoin(Tag, Tag.id == profile_tags.c.tag_id)\
-             .filter(or_(Skill.name.ilike(f"%{skill}%"), Tag.name.ilike(f"%{skill}%")))
-
-    # Use subquery to avoid JSON column issues with DISTINCT
-    subq = q.with_entities(Profile.id).distinct().subquery()
-    total = db.query(subq.c.id).count()
+    total = filters.apply(db.query(Profile.id), current_user).count()
     return {"total_count": total}
 
 @router.get("/semantic-search", response_model=List[ProfileResponse])
@@ -287,57 +193,30 @@ def semantic_search_profiles(
 
     print("DEBUG: semantic_search_profiles called")
     user_ids: list[uuid.UUID] = []
-    import json
-    import math
 
     dists = {} # Initialize dists
+    vec = None
     if embedding:
-        # ... existing embedding logic ...
-        pass
+        vec = parse_pg_vector(embedding)
     elif q_text:
+        vec = generate_text_embedding(q_text)
+
+    if vec is not None and len(vec) > 0:
         try:
-            vec = generate_text_embedding(q_text)
-            if vec:
-                emb_str = _vec_to_pg(vec)
-                logger.info(f"DEBUG: Semantic search for '{q_text}'")
-                
-                # MANUAL VECTOR SEARCH (Python-side)
-                # Fetch all embeddings
-                all_rows = db.execute(text("SELECT user_id, CAST(embedding AS text) FROM expert_embeddings")).fetchall()
-                
-                candidates = []
-                for uid, db_emb_str in all_rows:
-                    if not db_emb_str:
-                        continue
-                    try:
-                        # Parse DB vector (string "[0.1, ...]")
-                        db_vec = json.loads(db_emb_str)
-                        
-                        # Calculate Euclidean Distance (L2) to match <-> operator
-                        # dist = sqrt(sum((a-b)^2))
-                        dist = math.sqrt(sum((a - b) ** 2 for a, b in zip(vec, db_vec)))
-                        
-                        candidates.append((uid, dist))
-                    except Exception:
-                        pass
-                
-                # Sort by distance (ascending)
-                candidates.sort(key=lambda x: x[1])
-                
-                # Take top_k
-                top_candidates = candidates[:top_k]
-                
-                # Filter by threshold (e.g. 1.1)
-                # 1.05-1.06 is typical for relevant queries
-                # 1.2 is irrelevant
-                threshold = 1.1
-                final_candidates = [c for c in top_candidates if c[1] < threshold]
-                
-                user_ids = [c[0] for c in final_candidates]
-                dists = {c[0]: c[1] for c in final_candidates}
-                
-                logger.info(f"DEBUG: Found {len(user_ids)} users via semantic search")
-                
+            logger.info(f"DEBUG: Semantic search for '{q_text}' using '{expert_index.name}' index")
+            top_candidates = expert_index.search(db, vec, top_k)
+
+            # Filter by threshold (e.g. 1.1)
+            # 1.05-1.06 is typical for relevant queries
+            # 1.2 is irrelevant
+            threshold = 1.1
+            final_candidates = [c for c in top_candidates if c[1] < threshold]
+
+            user_ids = [c[0] for c in final_candidates]
+            dists = {c[0]: c[1] for c in final_candidates}
+
+            logger.info(f"DEBUG: Found {len(user_ids)} users via semantic search")
+
         except Exception as e:
             logger.error(f"DEBUG: Semantic search error: {e}")
             db.rollback()
@@ -360,6 +239,8 @@ def semantic_search_profiles(
     
     profiles_q = profiles_q.filter(Profile.visibility == ProfileVisibility.public)
     
+    profiles_q = profiles_q.options(*profile_service.profile_card_options())
+
     if user_ids:
         # If we have vector matches, filter by them
         items = profiles_q.filter(Profile.user_id.in_(user_ids)).all()
@@ -461,117 +342,33 @@ def semantic_search_profiles(
                     logger.error(f"DEBUG: Global LLM Reranking Error: {e}")
             else:
                 logger.warning("DEBUG: Skipping LLM Reranking (No API Key)")
-        
-        result: List[ProfileResponse] = []
-        from app.models.review_model import Review
-        for p in items[:top_k]:
-            avg = (
-                db.query(func.coalesce(func.avg(Review.rating), 0.0))
-                .filter(Review.reviewee_id == p.user_id, Review.deleted_at.is_(None))
-                .scalar()
-                or 0.0
-            )
-            cnt = (
-                db.query(func.count(Review.id))
-                .filter(Review.reviewee_id == p.user_id, Review.deleted_at.is_(None))
-                .scalar()
-                or 0
+
+        items = items[:top_k]
+        if q_text and len(items) < top_k:
+            # Experts onboarded or edited since their last embedding are matched by text until their job runs
+            predicate, rank = text_search(db, q_text, PROFILE_SEARCH)
+            items += (
+                profiles_q.filter(
+                    predicate,
+                    awaiting_embedding("experts", Profile.user_id),
+                    Profile.user_id.notin_([p.user_id for p in items]),
+                )
+                .order_by(rank.desc())
+                .limit(top_k - len(items))
+                .all()
             )
-            pr = ProfileResponse.model_validate({
-                "id": p.id,
-                "user_id": p.user_id,
-                "full_name": p.full_name,
-                "bio": p.bio,
-                "title": p.title,
-                "availability": p.availability,
-                "avatar_url": p.avatar_url,
-                "cover_url": p.cover_url,
-                "linkedin_url": p.linkedin_url,
-                "github_url": p.github_url,
-                "instagram_url": p.instagram_url,
-                "twitter_url": p.twitter_url,
-                "website_url": p.website_url,
-                "visibility": p.visibility,
-                "can_be_speaker": p.can_be_speaker,
-                "tags": p.tags,
-                "skills": p.skills,
-                "educations": p.educations,
-                "job_experiences": p.job_experiences,
-                "average_rating": float(avg),
-                "reviews_count": int(cnt),
-                
-                # Missing fields
-                "country": p.country,
-                "city": p.city,
-                "origin_country": p.origin_country,
-                "can_be_speaker": p.can_be_speaker,
-                "intents": p.intents,
-                "today_status": p.today_status,
-                "distance": dists.get(p.user_id) if dists else None,
-                "sponsor_tier": calculate_sponsor_tier(db, p.user_id),
-            })
-            result.append(pr)
-        return result
+        
+        return profile_service.build_profile_responses(
+            db, items, distance=lambda p: dists.get(p.user_id) if dists else None
+        )
     
     elif q_text:
-        # Fallback to ILIKE if no embeddings found or not using embeddings
-        profiles_q = profiles_q.filter(or_(
-            Profile.full_name.ilike(f"%{q_text}%"),
-            Profile.title.ilike(f"%{q_text}%"),
-            Profile.bio.ilike(f"%{q_text}%"),
-            Profile.availability.ilike(f"%{q_text}%")
-        ))
+        # Fallback to ranked text search if no embeddings found or not using embeddings
+        predicate, rank = text_search(db, q_text, PROFILE_SEARCH)
+        profiles_q = profiles_q.filter(predicate).order_by(rank.desc())
     
     profiles = profiles_q.limit(top_k).all()
-    result: List[ProfileResponse] = []
-    from app.models.review_model import Review
-    for p in profiles:
-        avg = (
-            db.query(func.coalesce(func.avg(Review.rating), 0.0))
-            .filter(Review.reviewee_id == p.user_id, Review.deleted_at.is_(None))
-            .scalar()
-            or 0.0
-        )
-        cnt = (
-            db.query(func.count(Review.id))
-            .filter(Review.reviewee_id == p.user_id, Review.deleted_at.is_(None))
-            .scalar()
-            or 0
-        )
-        pr = ProfileResponse.model_validate({
-            "id": p.id,
-            "user_id": p.user_id,
-            "full_name": p.full_name,
-            "bio": p.bio,
-            "title": p.title,
-            "availability": p.availability,
-            "avatar_url": p.avatar_url,
-            "cover_url": p.cover_url,
-            "linkedin_url": p.linkedin_url,
-            "github_url": p.github_url,
-            "instagram_url": p.instagram_url,
-            "twitter_url": p.twitter_url,
-            "website_url": p.website_url,
-            "visibility": p.visibility,
-            "can_be_speaker": p.can_be_speaker,
-            "tags": p.tags,
-            "skills": p.skills,
-            "educations": p.educations,
-            "job_experiences": p.job_experiences,
-            "average_rating": float(avg),
-            "reviews_count": int(cnt),
-            
-            # Missing fields
-            "country": p.country,
-            "city": p.city,
-            "origin_country": p.origin_country,
-            "can_be_speaker": p.can_be_speaker,
-            "intents": p.intents,
-            "today_status": p.today_status,
-            "sponsor_tier": calculate_sponsor_tier(db, p.user_id),
-        })
-        result.append(pr)
-    return result
+    return profile_service.build_profile_responses(db, profiles)
 
 @router.get("/semantic/profiles", response_model=List[ProfileResponse])
 def semantic_search_profiles_alias(
@@ -602,7 +399,7 @@ def search_profiles(
         q = q.join(User, User.id == Profile.user_id).filter(sa_func.lower(User.email).like(f"%{email.lower()}%"))
     
     if name:
-        q = q.filter(Profile.full_name.ilike(f"%{name}%"))
+        q = q.filter(text_search(db, name, PROFILE_SEARCH)[0])
 
     if skill:
         q = q.outerjoin(profile_skills, profile_skills.c.profile_id == Profile.id)\
@@ -672,24 +469,9 @@ def complete_onboarding(onboarding_data: OnboardingUpdate, db: Session = Depends
 
     # --- AI Embedding Logic (Merged) ---
     # Only create embeddings when the selected role is 'expert'
+    # Queued in this transaction; the embedding job queue embeds it and updates the vector index
     if desired_role == 'expert':
-        try:
-            from app.services.ai_service import generate_text_embedding, _vec_to_pg
-            src = f"{db_profile.full_name}\n{db_profile.bio or ''}\navailability:{db_profile.availability or ''}"
-            vec = generate_text_embedding(src)
-            if vec:
-                emb = _vec_to_pg(vec)
-                up = text(
-                    """
-                    INSERT INTO expert_embeddings(user_id, embedding, source_text)
-                    VALUES (:uid, CAST(:emb AS vector), :src)
-                    ON CONFLICT (user_id) DO UPDATE SET embedding = EXCLUDED.embedding, source_text = EXCLUDED.source_text
-                    """
-                )
-                db.execute(up, {"uid": current_user.id, "emb": emb, "src": src})
-        except Exception as e:
-            print(f"Embedding failed: {e}")
-            db.rollback()
+        enqueue_expert(db, db_profile)
     # -----------------------------------------------
 
     # --- Welcome Notification ---
@@ -719,15 +501,14 @@ def complete_onboarding(onboarding_data: OnboardingUpdate, db: Session = Depends
             .filter(func.lower(Role.name) == func.lower("admin"))
             .all()
         )
-        for admin in admin_users:
-            db.add(Notification(
-                recipient_id=admin.id,
-                actor_id=current_user.id,
-                type=NotificationType.system,
-                content=f"{desired_role.capitalize()} verification requested by {current_user.email}",
-                link_url=f"/admin/users/{current_user.id}"
-            ))
-        db.commit() # Commit admin notifications and role
+        # Commit admin notifications and role, then publish them in one batch
+        NotificationService.create_notifications_bulk(db, NotificationService.rows_for(
+            [admin.id for admin in admin_users],
+            actor_id=current_user.id,
+            type=NotificationType.system,
+            content=f"{desired_role.capitalize()} verification requested by {current_user.email}",
+            link_url=f"/admin/users/{current_user.id}",
+        ))
     else:
         user_service.assign_role_to_user(db, user=current_user, role_name=desired_role)
         
@@ -778,13 +559,8 @@ def read_my_profile(db: Session = Depends(get_db), current_user: User = Depends(
     # Manually attach email since not in Profile model
     setattr(db_profile, "email", current_user.email)
     
-    # Calculate counts
-    followers = db.query(func.count(Follow.id)).filter(Follow.followee_id == current_user.id).scalar()
-    following = db.query(func.count(Follow.id)).filter(Follow.follower_id == current_user.id).scalar()
-    
-    setattr(db_profile, "followers_count", followers)
-    setattr(db_profile, "following_count", following)
-    setattr(db_profile, "sponsor_tier", calculate_sponsor_tier(db, current_user.id))
+    # Review, follow and sponsor aggregates
+    profile_service.attach_profile_stats(db, db_profile)
     
     return db_profile
 
@@ -805,13 +581,8 @@ def read_profile(user_id: uuid.UUID, db: Session = Depends(get_db), current_user
     if db_profile.user:
         setattr(db_profile, "email", db_profile.user.email)
         
-    # Calculate counts
-    followers = db.query(func.count(Follow.id)).filter(Follow.followee_id == user_id).scalar()
-    following = db.query(func.count(Follow.id)).filter(Follow.follower_id == user_id).scalar()
-    
-    setattr(db_profile, "followers_count", followers)
-    setattr(db_profile, "following_count", following)
-    setattr(db_profile, "sponsor_tier", calculate_sponsor_tier(db, user_id))
+    # Review, follow and sponsor aggregates
+    profile_service.attach_profile_stats(db, db_profile)
         
     return db_profile
 
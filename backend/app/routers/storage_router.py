@@ -0,0 +1,20 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from app.services import storage_service
+
+router = APIRouter()
+
+
+@router.put("/storage/uploads/{token}")
+async def receive_direct_upload(token: str, request: Request):
+    """
+    Target of client-direct uploads signed by the local storage backend
+    (development and tests). The raw request body is streamed to disk and
+    rejected as soon as it exceeds the signed folder's size limit.
+    """
+    storage = storage_service.storage
+    if not isinstance(storage, storage_service.LocalStorage):
+        raise HTTPException(status_code=404, detail="Direct uploads go to the storage provider")
+    folder = storage.verify_upload_token(token)
+    url = await storage.receive(folder, request.stream(), request.headers.get("content-type"))
+    return {"url": url}
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.orm import Session, selectinload
 import uuid
 from sqlalchemy.sql import func
 from app.database.database import get_db
@@ -12,6 +12,7 @@ from app.services.user_service import (
     remove_role_from_user,
 )
 from app.services.audit_service import log_admin_action
+from app.core.pagination import fetch_page, paginate, set_next_cursor
 
 router = APIRouter()
 
@@ -115,44 +116,55 @@ def update_user(
         "roles": [r.name for r in getattr(u, "roles", [])],
     }
 
+class UserFilters:
+    """Filters shared by GET /users and GET /users/search/count"""
+
+    def __init__(
+        self,
+        email: str | None = None,
+        status: UserStatus | None = None,
+        is_verified: bool | None = None,
+        name: str | None = None,
+        role: str | None = None,
+    ):
+        self.email = email
+        self.status = status
+        self.is_verified = is_verified
+        self.name = name
+        self.role = role
+
+    def apply(self, q):
+        if self.email:
+            q = q.filter(func.lower(User.email).like(f"%{self.email.lower()}%"))
+        if self.status is not None:
+            q = q.filter(User.status == self.status)
+        if self.is_verified is not None:
+            q = q.filter(User.is_verified == self.is_verified)
+        if self.name:
+            q = q.filter(User.profile.has(func.lower(Profile.full_name).like(f"%{self.name.lower()}%")))
+        # Role filtering (EXISTS, so users are never duplicated)
+        if self.role:
+            q = q.filter(User.roles.any(Role.name == self.role))
+        return q
+
+
 @router.get("")
 def list_users(
-    email: str | None = None,
-    status: UserStatus | None = None,
-    is_verified: bool | None = None,
-    name: str | None = None,
-    role: str | None = None,
+    response: Response,
+    filters: UserFilters = Depends(),
     page: int = 1,
     page_size: int = 20,
+    cursor: str | None = None,
+    with_total: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(["admin", "customer_support"]))
 ):
-    q = db.query(User).options(joinedload(User.profile))
-    if email:
-        q = q.filter(func.lower(User.email).like(f"%{email.lower()}%"))
-    if status is not None:
-        q = q.filter(User.status == status)
-    if is_verified is not None:
-        q = q.filter(User.is_verified == is_verified)
-    
-    if name:
-        q = q.join(Profile, Profile.user_id == User.id).filter(func.lower(Profile.full_name).like(f"%{name.lower()}%"))
-    
-    # Role filtering
-    if role:
-        q = q.join(User.roles).filter(Role.name == role)
-    
-    if page < 1:
-        page = 1
-    if page_size < 1:
-        page_size = 20
-    items = (
-        q.order_by(User.created_at.desc() if hasattr(User, "created_at") else User.email.asc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
-    return [
+    q = filters.apply(db.query(User))
+    page_q, page_size = paginate(q, User.created_at, User.id, cursor, page, page_size, descending=True)
+    page_q = page_q.options(selectinload(User.profile), selectinload(User.roles))
+    items, total = fetch_page(q, page_q, with_total, cursor)
+    set_next_cursor(response, items, page_size, lambda u: (u.created_at, u.id))
+    users = [
         {
             "id": str(u.id),
             "email": u.email,
@@ -164,33 +176,18 @@ def list_users(
         }
         for u in items
     ]
+    if with_total:
+        return {"items": users, "total": total}
+    return users
 
 
 @router.get("/search/count")
 def count_users(
-    email: str | None = None,
-    status: UserStatus | None = None,
-    is_verified: bool | None = None,
-    name: str | None = None,
-    role: str | None = None,
+    filters: UserFilters = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(["admin", "customer_support"]))
 ):
-    q = db.query(User)
-    if email:
-        q = q.filter(func.lower(User.email).like(f"%{email.lower()}%"))
-    if status is not None:
-        q = q.filter(User.status == status)
-    if is_verified is not None:
-        q = q.filter(User.is_verified == is_verified)
-    if name:
-        q = q.join(Profile, Profile.user_id == User.id).filter(func.lower(Profile.full_name).like(f"%{name.lower()}%"))
-    
-    # Role filtering
-    if role:
-        q = q.join(User.roles).filter(Role.name == role)
-    
-    total = q.with_entities(User.id).distinct().count()
+    total = filters.apply(db.query(User.id)).count()
     return {"total_count": total}
 
 
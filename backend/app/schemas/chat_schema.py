@@ -32,6 +32,7 @@ class ParticipantResponse(BaseModel):
     user_id: uuid.UUID
     full_name: Optional[str] = None
     avatar_url: Optional[str] = None
+    avatar_variants: Optional[dict[str, str]] = None
     last_read_at: Optional[datetime] = None
 
     class Config:
@@ -48,6 +49,7 @@ class ConversationResponse(BaseModel):
     updated_at: datetime
     participants: List[ParticipantResponse]
     last_message: Optional[MessageResponse] = None
+    last_message_at: Optional[datetime] = None
     unread_count: int = 0
     
     class Config:
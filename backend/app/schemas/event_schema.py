@@ -141,6 +141,9 @@ class EventDetails(BaseModel):
     description: str | None = None
     logo_url: str | None = None
     cover_url: str | None = None
+    # Resized WebP copies keyed by size in px, e.g. {"64": url, "128": url}
+    logo_variants: dict[str, str] | None = None
+    cover_variants: dict[str, str] | None = None
     meeting_url: str | None = None
     payment_qr_url: str | None = None
     format: EventFormat
@@ -428,6 +431,7 @@ class MyEventItem(BaseModel):
     my_role: EventParticipantRole | None = None
     my_status: EventParticipantStatus | None = None
     cover_url: str | None = None
+    cover_variants: dict[str, str] | None = None
     venue_remark: str | None = None
     format: EventFormat
     participant_count: int = 0
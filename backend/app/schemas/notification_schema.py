@@ -17,3 +17,19 @@ class NotificationResponse(BaseModel):
 
 class NotificationReadAllResponse(BaseModel):
     updated_count: int
+
+class NotificationBroadcastResponse(BaseModel):
+    id: uuid.UUID
+    title: str
+    status: str
+    total: int
+    sent: int
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class NotificationBroadcastQueuedResponse(NotificationBroadcastResponse):
+    count: int # recipients, as returned before broadcasts ran in the background
@@ -35,11 +35,15 @@ class OrganizationOwner(BaseModel):
     email: str
     full_name: Optional[str] = None
     avatar_url: Optional[str] = None
+    avatar_variants: Optional[dict[str, str]] = None
     model_config = ConfigDict(from_attributes=True)
 
 class OrganizationResponse(OrganizationBase):
     id: UUID
     owner_id: UUID
+    # Resized WebP copies keyed by size in px, e.g. {"64": url, "128": url}
+    logo_variants: Optional[dict[str, str]] = None
+    cover_variants: Optional[dict[str, str]] = None
     owner: Optional[OrganizationOwner] = None
     status: OrganizationStatus
     bank_details: Optional[dict] = None
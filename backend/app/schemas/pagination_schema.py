@@ -0,0 +1,12 @@
+from typing import Generic, List, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """List response with the total row count (`with_total=true`)"""
+
+    items: List[T]
+    total: int
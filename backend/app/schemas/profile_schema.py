@@ -91,6 +91,9 @@ class ProfileUpdate(BaseModel):
 class ProfileResponse(ProfileBase):
     id: uuid.UUID
     user_id: uuid.UUID
+    # Resized WebP copies keyed by size in px, e.g. {"64": url, "128": url}
+    avatar_variants: Optional[dict[str, str]] = None
+    cover_variants: Optional[dict[str, str]] = None
     tags: List[TagResponse] = []
     skills: List[SkillResponse] = []
     educations: List[EducationResponse] = []
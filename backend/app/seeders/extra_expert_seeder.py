@@ -13,7 +13,7 @@ from app.models.user_model import User, Role, UserStatus
 from app.models.profile_model import Profile, ProfileVisibility, Tag
 from app.models.review_model import Review
 from app.core.security import get_password_hash
-from app.services.ai_service import upsert_expert_embedding
+from app.services.embedding_pipeline import embed_rows, expert_source_text
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -79,6 +79,7 @@ def seed_extra_experts():
             }
         ]
 
+        experts = []
         for data in experts_data:
             user = db.query(User).filter(User.email == data["email"]).first()
             if not user:
@@ -132,11 +133,8 @@ def seed_extra_experts():
 
                 db.commit() # Commit to save all relation changes
 
-                # Generate/Upsert Embedding (After commit so relations exist if needed, but we pass source_text manually)
-                source_text = f"{data['name']} {data['title']} {data['bio']} {' '.join(data['tags'])}"
-                upsert_expert_embedding(db, user.id, source_text)
-                
-                logger.info(f"Created expert {data['name']} with tags and embedding.")
+                experts.append((user.id, expert_source_text(profile.full_name, profile.bio, profile.availability)))
+                logger.info(f"Created expert {data['name']} with tags.")
             else:
                 profile = db.query(Profile).filter(Profile.user_id == user.id).first()
                 if not profile:
@@ -195,11 +193,13 @@ def seed_extra_experts():
                     )
                     db.add(review)
                 db.commit()
-                source_text = f"{data['name']} {data['title']} {data['bio']} {' '.join(data['tags'])}"
-                upsert_expert_embedding(db, user.id, source_text)
-                logger.info(f"Updated expert {data['email']} profile and embedding.")
+                experts.append((user.id, expert_source_text(profile.full_name, profile.bio, profile.availability)))
+                logger.info(f"Updated expert {data['email']} profile.")
 
-        logger.info("Extra experts seeded successfully.")
+        # One batch call and one multi-row upsert for all experts
+        embedded = embed_rows(db, "experts", experts)
+        db.commit()
+        logger.info(f"Extra experts seeded successfully ({embedded} of {len(experts)} embedded).")
 
     except Exception as e:
         logger.error(f"Error seeding extra experts: {e}")
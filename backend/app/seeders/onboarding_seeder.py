@@ -3,13 +3,12 @@ from dotenv import load_dotenv
 load_dotenv()
 import random
 from sqlalchemy.orm import Session
-from sqlalchemy import text
 from fastapi.encoders import jsonable_encoder
 from app.database.database import SessionLocal
 from app.models.user_model import User
 from app.models.profile_model import Profile
 from app.models.onboarding_model import UserOnboarding, OnboardingStatus
-from app.services.ai_service import generate_text_embedding, _vec_to_pg
+from app.services.embedding_pipeline import embed_rows, expert_source_text
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -83,6 +82,7 @@ def seed_onboarding():
             }
         }
 
+        experts = []
         for email, data in onboarding_data.items():
             user = db.query(User).filter(User.email == email).first()
             if user and user.profile:
@@ -130,28 +130,21 @@ def seed_onboarding():
                 
                 logger.info(f"Updated UserOnboarding record for {email}")
 
-                # 3. Generate Embeddings (Only for Experts)
+                # 3. Collect Embedding Source (Only for Experts)
                 if data.get("role") == "expert":
-                    try:
-                        src = f"{profile.full_name}\n{profile.bio or ''}\navailability:{profile.availability or ''}"
-                        vec = generate_text_embedding(src)
-                        if vec:
-                            emb = _vec_to_pg(vec)
-                            up = text(
-                                """
-                                INSERT INTO expert_embeddings(user_id, embedding, source_text)
-                                VALUES (:uid, CAST(:emb AS vector), :src)
-                                ON CONFLICT (user_id) DO UPDATE SET embedding = EXCLUDED.embedding, source_text = EXCLUDED.source_text
-                                """
-                            )
-                            db.execute(up, {"uid": user.id, "emb": emb, "src": src})
-                            logger.info(f"Generated expert embedding for {email}")
-                    except Exception as e:
-                        logger.error(f"Failed to generate embedding for {email}: {e}")
+                    experts.append((user.id, expert_source_text(profile.full_name, profile.bio, profile.availability)))
 
             else:
                 logger.warning(f"User or profile not found for {email}")
 
+        # One batch call and one multi-row upsert for all experts
+        try:
+            with db.begin_nested():
+                embedded = embed_rows(db, "experts", experts)
+            logger.info(f"Generated {embedded} of {len(experts)} expert embeddings")
+        except Exception as e:
+            logger.error(f"Failed to generate expert embeddings: {e}")
+
         db.commit()
         logger.info("Onboarding seeding (full flow) completed successfully.")
 
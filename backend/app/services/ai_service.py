@@ -1,8 +1,13 @@
 import os
 import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 import requests
 
+logger = logging.getLogger(__name__)
+
 # Trigger reload for new dependency
 
 
@@ -48,6 +53,23 @@ def _stub_generate(event: Dict[str, Any], expert: Optional[Dict[str, Any]], opti
 
 
 from app.core.config import settings
+from app.services.embedding_cache import DOCUMENT_TASK, QUERY_TASK, embedding_cache, normalize_text
+
+_gemini_configured_key: str | None = None
+
+
+def _gemini():
+    """The google.generativeai module, configured once per API key; None without a key"""
+    global _gemini_configured_key
+    import google.generativeai as genai
+    api_key = settings.GEMINI_API_KEY
+    if not api_key:
+        return None
+    if _gemini_configured_key != api_key:
+        genai.configure(api_key=api_key)
+        _gemini_configured_key = api_key
+    return genai
+
 
 def generate_proposal(event: Dict[str, Any], expert: Optional[Dict[str, Any]], options: Dict[str, Any]) -> Dict[str, Any]:
     # TESTING path or missing provider => stub
@@ -137,12 +159,10 @@ def generate_proposal(event: Dict[str, Any], expert: Optional[Dict[str, Any]], o
             return _stub_generate(event, expert, options)
 
     if provider == "gemini":
-        import google.generativeai as genai
-        api_key = settings.GEMINI_API_KEY
-        if not api_key:
+        genai = _gemini()
+        if genai is None:
             return _stub_generate(event, expert, options)
-        
-        genai.configure(api_key=api_key)
+
         # Use gemini-flash-latest (the ONLY model that works with google.generativeai)
         model_name = "gemini-flash-latest"
         gemini_model = genai.GenerativeModel(model_name)
@@ -184,16 +204,14 @@ def generate_simple_content(prompt: str) -> str:
     
     if provider == "gemini":
         try:
-            import google.generativeai as genai
+            genai = _gemini()
         except ImportError:
             return "Error: google.generativeai not installed"
-            
-        api_key = settings.GEMINI_API_KEY
-        if not api_key:
+
+        if genai is None:
             return "Error: No API Key"
         
         try:
-            genai.configure(api_key=api_key)
             # Use gemini-flash-latest (same as semantic search - this is the ONLY model that works)
             model_name = "gemini-flash-latest"
             model = genai.GenerativeModel(model_name)
@@ -206,10 +224,31 @@ def generate_simple_content(prompt: str) -> str:
     # Fallback to stub if not gemini (for now)
     return "AI generation only supported for Gemini currently."
 
+def _embedding_model(provider: str) -> str:
+    if provider == "ollama":
+        return settings.AI_MODEL or "nomic-embed-text"
+    if provider == "gemini":
+        return "text-embedding-004"
+    return "nomic-embed-text"
+
+
 def generate_text_embedding(query: str, is_document: bool = False) -> Optional[list[float]]:
+    """Embedding of `query`, served from the embedding cache when possible"""
     provider = settings.AI_PROVIDER.lower()
+    task = DOCUMENT_TASK if is_document else QUERY_TASK
+    return embedding_cache.get_or_compute(
+        provider,
+        _embedding_model(provider),
+        task,
+        query,
+        lambda text: _request_embedding(provider, text, task),
+    )
+
+
+def _request_embedding(provider: str, query: str, task: str, raise_rate_limit: bool = False) -> Optional[list[float]]:
     if os.getenv("TESTING") == "1":
         return [0.0] * 768
+    model = _embedding_model(provider)
     try:
         if provider == "groq":
             url = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/embeddings")
@@ -217,27 +256,26 @@ def generate_text_embedding(query: str, is_document: bool = False) -> Optional[l
                 "Authorization": f"Bearer {settings.GROQ_API_KEY}",
                 "Content-Type": "application/json",
             }
-            body = {"model": "nomic-embed-text", "input": query}
+            body = {"model": model, "input": query}
             r = requests.post(url, headers=headers, json=body, timeout=10)
+            _raise_for_rate_limit(r)
             r.raise_for_status()
             data = r.json()
             return data["data"][0]["embedding"]
         elif provider == "ollama":
             url = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/embeddings")
-            body = {"model": settings.AI_MODEL or "nomic-embed-text", "prompt": query}
+            body = {"model": model, "prompt": query}
             r = requests.post(url, json=body, timeout=10)
+            _raise_for_rate_limit(r)
             r.raise_for_status()
             data = r.json()
             return data.get("embedding")
         elif provider == "gemini":
-            import google.generativeai as genai
-            api_key = settings.GEMINI_API_KEY
-            if not api_key:
+            genai = _gemini()
+            if genai is None:
                 return None
-            genai.configure(api_key=api_key)
             try:
-                task = "retrieval_document" if is_document else "retrieval_query"
-                res = genai.embed_content(model="text-embedding-004", content=query, task_type=task)
+                res = genai.embed_content(model=model, content=query, task_type=task)
                 # SDK may return dict-like with 'embedding' or object with .embedding.values
                 if isinstance(res, dict):
                     emb = res.get("embedding")
@@ -253,14 +291,110 @@ def generate_text_embedding(query: str, is_document: bool = False) -> Optional[l
                     return vals
                 return None
             except Exception as e:
-                print(f"DEBUG: Gemini embedding error: {e}")
+                if raise_rate_limit and (type(e).__name__ == "ResourceExhausted" or "429" in str(e)):
+                    raise EmbeddingRateLimited()
+                logger.error(f"Gemini embedding error: {e}")
                 return None
+    except EmbeddingRateLimited:
+        if raise_rate_limit:
+            raise
+        logger.warning("Embedding error: rate limited")
+        return None
     except Exception as e:
-        print(f"DEBUG: Embedding error: {e}")
+        logger.error(f"Embedding error: {e}")
         return None
     return None
 
 
+class EmbeddingRateLimited(Exception):
+    """The provider answered 429 / quota exhausted"""
+
+    def __init__(self, retry_after: float | None = None):
+        super().__init__(f"rate limited (retry after {retry_after}s)")
+        self.retry_after = retry_after
+
+
+def _raise_for_rate_limit(r: requests.Response) -> None:
+    if r.status_code == 429:
+        retry_after = r.headers.get("Retry-After")
+        raise EmbeddingRateLimited(float(retry_after) if retry_after and retry_after.isdigit() else None)
+
+
+def _with_backoff(call, retries: int):
+    """Run `call`, sleeping and retrying while the provider rate-limits us"""
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except EmbeddingRateLimited as e:
+            if attempt == retries:
+                raise
+            delay = e.retry_after or min(2 ** attempt, 60)
+            logger.warning(f"Embedding provider rate limited, retrying in {delay}s")
+            time.sleep(delay)
+        except Exception as e:
+            # google.api_core.exceptions.ResourceExhausted and similar SDK errors
+            if attempt == retries or (type(e).__name__ != "ResourceExhausted" and "429" not in str(e)):
+                raise
+            time.sleep(min(2 ** attempt, 60))
+
+
+def generate_text_embeddings(texts: list[str], is_document: bool = True) -> list[Optional[list[float]]]:
+    """Embeddings for many texts using the provider's batch API where it has one.
+
+    Bypasses the embedding cache (bulk source texts rarely repeat). Returns one
+    entry per input, None where embedding failed. Rate limits are retried with
+    backoff up to EMBEDDING_MAX_RETRIES times.
+    """
+    if not texts:
+        return []
+    provider = settings.AI_PROVIDER.lower()
+    task = DOCUMENT_TASK if is_document else QUERY_TASK
+    inputs = [normalize_text(t, task) for t in texts]
+    if os.getenv("TESTING") == "1":
+        return [[0.0] * 768 for _ in inputs]
+    model = _embedding_model(provider)
+    retries = settings.EMBEDDING_MAX_RETRIES
+    try:
+        if provider == "groq":
+            def call():
+                r = requests.post(
+                    os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/embeddings"),
+                    headers={"Authorization": f"Bearer {settings.GROQ_API_KEY}", "Content-Type": "application/json"},
+                    json={"model": model, "input": inputs},
+                    timeout=30,
+                )
+                _raise_for_rate_limit(r)
+                r.raise_for_status()
+                return r.json()["data"]
+            data = _with_backoff(call, retries)
+            out: list[Optional[list[float]]] = [None] * len(inputs)
+            for i, item in enumerate(data):
+                out[item.get("index", i)] = item.get("embedding")
+            return out
+        elif provider == "gemini":
+            genai = _gemini()
+            if genai is None:
+                return [None] * len(inputs)
+            res = _with_backoff(lambda: genai.embed_content(model=model, content=inputs, task_type=task), retries)
+            emb = res.get("embedding") if isinstance(res, dict) else getattr(res, "embedding", None)
+            if isinstance(emb, list) and len(emb) == len(inputs):
+                return [list(e) if e else None for e in emb]
+            return [None] * len(inputs)
+        else:
+            # No batch endpoint: a bounded pool of single requests, each failing on its own
+            def one(text: str) -> Optional[list[float]]:
+                try:
+                    return _with_backoff(lambda: _request_embedding(provider, text, task, raise_rate_limit=True), retries)
+                except Exception as e:
+                    logger.error(f"Embedding request failed: {e}")
+                    return None
+            with ThreadPoolExecutor(max_workers=max(1, settings.EMBEDDING_BATCH_CONCURRENCY)) as pool:
+                return list(pool.map(one, inputs))
+    except Exception as e:
+        logger.error(f"Batch embedding error: {e}")
+        return [None] * len(inputs)
+
+
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import uuid
@@ -286,6 +420,9 @@ def upsert_expert_embedding(db: Session, user_id: uuid.UUID, source_text: str) -
             """
         )
         db.execute(sql, {"uid": user_id, "emb": emb, "src": source_text})
+        # Searchable as soon as the caller commits
+        from app.services.vector_index import expert_index
+        expert_index.stage_upsert(db, user_id, vec)
         return True
     except Exception as e:
         print(f"Error upserting expert embedding: {e}")
@@ -316,13 +453,9 @@ def search_similar_experts(db: Session, query_text: str, top_k: int = 20) -> lis
         vec = generate_text_embedding(query_text)
         if not vec:
             return []
-            
-        emb = _vec_to_pg(vec)
-        sql = text(
-            "SELECT user_id FROM expert_embeddings ORDER BY embedding <-> CAST(:emb AS vector) LIMIT :k"
-        )
-        rows = db.execute(sql, {"emb": emb, "k": top_k}).fetchall()
-        return [r[0] for r in rows]
+
+        from app.services.vector_index import expert_index
+        return [uid for uid, _ in expert_index.search(db, vec, top_k)]
     except Exception as e:
         print(f"Error searching experts: {e}")
         return []
@@ -0,0 +1,162 @@
+"""
+Real-time delivery of built-in chat events over WebSocket.
+
+A client keeps one socket open (`/chat/ws`) and subscribes to the
+conversations it is showing. Events are published per conversation through
+the same pub/sub backend as SSE, on a channel of their own, so an event is
+published once and every worker hands it to the local sockets subscribed to
+that conversation.
+
+Events (`type`):
+- chat.message: a committed message (MessageResponse)
+- chat.typing:  a participant is typing; not stored, not echoed to the typist
+- chat.read:    a participant read the conversation (read receipt)
+
+Each socket has a bounded queue like an SSE stream; typing and read events
+coalesce per participant. Events arriving within CHAT_WS_BATCH_MS of each
+other go out together: every server frame is a JSON array of events.
+"""
+
+import asyncio
+import logging
+import uuid
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+from app.services.sse_manager import SSEConnection
+from app.services.sse_pubsub import NODE_ID, PubSubBackend, create_pubsub_backend
+
+logger = logging.getLogger(__name__)
+
+
+class ChatSocket(SSEConnection):
+    """Outbound queue of one WebSocket and the conversations it follows"""
+
+    def __init__(self, user_id: uuid.UUID, max_queue: int):
+        super().__init__(user_id, max_queue)
+        self.subscriptions: Set[uuid.UUID] = set()
+
+    async def next_batch(self, window: float, limit: int) -> list:
+        """Wait for one event, then add whatever else arrives within `window`"""
+        batch = [await self.get()]
+        if window > 0 and len(self) < limit - 1:
+            await asyncio.sleep(window)
+        batch.extend(self.take(limit - 1))
+        return batch
+
+
+def message_event(message: dict) -> dict:
+    return {"type": "chat.message", "conversation_id": message["conversation_id"], "message": message}
+
+
+def typing_event(conversation_id: uuid.UUID, user_id: uuid.UUID) -> dict:
+    return {
+        "type": "chat.typing",
+        "conversation_id": str(conversation_id),
+        "user_id": str(user_id),
+        "coalesce_key": f"typing:{conversation_id}:{user_id}",
+    }
+
+
+def read_event(conversation_id: uuid.UUID, user_id: uuid.UUID, read_at: str) -> dict:
+    return {
+        "type": "chat.read",
+        "conversation_id": str(conversation_id),
+        "user_id": str(user_id),
+        "read_at": read_at,
+        "coalesce_key": f"read:{conversation_id}:{user_id}",
+    }
+
+
+class ChatHub:
+    """WebSocket subscriptions of this process, fed by the chat pub/sub channel"""
+
+    def __init__(self, backend: Optional[PubSubBackend] = None, max_queue: int | None = None):
+        # Maps conversation_id to the local sockets subscribed to it
+        self.subscribers: Dict[uuid.UUID, Set[ChatSocket]] = {}
+        self.sockets: Set[ChatSocket] = set()
+        self.backend = backend or create_pubsub_backend(settings.SSE_PUBSUB_BACKEND, channel="chat_events")
+        self.max_queue = max_queue or settings.SSE_MAX_QUEUE
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._closed_totals = {"delivered": 0, "dropped": 0, "coalesced": 0}
+
+    async def start(self):
+        """Subscribe to the pub/sub backend (idempotent; also done on first connect)"""
+        if self.backend.started:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if not self.backend.started:
+                await self.backend.start(self._deliver_local)
+                logger.info(f"Chat hub started on node {NODE_ID} with '{self.backend.name}' pub/sub")
+
+    async def stop(self):
+        await self.backend.stop()
+
+    async def connect(self, user_id: uuid.UUID) -> ChatSocket:
+        await self.start()
+        socket = ChatSocket(user_id, self.max_queue)
+        self.sockets.add(socket)
+        return socket
+
+    def disconnect(self, socket: ChatSocket):
+        if socket not in self.sockets:
+            return
+        for conversation_id in list(socket.subscriptions):
+            self.unsubscribe(socket, conversation_id)
+        self.sockets.discard(socket)
+        for key in self._closed_totals:
+            self._closed_totals[key] += getattr(socket, key)
+        if socket.dropped:
+            logger.warning(f"Chat socket {socket.id} for user {socket.user_id} dropped {socket.dropped} events")
+
+    def subscribe(self, socket: ChatSocket, conversation_id: uuid.UUID):
+        """Follow a conversation; the caller has checked that the user takes part"""
+        socket.subscriptions.add(conversation_id)
+        self.subscribers.setdefault(conversation_id, set()).add(socket)
+
+    def unsubscribe(self, socket: ChatSocket, conversation_id: uuid.UUID):
+        socket.subscriptions.discard(conversation_id)
+        sockets = self.subscribers.get(conversation_id)
+        if sockets is not None:
+            sockets.discard(socket)
+            if not sockets:
+                del self.subscribers[conversation_id]
+
+    def publish(self, conversation_id: uuid.UUID, payload: dict):
+        """Fan an event out to every worker; safe to call from sync code and threads"""
+        try:
+            self.backend.publish(conversation_id, payload)
+        except Exception as e:
+            logger.error(f"Error publishing chat event for conversation {conversation_id}: {e}")
+
+    async def publish_async(self, conversation_id: uuid.UUID, payload: dict):
+        """`publish` for async handlers: network backends publish from a thread"""
+        if self.backend.publish_blocks:
+            await asyncio.to_thread(self.publish, conversation_id, payload)
+        else:
+            self.publish(conversation_id, payload)
+
+    async def _deliver_local(self, conversation_id: uuid.UUID, payload: dict):
+        """Called by the backend for every published event"""
+        typist = payload.get("user_id") if payload.get("type") == "chat.typing" else None
+        for socket in list(self.subscribers.get(conversation_id, ())):
+            if typist is not None and str(socket.user_id) == typist:
+                continue
+            socket.offer(payload)
+
+    def stats(self) -> dict:
+        totals = {key: value + sum(getattr(s, key) for s in self.sockets) for key, value in self._closed_totals.items()}
+        return {
+            "node": NODE_ID,
+            "backend": self.backend.name,
+            "sockets": len(self.sockets),
+            "conversations": len(self.subscribers),
+            "queued": sum(len(s) for s in self.sockets),
+            **totals,
+        }
+
+
+# Global chat hub instance
+chat_hub = ChatHub()
@@ -0,0 +1,89 @@
+"""
+Conversation bookkeeping: canonical 1:1 chats and the inbox projection.
+
+Every pair of users has at most one direct conversation, found by its
+`participant_key`: a UUID derived from the sorted participant ids (md5, so the
+migration can compute it in SQL). It is unique-indexed, which makes
+"get or create" one indexed lookup, and concurrent creators (two bookings for
+the same expert, a double-clicked "Message" button) end up in the same row.
+Conversations started for a proposal or an event invitation with a proposal
+are separate threads and carry no key.
+
+The inbox reads a projection instead of scanning messages: the conversation's
+`last_message_id` / `last_message_at` and each participant's `unread_count`.
+Whatever stores a message calls `record_message` in the same transaction, and
+reading a conversation calls `mark_read` (whose time goes out as a read receipt,
+see app.services.chat_realtime).
+"""
+
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.chat_model import Conversation, ConversationParticipant, Message
+
+
+def participant_key(user_ids: Iterable[uuid.UUID]) -> uuid.UUID:
+    members = sorted({str(uid) for uid in user_ids})
+    return uuid.UUID(hashlib.md5(":".join(members).encode()).hexdigest())
+
+
+def get_or_create_direct_conversation(db: Session, user_id: uuid.UUID, other_user_id: uuid.UUID) -> uuid.UUID:
+    """Id of the 1:1 conversation of two users, created if needed; does not commit"""
+    key = participant_key((user_id, other_user_id))
+    conversation_id = db.execute(
+        insert(Conversation)
+        .values(id=uuid.uuid4(), participant_key=key)
+        .on_conflict_do_nothing(index_elements=[Conversation.participant_key])
+        .returning(Conversation.id)
+    ).scalar()
+    if conversation_id is None:
+        # Exists (a concurrent creator's row is visible once its transaction commits)
+        return db.execute(select(Conversation.id).where(Conversation.participant_key == key)).scalar_one()
+    db.execute(
+        insert(ConversationParticipant).values(
+            [{"conversation_id": conversation_id, "user_id": uid} for uid in {user_id, other_user_id}]
+        )
+    )
+    return conversation_id
+
+
+def record_message(db: Session, message: Message) -> None:
+    """Update the inbox projection for a newly added message; does not commit"""
+    db.flush()
+    # now() is the transaction start, i.e. the message's created_at; a
+    # transaction that started earlier but commits later does not win
+    db.execute(
+        update(Conversation)
+        .where(
+            Conversation.id == message.conversation_id,
+            or_(Conversation.last_message_at.is_(None), Conversation.last_message_at <= func.now()),
+        )
+        .values(last_message_id=message.id, last_message_at=func.now(), updated_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(ConversationParticipant)
+        .where(
+            ConversationParticipant.conversation_id == message.conversation_id,
+            ConversationParticipant.user_id != message.sender_id,
+        )
+        .values(unread_count=ConversationParticipant.unread_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def mark_read(db: Session, conversation_id: uuid.UUID, user_id: uuid.UUID) -> datetime | None:
+    """Reset the user's unread counter; returns the new last_read_at. Does not commit."""
+    return db.execute(
+        update(ConversationParticipant)
+        .where(ConversationParticipant.conversation_id == conversation_id, ConversationParticipant.user_id == user_id)
+        .values(last_read_at=func.now(), unread_count=0)
+        .returning(ConversationParticipant.last_read_at)
+        .execution_options(synchronize_session=False)
+    ).scalar()
@@ -0,0 +1,302 @@
+"""
+Outbound email outbox.
+
+Request handlers only insert PENDING `CommunicationLog` rows (see
+`email_service.enqueue_email`). `EmailOutboxWorker` drains them in the
+background:
+- rows are claimed with `FOR UPDATE SKIP LOCKED` and leased via
+  `next_attempt_at`, so several workers/processes never send the same row
+  and a crashed worker's rows become claimable again after the lease
+- claimed rows are sent in chunks of `transport.max_batch`
+- failures are retried with exponential backoff until EMAIL_MAX_ATTEMPTS,
+  then marked FAILED
+
+Transports:
+- resend: Resend API, batch endpoint for more than one message (one by one
+          when it rejects the batch)
+- smtp:   plain SMTP (e.g. a local MailHog/Mailpit)
+- file:   append messages as JSON lines to EMAIL_FILE_PATH (tests, local dev)
+"""
+
+import asyncio
+import json
+import logging
+import smtplib
+import threading
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from typing import Optional
+
+import resend
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.communication_log_model import CommunicationLog, CommunicationType, CommunicationStatus
+
+logger = logging.getLogger(__name__)
+
+CLAIM_LEASE = timedelta(minutes=5)
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+class EmailTransport:
+    """Sends a list of messages ({"from", "to", "subject", "html"}).
+
+    Returns one error string (or None on success) per message. Raising
+    fails the whole chunk.
+    """
+
+    name = "base"
+    max_batch = 1
+
+    def send_batch(self, messages: list[dict]) -> list[Optional[str]]:
+        raise NotImplementedError
+
+
+class ResendTransport(EmailTransport):
+    name = "resend"
+    max_batch = 100  # Resend batch API limit
+
+    def __init__(self, api_key: str | None = None):
+        resend.api_key = api_key if api_key is not None else settings.RESEND_API_KEY
+
+    def send_batch(self, messages: list[dict]) -> list[Optional[str]]:
+        if len(messages) > 1:
+            try:
+                resend.Batch.send(messages)
+                return [None] * len(messages)
+            except (resend.exceptions.ValidationError, resend.exceptions.MissingRequiredFieldsError) as e:
+                # Batch endpoint validates strictly: one bad message rejects the whole batch
+                logger.warning(f"Resend rejected a batch of {len(messages)}, sending one by one: {e}")
+        return [self._send_one(m) for m in messages]
+
+    def _send_one(self, message: dict) -> Optional[str]:
+        try:
+            resend.Emails.send(message)
+            return None
+        except resend.exceptions.ResendError as e:
+            return str(e)
+
+
+class SmtpTransport(EmailTransport):
+    name = "smtp"
+    max_batch = 50
+
+    def __init__(self, host: str | None = None, port: int | None = None, username: str | None = None, password: str | None = None):
+        self.host = host or settings.SMTP_HOST
+        self.port = port or settings.SMTP_PORT
+        self.username = username if username is not None else settings.SMTP_USERNAME
+        self.password = password if password is not None else settings.SMTP_PASSWORD
+
+    def send_batch(self, messages: list[dict]) -> list[Optional[str]]:
+        errors: list[Optional[str]] = []
+        # One connection per chunk
+        with smtplib.SMTP(self.host, self.port, timeout=30) as smtp:
+            if self.username:
+                smtp.starttls()
+                smtp.login(self.username, self.password)
+            for m in messages:
+                msg = EmailMessage()
+                msg["From"] = m["from"]
+                msg["To"] = ", ".join(m["to"])
+                msg["Subject"] = m["subject"]
+                msg.set_content(m["html"], subtype="html")
+                try:
+                    smtp.send_message(msg)
+                    errors.append(None)
+                except smtplib.SMTPException as e:
+                    errors.append(str(e))
+        return errors
+
+
+class FileTransport(EmailTransport):
+    name = "file"
+    max_batch = 100
+
+    def __init__(self, path: str | None = None):
+        self.path = path or settings.EMAIL_FILE_PATH
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages: list[dict]) -> list[Optional[str]]:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            for m in messages:
+                f.write(json.dumps(m) + "\n")
+        return [None] * len(messages)
+
+
+def create_transport(name: str | None = None) -> EmailTransport:
+    name = (name or settings.EMAIL_TRANSPORT or "resend").strip().lower()
+    if name == "smtp":
+        return SmtpTransport()
+    if name == "file":
+        return FileTransport()
+    return ResendTransport()
+
+
+def backoff_for(attempts: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS))
+
+
+def claim_pending(db: Session, limit: int) -> list[dict]:
+    """Lease up to `limit` due PENDING emails and return their send data"""
+    now = datetime.now(timezone.utc)
+    rows = (
+        db.query(CommunicationLog)
+        .filter(
+            CommunicationLog.type == CommunicationType.EMAIL,
+            CommunicationLog.status == CommunicationStatus.PENDING,
+            or_(CommunicationLog.next_attempt_at.is_(None), CommunicationLog.next_attempt_at <= now),
+        )
+        .order_by(CommunicationLog.created_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    claimed = []
+    for row in rows:
+        row.attempts = (row.attempts or 0) + 1
+        row.next_attempt_at = now + CLAIM_LEASE
+        claimed.append({
+            "id": row.id,
+            "attempts": row.attempts,
+            "recipient": row.recipient,
+            "subject": row.subject,
+            "html": row.content,
+        })
+    db.commit()
+    return claimed
+
+
+def record_results(db: Session, results: list[tuple[dict, Optional[str]]]) -> None:
+    now = datetime.now(timezone.utc)
+    sent_ids = [item["id"] for item, error in results if error is None]
+    if sent_ids:
+        db.query(CommunicationLog).filter(CommunicationLog.id.in_(sent_ids)).update(
+            {
+                CommunicationLog.status: CommunicationStatus.SENT,
+                CommunicationLog.error_message: None,
+                CommunicationLog.next_attempt_at: None,
+            },
+            synchronize_session=False,
+        )
+    for item, error in results:
+        if error is None:
+            continue
+        if item["attempts"] >= settings.EMAIL_MAX_ATTEMPTS:
+            values = {CommunicationLog.status: CommunicationStatus.FAILED, CommunicationLog.next_attempt_at: None}
+            logger.error(f"Giving up on email {item['id']} to {item['recipient']} after {item['attempts']} attempts: {error}")
+        else:
+            values = {CommunicationLog.next_attempt_at: now + backoff_for(item["attempts"])}
+            logger.warning(f"Email {item['id']} to {item['recipient']} failed (attempt {item['attempts']}), will retry: {error}")
+        values[CommunicationLog.error_message] = error
+        db.query(CommunicationLog).filter(CommunicationLog.id == item["id"]).update(values, synchronize_session=False)
+    db.commit()
+
+
+def send_claimed(transport: EmailTransport, claimed: list[dict]) -> list[tuple[dict, Optional[str]]]:
+    results: list[tuple[dict, Optional[str]]] = []
+    sendable = []
+    for item in claimed:
+        if not item["recipient"] or not item["subject"] or not item["html"]:
+            results.append((item, "Missing recipient, subject or content"))
+        else:
+            sendable.append(item)
+
+    size = max(1, transport.max_batch)
+    for i in range(0, len(sendable), size):
+        chunk = sendable[i:i + size]
+        messages = [
+            {"from": settings.SENDER_EMAIL, "to": [item["recipient"]], "subject": item["subject"], "html": item["html"]}
+            for item in chunk
+        ]
+        try:
+            errors = transport.send_batch(messages)
+        except Exception as e:
+            errors = [str(e)] * len(chunk)
+        results.extend(zip(chunk, errors))
+    return results
+
+
+def process_batch(db: Session, transport: EmailTransport, limit: int | None = None) -> int:
+    """Claim, send and record one batch. Returns the number of rows claimed."""
+    claimed = claim_pending(db, limit or settings.EMAIL_BATCH_SIZE)
+    if not claimed:
+        return 0
+    record_results(db, send_claimed(transport, claimed))
+    return len(claimed)
+
+
+class EmailOutboxWorker:
+    """Pool of asyncio tasks draining the outbox.
+
+    Each task runs `process_batch` in a thread with its own session; SKIP
+    LOCKED keeps their claims disjoint. Tasks sleep until `notify()` or the
+    poll interval, which also picks up retries whose backoff has elapsed.
+    """
+
+    def __init__(self, transport: EmailTransport | None = None, concurrency: int | None = None, poll_interval: float = 10.0, session_factory=SessionLocal):
+        self.transport = transport
+        self.concurrency = concurrency or settings.EMAIL_WORKER_CONCURRENCY
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        if self.transport is None:
+            self.transport = create_transport()
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run(i)) for i in range(self.concurrency)]
+        logger.info(f"Email outbox worker started ({self.concurrency} tasks, transport={self.transport.name})")
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+
+    def notify(self) -> None:
+        """Wake the workers; safe to call from request threads"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _process_once(self) -> int:
+        db = self.session_factory()
+        try:
+            return process_batch(db, self.transport)
+        finally:
+            db.close()
+
+    async def _run(self, worker_no: int) -> None:
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self._process_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox worker {worker_no} error: {e}")
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+# Global worker instance, started from app startup
+outbox_worker = EmailOutboxWorker()
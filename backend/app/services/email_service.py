@@ -1,4 +1,5 @@
-import resend
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from app.core.config import settings
 import logging
 import uuid
@@ -8,10 +9,24 @@ from datetime import datetime
 from app.models.event_model import EventProposal
 from app.models.communication_log_model import CommunicationLog, CommunicationType, CommunicationStatus
 from app.database.database import SessionLocal
+from app.services.email_outbox import outbox_worker
 
 logger = logging.getLogger(__name__)
 
-resend.api_key = settings.RESEND_API_KEY
+# session.info flag: emails were queued in this transaction, wake the outbox on commit
+OUTBOX_PENDING = "email_outbox_pending"
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_outbox(session: Session) -> None:
+    if session.info.pop(OUTBOX_PENDING, False):
+        outbox_worker.notify()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_outbox(session: Session, previous_transaction) -> None:
+    if not previous_transaction.nested:
+        session.info.pop(OUTBOX_PENDING, None)
 
 
 def _format_dt(dt: datetime) -> str:
@@ -40,9 +55,11 @@ def _wrap_html(title: str, inner_html: str) -> str:
         "</div>"
     )
 
-def _log_and_send(email: str, subject: str, html: str, metadata: dict = None):
+def enqueue_email(email: str, subject: str, html: str, metadata: dict = None, db: Session | None = None) -> CommunicationLog:
     """
-    Helper to log email attempt to DB and send via Resend.
+    Queue an email as a PENDING CommunicationLog row; delivery happens in
+    app.services.email_outbox. With `db`, the row joins the caller's
+    transaction and is sent only once that commits.
     """
     # Sanitize metadata for JSON serialization (convert UUIDs to strings)
     sanitized_metadata = {}
@@ -53,7 +70,6 @@ def _log_and_send(email: str, subject: str, html: str, metadata: dict = None):
             else:
                 sanitized_metadata[k] = v
 
-    db = SessionLocal()
     log = CommunicationLog(
         type=CommunicationType.EMAIL,
         recipient=email,
@@ -62,31 +78,22 @@ def _log_and_send(email: str, subject: str, html: str, metadata: dict = None):
         status=CommunicationStatus.PENDING,
         metadata_payload=sanitized_metadata or {}
     )
-    db.add(log)
-    db.commit()
-    db.refresh(log)
-
-    params = {
-        "from": settings.SENDER_EMAIL,
-        "to": [email],
-        "subject": subject,
-        "html": html,
-    }
+    if db is not None:
+        db.add(log)
+        db.info[OUTBOX_PENDING] = True
+        return log
 
+    own_db = SessionLocal()
     try:
-        resend.Emails.send(params)
-        log.status = CommunicationStatus.SENT
-        db.commit()
-    except Exception as e:
-        logger.error(f"Error sending email to {email}: {e}")
-    
-        log.status = CommunicationStatus.FAILED
-        log.error_message = str(e)
-        db.commit()
+        own_db.add(log)
+        own_db.commit()
+        own_db.refresh(log)
     finally:
-        db.close()
+        own_db.close()
+    outbox_worker.notify()
+    return log
 
-def send_verification_email(email: str, token: str):
+def send_verification_email(email: str, token: str, db: Session | None = None):
     # token is now a 6-digit code
     verify_link = f"{settings.FRONTEND_BASE_URL}/verify/{token}?email={email}"
     html = _wrap_html(
@@ -102,9 +109,9 @@ def send_verification_email(email: str, token: str):
             f"</div>"
         ),
     )
-    _log_and_send(email, "Verify your email address", html, {"type": "verification"})
+    enqueue_email(email, "Verify your email address", html, {"type": "verification"}, db=db)
 
-def send_password_reset_email(email: str, token: str):
+def send_password_reset_email(email: str, token: str, db: Session | None = None):
     # token is now a 6-digit code
     html = _wrap_html(
         "Reset your password",
@@ -116,9 +123,9 @@ def send_password_reset_email(email: str, token: str):
             f"<p style=\"margin:0;color:#6b7280;font-size:14px;text-align:center;\">Enter this code in the password reset page.</p>"
         ),
     )
-    _log_and_send(email, "Reset your password", html, {"type": "password_reset"})
+    enqueue_email(email, "Reset your password", html, {"type": "password_reset"}, db=db)
 
-def send_event_joined_email(email: str, event: Event):
+def send_event_joined_email(email: str, event: Event, db: Session | None = None):
     """Send a confirmation email when a user joins a public event."""
     event_link = f"{settings.FRONTEND_BASE_URL}/events/{event.id}"
     subject = f"You're registered: {event.title}"
@@ -130,10 +137,10 @@ def send_event_joined_email(email: str, event: Event):
             f"<a href=\"{event_link}\" style=\"display:inline-block;background:#2563eb;color:#ffffff;text-decoration:none;padding:10px 16px;border-radius:8px;font-weight:600;\">View Event</a>"
         ),
     )
-    _log_and_send(email, subject, html, {"type": "event_joined", "event_id": event.id})
+    enqueue_email(email, subject, html, {"type": "event_joined", "event_id": event.id}, db=db)
 
 
-def send_event_invitation_email(email: str, event: Event, role: EventParticipantRole, description: Optional[str] = None):
+def send_event_invitation_email(email: str, event: Event, role: EventParticipantRole, description: Optional[str] = None, db: Session | None = None):
     """Send an invitation email to a participant for an event."""
     event_link = f"{settings.FRONTEND_BASE_URL}/events/{event.id}"
     subject = f"You're invited: {event.title}"
@@ -147,10 +154,10 @@ def send_event_invitation_email(email: str, event: Event, role: EventParticipant
             f"<a href=\"{event_link}\" style=\"display:inline-block;background:#2563eb;color:#ffffff;text-decoration:none;padding:10px 16px;border-radius:8px;font-weight:600;\">View Event</a>"
         ),
     )
-    _log_and_send(email, subject, html, {"type": "event_invitation", "event_id": event.id, "role": role.value})
+    enqueue_email(email, subject, html, {"type": "event_invitation", "event_id": event.id, "role": role.value}, db=db)
 
 
-def send_event_role_update_email(email: str, event: Event, new_role: EventParticipantRole, description: Optional[str] = None):
+def send_event_role_update_email(email: str, event: Event, new_role: EventParticipantRole, description: Optional[str] = None, db: Session | None = None):
     """Notify a participant that their role has been updated for an event."""
     event_link = f"{settings.FRONTEND_BASE_URL}/events/{event.id}"
     subject = f"Your role was updated for: {event.title}"
@@ -164,10 +171,10 @@ def send_event_role_update_email(email: str, event: Event, new_role: EventPartic
             f"<a href=\"{event_link}\" style=\"display:inline-block;background:#2563eb;color:#ffffff;text-decoration:none;padding:10px 16px;border-radius:8px;font-weight:600;\">View Event</a>"
         ),
     )
-    _log_and_send(email, subject, html, {"type": "event_role_update", "event_id": event.id, "new_role": new_role.value})
+    enqueue_email(email, subject, html, {"type": "event_role_update", "event_id": event.id, "new_role": new_role.value}, db=db)
 
 
-def send_event_removed_email(email: str, event: Event, description: Optional[str] = None):
+def send_event_removed_email(email: str, event: Event, description: Optional[str] = None, db: Session | None = None):
     """Notify a participant that they have been removed from an event."""
     subject = f"You have been removed from: {event.title}"
     desc_html = f"<p style=\"margin:0 0 12px;\">{description}</p>" if description else ""
@@ -178,10 +185,10 @@ def send_event_removed_email(email: str, event: Event, description: Optional[str
             f"{desc_html}"
         ),
     )
-    _log_and_send(email, subject, html, {"type": "event_removed", "event_id": event.id})
+    enqueue_email(email, subject, html, {"type": "event_removed", "event_id": event.id}, db=db)
 
 
-def send_event_reminder_email(email: str, event: Event, when_label: str):
+def send_event_reminder_email(email: str, event: Event, when_label: str, db: Session | None = None):
     """Send a reminder email for an upcoming event.
     when_label examples: "one_week", "three_days", "one_day".
     """
@@ -200,10 +207,10 @@ def send_event_reminder_email(email: str, event: Event, when_label: str):
             f"<a href=\"{event_link}\" style=\"display:inline-block;background:#2563eb;color:#ffffff;text-decoration:none;padding:10px 16px;border-radius:8px;font-weight:600;\">View Event</a>"
         ),
     )
-    _log_and_send(email, subject, html, {"type": "event_reminder", "event_id": event.id, "when": when_label})
+    enqueue_email(email, subject, html, {"type": "event_reminder", "event_id": event.id, "when": when_label}, db=db)
 
 
-def send_event_proposal_comment_email(email: str, event: Event, proposal: EventProposal, comment_content: str):
+def send_event_proposal_comment_email(email: str, event: Event, proposal: EventProposal, comment_content: str, db: Session | None = None):
     """Notify proposal owner of a new comment."""
     event_link = f"{settings.FRONTEND_BASE_URL}/events/{event.id}"
     subject = f"New comment on your proposal: {event.title}"
@@ -215,4 +222,4 @@ def send_event_proposal_comment_email(email: str, event: Event, proposal: EventP
             f"<a href=\"{event_link}\" style=\"display:inline-block;background:#2563eb;color:#ffffff;text-decoration:none;padding:10px 16px;border-radius:8px;font-weight:600;\">View Event</a>"
         ),
     )
-    _log_and_send(email, subject, html, {"type": "proposal_comment", "event_id": event.id})
+    enqueue_email(email, subject, html, {"type": "proposal_comment", "event_id": event.id}, db=db)
@@ -0,0 +1,194 @@
+"""
+Cache for text embeddings from the AI provider.
+
+Semantic search embeds the user's query on every request, and popular queries
+repeat. Embeddings are deterministic for a given provider, model, task type
+and input, so they are cached under that key. The input is whitespace-
+normalized, and case-folded for search queries.
+
+- In memory: a per-process TTL + LRU map (EMBEDDING_CACHE_TTL_SECONDS,
+  EMBEDDING_CACHE_MAX_SIZE).
+- Persistent, with EMBEDDING_CACHE_PERSIST: the `embedding_cache` table,
+  shared by every worker and surviving restarts.
+- Concurrent misses for the same key are coalesced: one caller asks the
+  provider and the others wait for its result.
+
+Failed embeddings (None) are not cached.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUERY_TASK = "retrieval_query"
+DOCUMENT_TASK = "retrieval_document"
+
+# Waiters give up after the provider's own timeout plus some slack
+INFLIGHT_WAIT_SECONDS = 30
+
+
+def normalize_text(text: str, task_type: str) -> str:
+    collapsed = " ".join((text or "").split())
+    return collapsed.casefold() if task_type == QUERY_TASK else collapsed
+
+
+def cache_key(provider: str, model: str, task_type: str, text: str) -> str:
+    raw = json.dumps([provider, model, task_type, text], ensure_ascii=False)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """Thread-safe TTL + LRU map of cache key -> embedding, with in-flight coalescing"""
+
+    def __init__(self, ttl_seconds: float | None = None, max_size: int | None = None, persist: bool | None = None):
+        self.ttl_seconds = settings.EMBEDDING_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_size = settings.EMBEDDING_CACHE_MAX_SIZE if max_size is None else max_size
+        self.persist = settings.EMBEDDING_CACHE_PERSIST if persist is None else persist
+        # key -> (expires_at, vector); a double array is ~4x smaller than a list of floats
+        self._entries: OrderedDict[str, tuple[float, array]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get_or_compute(
+        self,
+        provider: str,
+        model: str,
+        task_type: str,
+        text: str,
+        compute: Callable[[str], Optional[list[float]]],
+    ) -> Optional[list[float]]:
+        """Cached embedding of `text`, calling `compute(normalized_text)` on a miss"""
+        text = normalize_text(text, task_type)
+        if not self.enabled:
+            return compute(text)
+        key = cache_key(provider, model, task_type, text)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            pending = self._inflight.get(key)
+            if pending is None:
+                pending = self._inflight[key] = Future()
+                owner = True
+            else:
+                self.coalesced += 1
+                owner = False
+
+        if not owner:
+            try:
+                vec = pending.result(timeout=INFLIGHT_WAIT_SECONDS)
+            except Exception:
+                return None
+            return list(vec) if vec else None
+
+        vec = None
+        try:
+            vec = self._load(key) if self.persist else None
+            with self._lock:
+                if vec is not None:
+                    self.persistent_hits += 1
+                else:
+                    self.misses += 1
+            if vec is None:
+                vec = compute(text)
+                if vec and self.persist:
+                    self._store(key, provider, model, task_type, text, vec)
+            if vec:
+                self._put(key, vec)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending.set_result(vec)
+        return vec
+
+    def _put(self, key: str, vec: list[float]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, array("d", vec))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _load(self, key: str) -> Optional[list[float]]:
+        from app.database.database import SessionLocal
+        from app.models.ai_model import EmbeddingCacheEntry
+
+        try:
+            with SessionLocal() as db:
+                entry = db.get(EmbeddingCacheEntry, key)
+                return list(entry.embedding) if entry is not None else None
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return None
+
+    def _store(self, key: str, provider: str, model: str, task_type: str, text: str, vec: list[float]) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+        from app.database.database import SessionLocal
+        from app.models.ai_model import EmbeddingCacheEntry
+
+        try:
+            with SessionLocal() as db:
+                db.execute(
+                    insert(EmbeddingCacheEntry)
+                    .values(
+                        cache_key=key,
+                        provider=provider,
+                        model_name=model,
+                        task_type=task_type,
+                        source_text=text,
+                        embedding=list(vec),
+                    )
+                    .on_conflict_do_nothing(index_elements=["cache_key"])
+                )
+                db.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "persist": self.persist,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "hit_ratio": round((self.hits + self.persistent_hits) / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "inflight": len(self._inflight),
+            }
+
+
+embedding_cache = EmbeddingCache()
@@ -0,0 +1,276 @@
+"""
+Embedding job queue: keeps provider calls off the request path.
+
+Handlers that create or change embeddable rows (event create/publish/update,
+expert onboarding) call `enqueue_event` / `enqueue_expert` before their
+commit. That adds or replaces one `embedding_jobs` row per entity holding the
+source text and its hash, in the handler's own transaction.
+
+`process_embedding_jobs`, run by app.core.scheduler, drains the queue:
+
+- claims a batch of due jobs with UPDATE ... RETURNING over a SKIP LOCKED
+  selection, leasing them for EMBEDDING_JOB_LEASE_SECONDS so a crashed run is
+  retried;
+- drops jobs whose stored embedding already matches the source text and model;
+- embeds the rest per entity type with one batch call and upserts them with
+  `embedding_pipeline.upsert_embeddings`;
+- marks embedded jobs `done` and deletes unchanged ones, unless they were
+  re-enqueued with new text meanwhile;
+- backs failed jobs off exponentially and marks them `failed` after
+  EMBEDDING_JOB_MAX_ATTEMPTS.
+
+Until its job runs, a row is found by semantic search through text search
+(see `awaiting_embedding`). Jobs run on the scheduler leader only; other
+workers pick the new vectors up when they next check the index version, at
+most VECTOR_INDEX_REFRESH_SECONDS later. `done` jobs keep the text fallback
+for that long and are then purged.
+"""
+
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, func, or_, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.ai_model import EmbeddingJob
+from app.services import ai_service
+from app.services.embedding_pipeline import (
+    SOURCES,
+    current_model_name,
+    event_source_text,
+    expert_source_text,
+    source_hash,
+    upsert_embeddings,
+)
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+FAILED = "failed"
+DONE = "done"
+
+# Retry delay doubles per attempt, capped
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+
+
+def enqueue_embedding(db: Session, entity_type: str, entity_id: uuid.UUID, source_text: str) -> None:
+    """Queue (or re-queue) the embedding of one entity; does not commit.
+
+    An existing job for the entity takes the new text and starts over, so
+    repeated edits before the worker runs cost a single embedding.
+    """
+    if entity_type not in SOURCES:
+        raise ValueError(f"Unknown embedding source: {entity_type}")
+    stmt = insert(EmbeddingJob).values(
+        id=uuid.uuid4(),
+        entity_type=entity_type,
+        entity_id=entity_id,
+        source_text=source_text,
+        source_hash=source_hash(source_text),
+        status=PENDING,
+        attempts=0,
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            constraint="uq_embedding_jobs_entity",
+            set_={
+                "source_text": stmt.excluded.source_text,
+                "source_hash": stmt.excluded.source_hash,
+                "status": PENDING,
+                "attempts": 0,
+                "available_at": func.now(),
+                "last_error": None,
+            },
+        )
+    )
+
+
+def enqueue_event(db: Session, event) -> None:
+    enqueue_embedding(db, "events", event.id, event_source_text(event.title, event.description, event.format, event.type))
+
+
+def enqueue_expert(db: Session, profile) -> None:
+    enqueue_embedding(db, "experts", profile.user_id, expert_source_text(profile.full_name, profile.bio, profile.availability))
+
+
+def _settled_before() -> datetime:
+    """Jobs done before this are in every worker's index"""
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.VECTOR_INDEX_REFRESH_SECONDS)
+
+
+def awaiting_embedding(entity_type: str, key_column):
+    """Filter for rows not (re-)embedded yet, or so recently that another worker's index may lack them"""
+    return key_column.in_(
+        select(EmbeddingJob.entity_id).where(
+            EmbeddingJob.entity_type == entity_type,
+            or_(
+                EmbeddingJob.status == PENDING,
+                and_(EmbeddingJob.status == DONE, EmbeddingJob.available_at > _settled_before()),
+            ),
+        )
+    )
+
+
+def _claim(db: Session, now: datetime, batch_size: int) -> list:
+    due = (
+        select(EmbeddingJob.id)
+        .where(EmbeddingJob.status == PENDING, EmbeddingJob.available_at <= now)
+        .order_by(EmbeddingJob.available_at, EmbeddingJob.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("due_jobs")
+        .prefix_with("MATERIALIZED", dialect="postgresql")
+    )
+    claimed = db.execute(
+        update(EmbeddingJob)
+        .where(EmbeddingJob.id.in_(select(due.c.id)))
+        .values(
+            attempts=EmbeddingJob.attempts + 1,
+            available_at=now + timedelta(seconds=settings.EMBEDDING_JOB_LEASE_SECONDS),
+        )
+        .returning(
+            EmbeddingJob.id,
+            EmbeddingJob.entity_type,
+            EmbeddingJob.entity_id,
+            EmbeddingJob.source_text,
+            EmbeddingJob.source_hash,
+            EmbeddingJob.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return claimed
+
+
+def _unchanged(db: Session, entity_type: str, jobs: list, model_name: str) -> set[uuid.UUID]:
+    """Job ids whose stored embedding already has the job's source text and model"""
+    source = SOURCES[entity_type]
+    stored = dict(
+        (row[0], (row[1], row[2]))
+        for row in db.execute(
+            text(
+                f"SELECT {source.key_column}, md5(source_text), model_name FROM {source.table} "
+                f"WHERE {source.key_column} = ANY(:keys)"
+            ),
+            {"keys": [j.entity_id for j in jobs]},
+        )
+    )
+    return {j.id for j in jobs if stored.get(j.entity_id) == (j.source_hash, model_name)}
+
+
+def _finish(db: Session, unchanged: list, embedded: list) -> None:
+    # A job re-enqueued while we worked has a new hash and stays queued
+    if unchanged:
+        db.execute(
+            delete(EmbeddingJob)
+            .where(tuple_(EmbeddingJob.id, EmbeddingJob.source_hash).in_([(j.id, j.source_hash) for j in unchanged]))
+            .execution_options(synchronize_session=False)
+        )
+    if embedded:
+        # Kept until every worker has reloaded the vector (see `awaiting_embedding`)
+        db.execute(
+            update(EmbeddingJob)
+            .where(tuple_(EmbeddingJob.id, EmbeddingJob.source_hash).in_([(j.id, j.source_hash) for j in embedded]))
+            .values(status=DONE, available_at=datetime.now(timezone.utc), last_error=None)
+            .execution_options(synchronize_session=False)
+        )
+
+
+def _purge_settled(db: Session) -> int:
+    purged = db.execute(
+        delete(EmbeddingJob)
+        .where(EmbeddingJob.status == DONE, EmbeddingJob.available_at <= _settled_before())
+        .returning(EmbeddingJob.id)
+        .execution_options(synchronize_session=False)
+    ).all()
+    db.commit()
+    return len(purged)
+
+
+def _fail(db: Session, jobs: list, now: datetime, error: str) -> None:
+    for j in jobs:
+        delay = min(BACKOFF_BASE_SECONDS * 2 ** (j.attempts - 1), BACKOFF_MAX_SECONDS)
+        give_up = j.attempts >= settings.EMBEDDING_JOB_MAX_ATTEMPTS
+        db.execute(
+            update(EmbeddingJob)
+            .where(EmbeddingJob.id == j.id, EmbeddingJob.source_hash == j.source_hash)
+            .values(
+                status=FAILED if give_up else PENDING,
+                available_at=now + timedelta(seconds=delay),
+                last_error=error[:1000],
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if give_up:
+            logger.warning(f"Embedding job for {j.entity_type} {j.entity_id} failed after {j.attempts} attempts: {error}")
+
+
+def process_embedding_jobs(db: Session, batch_size: int | None = None, max_jobs: int | None = None) -> dict:
+    """Embed queued entities in batches until the due queue is empty (or `max_jobs` are claimed)"""
+    batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+    model_name = current_model_name()
+    stats = {"claimed": 0, "embedded": 0, "unchanged": 0, "failed": 0}
+    _purge_settled(db)
+
+    while max_jobs is None or stats["claimed"] < max_jobs:
+        now = datetime.now(timezone.utc)
+        size = batch_size if max_jobs is None else min(batch_size, max_jobs - stats["claimed"])
+        claimed = _claim(db, now, size)
+        if not claimed:
+            break
+        stats["claimed"] += len(claimed)
+
+        by_type: dict[str, list] = defaultdict(list)
+        for job in claimed:
+            by_type[job.entity_type].append(job)
+
+        for entity_type, jobs in by_type.items():
+            unchanged = _unchanged(db, entity_type, jobs, model_name)
+            pending = [j for j in jobs if j.id not in unchanged]
+            try:
+                vectors = ai_service.generate_text_embeddings([j.source_text for j in pending], is_document=True)
+                error = "Embedding provider returned no vector"
+            except Exception as e:
+                vectors, error = [None] * len(pending), str(e)
+            embedded = [(j, vec) for j, vec in zip(pending, vectors) if vec]
+            failed = [j for j, vec in zip(pending, vectors) if not vec]
+
+            try:
+                upsert_embeddings(db, SOURCES[entity_type], [(j.entity_id, j.source_text, vec) for j, vec in embedded], model_name)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Storing {len(embedded)} {entity_type} embeddings failed: {e}")
+                failed += [j for j, _ in embedded]
+                embedded, error = [], str(e)
+            _finish(db, [j for j in jobs if j.id in unchanged], [j for j, _ in embedded])
+            _fail(db, failed, now, error)
+            db.commit()
+
+            stats["embedded"] += len(embedded)
+            stats["unchanged"] += len(unchanged)
+            stats["failed"] += len(failed)
+
+        if len(claimed) < size:
+            break
+
+    if stats["claimed"]:
+        logger.info(
+            f"Embedding jobs: {stats['embedded']} embedded, {stats['unchanged']} unchanged, {stats['failed']} failed"
+        )
+    return stats
+
+
+def embedding_job_backlog(db: Session) -> dict:
+    now = datetime.now(timezone.utc)
+    counts = dict(
+        db.query(EmbeddingJob.status, func.count(EmbeddingJob.id))
+        .filter((EmbeddingJob.status == FAILED) | (EmbeddingJob.available_at <= now))
+        .group_by(EmbeddingJob.status)
+        .all()
+    )
+    return {"embedding_jobs_due": int(counts.get(PENDING, 0)), "embedding_jobs_failed": int(counts.get(FAILED, 0))}
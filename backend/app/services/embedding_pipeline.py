@@ -0,0 +1,233 @@
+"""
+Bulk (re-)embedding of events and experts.
+
+`reindex(db, "events")` walks the source rows in id order, in chunks of
+EMBEDDING_BATCH_SIZE, and for each chunk:
+
+- builds the source text of every row and skips rows whose stored
+  `source_text` hash and `model_name` already match (unless `force`);
+- embeds the rest with one batch call (`ai_service.generate_text_embeddings`),
+  which retries provider rate limits with backoff;
+- upserts the vectors with one multi-row INSERT ... ON CONFLICT and advances
+  the checkpoint in `embedding_checkpoints` in the same transaction.
+
+An interrupted run resumes after the last committed chunk. Progress and
+throughput (rows/s) are logged per chunk and returned as a summary.
+
+Command line: `python -m app.database.reindex_embeddings --help`.
+"""
+
+import hashlib
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.ai_model import EmbeddingCheckpoint
+from app.services import ai_service
+
+logger = logging.getLogger(__name__)
+
+
+def event_source_text(title: str | None, description: str | None, format: Any, type: Any) -> str:
+    # Enum members and their raw database values render the same
+    format, type = getattr(format, "value", format), getattr(type, "value", type)
+    return f"{title or ''}\n{description or ''}\nformat:{format} type:{type}"
+
+
+def expert_source_text(full_name: str | None, bio: str | None, availability: str | None) -> str:
+    return f"{full_name or ''}\n{bio or ''}\navailability:{availability or ''}"
+
+
+def current_model_name() -> str:
+    """`model_name` stored with embeddings from the configured provider"""
+    provider = settings.AI_PROVIDER.lower()
+    return f"{provider}:{ai_service._embedding_model(provider)}"
+
+
+def source_hash(source_text: str) -> str:
+    """Same digest as Postgres md5(source_text), so stored rows can be compared in SQL"""
+    return hashlib.md5(source_text.encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class EmbeddingSource:
+    name: str
+    table: str  # embeddings table
+    key_column: str
+    # Selects key, the source text parts, md5 of the stored source_text and stored model_name,
+    # for rows with key > :after, in key order, at most :limit
+    rows_sql: str
+    build_text: Callable[..., str]
+
+
+SOURCES: dict[str, EmbeddingSource] = {
+    "events": EmbeddingSource(
+        name="events",
+        table="event_embeddings",
+        key_column="event_id",
+        rows_sql="""
+            SELECT e.id, e.title, e.description, e.format, e.type, md5(ee.source_text), ee.model_name
+            FROM events e
+            LEFT JOIN event_embeddings ee ON ee.event_id = e.id
+            WHERE e.visibility = 'public' AND e.deleted_at IS NULL
+              AND (CAST(:after AS uuid) IS NULL OR e.id > CAST(:after AS uuid))
+            ORDER BY e.id
+            LIMIT :limit
+        """,
+        build_text=event_source_text,
+    ),
+    "experts": EmbeddingSource(
+        name="experts",
+        table="expert_embeddings",
+        key_column="user_id",
+        rows_sql="""
+            SELECT p.user_id, p.full_name, p.bio, p.availability, md5(xe.source_text), xe.model_name
+            FROM profiles p
+            LEFT JOIN expert_embeddings xe ON xe.user_id = p.user_id
+            WHERE p.visibility = 'public'
+              AND EXISTS (
+                  SELECT 1 FROM user_roles ur JOIN roles r ON r.id = ur.role_id
+                  WHERE ur.user_id = p.user_id AND r.name = 'expert'
+              )
+              AND (CAST(:after AS uuid) IS NULL OR p.user_id > CAST(:after AS uuid))
+            ORDER BY p.user_id
+            LIMIT :limit
+        """,
+        build_text=expert_source_text,
+    ),
+}
+
+
+def upsert_embeddings(db: Session, source: EmbeddingSource, rows: list[tuple[uuid.UUID, str, list[float]]], model_name: str) -> int:
+    """One multi-row INSERT ... ON CONFLICT for (key, source_text, vector) rows; does not commit"""
+    if not rows:
+        return 0
+    values, params = [], {"model": model_name}
+    for i, (key, source_text, vec) in enumerate(rows):
+        values.append(f"(:k{i}, CAST(:e{i} AS vector), :s{i}, :model)")
+        params.update({f"k{i}": key, f"e{i}": ai_service._vec_to_pg(vec), f"s{i}": source_text})
+    db.execute(
+        text(
+            f"""
+            INSERT INTO {source.table} ({source.key_column}, embedding, source_text, model_name)
+            VALUES {", ".join(values)}
+            ON CONFLICT ({source.key_column}) DO UPDATE
+            SET embedding = EXCLUDED.embedding, source_text = EXCLUDED.source_text, model_name = EXCLUDED.model_name
+            """
+        ),
+        params,
+    )
+    if source.name == "experts":
+        # Re-embedded experts become searchable as soon as the caller commits
+        from app.services.vector_index import expert_index
+        for key, _, vec in rows:
+            expert_index.stage_upsert(db, key, vec)
+    return len(rows)
+
+
+def embed_rows(db: Session, source_name: str, rows: list[tuple[uuid.UUID, str]]) -> int:
+    """Embed (key, source_text) rows with one batch call and upsert them; does not commit.
+
+    Returns how many rows were embedded; failed ones are left as they were.
+    """
+    vectors = ai_service.generate_text_embeddings([src for _, src in rows], is_document=True)
+    embedded = [(key, src, vec) for (key, src), vec in zip(rows, vectors) if vec]
+    return upsert_embeddings(db, SOURCES[source_name], embedded, current_model_name())
+
+
+def _checkpoint(db: Session, source: str, restart: bool) -> EmbeddingCheckpoint:
+    cp = db.get(EmbeddingCheckpoint, source)
+    if cp is None:
+        cp = EmbeddingCheckpoint(source=source, processed=0, embedded=0, skipped=0, failed=0)
+        db.add(cp)
+    elif restart or cp.completed_at is not None:
+        # A finished (or explicitly restarted) run starts over from the first row
+        cp.last_key = None
+        cp.processed = cp.embedded = cp.skipped = cp.failed = 0
+        cp.started_at = datetime.now(timezone.utc)
+        cp.completed_at = None
+    db.commit()
+    return cp
+
+
+def reindex(
+    db: Session,
+    source_name: str,
+    chunk_size: int | None = None,
+    force: bool = False,
+    restart: bool = False,
+    limit: int | None = None,
+) -> dict:
+    """Embed every row of `source_name` whose source text or model changed.
+
+    `limit` caps the rows scanned in this call (the checkpoint still advances,
+    so the next call carries on). `restart` ignores an unfinished checkpoint.
+    """
+    source = SOURCES[source_name]
+    chunk_size = chunk_size or settings.EMBEDDING_BATCH_SIZE
+    model_name = current_model_name()
+
+    cp = _checkpoint(db, source.name, restart)
+    stats = {"source": source.name, "resumed_after": str(cp.last_key) if cp.last_key else None,
+             "scanned": 0, "embedded": 0, "skipped": 0, "failed": 0}
+    started = time.monotonic()
+
+    while limit is None or stats["scanned"] < limit:
+        batch = chunk_size if limit is None else min(chunk_size, limit - stats["scanned"])
+        rows = db.execute(
+            text(source.rows_sql),
+            {"after": str(cp.last_key) if cp.last_key else None, "limit": batch},
+        ).fetchall()
+        if not rows:
+            cp.completed_at = datetime.now(timezone.utc)
+            db.commit()
+            break
+
+        pending: list[tuple[uuid.UUID, str]] = []
+        for row in rows:
+            key, parts, stored_hash, stored_model = row[0], row[1:-2], row[-2], row[-1]
+            src = source.build_text(*parts)
+            if not force and stored_hash == source_hash(src) and stored_model == model_name:
+                stats["skipped"] += 1
+            else:
+                pending.append((key, src))
+
+        embedded = embed_rows(db, source.name, pending)
+
+        stats["scanned"] += len(rows)
+        stats["embedded"] += embedded
+        stats["failed"] += len(pending) - embedded
+        cp.last_key = rows[-1][0]
+        cp.processed += len(rows)
+        cp.embedded += embedded
+        cp.skipped += len(rows) - len(pending)
+        cp.failed += len(pending) - embedded
+        db.commit()
+
+        elapsed = time.monotonic() - started
+        logger.info(
+            f"Re-embedding {source.name}: {stats['scanned']} scanned, {stats['embedded']} embedded, "
+            f"{stats['skipped']} unchanged, {stats['failed']} failed "
+            f"({stats['scanned'] / elapsed if elapsed else 0:.1f} rows/s)"
+        )
+        if len(rows) < batch:
+            cp.completed_at = datetime.now(timezone.utc)
+            db.commit()
+            break
+
+    elapsed = time.monotonic() - started
+    stats["completed"] = cp.completed_at is not None
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_second"] = round(stats["scanned"] / elapsed, 1) if elapsed else None
+    return stats
+
+
+def reindex_all(db: Session, **kwargs) -> list[dict]:
+    return [reindex(db, name, **kwargs) for name in SOURCES]
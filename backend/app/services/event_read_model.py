@@ -0,0 +1,101 @@
+"""
+Read model for endpoints that return lists of `EventDetails`.
+
+Serializing an `Event` touches its organizer (and their profile), categories,
+pictures and sponsors, plus three correlated `column_property` aggregates.
+Left to lazy loading that is several statements per row. Here the relationships
+are `selectinload`ed (one statement each per page) and the aggregates are
+deferred and filled from a single grouped query, so a page costs a fixed
+number of statements regardless of its size.
+
+Usage:
+    query = event_list_query(db).filter(...).order_by(...)
+    return fetch_events(query.limit(page_size))
+"""
+
+import uuid
+from typing import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Query, Session, defer, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.event_model import (
+    COUNTED_PARTICIPANT_STATUSES,
+    Event,
+    EventCategory,
+    EventParticipant,
+)
+from app.models.review_model import Review
+from app.models.user_model import User
+
+
+def event_list_options() -> list:
+    """Loader options for everything EventDetails serializes"""
+    return [
+        defer(Event.participant_count),
+        defer(Event.reviews_count),
+        defer(Event.average_rating),
+        selectinload(Event.organizer).selectinload(User.profile),
+        selectinload(Event.categories).selectinload(EventCategory.category),
+        selectinload(Event.pictures),
+        selectinload(Event.sponsors),
+    ]
+
+
+def event_list_query(db: Session) -> Query:
+    return db.query(Event).options(*event_list_options())
+
+
+def event_aggregates(db: Session, event_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, tuple[int, int, float]]:
+    """(participant_count, reviews_count, average_rating) per event, in one statement"""
+    ids = list(set(event_ids))
+    if not ids:
+        return {}
+    participants = (
+        select(EventParticipant.event_id, func.count(EventParticipant.id).label("n"))
+        .where(
+            EventParticipant.event_id.in_(ids),
+            EventParticipant.status.in_(COUNTED_PARTICIPANT_STATUSES),
+        )
+        .group_by(EventParticipant.event_id)
+        .subquery()
+    )
+    reviews = (
+        select(
+            Review.event_id,
+            func.count(Review.id).label("n"),
+            func.avg(Review.rating).label("avg"),
+        )
+        .where(Review.event_id.in_(ids), Review.deleted_at.is_(None))
+        .group_by(Review.event_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            Event.id,
+            func.coalesce(participants.c.n, 0),
+            func.coalesce(reviews.c.n, 0),
+            func.coalesce(reviews.c.avg, 0.0),
+        )
+        .outerjoin(participants, participants.c.event_id == Event.id)
+        .outerjoin(reviews, reviews.c.event_id == Event.id)
+        .where(Event.id.in_(ids))
+    ).all()
+    return {row[0]: (int(row[1]), int(row[2]), float(row[3])) for row in rows}
+
+
+def attach_event_aggregates(db: Session, events: list[Event]) -> list[Event]:
+    """Fill the deferred aggregate attributes without marking the events dirty"""
+    aggregates = event_aggregates(db, (e.id for e in events))
+    for event in events:
+        participant_count, reviews_count, average_rating = aggregates.get(event.id, (0, 0, 0.0))
+        set_committed_value(event, "participant_count", participant_count)
+        set_committed_value(event, "reviews_count", reviews_count)
+        set_committed_value(event, "average_rating", average_rating)
+    return events
+
+
+def fetch_events(query: Query) -> list[Event]:
+    """Run an event_list_query and attach aggregates"""
+    return attach_event_aggregates(query.session, query.all())
@@ -0,0 +1,242 @@
+"""
+Periodic event jobs: lifecycle transitions and due reminders.
+
+Both jobs work in bounded batches applied with set-based UPDATE ... RETURNING
+statements, so no ORM objects are loaded for the rows they move and a run
+touches a bounded number of rows per statement regardless of backlog size. They are run by app.core.scheduler and can also be
+triggered through the /events/scheduler/run and /events/reminders/run routes.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import func, select, update, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.event_model import (
+    Event,
+    EventParticipant,
+    EventParticipantRole,
+    EventParticipantStatus,
+    EventRegistrationStatus,
+    EventReminder,
+    EventStatus,
+)
+from app.models.notification_model import NotificationType
+from app.models.user_model import User
+from app.services.email_service import send_event_reminder_email
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+AUDIENCE_ROLES = [
+    EventParticipantRole.audience,
+    EventParticipantRole.student,
+    EventParticipantRole.teacher,
+]
+
+
+def _due_events(name: str, *criteria, batch_size: int):
+    """Materialized CTE picking the next batch of events matching criteria.
+
+    Rows leave the predicate once updated, so repeating the statement walks
+    the whole backlog; SKIP LOCKED keeps concurrent runs off each other's rows.
+    Materializing matters: a `LIMIT ... FOR UPDATE` subquery inlined into
+    `IN (...)` can be rescanned and pick up more than `batch_size` rows.
+    """
+    due = (
+        select(Event.id)
+        .where(*criteria)
+        .order_by(Event.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte(name)
+        .prefix_with("MATERIALIZED", dialect="postgresql")
+    )
+    return select(due.c.id)
+
+
+def close_started_registrations(db: Session, now: datetime, batch_size: int) -> list[uuid.UUID]:
+    """UPDATE events SET registration_status='closed' ... RETURNING id"""
+    criteria = (
+        Event.status == EventStatus.published,
+        Event.start_datetime <= now,
+        Event.registration_status == EventRegistrationStatus.opened,
+    )
+    return list(db.execute(
+        update(Event)
+        .where(Event.id.in_(_due_events("to_close", *criteria, batch_size=batch_size)))
+        .values(registration_status=EventRegistrationStatus.closed)
+        .returning(Event.id)
+        .execution_options(synchronize_session=False)
+    ).scalars())
+
+
+def end_finished_events(db: Session, now: datetime, batch_size: int) -> tuple[int, int]:
+    """End a batch of finished events and mark their accepted audience absent.
+
+    Both UPDATEs run as one statement: the events UPDATE ... RETURNING id is
+    a CTE feeding the participants UPDATE. Returns (events, participants).
+    """
+    ended = (
+        update(Event)
+        .where(Event.id.in_(_due_events(
+            "to_end",
+            Event.status == EventStatus.published,
+            Event.end_datetime < now,
+            batch_size=batch_size,
+        )))
+        .values(status=EventStatus.ended)
+        .returning(Event.id)
+        .cte("ended")
+    )
+    absent = (
+        update(EventParticipant)
+        .where(
+            EventParticipant.event_id.in_(select(ended.c.id)),
+            EventParticipant.role.in_(AUDIENCE_ROLES),
+            EventParticipant.status == EventParticipantStatus.accepted,
+        )
+        .values(status=EventParticipantStatus.absent)
+        .returning(EventParticipant.id)
+        .cte("absent")
+    )
+    row = db.execute(
+        select(
+            select(func.count()).select_from(ended).scalar_subquery(),
+            select(func.count()).select_from(absent).scalar_subquery(),
+        )
+    ).one()
+    return int(row[0]), int(row[1])
+
+
+def run_event_transitions(db: Session, batch_size: int = 500, max_events: int | None = None) -> dict:
+    """Close registration for started events; end finished events and mark
+    accepted audience members who never checked in as absent.
+
+    Returns how many rows each transition moved. Work is committed per batch
+    of `batch_size` events; `max_events` caps each transition for one run.
+    """
+    now = datetime.now(timezone.utc)
+    counts = {"registration_closed": 0, "events_ended": 0, "participants_absent": 0}
+
+    def next_size(done: int) -> int:
+        return batch_size if max_events is None else min(batch_size, max_events - done)
+
+    while next_size(counts["registration_closed"]) > 0:
+        size = next_size(counts["registration_closed"])
+        closed = close_started_registrations(db, now, size)
+        db.commit()
+        counts["registration_closed"] += len(closed)
+        if len(closed) < size:
+            break
+
+    while next_size(counts["events_ended"]) > 0:
+        size = next_size(counts["events_ended"])
+        events, participants = end_finished_events(db, now, size)
+        db.commit()
+        counts["events_ended"] += events
+        counts["participants_absent"] += participants
+        if events < size:
+            break
+
+    if any(counts.values()):
+        logger.info(f"Event transitions: {counts}")
+    return counts
+
+
+def event_transition_backlog(db: Session) -> dict:
+    now = datetime.now(timezone.utc)
+    to_close = db.query(func.count(Event.id)).filter(
+        Event.status == EventStatus.published,
+        Event.start_datetime <= now,
+        Event.registration_status == EventRegistrationStatus.opened,
+    ).scalar() or 0
+    to_end = db.query(func.count(Event.id)).filter(
+        Event.status == EventStatus.published,
+        Event.end_datetime < now,
+    ).scalar() or 0
+    return {"registration_to_close": int(to_close), "events_to_end": int(to_end)}
+
+
+def process_due_reminders(
+    db: Session,
+    user_id: uuid.UUID | None = None,
+    batch_size: int = 200,
+    max_reminders: int | None = None,
+) -> list[uuid.UUID]:
+    """Send due reminders (for every user, or only `user_id`). Returns the
+    ids of reminders processed by this call.
+
+    Each batch is claimed with `UPDATE ... WHERE is_sent = false RETURNING`,
+    so concurrent runs never send the same reminder twice. The claim,
+    notifications and queued emails commit together.
+    """
+    from app.services.sse_manager import sse_manager
+
+    now = datetime.now(timezone.utc)
+    processed: list[uuid.UUID] = []
+    cursor = None
+    while max_reminders is None or len(processed) < max_reminders:
+        size = batch_size if max_reminders is None else min(batch_size, max_reminders - len(processed))
+        q = (
+            select(EventReminder.id, EventReminder.remind_at)
+            .where(EventReminder.is_sent == False, EventReminder.remind_at <= now)
+            .order_by(EventReminder.remind_at, EventReminder.id)
+            .limit(size)
+        )
+        if user_id is not None:
+            q = q.where(EventReminder.user_id == user_id)
+        if cursor is not None:
+            q = q.where(tuple_(EventReminder.remind_at, EventReminder.id) > cursor)
+        page = db.execute(q).all()
+        if not page:
+            break
+        cursor = (page[-1].remind_at, page[-1].id)
+
+        claimed = db.execute(
+            update(EventReminder)
+            .where(EventReminder.id.in_([r.id for r in page]), EventReminder.is_sent == False)
+            .values(is_sent=True, sent_at=now)
+            .returning(EventReminder.id, EventReminder.user_id, EventReminder.event_id, EventReminder.option)
+            .execution_options(synchronize_session=False)
+        ).all()
+        if not claimed:
+            db.commit()
+            continue
+
+        events = {e.id: e for e in db.query(Event).filter(Event.id.in_({c.event_id for c in claimed})).all()}
+        emails = dict(db.query(User.id, User.email).filter(User.id.in_({c.user_id for c in claimed})).all())
+        rows = []
+        for c in claimed:
+            event = events.get(c.event_id)
+            if event is None:
+                # Event gone; the reminder is just marked sent
+                continue
+            rows.append({
+                "recipient_id": c.user_id,
+                "actor_id": c.user_id,
+                "type": NotificationType.event,
+                "content": f"Reminder: '{event.title}' starts at {event.start_datetime}",
+                "link_url": f"/main/events/{event.id}",
+            })
+            if emails.get(c.user_id):
+                send_event_reminder_email(email=emails[c.user_id], event=event, when_label=c.option, db=db)
+        # One multi-row INSERT ... RETURNING in the claim's transaction, one batched publish after it
+        notifications = NotificationService.add_notifications(db, rows)
+        db.commit()
+
+        sse_manager.publish_notifications(notifications)
+        processed.extend(c.id for c in claimed)
+
+    return processed
+
+
+def reminder_backlog(db: Session) -> dict:
+    now = datetime.now(timezone.utc)
+    due = db.query(func.count(EventReminder.id)).filter(
+        EventReminder.is_sent == False,
+        EventReminder.remind_at <= now,
+    ).scalar() or 0
+    return {"reminders_due": int(due)}
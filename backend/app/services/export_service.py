@@ -0,0 +1,195 @@
+"""
+Streaming exports (CSV, NDJSON, Parquet) for admin and organizer downloads.
+
+Rows are read through a server-side cursor (`yield_per`) and encoded batch by
+batch, so memory stays flat regardless of table size and the first bytes are
+sent as soon as the first batch arrives. Any format can be gzipped on the fly.
+
+Parquet requires the optional `pyarrow` package.
+"""
+
+import csv
+import enum
+import io
+import json
+import logging
+import uuid
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Callable, Iterable, Iterator, Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+EXPORT_FORMAT_PATTERN = "^(csv|ndjson|parquet)$"
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Flush encoded output once this much is buffered
+CHUNK_BYTES = 64 * 1024
+
+RowFormatter = Callable[[Sequence], Sequence]
+
+
+def _plain(value):
+    """Enum/UUID/datetime values as their JSON-friendly form"""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def iter_row_batches(db: Session, stmt: Select, format_row: RowFormatter, batch_size: int = 1000) -> Iterator[list[list]]:
+    """Execute stmt with a server-side cursor and yield formatted rows per batch"""
+    result = db.execute(stmt, execution_options={"yield_per": batch_size})
+    try:
+        for partition in result.partitions():
+            yield [[_plain(v) for v in format_row(row)] for row in partition]
+    finally:
+        result.close()
+
+
+def _csv_chunks(headers: Sequence[str], batches: Iterable[list[list]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for batch in batches:
+        writer.writerows(["" if v is None else v for v in row] for row in batch)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(headers: Sequence[str], batches: Iterable[list[list]]) -> Iterator[bytes]:
+    for batch in batches:
+        lines = [json.dumps(dict(zip(headers, row)), default=str) for row in batch]
+        if lines:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _ChunkSink:
+    """Write-only file object that hands back what has been written so far"""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_chunks(headers: Sequence[str], batches: Iterable[list[list]]) -> Iterator[bytes]:
+    # One row group per batch; every column is exported as nullable text
+    schema = pa.schema([(h, pa.string()) for h in headers])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    try:
+        for batch in batches:
+            if not batch:
+                continue
+            columns = [
+                pa.array([None if row[i] is None else str(row[i]) for row in batch], type=pa.string())
+                for i in range(len(headers))
+            ]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(
+    db: Session,
+    stmt: Select,
+    headers: Sequence[str],
+    format_row: RowFormatter,
+    fmt: str = "csv",
+    compress: bool = False,
+    batch_size: int = 1000,
+) -> Iterator[bytes]:
+    """Encoded export body as a byte-chunk generator"""
+    batches = iter_row_batches(db, stmt, format_row, batch_size)
+    if fmt == "ndjson":
+        chunks = _ndjson_chunks(headers, batches)
+    elif fmt == "parquet":
+        chunks = _parquet_chunks(headers, batches)
+    else:
+        chunks = _csv_chunks(headers, batches)
+    return _gzip(chunks) if compress else chunks
+
+
+def export_response(
+    db: Session,
+    stmt: Select,
+    headers: Sequence[str],
+    format_row: RowFormatter,
+    filename: str,
+    fmt: str = "csv",
+    compress: bool = False,
+) -> StreamingResponse:
+    """StreamingResponse for an export; `filename` is given without extension"""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format '{fmt}'")
+    if fmt == "parquet" and pa is None:
+        raise HTTPException(status_code=400, detail="Parquet export is not available on this server (pyarrow is not installed)")
+
+    filename = f"{filename}.{fmt}"
+    media_type = MEDIA_TYPES[fmt]
+    if compress:
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        stream_export(db, stmt, headers, format_row, fmt=fmt, compress=compress),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -0,0 +1,193 @@
+"""
+Image derivatives for avatars, logos and covers.
+
+An uploaded image is decoded once with Pillow and resized to the fixed
+sizes of its folder's `DerivativeSpec`, each encoded as WebP:
+
+- avatars and logos: square crops (64, 128, 256 px)
+- covers: scaled to a width (480, 960, 1600 px), keeping the aspect ratio
+
+Sizes larger than the source are skipped (the smallest is always produced).
+The original and its derivatives are stored concurrently, and the size-keyed
+URL map is saved next to the original URL (`avatar_variants`,
+`cover_variants`, `logo_variants`) so list responses can pick a small image.
+
+Images stored before derivatives existed are processed by
+`backfill_image_derivatives` (`python -m app.database.backfill_image_derivatives`).
+"""
+
+import asyncio
+import io
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import anyio
+from fastapi import HTTPException, UploadFile
+from PIL import Image, ImageOps
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.event_model import Event
+from app.models.organization_model import Organization
+from app.models.profile_model import Profile
+from app.services import storage_service
+
+logger = logging.getLogger(__name__)
+
+WEBP_QUALITY = 80
+# Decompression bomb guard: refuse images over this many pixels
+MAX_IMAGE_PIXELS = 40_000_000
+
+
+@dataclass(frozen=True)
+class DerivativeSpec:
+    sizes: tuple[int, ...]
+    square: bool  # crop to a square (avatars, logos) or scale to a width (covers)
+
+
+SQUARE = DerivativeSpec((64, 128, 256), square=True)
+WIDE = DerivativeSpec((480, 960, 1600), square=False)
+
+DERIVATIVE_SPECS: dict[str, DerivativeSpec] = {
+    "avatars": SQUARE,
+    "event_logos": SQUARE,
+    "org_logos": SQUARE,
+    "covers": WIDE,
+    "event_covers": WIDE,
+    "org_covers": WIDE,
+}
+
+
+@dataclass(frozen=True)
+class StoredImage:
+    url: str
+    variants: dict[str, str]
+
+
+def render_derivatives(data: bytes, spec: DerivativeSpec) -> dict[int, bytes]:
+    """WebP bytes per size; raises ValueError if `data` is not a readable image"""
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise ValueError("image too large")
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(str(e)) from e
+    image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+    source = min(image.size) if spec.square else image.width
+    sizes = [s for s in spec.sizes if s <= source] or [min(spec.sizes)]
+    out = {}
+    for size in sizes:
+        if spec.square:
+            resized = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        else:
+            resized = image.resize((size, max(1, round(image.height * size / image.width))), Image.LANCZOS)
+        buf = io.BytesIO()
+        resized.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+        out[size] = buf.getvalue()
+    return out
+
+
+async def _render(data: bytes, folder: str) -> dict[int, bytes]:
+    # CPU-bound; keep it off the event loop
+    try:
+        return await anyio.to_thread.run_sync(render_derivatives, data, DERIVATIVE_SPECS[folder])
+    except ValueError:
+        raise HTTPException(status_code=415, detail="Could not read image")
+
+
+def _put_derivatives(rendered: dict[int, bytes], folder: str) -> list:
+    storage = storage_service.storage
+    return [storage.put(io.BytesIO(webp), folder, f"{size}.webp", "image/webp") for size, webp in rendered.items()]
+
+
+async def save_image(file: UploadFile, folder: str) -> StoredImage:
+    """Validate and store an uploaded image together with its derivatives"""
+    policy = storage_service.UPLOAD_POLICIES[folder]
+    content_type, _ = await storage_service.inspect_upload(file, policy)
+    rendered = await _render(await file.read(), folder)
+    await file.seek(0)
+    original, *urls = await asyncio.gather(
+        storage_service.storage.put(file.file, folder, file.filename or "upload", content_type),
+        *_put_derivatives(rendered, folder),
+    )
+    return StoredImage(url=original, variants={str(size): url for size, url in zip(rendered, urls)})
+
+
+# (model, key column, URL column, variants column, storage folder) of every stored image
+IMAGE_COLUMNS = [
+    (Profile, Profile.id, Profile.avatar_url, Profile.avatar_variants, "avatars"),
+    (Profile, Profile.id, Profile.cover_url, Profile.cover_variants, "covers"),
+    (Event, Event.id, Event.logo_url, Event.logo_variants, "event_logos"),
+    (Event, Event.id, Event.cover_url, Event.cover_variants, "event_covers"),
+    (Organization, Organization.id, Organization.logo_url, Organization.logo_variants, "org_logos"),
+    (Organization, Organization.id, Organization.cover_url, Organization.cover_variants, "org_covers"),
+]
+
+
+async def _derive_from_url(url: str, folder: str) -> Optional[dict[str, str]]:
+    try:
+        rendered = await _render(await storage_service.storage.fetch(url, settings.UPLOAD_MAX_IMAGE_BYTES), folder)
+        urls = await asyncio.gather(*_put_derivatives(rendered, folder))
+        return {str(size): url for size, url in zip(rendered, urls)}
+    except Exception as e:
+        logger.warning(f"No derivatives for {url}: {getattr(e, 'detail', e)}")
+        return None
+
+
+def backfill_image_derivatives(
+    db: Session,
+    batch_size: int = 50,
+    concurrency: int = 8,
+    limit: Optional[int] = None,
+) -> dict:
+    """Generate derivatives for stored images that have none.
+
+    Rows are walked in key order per image column; each batch is fetched and
+    resized concurrently (at most `concurrency` at a time) and committed
+    together. Images that cannot be fetched or decoded get an empty map so
+    later runs skip them; clear the column to retry.
+    """
+    stats = {"processed": 0, "derived": 0, "failed": 0}
+
+    async def derive_all(rows, folder):
+        limiter = asyncio.Semaphore(concurrency)
+
+        async def derive(url: str):
+            async with limiter:
+                return await _derive_from_url(url, folder)
+
+        return await asyncio.gather(*(derive(url) for _, url in rows))
+
+    for model, key, url_column, variants_column, folder in IMAGE_COLUMNS:
+        cursor = None
+        while limit is None or stats["processed"] < limit:
+            size = batch_size if limit is None else min(batch_size, limit - stats["processed"])
+            q = db.query(key, url_column).filter(url_column.isnot(None), url_column != "", variants_column.is_(None))
+            if cursor is not None:
+                q = q.filter(key > cursor)
+            rows = q.order_by(key).limit(size).all()
+            if not rows:
+                break
+            cursor = rows[-1][0]
+
+            results = asyncio.run(derive_all(rows, folder))
+            for (row_id, url), variants in zip(rows, results):
+                # Only if the image was not replaced meanwhile
+                db.execute(
+                    update(model)
+                    .where(key == row_id, url_column == url)
+                    .values({variants_column.key: variants or {}})
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+
+            stats["processed"] += len(rows)
+            stats["derived"] += sum(1 for v in results if v)
+            stats["failed"] += sum(1 for v in results if not v)
+            logger.info(f"Image derivatives ({folder}): {stats['processed']} processed, {stats['failed']} failed")
+    return stats
@@ -0,0 +1,184 @@
+"""
+Admin notification broadcasts as durable background jobs.
+
+The broadcast endpoint records a `NotificationBroadcast` with its target,
+content and recipient total, and returns right away. The scheduler's
+`notification_broadcasts` job (nudged by the endpoint, so delivery starts
+immediately) claims queued broadcasts, and running ones whose lease has
+expired, with FOR UPDATE SKIP LOCKED. Recipients are walked in user-id
+order, NOTIFICATION_BULK_CHUNK_SIZE at a time: each chunk is one multi-row
+insert, committed together with the job's `sent` counter, the last
+recipient id and a renewed lease, and then published to SSE as one batch.
+A broadcast interrupted by a restart is picked up where its last committed
+chunk ended. Progress is read back from the row, so any worker can report it.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.notification_model import NotificationBroadcast, NotificationType
+from app.models.user_model import Role, User, user_roles
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def recipients_query(target_role: str | None = None, target_user_id: uuid.UUID | None = None) -> Select:
+    """User ids a broadcast goes to: one user, everyone with a role, or everyone"""
+    query = select(User.id)
+    if target_user_id:
+        query = query.where(User.id == target_user_id)
+    elif target_role:
+        query = (
+            query
+            .join(user_roles, user_roles.c.user_id == User.id)
+            .join(Role, Role.id == user_roles.c.role_id)
+            .where(func.lower(Role.name) == func.lower(target_role))
+        )
+    return query
+
+
+def count_query(target_role: str | None = None, target_user_id: uuid.UUID | None = None) -> Select:
+    return select(func.count()).select_from(recipients_query(target_role, target_user_id).subquery())
+
+
+def _lease(now: datetime) -> datetime:
+    return now + timedelta(seconds=settings.NOTIFICATION_BROADCAST_LEASE_SECONDS)
+
+
+def _claim(db: Session, now: datetime):
+    """Take the oldest queued (or abandoned running) broadcast; commits the claim"""
+    due = (
+        select(NotificationBroadcast.id)
+        .where(
+            (NotificationBroadcast.status == QUEUED)
+            | ((NotificationBroadcast.status == RUNNING) & (NotificationBroadcast.lease_until <= now))
+        )
+        .order_by(NotificationBroadcast.created_at, NotificationBroadcast.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .cte("due_broadcasts")
+        .prefix_with("MATERIALIZED", dialect="postgresql")
+    )
+    claimed = db.execute(
+        update(NotificationBroadcast)
+        .where(NotificationBroadcast.id.in_(select(due.c.id)))
+        .values(
+            status=RUNNING,
+            started_at=func.coalesce(NotificationBroadcast.started_at, now),
+            lease_until=_lease(now),
+            attempts=NotificationBroadcast.attempts + 1,
+        )
+        .returning(
+            NotificationBroadcast.id,
+            NotificationBroadcast.created_by_id,
+            NotificationBroadcast.content,
+            NotificationBroadcast.link_url,
+            NotificationBroadcast.target_role,
+            NotificationBroadcast.target_user_id,
+            NotificationBroadcast.sent,
+            NotificationBroadcast.last_recipient_id,
+            NotificationBroadcast.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    ).first()
+    db.commit()
+    return claimed
+
+
+def _set(db: Session, job, **values) -> bool:
+    """Update a claimed broadcast unless another worker has re-claimed it since"""
+    result = db.execute(
+        update(NotificationBroadcast)
+        .where(
+            NotificationBroadcast.id == job.id,
+            NotificationBroadcast.status == RUNNING,
+            NotificationBroadcast.attempts == job.attempts,
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def _deliver(db: Session, job, size: int) -> str:
+    """Send the rest of a claimed broadcast; returns its final status"""
+    if job.attempts > settings.NOTIFICATION_BROADCAST_MAX_ATTEMPTS:
+        _set(db, job, status=FAILED, error=f"Abandoned after {job.attempts - 1} attempts", finished_at=datetime.now(timezone.utc))
+        db.commit()
+        return FAILED
+
+    recipients = recipients_query(job.target_role, job.target_user_id).order_by(User.id)
+    last_id, sent = job.last_recipient_id, job.sent
+    try:
+        while True:
+            query = recipients if last_id is None else recipients.where(User.id > last_id)
+            user_ids = db.scalars(query.limit(size)).all()
+            if not user_ids:
+                break
+            rows = NotificationService.rows_for(user_ids, job.created_by_id, NotificationType.system, job.content, job.link_url)
+            sent += len(rows)
+            last_id = user_ids[-1]
+            if not _set(db, job, sent=sent, last_recipient_id=last_id, lease_until=_lease(datetime.now(timezone.utc))):
+                db.rollback()
+                logger.warning(f"Notification broadcast {job.id} was re-claimed by another worker")
+                return RUNNING
+            # Notifications and progress commit together; SSE gets the chunk as one batch
+            NotificationService.create_notifications_bulk(db, rows, chunk_size=size)
+
+        _set(db, job, status=COMPLETED, lease_until=None, finished_at=datetime.now(timezone.utc))
+        db.commit()
+        logger.info(f"Notification broadcast {job.id} sent to {sent} users")
+        return COMPLETED
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Notification broadcast {job.id} failed: {e}")
+        _set(db, job, status=FAILED, error=str(e)[:1000], lease_until=None, finished_at=datetime.now(timezone.utc))
+        db.commit()
+        return FAILED
+
+
+def process_notification_broadcasts(db: Session, chunk_size: int | None = None) -> dict:
+    """Deliver queued and abandoned broadcasts, one claim at a time, until none is due"""
+    size = chunk_size or settings.NOTIFICATION_BULK_CHUNK_SIZE
+    stats = {"claimed": 0, COMPLETED: 0, FAILED: 0}
+    while (job := _claim(db, datetime.now(timezone.utc))) is not None:
+        stats["claimed"] += 1
+        status = _deliver(db, job, size)
+        if status in stats:
+            stats[status] += 1
+    return stats
+
+
+def notification_broadcast_backlog(db: Session) -> dict:
+    now = datetime.now(timezone.utc)
+    due = db.scalar(
+        select(func.count(NotificationBroadcast.id)).where(
+            (NotificationBroadcast.status == QUEUED)
+            | ((NotificationBroadcast.status == RUNNING) & (NotificationBroadcast.lease_until <= now))
+        )
+    )
+    return {"notification_broadcasts_due": int(due or 0)}
+
+
+def run_pending_broadcasts(session_factory=SessionLocal) -> None:
+    """Start delivery right after a broadcast is queued instead of on the next scheduler tick"""
+    db = session_factory()
+    try:
+        process_notification_broadcasts(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Notification broadcast run failed: {e}")
+    finally:
+        db.close()
@@ -1,6 +1,10 @@
 
+from sqlalchemy import insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from typing import Iterable
 import uuid
+from app.core.config import settings
 from app.models.notification_model import Notification, NotificationType
 
 class NotificationService:
@@ -25,23 +29,110 @@ class NotificationService:
         db.commit()
         db.refresh(notif)
         
-        # Broadcast to SSE if user is connected
-        import asyncio
+        # Publish once; every worker delivers to the streams it holds
         from app.services.sse_manager import sse_manager
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        try:
-            loop = asyncio.get_event_loop()
-            if loop.is_running():
-                asyncio.create_task(sse_manager.send_to_user(recipient_id, notif))
-        except RuntimeError:
-            # No event loop running, skip SSE broadcast
-            logger.warning(f"Skipping SSE broadcast for notification {notif.id} - no running event loop")
-            pass
+        sse_manager.publish_notification(notif)
         
         return notif
 
+    @staticmethod
+    async def create_notification_async(
+        db: AsyncSession,
+        recipient_id: uuid.UUID,
+        actor_id: uuid.UUID,
+        type: NotificationType,
+        content: str,
+        link_url: str = None
+    ) -> Notification:
+        """create_notification for `async def` handlers"""
+        notifications = await NotificationService.create_notifications_async(db, [recipient_id], actor_id, type, content, link_url)
+        return notifications[0]
+
+    @staticmethod
+    async def create_notifications_async(
+        db: AsyncSession,
+        recipient_ids: list[uuid.UUID],
+        actor_id: uuid.UUID,
+        type: NotificationType,
+        content: str,
+        link_url: str = None
+    ) -> list:
+        """The same notification for every recipient, committed together, then published"""
+        rows = NotificationService.rows_for(recipient_ids, actor_id, type, content, link_url)
+        notifications = await db.run_sync(NotificationService.add_notifications, rows)
+        await db.commit()
+
+        from app.services.sse_manager import sse_manager
+        await sse_manager.publish_notifications_async(notifications)
+        return notifications
+
+    @staticmethod
+    def rows_for(
+        recipient_ids: Iterable[uuid.UUID],
+        actor_id: uuid.UUID,
+        type: NotificationType,
+        content: str,
+        link_url: str = None
+    ) -> list[dict]:
+        """`add_notifications` rows for one notification sent to several recipients"""
+        return [
+            {"recipient_id": rid, "actor_id": actor_id, "type": type, "content": content, "link_url": link_url}
+            for rid in recipient_ids
+        ]
+
+    @staticmethod
+    def add_notifications(db: Session, rows: list[dict], chunk_size: int | None = None) -> list:
+        """Insert notifications with one multi-row INSERT ... RETURNING per chunk; does not commit.
+
+        Each row has recipient_id, actor_id, type, content and optionally
+        link_url. Returns the inserted rows (with ids and created_at) for
+        `sse_manager.publish_notifications` once the caller has committed.
+        """
+        size = chunk_size or settings.NOTIFICATION_BULK_CHUNK_SIZE
+        table = Notification.__table__
+        created = []
+        for i in range(0, len(rows), size):
+            chunk = [{"id": uuid.uuid4(), "link_url": None, "is_read": False, **row} for row in rows[i:i + size]]
+            created.extend(db.execute(insert(table).values(chunk).returning(*table.c)).all())
+        return created
+
+    @staticmethod
+    def create_notifications_bulk(db: Session, rows: list[dict], chunk_size: int | None = None) -> list:
+        """`add_notifications`, one commit (with whatever else the session holds), one batched SSE publish"""
+        notifications = NotificationService.add_notifications(db, rows, chunk_size)
+        db.commit()
+
+        from app.services.sse_manager import sse_manager
+        sse_manager.publish_notifications(notifications)
+        return notifications
+
+    @staticmethod
+    def list_since(db: Session, user_id: uuid.UUID, last_event_id: uuid.UUID, limit: int) -> list[Notification] | None:
+        """Notifications newer than `last_event_id`, oldest first.
+
+        Returns None when the id is unknown or more than `limit` notifications
+        were missed, i.e. the client has to reload instead of replaying.
+        """
+        anchor = db.query(Notification.created_at).filter(
+            Notification.id == last_event_id,
+            Notification.recipient_id == user_id,
+        ).first()
+        if anchor is None:
+            return None
+        rows = (
+            db.query(Notification)
+            .filter(
+                Notification.recipient_id == user_id,
+                tuple_(Notification.created_at, Notification.id) > tuple_(anchor.created_at, last_event_id),
+            )
+            .order_by(Notification.created_at, Notification.id)
+            .limit(limit + 1)
+            .all()
+        )
+        if len(rows) > limit:
+            return None
+        return rows
+
     @staticmethod
     def get_unread_count(db: Session, user_id: uuid.UUID) -> int:
         return db.query(Notification).filter(
@@ -0,0 +1,174 @@
+"""
+Per-process cache of authenticated principals (user id, status, role names).
+
+`get_current_user` and `require_roles` resolve identity and roles from this
+cache, so a hit costs no database round trip: the route receives a User bound
+to its session with only `id` and `status` loaded, and any other attribute
+is loaded lazily on first access.
+
+Entries expire after PRINCIPAL_CACHE_TTL_SECONDS and the least recently used
+entry is evicted beyond PRINCIPAL_CACHE_MAX_SIZE. Changes to a user's status
+or roles (and user deletion) invalidate the entry when the session commits,
+whichever route made them. Other worker processes pick changes up when their
+entry expires.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user_model import Role, User, UserStatus
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = "principal_cache_invalidate"
+
+
+class Principal:
+    """What the auth dependencies need to know about a user"""
+
+    __slots__ = ("user_id", "status", "roles", "expires_at")
+
+    def __init__(self, user_id: uuid.UUID, status: UserStatus, roles: Optional[frozenset[str]], expires_at: float):
+        self.user_id = user_id
+        self.status = status
+        # None until a role check needs them
+        self.roles = roles
+        self.expires_at = expires_at
+
+    def bind(self, db: Session) -> User:
+        """A persistent User in `db` without querying; other columns load lazily"""
+        user = User(id=self.user_id, status=self.status)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+
+class PrincipalCache:
+    """Thread-safe TTL + LRU map of user id -> Principal"""
+
+    def __init__(self, ttl_seconds: float | None = None, max_size: int | None = None):
+        self.ttl_seconds = settings.PRINCIPAL_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.max_size = settings.PRINCIPAL_CACHE_MAX_SIZE if max_size is None else max_size
+        self._entries: OrderedDict[uuid.UUID, Principal] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_size > 0
+
+    def get(self, user_id: uuid.UUID) -> Optional[Principal]:
+        with self._lock:
+            principal = self._entries.get(user_id)
+            if principal is None or principal.expires_at <= time.monotonic():
+                if principal is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return principal
+
+    def put(self, user: User, roles: Iterable[str] | None = None) -> Optional[Principal]:
+        if not self.enabled:
+            return None
+        principal = Principal(
+            user.id,
+            user.status,
+            frozenset(roles) if roles is not None else None,
+            time.monotonic() + self.ttl_seconds,
+        )
+        with self._lock:
+            self._entries[user.id] = principal
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return principal
+
+    def set_roles(self, user_id: uuid.UUID, roles: Iterable[str]) -> None:
+        with self._lock:
+            principal = self._entries.get(user_id)
+            if principal is not None:
+                principal.roles = frozenset(roles)
+
+    def invalidate(self, user_ids: Iterable[uuid.UUID]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+            }
+
+
+principal_cache = PrincipalCache()
+
+
+# --- Invalidation on commit ---
+
+def _changed(obj, attr: str) -> bool:
+    return inspect(obj).attrs[attr].history.has_changes()
+
+
+def _collect_invalidations(session: Session, flush_context) -> None:
+    pending: set = session.info.setdefault(_PENDING_KEY, set())
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            pending.add(obj.id)
+        elif isinstance(obj, Role):
+            pending.add("*")
+    for obj in session.dirty:
+        if isinstance(obj, User) and (_changed(obj, "status") or _changed(obj, "roles")):
+            pending.add(obj.id)
+        elif isinstance(obj, Role) and _changed(obj, "users"):
+            history = inspect(obj).attrs.users.history
+            pending.update(u.id for u in (*history.added, *history.deleted))
+
+
+def _apply_invalidations(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    if "*" in pending:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate(pending)
+
+
+def _discard_invalidations(session: Session, previous_transaction=None) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# after_flush still sees the flushed changes; the cache is only touched once
+# they are committed, so a concurrent request cannot re-cache the old state.
+event.listen(Session, "after_flush", _collect_invalidations)
+event.listen(Session, "after_commit", _apply_invalidations)
+event.listen(Session, "after_soft_rollback", _discard_invalidations)
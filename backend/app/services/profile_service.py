@@ -1,9 +1,17 @@
-from sqlalchemy.orm import Session
+import anyio
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import select, literal, union_all
+from sqlalchemy.sql import func
 import uuid
+from typing import Iterable
 from fastapi import UploadFile
 from app.models.profile_model import Profile, ProfileVisibility
-from app.schemas.profile_schema import ProfileCreate, ProfileUpdate
-from app.services import cloudinary_service
+from app.models.user_model import User
+from app.models.review_model import Review
+from app.models.follows_model import Follow
+from app.models.event_model import EventParticipant, EventParticipantRole, EventParticipantStatus
+from app.schemas.profile_schema import ProfileCreate, ProfileUpdate, ProfileResponse
+from app.services import image_service, profile_stats_service
 
 
 def get_profile(db: Session, user_id: uuid.UUID):
@@ -22,8 +30,6 @@ def update_profile(
     db: Session,
     user_id: uuid.UUID,
     profile: ProfileUpdate,
-    avatar: UploadFile | None = None,
-    cover_picture: UploadFile | None = None,
 ):
     db_profile = get_profile(db, user_id)
     if db_profile:
@@ -32,16 +38,6 @@ def update_profile(
         for key, value in update_data.items():
             setattr(db_profile, key, value)
 
-        # Handle avatar upload
-        if avatar:
-            avatar_url = cloudinary_service.upload_file(avatar, "avatars")
-            db_profile.avatar_url = avatar_url
-
-        # Handle cover picture upload
-        if cover_picture:
-            cover_url = cloudinary_service.upload_file(cover_picture, "covers")
-            db_profile.cover_url = cover_url
-
         db.commit()
         db.refresh(db_profile)
     return db_profile
@@ -59,12 +55,15 @@ def list_profiles(db: Session, visibility: str | None = None):
     return query.all()
 
 
+# Called from sync handlers, i.e. a threadpool worker: queries stay off the
+# event loop, and only the (async) upload is handed to it.
 def update_avatar(db: Session, user_id: uuid.UUID, avatar: UploadFile):
     db_profile = get_profile(db, user_id)
     if not db_profile:
         return None
-    avatar_url = cloudinary_service.upload_file(avatar, "avatars")
-    db_profile.avatar_url = avatar_url
+    image = anyio.from_thread.run(image_service.save_image, avatar, "avatars")
+    db_profile.avatar_url = image.url
+    db_profile.avatar_variants = image.variants
     db.commit()
     db.refresh(db_profile)
     return db_profile
@@ -74,8 +73,181 @@ def update_cover_picture(db: Session, user_id: uuid.UUID, cover_picture: UploadF
     db_profile = get_profile(db, user_id)
     if not db_profile:
         return None
-    cover_url = cloudinary_service.upload_file(cover_picture, "covers")
-    db_profile.cover_url = cover_url
+    image = anyio.from_thread.run(image_service.save_image, cover_picture, "covers")
+    db_profile.cover_url = image.url
+    db_profile.cover_variants = image.variants
     db.commit()
     db.refresh(db_profile)
-    return db_profile
\ No newline at end of file
+    return db_profile
+
+
+# --- Profile enrichment ---
+# Aggregates shown on profile cards, loaded for a whole page at once instead of
+# one round trip per profile per aggregate.
+
+def sponsor_tier_for_count(count: int) -> str | None:
+    if count >= 10:
+        return "Gold"
+    elif count >= 5:
+        return "Silver"
+    elif count >= 1:
+        return "Bronze"
+    return None
+
+
+def profile_card_options():
+    """Loader options for relationships serialized by ProfileResponse"""
+    return [
+        selectinload(Profile.tags),
+        selectinload(Profile.skills),
+        selectinload(Profile.user).selectinload(User.educations),
+        selectinload(Profile.user).selectinload(User.job_experiences),
+    ]
+
+
+def _empty_stats() -> dict:
+    return {
+        "average_rating": 0.0,
+        "reviews_count": 0,
+        "sponsor_count": 0,
+        "sponsor_tier": None,
+        "followers_count": 0,
+        "following_count": 0,
+    }
+
+
+def load_profile_stats(db: Session, user_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, dict]:
+    """Review, sponsor and follow aggregates for many users.
+
+    Reads the denormalized profile_stats rows in one indexed lookup; users
+    that have no row yet are computed from source tables.
+    """
+    ids = list(dict.fromkeys(uid for uid in user_ids if uid is not None))
+    stats = {}
+    for uid, row in profile_stats_service.get_profile_stats(db, ids).items():
+        stats[uid] = {
+            "average_rating": row.average_rating,
+            "reviews_count": row.reviews_count,
+            "sponsor_count": row.sponsor_count,
+            "sponsor_tier": sponsor_tier_for_count(row.sponsor_count),
+            "followers_count": row.followers_count,
+            "following_count": row.following_count,
+        }
+    missing = [uid for uid in ids if uid not in stats]
+    if missing:
+        stats.update(compute_profile_stats(db, missing))
+    return stats
+
+
+def compute_profile_stats(db: Session, user_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, dict]:
+    """Aggregates from source tables, one grouped query per aggregate.
+
+    Users without rows get zeroed stats.
+    """
+    ids = list(dict.fromkeys(uid for uid in user_ids if uid is not None))
+    stats = {uid: _empty_stats() for uid in ids}
+    if not ids:
+        return stats
+
+    review_rows = (
+        db.query(Review.reviewee_id, func.avg(Review.rating), func.count(Review.id))
+        .filter(Review.reviewee_id.in_(ids), Review.deleted_at.is_(None))
+        .group_by(Review.reviewee_id)
+        .all()
+    )
+    for uid, avg, cnt in review_rows:
+        stats[uid]["average_rating"] = float(avg or 0.0)
+        stats[uid]["reviews_count"] = int(cnt or 0)
+
+    sponsor_rows = (
+        db.query(EventParticipant.user_id, func.count(EventParticipant.id))
+        .filter(
+            EventParticipant.user_id.in_(ids),
+            EventParticipant.role == EventParticipantRole.sponsor,
+            EventParticipant.status == EventParticipantStatus.accepted,
+        )
+        .group_by(EventParticipant.user_id)
+        .all()
+    )
+    for uid, cnt in sponsor_rows:
+        stats[uid]["sponsor_count"] = int(cnt or 0)
+    for s in stats.values():
+        s["sponsor_tier"] = sponsor_tier_for_count(s["sponsor_count"])
+
+    followers = (
+        select(Follow.followee_id.label("uid"), literal("followers_count").label("kind"), func.count(Follow.id).label("n"))
+        .where(Follow.followee_id.in_(ids))
+        .group_by(Follow.followee_id)
+    )
+    following = (
+        select(Follow.follower_id.label("uid"), literal("following_count").label("kind"), func.count(Follow.id).label("n"))
+        .where(Follow.follower_id.in_(ids))
+        .group_by(Follow.follower_id)
+    )
+    for uid, kind, n in db.execute(union_all(followers, following)).all():
+        stats[uid][kind] = int(n or 0)
+
+    return stats
+
+
+def build_profile_response(p: Profile, stats: dict | None = None, **extra) -> ProfileResponse:
+    """ProfileResponse for a profile card using preloaded stats"""
+    s = stats or _empty_stats()
+    data = {
+        "id": p.id,
+        "user_id": p.user_id,
+        "full_name": p.full_name,
+        "bio": p.bio,
+        "title": p.title,
+        "availability": p.availability,
+        "avatar_url": p.avatar_url,
+        "cover_url": p.cover_url,
+        "avatar_variants": p.avatar_variants,
+        "cover_variants": p.cover_variants,
+        "linkedin_url": p.linkedin_url,
+        "github_url": p.github_url,
+        "instagram_url": p.instagram_url,
+        "twitter_url": p.twitter_url,
+        "website_url": p.website_url,
+        "visibility": p.visibility,
+        "tags": p.tags,
+        "skills": p.skills,
+        "educations": p.educations,
+        "job_experiences": p.job_experiences,
+        "average_rating": s["average_rating"],
+        "reviews_count": s["reviews_count"],
+        "followers_count": s["followers_count"],
+        "following_count": s["following_count"],
+        "sponsor_tier": s["sponsor_tier"],
+        "country": p.country,
+        "city": p.city,
+        "origin_country": p.origin_country,
+        "can_be_speaker": p.can_be_speaker,
+        "intents": p.intents,
+        "today_status": p.today_status,
+    }
+    data.update(extra)
+    return ProfileResponse.model_validate(data)
+
+
+def build_profile_responses(db: Session, profiles: list[Profile], **extra_by_user) -> list[ProfileResponse]:
+    """Enrich a page of profiles with a fixed number of queries.
+
+    extra_by_user maps a response field to a callable taking the profile,
+    e.g. email=lambda p: p.user.email.
+    """
+    stats = load_profile_stats(db, [p.user_id for p in profiles])
+    return [
+        build_profile_response(p, stats.get(p.user_id), **{k: fn(p) for k, fn in extra_by_user.items()})
+        for p in profiles
+    ]
+
+
+def attach_profile_stats(db: Session, profile: Profile) -> Profile:
+    """Set the non-column aggregates read by ProfileResponse on a single ORM profile"""
+    s = load_profile_stats(db, [profile.user_id]).get(profile.user_id) or _empty_stats()
+    setattr(profile, "reviews_count", s["reviews_count"])
+    setattr(profile, "followers_count", s["followers_count"])
+    setattr(profile, "following_count", s["following_count"])
+    setattr(profile, "sponsor_tier", s["sponsor_tier"])
+    return profile
@@ -0,0 +1,285 @@
+"""
+Incrementally maintained profile aggregates (`profile_stats`).
+
+Counters are adjusted inside the same flush that changes their source rows,
+so they commit or roll back together with the change. Every new user gets
+a zeroed row, so profile reads are a single primary-key lookup:
+- reviews:       reviews_count / rating_sum of the reviewee (soft delete via deleted_at)
+- follows:       followers_count of the followee, following_count of the follower
+- participants:  sponsor_count while role == sponsor and status == accepted
+
+Hooking the session rather than individual routes covers every code path
+that accepts a sponsor (organizer, admin, booking and invitation flows).
+Bulk `Query.update()/delete()` bypass the hook; `rebuild_profile_stats`
+recomputes the counters from source and is the reconciliation job.
+"""
+
+import logging
+import uuid
+from collections import Counter, defaultdict
+from typing import Iterable
+
+from sqlalchemy import event, inspect, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import NO_VALUE
+from sqlalchemy.sql import func
+
+from app.models.event_model import EventParticipant, EventParticipantRole, EventParticipantStatus
+from app.models.follows_model import Follow
+from app.models.profile_model import Profile, ProfileStats
+from app.models.review_model import Review
+from app.models.user_model import User
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ("reviews_count", "rating_sum", "followers_count", "following_count", "sponsor_count")
+
+_PENDING_KEY = "profile_stats_deltas"
+
+
+def _is(value, member) -> bool:
+    return value == member or value == member.value
+
+
+def _review_contribution(v: dict) -> dict:
+    if v["deleted_at"] is not None or v["reviewee_id"] is None or v["rating"] is None:
+        return {}
+    return {v["reviewee_id"]: {"reviews_count": 1, "rating_sum": int(v["rating"])}}
+
+
+def _follow_contribution(v: dict) -> dict:
+    out = defaultdict(dict)
+    if v["follower_id"] is not None:
+        out[v["follower_id"]]["following_count"] = 1
+    if v["followee_id"] is not None:
+        out[v["followee_id"]]["followers_count"] = 1
+    return out
+
+
+def _participant_contribution(v: dict) -> dict:
+    if v["user_id"] is None:
+        return {}
+    if _is(v["role"], EventParticipantRole.sponsor) and _is(v["status"], EventParticipantStatus.accepted):
+        return {v["user_id"]: {"sponsor_count": 1}}
+    return {}
+
+
+# model -> (watched attributes, contribution of one row to per-user counters)
+_TRACKED = {
+    Review: (("reviewee_id", "rating", "deleted_at"), _review_contribution),
+    Follow: (("follower_id", "followee_id"), _follow_contribution),
+    EventParticipant: (("user_id", "role", "status"), _participant_contribution),
+}
+
+
+def _current_values(obj, attrs) -> dict:
+    state = inspect(obj)
+    values = {}
+    for attr in attrs:
+        hist = state.attrs[attr].history
+        values[attr] = hist.added[0] if hist.added else (hist.unchanged[0] if hist.unchanged else None)
+    return values
+
+
+def _committed_values(session: Session, obj, attrs) -> dict:
+    """Values as stored in the database before this flush"""
+    state = inspect(obj)
+    values = {}
+    missing = []
+    for attr in attrs:
+        hist = state.attrs[attr].history
+        if hist.deleted:
+            values[attr] = hist.deleted[0]
+        elif hist.unchanged:
+            values[attr] = hist.unchanged[0]
+        elif state.committed_state.get(attr, NO_VALUE) is None:
+            values[attr] = None
+        else:
+            missing.append(attr)
+    if missing:
+        # Attribute was expired when it was changed/deleted; the row is not
+        # written yet, so read the old value straight from the table.
+        model = type(obj)
+        cols = [getattr(model, a) for a in missing]
+        row = session.connection().execute(select(*cols).where(model.id == obj.id)).first()
+        for attr, value in zip(missing, row or [None] * len(missing)):
+            values[attr] = value
+    return values
+
+
+def _accumulate(deltas: dict, contribution: dict, sign: int) -> None:
+    for uid, counters in contribution.items():
+        for col, n in counters.items():
+            deltas[uid][col] += sign * n
+
+
+def _collect_deltas(session: Session, flush_context, instances) -> None:
+    deltas = defaultdict(Counter)
+    for obj in session.new:
+        tracked = _TRACKED.get(type(obj))
+        if tracked:
+            attrs, contribution = tracked
+            _accumulate(deltas, contribution(_current_values(obj, attrs)), 1)
+    for obj in session.deleted:
+        tracked = _TRACKED.get(type(obj))
+        if tracked:
+            attrs, contribution = tracked
+            _accumulate(deltas, contribution(_committed_values(session, obj, attrs)), -1)
+    for obj in session.dirty:
+        tracked = _TRACKED.get(type(obj))
+        if not tracked:
+            continue
+        attrs, contribution = tracked
+        state = inspect(obj)
+        if not any(state.attrs[a].history.has_changes() for a in attrs):
+            continue
+        _accumulate(deltas, contribution(_committed_values(session, obj, attrs)), -1)
+        _accumulate(deltas, contribution(_current_values(obj, attrs)), 1)
+
+    # Overwrite rather than merge: leftovers belong to a flush that failed
+    session.info[_PENDING_KEY] = {uid: c for uid, c in deltas.items() if any(c.values())}
+
+
+def _apply_deltas(session: Session, flush_context) -> None:
+    deltas = session.info.pop(_PENDING_KEY, None)
+    table = ProfileStats.__table__
+    new_users = [obj.id for obj in session.new if isinstance(obj, User)]
+    if new_users:
+        session.connection().execute(
+            pg_insert(table).values([{"user_id": uid} for uid in new_users]).on_conflict_do_nothing(index_elements=["user_id"])
+        )
+    if not deltas:
+        return
+    conn = session.connection()
+    # Same lock order in every transaction, or mutual follows deadlock
+    for uid in sorted(deltas):
+        counters = deltas[uid]
+        values = {col: table.c[col] + n for col, n in counters.items() if n}
+        stmt = update(table).where(table.c.user_id == uid).values(**values, updated_at=func.now())
+        if conn.execute(stmt).rowcount == 0:
+            # No row yet: seed it from source tables, which already include this flush
+            inserted = conn.execute(
+                pg_insert(table)
+                .from_select(["user_id", *COUNTERS], stats_select([uid]))
+                .on_conflict_do_nothing(index_elements=["user_id"])
+                .returning(table.c.user_id)
+            ).first()
+            if inserted is None:
+                # Lost a race with a concurrent seed that cannot see our changes
+                conn.execute(stmt)
+        if counters.get("reviews_count") or counters.get("rating_sum"):
+            _sync_profile_rating(conn, [uid])
+
+
+event.listen(Session, "before_flush", _collect_deltas)
+event.listen(Session, "after_flush", _apply_deltas)
+
+
+def _sync_profile_rating(conn, user_ids: Iterable[uuid.UUID] | None = None) -> None:
+    """Copy the average into profiles.average_rating, which discovery sorts on"""
+    stats = ProfileStats.__table__
+    avg = func.coalesce(stats.c.rating_sum * 1.0 / func.nullif(stats.c.reviews_count, 0), 0.0)
+    stmt = (
+        update(Profile.__table__)
+        .where(Profile.__table__.c.user_id == stats.c.user_id)
+        .values(average_rating=avg)
+    )
+    if user_ids is not None:
+        stmt = stmt.where(stats.c.user_id.in_(list(user_ids)))
+    conn.execute(stmt)
+
+
+def stats_select(user_ids: Iterable[uuid.UUID] | None = None):
+    """SELECT user_id, reviews_count, rating_sum, followers_count, following_count,
+    sponsor_count computed from source tables, one grouped subquery per aggregate"""
+    ids = list(user_ids) if user_ids is not None else None
+
+    def scoped(q, col):
+        return q.where(col.in_(ids)) if ids is not None else q
+
+    reviews = scoped(
+        select(Review.reviewee_id.label("uid"), func.count(Review.id).label("n"), func.sum(Review.rating).label("s"))
+        .where(Review.deleted_at.is_(None), Review.reviewee_id.isnot(None)),
+        Review.reviewee_id,
+    ).group_by(Review.reviewee_id).subquery()
+    followers = scoped(
+        select(Follow.followee_id.label("uid"), func.count(Follow.id).label("n")).where(Follow.followee_id.isnot(None)),
+        Follow.followee_id,
+    ).group_by(Follow.followee_id).subquery()
+    following = scoped(
+        select(Follow.follower_id.label("uid"), func.count(Follow.id).label("n")),
+        Follow.follower_id,
+    ).group_by(Follow.follower_id).subquery()
+    sponsors = scoped(
+        select(EventParticipant.user_id.label("uid"), func.count(EventParticipant.id).label("n")).where(
+            EventParticipant.role == EventParticipantRole.sponsor,
+            EventParticipant.status == EventParticipantStatus.accepted,
+        ),
+        EventParticipant.user_id,
+    ).group_by(EventParticipant.user_id).subquery()
+
+    q = (
+        select(
+            User.id.label("user_id"),
+            func.coalesce(reviews.c.n, 0).label("reviews_count"),
+            func.coalesce(reviews.c.s, 0).label("rating_sum"),
+            func.coalesce(followers.c.n, 0).label("followers_count"),
+            func.coalesce(following.c.n, 0).label("following_count"),
+            func.coalesce(sponsors.c.n, 0).label("sponsor_count"),
+        )
+        .select_from(User)
+        .outerjoin(reviews, reviews.c.uid == User.id)
+        .outerjoin(followers, followers.c.uid == User.id)
+        .outerjoin(following, following.c.uid == User.id)
+        .outerjoin(sponsors, sponsors.c.uid == User.id)
+    )
+    return scoped(q, User.id)
+
+
+def rebuild_profile_stats(db: Session, user_ids: Iterable[uuid.UUID] | None = None) -> int:
+    """Reconciliation job: repair profile_stats (all users, or only user_ids) in bulk and commit.
+
+    Missing rows are inserted from source. Existing rows get the drift
+    (source count minus stored counter, both read from the statement's
+    snapshot) added rather than the source count written over them, so
+    deltas committed by concurrent flushes while the job runs are kept.
+    Returns the number of rows inserted or repaired.
+    """
+    table = ProfileStats.__table__
+    ids = list(user_ids) if user_ids is not None else None
+    conn = db.connection()
+    inserted = conn.execute(
+        pg_insert(table)
+        .from_select(["user_id", *COUNTERS], stats_select(ids))
+        .on_conflict_do_nothing(index_elements=["user_id"])
+        .returning(table.c.user_id)
+    ).all()
+
+    source = stats_select(ids).subquery("source")
+    drift = (
+        select(table.c.user_id, *[(source.c[col] - table.c[col]).label(col) for col in COUNTERS])
+        .join_from(table, source, source.c.user_id == table.c.user_id)
+        .where(or_(*[source.c[col] != table.c[col] for col in COUNTERS]))
+        .cte("drift")
+        .prefix_with("MATERIALIZED", dialect="postgresql")
+    )
+    repaired = conn.execute(
+        update(table)
+        .where(table.c.user_id == drift.c.user_id)
+        .values(**{col: table.c[col] + drift.c[col] for col in COUNTERS}, updated_at=func.now())
+        .returning(table.c.user_id)
+    ).all()
+    _sync_profile_rating(conn, ids)
+    db.commit()
+    count = len(inserted) + len(repaired)
+    logger.info(f"Repaired profile_stats for {count} users")
+    return count
+
+
+def get_profile_stats(db: Session, user_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, ProfileStats]:
+    ids = list(dict.fromkeys(uid for uid in user_ids if uid is not None))
+    if not ids:
+        return {}
+    rows = db.query(ProfileStats).filter(ProfileStats.user_id.in_(ids)).populate_existing().all()
+    return {row.user_id: row for row in rows}
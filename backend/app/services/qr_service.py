@@ -0,0 +1,116 @@
+"""
+Rendering and caching of attendance QR images.
+
+Attendance QR tokens rotate on a fixed schedule: time is split into windows
+of `minutes_valid` minutes, and every request in a window gets the same token
+(valid for one more window, so a code shown just before the rollover still
+scans). The image therefore only changes when the window rolls over, and:
+
+- rendered images are kept in a per-process LRU map keyed by token and
+  format (QR_CACHE_MAX_SIZE), so polling check-in screens cost no encoding;
+- responses carry an `ETag` and a `Cache-Control` max-age lasting until the
+  rollover, and `If-None-Match` is answered with 304.
+
+Images are PNG or SVG; SVG is far cheaper to produce and scales on any screen.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+
+from fastapi import HTTPException, Request, Response
+
+from app.core.config import settings
+
+QRFormat = Literal["png", "svg"]
+
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def rotation_window(minutes_valid: int, now: Optional[datetime] = None) -> tuple[datetime, datetime]:
+    """Token expiry and next rollover for the window containing `now`"""
+    period = minutes_valid * 60
+    ts = int((now or datetime.now(timezone.utc)).timestamp())
+    rollover = datetime.fromtimestamp(ts - ts % period + period, timezone.utc)
+    return rollover + timedelta(seconds=period), rollover
+
+
+def render(token: str, fmt: QRFormat) -> bytes:
+    try:
+        import qrcode
+        import qrcode.image.svg
+    except ImportError:
+        raise HTTPException(status_code=500, detail="qrcode library not installed. Please add 'qrcode' and 'Pillow' to requirements.")
+    buf = io.BytesIO()
+    if fmt == "svg":
+        qrcode.make(token, image_factory=qrcode.image.svg.SvgPathImage).save(buf)
+    else:
+        qrcode.make(token).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def etag(token: str, fmt: QRFormat) -> str:
+    return '"' + hashlib.sha256(f"{fmt}:{token}".encode()).hexdigest()[:32] + '"'
+
+
+class QRCache:
+    """Thread-safe LRU map of (token, format) -> image bytes"""
+
+    def __init__(self, max_size: int | None = None):
+        self.max_size = settings.QR_CACHE_MAX_SIZE if max_size is None else max_size
+        self._entries: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_render(self, token: str, fmt: QRFormat) -> bytes:
+        key = (token, fmt)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+        # Two workers may render the same image once; not worth coalescing
+        image = render(token, fmt)
+        if self.max_size > 0:
+            with self._lock:
+                self._entries[key] = image
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return image
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+qr_cache = QRCache()
+
+
+def qr_response(request: Request, token: str, fmt: QRFormat, rollover: datetime) -> Response:
+    """The QR image for `token`, cacheable by the client until `rollover`"""
+    max_age = max(0, int((rollover - datetime.now(timezone.utc)).total_seconds()))
+    headers = {"ETag": etag(token, fmt), "Cache-Control": f"private, max-age={max_age}"}
+    if headers["ETag"] in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=qr_cache.get_or_render(token, fmt), media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -1,63 +1,216 @@
 import asyncio
+import itertools
 import uuid
-from typing import Dict, Optional
+from collections import deque
+from typing import Dict, Optional, Set
+from app.core.config import settings
 from app.models.notification_model import Notification
 from app.schemas.notification_schema import NotificationResponse
+from app.services.sse_pubsub import NODE_ID, PubSubBackend, create_pubsub_backend
 import logging
 
 logger = logging.getLogger(__name__)
 
+class SSEConnection:
+    """One open SSE stream with a bounded buffer.
+
+    When the buffer is full the oldest message is dropped, so a stalled
+    client costs at most `max_queue` messages. Messages carrying a
+    `coalesce_key` replace an older queued message with the same key
+    instead of taking another slot (e.g. repeated unread counters).
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, user_id: uuid.UUID, max_queue: int):
+        self.id = next(self._ids)
+        self.user_id = user_id
+        self.max_queue = max_queue
+        self._buffer: deque = deque()
+        self._ready = asyncio.Event()
+        # Backpressure metrics
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def offer(self, payload: dict) -> None:
+        key = payload.get("coalesce_key") if isinstance(payload, dict) else None
+        if key is not None:
+            for i, queued in enumerate(self._buffer):
+                if isinstance(queued, dict) and queued.get("coalesce_key") == key:
+                    self._buffer[i] = payload
+                    self.coalesced += 1
+                    return
+        if len(self._buffer) >= self.max_queue:
+            self._buffer.popleft()
+            self.dropped += 1
+        self._buffer.append(payload)
+        self.high_water = max(self.high_water, len(self._buffer))
+        self._ready.set()
+
+    async def get(self, timeout: float | None = None) -> dict:
+        """Next message; raises asyncio.TimeoutError after `timeout` seconds"""
+        while not self._buffer:
+            self._ready.clear()
+            await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+        self.delivered += 1
+        return self._buffer.popleft()
+
+    def take(self, limit: int) -> list:
+        """Up to `limit` already queued messages, without waiting"""
+        items = []
+        while self._buffer and len(items) < limit:
+            items.append(self._buffer.popleft())
+        self.delivered += len(items)
+        return items
+
+    def stats(self) -> dict:
+        return {
+            "id": self.id,
+            "user_id": str(self.user_id),
+            "queued": len(self._buffer),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "high_water": self.high_water,
+        }
+
+
 class SSEConnectionManager:
-    """Manages Server-Sent Events connections for real-time notifications"""
-    
-    def __init__(self):
-        # Maps user_id to their asyncio.Queue for notifications
-        self.connections: Dict[uuid.UUID, asyncio.Queue] = {}
-    
-    async def connect(self, user_id: uuid.UUID) -> asyncio.Queue:
+    """Manages Server-Sent Events connections for real-time notifications.
+
+    Connections are local to this process. Messages go through a pub/sub
+    backend (see app.services.sse_pubsub) so that every worker delivers to
+    the connections it holds, whichever worker published.
+    """
+
+    def __init__(self, backend: Optional[PubSubBackend] = None, max_queue: int | None = None):
+        # Maps user_id to the open streams for that user (one per tab/device)
+        self.connections: Dict[uuid.UUID, Set[SSEConnection]] = {}
+        self.backend = backend or create_pubsub_backend(settings.SSE_PUBSUB_BACKEND)
+        self.max_queue = max_queue or settings.SSE_MAX_QUEUE
+        self._start_lock: Optional[asyncio.Lock] = None
+        # Totals from connections that have already closed
+        self._closed_totals = {"delivered": 0, "dropped": 0, "coalesced": 0}
+
+    async def start(self):
+        """Subscribe to the pub/sub backend (idempotent; also done on first connect)"""
+        if self.backend.started:
+            return
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if not self.backend.started:
+                await self.backend.start(self._deliver_local)
+                logger.info(f"SSE manager started on node {NODE_ID} with '{self.backend.name}' pub/sub")
+
+    async def stop(self):
+        await self.backend.stop()
+
+    async def connect(self, user_id: uuid.UUID) -> SSEConnection:
         """Register a new SSE connection for a user"""
-        queue = asyncio.Queue()
-        self.connections[user_id] = queue
-        logger.info(f"SSE connection established for user {user_id}")
-        return queue
-    
-    def disconnect(self, user_id: uuid.UUID):
-        """Remove a user's SSE connection"""
-        if user_id in self.connections:
-            del self.connections[user_id]
-            logger.info(f"SSE connection closed for user {user_id}")
-    
+        await self.start()
+        connection = SSEConnection(user_id, self.max_queue)
+        self.connections.setdefault(user_id, set()).add(connection)
+        logger.info(f"SSE connection {connection.id} established for user {user_id}")
+        return connection
+
+    def disconnect(self, connection: SSEConnection):
+        """Remove one SSE connection; the user's other streams stay open"""
+        streams = self.connections.get(connection.user_id)
+        if streams is None or connection not in streams:
+            return
+        streams.discard(connection)
+        if not streams:
+            del self.connections[connection.user_id]
+        for key in self._closed_totals:
+            self._closed_totals[key] += getattr(connection, key)
+        if connection.dropped:
+            logger.warning(f"SSE connection {connection.id} for user {connection.user_id} dropped {connection.dropped} messages")
+        logger.info(f"SSE connection {connection.id} closed for user {connection.user_id}")
+
+    def publish(self, user_id: uuid.UUID, payload: dict):
+        """Fan a message out to every worker; safe to call from sync code and threads"""
+        try:
+            self.backend.publish(user_id, payload)
+        except Exception as e:
+            logger.error(f"Error publishing SSE message for user {user_id}: {e}")
+
+    def publish_notification(self, notification: Notification):
+        # Convert to response schema for JSON serialization
+        notif_data = NotificationResponse.model_validate(notification)
+        self.publish(notification.recipient_id, notif_data.model_dump(mode='json'))
+
+    def publish_notifications(self, notifications: list):
+        """Publish many notifications (ORM objects or inserted rows) as one batch"""
+        if not notifications:
+            return
+        messages = [
+            (n.recipient_id, NotificationResponse.model_validate(n).model_dump(mode='json'))
+            for n in notifications
+        ]
+        try:
+            self.backend.publish_many(messages)
+        except Exception as e:
+            logger.error(f"Error publishing {len(messages)} SSE messages: {e}")
+
+    async def publish_notifications_async(self, notifications: list):
+        """`publish_notifications` for async handlers: network backends publish from a thread"""
+        if self.backend.publish_blocks:
+            await asyncio.to_thread(self.publish_notifications, notifications)
+        else:
+            self.publish_notifications(notifications)
+
     async def send_to_user(self, user_id: uuid.UUID, notification: Notification):
-        """Send a notification to a specific user if they're connected"""
-        if user_id in self.connections:
+        """Send a notification to a specific user on whichever worker holds their stream"""
+        notif_data = NotificationResponse.model_validate(notification)
+        self.publish(user_id, notif_data.model_dump(mode='json'))
+
+    async def _deliver_local(self, user_id: uuid.UUID, payload: dict):
+        """Called by the backend for every published message"""
+        for connection in list(self.connections.get(user_id, ())):
             try:
-                # Convert to response schema for JSON serialization
-                notif_data = NotificationResponse.model_validate(notification)
-                await self.connections[user_id].put(notif_data.model_dump(mode='json'))
-                logger.debug(f"Notification sent to user {user_id} via SSE")
+                connection.offer(payload)
             except Exception as e:
                 logger.error(f"Error sending notification to user {user_id}: {e}")
-    
+
     def is_connected(self, user_id: uuid.UUID) -> bool:
-        """Check if a user has an active SSE connection"""
+        """Check if a user has an active SSE connection on this node"""
         return user_id in self.connections
 
+    def connection_count(self) -> int:
+        return sum(len(streams) for streams in self.connections.values())
+
+    def stats(self, include_connections: bool = False) -> dict:
+        """Connection counts and backpressure metrics for this node"""
+        live = [c for streams in self.connections.values() for c in streams]
+        totals = {key: value + sum(getattr(c, key) for c in live) for key, value in self._closed_totals.items()}
+        data = {
+            "node": NODE_ID,
+            "backend": self.backend.name,
+            "connections": len(live),
+            "users": len(self.connections),
+            "max_queue": self.max_queue,
+            "queued": sum(len(c) for c in live),
+            **totals,
+        }
+        if include_connections:
+            data["per_connection"] = [c.stats() for c in live]
+        return data
+
     async def broadcast_shutdown(self):
-        """Notify all connected clients that the server is shutting down"""
+        """Notify all locally connected clients that the server is shutting down"""
         logger.info("Broadcasting shutdown to all SSE connections")
         shutdown_msg = {"type": "shutdown", "message": "Server shutting down"}
-        
-        # Create a list of futures to ensure we don't block sequentially too long
-        tasks = []
-        for user_id, queue in list(self.connections.items()):
-            try:
-                tasks.append(queue.put(shutdown_msg))
-            except Exception:
-                pass
-        
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
 
+        for streams in list(self.connections.values()):
+            for connection in list(streams):
+                connection.offer(shutdown_msg)
+        await self.stop()
 
 # Global SSE manager instance
 sse_manager = SSEConnectionManager()
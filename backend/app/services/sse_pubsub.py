@@ -0,0 +1,322 @@
+"""
+Pub/sub backends for SSE fan-out across worker processes.
+
+A notification is published once; every process subscribed to the channel
+receives it and delivers to the SSE connections it holds locally.
+
+Backends:
+- memory:   single process only (default, also used in tests)
+- postgres: LISTEN/NOTIFY on the application database (psycopg2)
+- redis:    Redis-compatible PUBLISH/SUBSCRIBE (requires `redis`)
+
+`publish` is synchronous and thread-safe because notifications are mostly
+created from sync route handlers running in the threadpool.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis = None
+    redis_asyncio = None
+
+# Identifies this process in stats and messages
+NODE_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+DeliverCallback = Callable[[uuid.UUID, dict], Awaitable[None]]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+PG_NOTIFY_MAX_BYTES = 7900
+# Messages sent per pg_notify statement by publish_many
+PG_NOTIFY_BATCH = 500
+
+
+def _encode(user_id: uuid.UUID, payload: dict) -> str:
+    return json.dumps({"user_id": str(user_id), "payload": payload, "origin": NODE_ID})
+
+
+def _decode(raw) -> Optional[tuple[uuid.UUID, dict]]:
+    try:
+        msg = json.loads(raw)
+        return uuid.UUID(msg["user_id"]), msg["payload"]
+    except Exception as e:
+        logger.error(f"Dropping malformed SSE pub/sub message: {e}")
+        return None
+
+
+class PubSubBackend:
+    """Interface shared by all SSE pub/sub backends"""
+
+    name = "base"
+    # Whether publish() does network I/O (call it off the event loop then)
+    publish_blocks = True
+
+    def __init__(self):
+        self._deliver: Optional[DeliverCallback] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        self._deliver = deliver
+        self._loop = asyncio.get_running_loop()
+
+    async def stop(self) -> None:
+        self._loop = None
+
+    def publish(self, user_id: uuid.UUID, payload: dict) -> None:
+        raise NotImplementedError
+
+    def publish_many(self, messages: list[tuple[uuid.UUID, dict]]) -> None:
+        """Publish (user_id, payload) pairs; backends override this to save round trips"""
+        for user_id, payload in messages:
+            self.publish(user_id, payload)
+
+    def _dispatch(self, user_id: uuid.UUID, payload: dict) -> None:
+        """Schedule local delivery on the manager's event loop from any thread"""
+        self._schedule(self._deliver_all([(user_id, payload)]))
+
+    def _dispatch_many(self, messages: list[tuple[uuid.UUID, dict]]) -> None:
+        """Like _dispatch, with one scheduled task for the whole batch"""
+        if messages:
+            self._schedule(self._deliver_all(messages))
+
+    async def _deliver_all(self, messages: list[tuple[uuid.UUID, dict]]) -> None:
+        for user_id, payload in messages:
+            await self._deliver(user_id, payload)
+
+    def _schedule(self, coro) -> None:
+        loop, deliver = self._loop, self._deliver
+        if loop is None or deliver is None or loop.is_closed():
+            coro.close()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            loop.create_task(coro)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+class InMemoryPubSub(PubSubBackend):
+    """Delivers within the current process only"""
+
+    name = "memory"
+    publish_blocks = False
+
+    def publish(self, user_id: uuid.UUID, payload: dict) -> None:
+        self._dispatch(user_id, payload)
+
+    def publish_many(self, messages: list[tuple[uuid.UUID, dict]]) -> None:
+        self._dispatch_many(messages)
+
+
+class PostgresPubSub(PubSubBackend):
+    """LISTEN/NOTIFY on the application database.
+
+    Publishing uses a pooled autocommit connection. The listener holds one
+    dedicated psycopg2 connection registered with the event loop via
+    add_reader, so no extra thread is needed.
+    """
+
+    name = "postgres"
+    RECONNECT_DELAY = 5.0
+
+    def __init__(self, channel: str = "sse_events", engine=None):
+        super().__init__()
+        self.channel = channel
+        if engine is None:
+            from app.database.database import engine
+        self.engine = engine
+        self._listen_conn = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        await super().start(deliver)
+        self._listen()
+
+    async def stop(self) -> None:
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        self._close_listener()
+        await super().stop()
+
+    def _listen(self) -> None:
+        raw = self.engine.raw_connection()
+        # Take the connection out of the pool for good; it lives as long as the listener
+        raw.detach()
+        conn = raw.dbapi_connection
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN "{self.channel}"')
+        self._listen_conn = conn
+        self._loop.add_reader(conn.fileno(), self._on_readable)
+        logger.info(f"SSE pub/sub listening on Postgres channel '{self.channel}'")
+
+    def _close_listener(self) -> None:
+        conn, self._listen_conn = self._listen_conn, None
+        if conn is None:
+            return
+        try:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(conn.fileno())
+        except Exception:
+            pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _on_readable(self) -> None:
+        conn = self._listen_conn
+        if conn is None:
+            return
+        try:
+            payloads = self._read_notifies(conn)
+        except Exception as e:
+            logger.error(f"SSE pub/sub Postgres listener lost its connection: {e}")
+            self._close_listener()
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+            return
+        for payload in payloads:
+            decoded = _decode(payload)
+            if decoded is not None:
+                self._dispatch(*decoded)
+
+    @staticmethod
+    def _read_notifies(conn) -> list[str]:
+        """Payloads of the notifications that arrived, without blocking"""
+        pgconn = getattr(conn, "pgconn", None)
+        if pgconn is None:
+            # psycopg2
+            conn.poll()
+            payloads = [notify.payload for notify in conn.notifies]
+            conn.notifies.clear()
+            return payloads
+        # psycopg 3: read straight from libpq, the connection is idle between notifications
+        pgconn.consume_input()
+        payloads = []
+        while (notify := pgconn.notifies()) is not None:
+            payloads.append(notify.extra.decode("utf-8"))
+        return payloads
+
+    async def _reconnect(self) -> None:
+        while self._loop is not None:
+            await asyncio.sleep(self.RECONNECT_DELAY)
+            try:
+                self._listen()
+                return
+            except Exception as e:
+                logger.error(f"SSE pub/sub Postgres reconnect failed: {e}")
+
+    def publish(self, user_id: uuid.UUID, payload: dict) -> None:
+        message = _encode(user_id, payload)
+        if len(message.encode("utf-8")) > PG_NOTIFY_MAX_BYTES:
+            logger.error(f"SSE message for user {user_id} exceeds the NOTIFY payload limit; not published")
+            return
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :message)"), {"channel": self.channel, "message": message})
+
+    def publish_many(self, messages: list[tuple[uuid.UUID, dict]]) -> None:
+        encoded = []
+        for user_id, payload in messages:
+            message = _encode(user_id, payload)
+            if len(message.encode("utf-8")) > PG_NOTIFY_MAX_BYTES:
+                logger.error(f"SSE message for user {user_id} exceeds the NOTIFY payload limit; not published")
+                continue
+            encoded.append(message)
+        if not encoded:
+            return
+        # One statement per chunk instead of one round trip per message
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for i in range(0, len(encoded), PG_NOTIFY_BATCH):
+                conn.execute(
+                    text("SELECT pg_notify(:channel, m) FROM unnest(CAST(:messages AS text[])) AS m"),
+                    {"channel": self.channel, "messages": encoded[i:i + PG_NOTIFY_BATCH]},
+                )
+
+
+class RedisPubSub(PubSubBackend):
+    """PUBLISH/SUBSCRIBE on any Redis-compatible server (Redis, Valkey, KeyDB)"""
+
+    name = "redis"
+
+    def __init__(self, url: str | None = None, channel: str = "sse_events"):
+        if redis is None:
+            raise RuntimeError("redis is not installed; use SSE_PUBSUB_BACKEND=memory|postgres or install redis")
+        super().__init__()
+        self.url = url or settings.REDIS_URL
+        self.channel = channel
+        self._publisher = redis.Redis.from_url(self.url)
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        await super().start(deliver)
+        self._task = self._loop.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await super().stop()
+
+    async def _listen(self) -> None:
+        while True:
+            client = redis_asyncio.Redis.from_url(self.url)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    logger.info(f"SSE pub/sub subscribed to Redis channel '{self.channel}'")
+                    async for message in pubsub.listen():
+                        if message.get("type") != "message":
+                            continue
+                        decoded = _decode(message["data"])
+                        if decoded is not None:
+                            await self._deliver(*decoded)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"SSE pub/sub Redis subscription failed, retrying: {e}")
+                await asyncio.sleep(5.0)
+            finally:
+                await client.aclose()
+
+    def publish(self, user_id: uuid.UUID, payload: dict) -> None:
+        self._publisher.publish(self.channel, _encode(user_id, payload))
+
+    def publish_many(self, messages: list[tuple[uuid.UUID, dict]]) -> None:
+        pipe = self._publisher.pipeline(transaction=False)
+        for user_id, payload in messages:
+            pipe.publish(self.channel, _encode(user_id, payload))
+        pipe.execute()
+
+
+def create_pubsub_backend(name: str | None = None, channel: str = "sse_events") -> PubSubBackend:
+    name = (name or settings.SSE_PUBSUB_BACKEND or "memory").strip().lower()
+    if name == "postgres":
+        return PostgresPubSub(channel=channel)
+    if name == "redis":
+        if redis is not None:
+            return RedisPubSub(channel=channel)
+        logger.warning("redis not installed; falling back to in-memory SSE pub/sub (single process only)")
+    return InMemoryPubSub()
@@ -0,0 +1,362 @@
+"""
+Media storage for uploads (avatars, covers, logos, payment QR codes, receipts
+and proposal documents).
+
+`await save(file, folder)` reads the upload in chunks, checks its size and
+its real type (from the file's leading bytes, not the client's header)
+against the folder's `UploadPolicy`, and only then streams it to the
+backend. Nothing blocks the event loop: file reads go through Starlette's
+async UploadFile API and the provider is called with an async HTTP client.
+
+Backends (STORAGE_BACKEND):
+- cloudinary: signed uploads to the Cloudinary REST API
+- local:      files under MEDIA_ROOT, served from MEDIA_BASE_URL (tests, development)
+
+Client-direct uploads: `sign_upload(folder)` returns a short-lived signed
+form the client sends the file to itself, so large files (proposal decks)
+never pass through the API process; the resulting URL is then submitted
+like any other link.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, BinaryIO, Optional
+
+import anyio
+import cloudinary.utils
+import httpx
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+UPLOAD_TIMEOUT_SECONDS = 120
+# Cloudinary rejects signatures older than this
+CLOUDINARY_SIGNATURE_MAX_AGE = 3600
+
+EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "application/pdf": "pdf",
+    "application/msword": "doc",
+    "application/vnd.ms-powerpoint": "ppt",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation": "pptx",
+}
+IMAGE_TYPES = frozenset({"image/jpeg", "image/png", "image/gif", "image/webp"})
+DOCUMENT_TYPES = frozenset(EXTENSIONS)
+
+# Leading bytes -> content type. Office files are containers (OLE / zip), so for
+# those the declared type is accepted if it is one of the container's formats.
+_MAGIC = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"%PDF-", "application/pdf"),
+]
+_CONTAINERS = [
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", {"application/msword", "application/vnd.ms-powerpoint"}),
+    (b"PK\x03\x04", {
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    }),
+]
+
+
+@dataclass(frozen=True)
+class UploadPolicy:
+    content_types: frozenset[str]
+    limit_setting: str  # settings attribute holding the size limit
+
+    @property
+    def max_bytes(self) -> int:
+        return getattr(settings, self.limit_setting)
+
+    @property
+    def formats(self) -> list[str]:
+        return sorted(EXTENSIONS[t] for t in self.content_types)
+
+
+IMAGE_UPLOAD = UploadPolicy(IMAGE_TYPES, "UPLOAD_MAX_IMAGE_BYTES")
+RECEIPT_UPLOAD = UploadPolicy(IMAGE_TYPES | {"application/pdf"}, "UPLOAD_MAX_DOCUMENT_BYTES")
+DOCUMENT_UPLOAD = UploadPolicy(DOCUMENT_TYPES, "UPLOAD_MAX_DOCUMENT_BYTES")
+
+UPLOAD_POLICIES: dict[str, UploadPolicy] = {
+    "avatars": IMAGE_UPLOAD,
+    "covers": IMAGE_UPLOAD,
+    "event_logos": IMAGE_UPLOAD,
+    "event_covers": IMAGE_UPLOAD,
+    "event_payment_qr": IMAGE_UPLOAD,
+    "payment_qrs": IMAGE_UPLOAD,
+    "org_logos": IMAGE_UPLOAD,
+    "org_covers": IMAGE_UPLOAD,
+    "receipts": RECEIPT_UPLOAD,
+    "payment_proofs": RECEIPT_UPLOAD,
+    "event_proposals": DOCUMENT_UPLOAD,
+}
+# Folders clients may upload to directly, with their own (larger) limit
+DIRECT_UPLOAD_POLICIES: dict[str, UploadPolicy] = {
+    "event_proposals": UploadPolicy(DOCUMENT_TYPES, "UPLOAD_MAX_DIRECT_BYTES"),
+}
+
+
+def detect_content_type(head: bytes, declared: Optional[str] = None) -> Optional[str]:
+    """Content type from the file's leading bytes; None if unrecognized"""
+    for magic, content_type in _MAGIC:
+        if head.startswith(magic):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    declared = (declared or "").split(";")[0].strip().lower()
+    for magic, content_types in _CONTAINERS:
+        if head.startswith(magic):
+            return declared if declared in content_types else None
+    return None
+
+
+def _too_large(policy: UploadPolicy) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"File too large (max {policy.max_bytes // (1024 * 1024)} MB)")
+
+
+def check_content_type(head: bytes, declared: Optional[str], policy: UploadPolicy) -> str:
+    content_type = detect_content_type(head, declared)
+    if content_type not in policy.content_types:
+        allowed = ", ".join(policy.formats)
+        raise HTTPException(status_code=415, detail=f"Unsupported file type; allowed: {allowed}")
+    return content_type
+
+
+async def inspect_upload(file: UploadFile, policy: UploadPolicy) -> tuple[str, int]:
+    """(content type, size) of an upload, read in chunks; raises 413/415 before anything is stored"""
+    if file.size is not None and file.size > policy.max_bytes:
+        raise _too_large(policy)
+    await file.seek(0)
+    head = await file.read(CHUNK_SIZE)
+    if not head:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    content_type = check_content_type(head, file.content_type, policy)
+    size = len(head)
+    while size <= policy.max_bytes:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+    if size > policy.max_bytes:
+        raise _too_large(policy)
+    await file.seek(0)
+    return content_type, size
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("utf-8").rstrip("=")
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class StorageBackend:
+    """Interface shared by all storage backends"""
+
+    name = "base"
+
+    async def put(self, file: BinaryIO, folder: str, filename: str, content_type: str) -> str:
+        """Store an already validated file; returns its public URL"""
+        raise NotImplementedError
+
+    def sign_upload(self, folder: str, policy: UploadPolicy) -> dict:
+        """Signed form for a client-direct upload to `folder`"""
+        raise NotImplementedError
+
+    async def fetch(self, url: str, max_bytes: int) -> bytes:
+        """Content of a stored file by URL; 413 past `max_bytes`"""
+        data = bytearray()
+        try:
+            async with httpx.AsyncClient(timeout=UPLOAD_TIMEOUT_SECONDS, follow_redirects=True) as client:
+                async with client.stream("GET", url) as r:
+                    r.raise_for_status()
+                    async for chunk in r.aiter_bytes(CHUNK_SIZE):
+                        data += chunk
+                        if len(data) > max_bytes:
+                            raise HTTPException(status_code=413, detail="File too large")
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Could not fetch {url}: {str(e)}")
+        return bytes(data)
+
+
+class CloudinaryStorage(StorageBackend):
+    name = "cloudinary"
+
+    def _check_config(self) -> None:
+        if not settings.CLOUDINARY_CLOUD_NAME or not settings.CLOUDINARY_API_KEY or not settings.CLOUDINARY_API_SECRET:
+            raise HTTPException(status_code=500, detail="Cloudinary configuration missing. Please set CLOUDINARY_CLOUD_NAME, CLOUDINARY_API_KEY, and CLOUDINARY_API_SECRET in your environment.")
+
+    def _endpoint(self) -> str:
+        # "auto" lets Cloudinary store documents as raw files and images as images
+        return f"https://api.cloudinary.com/v1_1/{settings.CLOUDINARY_CLOUD_NAME}/auto/upload"
+
+    def _signed(self, params: dict) -> dict:
+        params = {**params, "timestamp": int(time.time())}
+        params["signature"] = cloudinary.utils.api_sign_request(params, settings.CLOUDINARY_API_SECRET)
+        params["api_key"] = settings.CLOUDINARY_API_KEY
+        return params
+
+    async def put(self, file: BinaryIO, folder: str, filename: str, content_type: str) -> str:
+        self._check_config()
+        try:
+            async with httpx.AsyncClient(timeout=UPLOAD_TIMEOUT_SECONDS) as client:
+                r = await client.post(
+                    self._endpoint(),
+                    data=self._signed({"folder": folder}),
+                    files={"file": (filename, file, content_type)},
+                )
+        except httpx.HTTPError as e:
+            raise HTTPException(status_code=502, detail=f"Cloudinary upload failed: {str(e)}")
+        if r.status_code >= 400:
+            try:
+                message = r.json().get("error", {}).get("message") or r.text
+            except ValueError:
+                message = r.text
+            # Surface a friendly error instead of 500 tracebacks
+            raise HTTPException(status_code=502, detail=f"Cloudinary upload failed: {message}. Please verify CLOUDINARY_CLOUD_NAME, CLOUDINARY_API_KEY, and CLOUDINARY_API_SECRET.")
+        result = r.json()
+        return result.get("secure_url") or result.get("url")
+
+    def sign_upload(self, folder: str, policy: UploadPolicy) -> dict:
+        self._check_config()
+        fields = self._signed({"folder": folder, "allowed_formats": ",".join(policy.formats)})
+        return {
+            "backend": self.name,
+            "method": "POST",
+            "url": self._endpoint(),
+            "fields": fields,
+            "file_field": "file",
+            "max_bytes": policy.max_bytes,
+            "expires_at": fields["timestamp"] + CLOUDINARY_SIGNATURE_MAX_AGE,
+        }
+
+
+class LocalStorage(StorageBackend):
+    """Files under `root`, served by the app at `base_url` (see app.main)"""
+
+    name = "local"
+
+    def __init__(self, root: str | Path | None = None, base_url: str | None = None):
+        self.root = Path(root or settings.MEDIA_ROOT)
+        self.base_url = (base_url or settings.MEDIA_BASE_URL).rstrip("/")
+
+    def _new_key(self, folder: str, content_type: str) -> str:
+        return f"{folder}/{uuid.uuid4().hex}.{EXTENSIONS[content_type]}"
+
+    def url_for(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def _write(self, key: str, file: BinaryIO) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(file, out, CHUNK_SIZE)
+
+    async def put(self, file: BinaryIO, folder: str, filename: str, content_type: str) -> str:
+        key = self._new_key(folder, content_type)
+        await anyio.to_thread.run_sync(self._write, key, file)
+        return self.url_for(key)
+
+    async def fetch(self, url: str, max_bytes: int) -> bytes:
+        if not url.startswith(self.base_url + "/"):
+            return await super().fetch(url, max_bytes)
+        path = self.root / url[len(self.base_url) + 1:]
+        if self.root.resolve() not in path.resolve().parents:
+            raise HTTPException(status_code=400, detail="Invalid media path")
+        try:
+            if path.stat().st_size > max_bytes:
+                raise HTTPException(status_code=413, detail="File too large")
+            return await anyio.Path(path).read_bytes()
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="File not found")
+
+    def sign_upload(self, folder: str, policy: UploadPolicy) -> dict:
+        expires_at = int(time.time()) + settings.UPLOAD_SIGNATURE_TTL_SECONDS
+        payload = _b64(json.dumps({"folder": folder, "exp": expires_at}).encode("utf-8"))
+        signature = _b64(hmac.new(settings.SECRET_KEY.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).digest())
+        return {
+            "backend": self.name,
+            "method": "PUT",
+            "url": f"/api/v1/storage/uploads/{payload}.{signature}",
+            "fields": {},
+            "file_field": None,  # raw request body
+            "max_bytes": policy.max_bytes,
+            "expires_at": expires_at,
+        }
+
+    def verify_upload_token(self, token: str) -> str:
+        """Folder a signed upload token grants; 403 if forged or expired"""
+        try:
+            payload, signature = token.split(".", 1)
+            expected = hmac.new(settings.SECRET_KEY.encode("utf-8"), payload.encode("utf-8"), hashlib.sha256).digest()
+            if not hmac.compare_digest(_unb64(signature), expected):
+                raise ValueError("bad signature")
+            claims = json.loads(_unb64(payload))
+        except Exception:
+            raise HTTPException(status_code=403, detail="Invalid upload token")
+        if claims["exp"] < time.time() or claims["folder"] not in DIRECT_UPLOAD_POLICIES:
+            raise HTTPException(status_code=403, detail="Upload token expired")
+        return claims["folder"]
+
+    async def receive(self, folder: str, chunks: AsyncIterator[bytes], declared: Optional[str]) -> str:
+        """Stream a direct upload to disk, aborting as soon as it exceeds the folder's limit"""
+        policy = DIRECT_UPLOAD_POLICIES[folder]
+        partial = self.root / folder / f"{uuid.uuid4().hex}.part"
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        head, size = b"", 0
+        try:
+            async with await anyio.open_file(partial, "wb") as out:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > policy.max_bytes:
+                        raise _too_large(policy)
+                    if len(head) < CHUNK_SIZE:
+                        head += chunk[:CHUNK_SIZE - len(head)]
+                    await out.write(chunk)
+            if not size:
+                raise HTTPException(status_code=400, detail="Uploaded file is empty")
+            key = self._new_key(folder, check_content_type(head, declared, policy))
+            partial.replace(self.root / key)
+        finally:
+            partial.unlink(missing_ok=True)
+        return self.url_for(key)
+
+
+def create_storage(name: str | None = None) -> StorageBackend:
+    name = (name or settings.STORAGE_BACKEND or "cloudinary").strip().lower()
+    if name == "local":
+        return LocalStorage()
+    return CloudinaryStorage()
+
+
+# Global storage backend
+storage: StorageBackend = create_storage()
+
+
+async def save(file: UploadFile, folder: str) -> str:
+    """Validate `file` against the folder's policy and store it; returns its URL"""
+    policy = UPLOAD_POLICIES[folder]
+    content_type, _ = await inspect_upload(file, policy)
+    return await storage.put(file.file, folder, file.filename or "upload", content_type)
+
+
+def sign_upload(folder: str) -> dict:
+    return storage.sign_upload(folder, DIRECT_UPLOAD_POLICIES[folder])
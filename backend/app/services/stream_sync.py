@@ -0,0 +1,196 @@
+"""
+Mirror of built-in chat messages to GetStream, off the request path.
+
+`send_message` calls `enqueue_message_sync` before its commit, which adds a
+`stream_sync_jobs` row in the same transaction (nothing when GetStream is not
+configured). `StreamSyncWorker` drains the queue in the background:
+
+- due jobs are claimed with UPDATE ... RETURNING over a SKIP LOCKED
+  selection and leased, so workers in several processes never send the same
+  message and a crashed worker's jobs are retried after the lease;
+- each message goes to the conversation's `legacy_<id>` channel, oldest
+  first; sent jobs are deleted;
+- failures back off exponentially and are marked `failed` after
+  STREAM_SYNC_MAX_ATTEMPTS.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.database.database import SessionLocal
+from app.models.chat_model import Message, StreamSyncJob
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+FAILED = "failed"
+
+CLAIM_LEASE = timedelta(minutes=5)
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 3600
+
+
+def stream_configured() -> bool:
+    return bool(settings.GET_STREAM_API_KEY and settings.GET_STREAM_SECRET_KEY)
+
+
+def channel_id(conversation_id: uuid.UUID) -> str:
+    return f"legacy_{conversation_id}"
+
+
+def enqueue_message_sync(db: Session, message_id: uuid.UUID) -> None:
+    """Queue the GetStream mirror of a message; does not commit"""
+    if stream_configured():
+        db.add(StreamSyncJob(message_id=message_id, status=PENDING, attempts=0))
+
+
+def _claim(db: Session, now: datetime, batch_size: int) -> list:
+    due = (
+        select(StreamSyncJob.message_id)
+        .where(StreamSyncJob.status == PENDING, StreamSyncJob.available_at <= now)
+        .order_by(StreamSyncJob.created_at, StreamSyncJob.message_id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .cte("due_jobs")
+        .prefix_with("MATERIALIZED", dialect="postgresql")
+    )
+    leased = (
+        update(StreamSyncJob)
+        .where(StreamSyncJob.message_id.in_(select(due.c.message_id)))
+        .values(attempts=StreamSyncJob.attempts + 1, available_at=now + CLAIM_LEASE)
+        .returning(StreamSyncJob.message_id, StreamSyncJob.attempts)
+        .cte("leased")
+    )
+    claimed = db.execute(
+        select(leased.c.message_id, leased.c.attempts, Message.conversation_id, Message.sender_id, Message.content)
+        .join(Message, Message.id == leased.c.message_id)
+        .order_by(Message.created_at, Message.id)
+    ).all()
+    db.commit()
+    return claimed
+
+
+def _fail(db: Session, job, now: datetime, error: str) -> None:
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (job.attempts - 1), BACKOFF_MAX_SECONDS)
+    give_up = job.attempts >= settings.STREAM_SYNC_MAX_ATTEMPTS
+    db.execute(
+        update(StreamSyncJob)
+        .where(StreamSyncJob.message_id == job.message_id)
+        .values(
+            status=FAILED if give_up else PENDING,
+            available_at=now + timedelta(seconds=delay),
+            last_error=error[:1000],
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if give_up:
+        logger.error(f"Giving up on GetStream sync of message {job.message_id} after {job.attempts} attempts: {error}")
+    else:
+        logger.warning(f"GetStream sync of message {job.message_id} failed (attempt {job.attempts}), will retry: {error}")
+
+
+def process_stream_sync(db: Session, service=None, batch_size: int | None = None) -> dict:
+    """Claim one batch of due jobs and send them. Returns counters."""
+    now = datetime.now(timezone.utc)
+    claimed = _claim(db, now, batch_size or settings.STREAM_SYNC_BATCH_SIZE)
+    stats = {"claimed": len(claimed), "sent": 0, "failed": 0}
+    if not claimed:
+        return stats
+    if service is None:
+        from app.services.stream_service import get_stream_service
+        service = get_stream_service()
+
+    sent = []
+    for job in claimed:
+        try:
+            service.send_message(
+                channel_type="messaging",
+                channel_id=channel_id(job.conversation_id),
+                user_id=str(job.sender_id),
+                text=job.content,
+            )
+            sent.append(job.message_id)
+        except Exception as e:
+            _fail(db, job, now, str(e))
+            stats["failed"] += 1
+    if sent:
+        db.execute(
+            delete(StreamSyncJob).where(StreamSyncJob.message_id.in_(sent)).execution_options(synchronize_session=False)
+        )
+    stats["sent"] = len(sent)
+    db.commit()
+    return stats
+
+
+class StreamSyncWorker:
+    """One asyncio task draining the queue in a thread.
+
+    Sleeps until `notify()` or the poll interval, which also picks up
+    retries whose backoff has elapsed.
+    """
+
+    def __init__(self, poll_interval: float = 10.0, session_factory=SessionLocal):
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("GetStream sync worker started")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self._loop = None
+
+    def notify(self) -> None:
+        """Wake the worker; safe to call from request threads"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _process_once(self) -> int:
+        db = self.session_factory()
+        try:
+            return process_stream_sync(db)["claimed"]
+        finally:
+            db.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                claimed = await asyncio.to_thread(self._process_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"GetStream sync worker error: {e}")
+                claimed = 0
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+
+# Global worker instance, started from app startup
+stream_sync_worker = StreamSyncWorker()
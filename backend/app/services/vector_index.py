@@ -0,0 +1,477 @@
+"""
+Vector index for expert semantic search.
+
+Backends:
+- memory:   NumPy matrix kept in-process, exact L2 search in one vectorized call
+- hnsw:     memory backend plus an approximate HNSW graph (requires `hnswlib`)
+- pgvector: push the search down to Postgres (`ORDER BY embedding <-> :q`)
+
+The memory backends are loaded at startup. Writers stage changes with
+`stage_upsert` / `stage_remove` before committing: the change reaches this
+worker's index only once the transaction commits (a rollback discards it),
+and the index's row in `vector_index_versions` is bumped in the same
+transaction. Every worker compares that version with its own at most every
+VECTOR_INDEX_REFRESH_SECONDS and reloads when another worker changed it.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user_model import User, UserStatus
+
+logger = logging.getLogger(__name__)
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+def parse_pg_vector(value) -> Optional[np.ndarray]:
+    """Parse a pgvector text literal ("[0.1,0.2,...]") or a list into a float32 array"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        stripped = value.strip().strip("[]")
+        if not stripped:
+            return None
+        arr = np.array(stripped.split(","), dtype=np.float32)
+    else:
+        arr = np.asarray(value, dtype=np.float32)
+    if arr.ndim != 1 or arr.size == 0:
+        return None
+    return arr
+
+
+class VectorIndex:
+    """Interface shared by all vector index backends"""
+
+    name = "base"
+
+    def load(self, db: Session) -> int:
+        return 0
+
+    def upsert(self, key: uuid.UUID, vector: Iterable[float]) -> None:
+        pass
+
+    def remove(self, key: uuid.UUID) -> None:
+        pass
+
+    def stage_upsert(self, db: Session, key: uuid.UUID, vector: Iterable[float]) -> None:
+        """Upsert once `db` commits; does not commit"""
+
+    def stage_remove(self, db: Session, key: uuid.UUID) -> None:
+        """Remove once `db` commits; does not commit"""
+
+    def stage_reload(self, db: Session, key: uuid.UUID) -> None:
+        """Re-add the stored vector of `key` once `db` commits, if there is one; does not commit"""
+
+    def search(self, db: Session, vector: Iterable[float], top_k: int = 20) -> list[tuple[uuid.UUID, float]]:
+        """Return up to top_k (key, L2 distance) pairs ordered by ascending distance"""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return 0
+
+
+class NumpyVectorIndex(VectorIndex):
+    """Exact L2 search over an in-memory float32 matrix.
+
+    Rows are stored in a preallocated matrix that grows geometrically, so an
+    upsert is amortised O(dim). Squared row norms are cached, which turns a
+    query into a single matrix-vector product:
+        ||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2
+    """
+
+    name = "memory"
+
+    def __init__(
+        self,
+        table: str = "expert_embeddings",
+        key_column: str = "user_id",
+        where: Optional[str] = None,
+        refresh_seconds: Optional[float] = None,
+    ):
+        self.table = table
+        self.key_column = key_column
+        # Extra SQL condition on the rows that belong in the index
+        self.where = where
+        # None: this process is the only writer, never poll vector_index_versions
+        self.refresh_seconds = refresh_seconds
+        self.version = 0
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+        self._dim: Optional[int] = None
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._norms = np.empty(0, dtype=np.float32)
+        self._keys: list[uuid.UUID] = []
+        self._rows: dict[uuid.UUID, int] = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self._dim
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dim = None
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+            self._norms = np.empty(0, dtype=np.float32)
+            self._keys = []
+            self._rows = {}
+            self.loaded = False
+
+    def _select(self, filtered: bool = True) -> str:
+        sql = f"SELECT {self.key_column}, CAST(embedding AS text) FROM {self.table} WHERE embedding IS NOT NULL"
+        return f"{sql} AND {self.where}" if self.where and filtered else sql
+
+    def _stored_version(self, db: Session) -> int:
+        version = db.execute(
+            text("SELECT version FROM vector_index_versions WHERE name = :name"), {"name": self.table}
+        ).scalar()
+        return version or 0
+
+    def load(self, db: Session) -> int:
+        # Read the version first: a change committed in between only causes another reload
+        version = self._stored_version(db) if self.refresh_seconds is not None else 0
+        rows = db.execute(text(self._select())).fetchall()
+        with self._lock:
+            self.clear()
+            for key, raw in rows:
+                vec = parse_pg_vector(raw)
+                if vec is not None:
+                    self._upsert_locked(key, vec)
+            self.version = version
+            self._checked_at = time.monotonic()
+            self.loaded = True
+        logger.info(f"Vector index '{self.name}' loaded {len(self)} rows from {self.table}")
+        return len(self)
+
+    def refresh(self, db: Session) -> None:
+        """Load on first use, then reload whenever another worker changed the index"""
+        if not self.loaded:
+            # Startup load failed or was skipped; load lazily on first use
+            self.load(db)
+            return
+        if self.refresh_seconds is None or time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        self._checked_at = time.monotonic()
+        version = self._stored_version(db)
+        if version != self.version:
+            logger.info(f"Vector index '{self.name}' is at version {self.version}, database at {version}; reloading")
+            self.load(db)
+
+    def _stage(self, db: Session, change: tuple) -> None:
+        pending = db.info.setdefault(PENDING_CHANGES, {})
+        # Keyed by savepoint too, so rolling one back drops its changes (and its bump)
+        key = (self, db.get_nested_transaction() or db.get_transaction())
+        if key not in pending:
+            # One bump per transaction; the row lock orders concurrent writers
+            version = db.execute(
+                text(
+                    "INSERT INTO vector_index_versions (name, version) VALUES (:name, 1) "
+                    "ON CONFLICT (name) DO UPDATE SET version = vector_index_versions.version + 1 "
+                    "RETURNING version"
+                ),
+                {"name": self.table},
+            ).scalar()
+            pending[key] = (version, [])
+        pending[key][1].append(change)
+
+    def stage_upsert(self, db: Session, key: uuid.UUID, vector: Iterable[float]) -> None:
+        self._stage(db, (key, vector))
+
+    def stage_remove(self, db: Session, key: uuid.UUID) -> None:
+        # Keys that were never indexed need no version bump (and no row lock on it)
+        if key not in self._rows and db.execute(
+            text(f"SELECT 1 FROM {self.table} WHERE {self.key_column} = :key"), {"key": key}
+        ).first() is None:
+            return
+        self._stage(db, (key, None))
+
+    def stage_reload(self, db: Session, key: uuid.UUID) -> None:
+        # Unfiltered: called while the change that qualifies the key is still unflushed
+        row = db.execute(text(f"{self._select(filtered=False)} AND {self.key_column} = :key"), {"key": key}).first()
+        if row is not None:
+            self.stage_upsert(db, key, row[1])
+
+    def apply(self, version: int, changes: list[tuple]) -> None:
+        """Apply changes committed at `version` (called after commit)"""
+        with self._lock:
+            if not self.loaded:
+                # The first search loads everything, these changes included
+                return
+            for key, vector in changes:
+                if vector is None:
+                    self.remove(key)
+                else:
+                    self.upsert(key, vector)
+            # Another worker's commit in between leaves the index stale: reload on the next check
+            if version == self.version + 1:
+                self.version = version
+
+    def upsert(self, key: uuid.UUID, vector: Iterable[float]) -> None:
+        vec = parse_pg_vector(vector)
+        if vec is None:
+            return
+        with self._lock:
+            self._upsert_locked(key, vec)
+
+    def _upsert_locked(self, key: uuid.UUID, vec: np.ndarray) -> None:
+        if self._dim is None:
+            self._dim = int(vec.shape[0])
+            self._matrix = np.empty((64, self._dim), dtype=np.float32)
+            self._norms = np.empty(64, dtype=np.float32)
+        if vec.shape[0] != self._dim:
+            logger.warning(f"Skipping vector for {key}: dimension {vec.shape[0]} != index dimension {self._dim}")
+            return
+
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._keys)
+            if row >= self._matrix.shape[0]:
+                new_cap = max(64, self._matrix.shape[0] * 2)
+                matrix = np.empty((new_cap, self._dim), dtype=np.float32)
+                matrix[:row] = self._matrix[:row]
+                norms = np.empty(new_cap, dtype=np.float32)
+                norms[:row] = self._norms[:row]
+                self._matrix, self._norms = matrix, norms
+            self._keys.append(key)
+            self._rows[key] = row
+        self._matrix[row] = vec
+        self._norms[row] = float(vec @ vec)
+        self._on_upsert(key, row, vec)
+
+    def _on_upsert(self, key: uuid.UUID, row: int, vec: np.ndarray) -> None:
+        pass
+
+    def remove(self, key: uuid.UUID) -> None:
+        with self._lock:
+            row = self._rows.pop(key, None)
+            if row is None:
+                return
+            # Swap the last row into the freed slot to keep the matrix dense
+            last = len(self._keys) - 1
+            if row != last:
+                last_key = self._keys[last]
+                self._matrix[row] = self._matrix[last]
+                self._norms[row] = self._norms[last]
+                self._keys[row] = last_key
+                self._rows[last_key] = row
+                self._on_move(last_key, row)
+            self._keys.pop()
+            self._on_remove(key)
+
+    def _on_move(self, key: uuid.UUID, row: int) -> None:
+        pass
+
+    def _on_remove(self, key: uuid.UUID) -> None:
+        pass
+
+    def search(self, db: Session, vector: Iterable[float], top_k: int = 20) -> list[tuple[uuid.UUID, float]]:
+        self.refresh(db)
+        q = parse_pg_vector(vector)
+        with self._lock:
+            n = len(self._keys)
+            if q is None or n == 0 or top_k <= 0 or q.shape[0] != self._dim:
+                return []
+            matrix = self._matrix[:n]
+            sq = self._norms[:n] - 2.0 * (matrix @ q) + float(q @ q)
+            k = min(top_k, n)
+            if k < n:
+                idx = np.argpartition(sq, k - 1)[:k]
+            else:
+                idx = np.arange(n)
+            idx = idx[np.argsort(sq[idx], kind="stable")]
+            dists = np.sqrt(np.maximum(sq[idx], 0.0))
+            return [(self._keys[i], float(d)) for i, d in zip(idx.tolist(), dists.tolist())]
+
+
+class HnswVectorIndex(NumpyVectorIndex):
+    """NumpyVectorIndex with an approximate HNSW graph for large corpora.
+
+    The matrix stays authoritative (it backs reloads and exact fallbacks); the
+    graph is keyed by a stable integer label per key. Small indexes are served
+    exactly since the graph only pays off at a few thousand rows.
+    """
+
+    name = "hnsw"
+    EXACT_SEARCH_BELOW = 2000
+
+    def __init__(self, *args, ef_search: int = 64, m: int = 16, ef_construction: int = 200, **kwargs):
+        if hnswlib is None:
+            raise RuntimeError("hnswlib is not installed; use VECTOR_INDEX_BACKEND=memory or install hnswlib")
+        super().__init__(*args, **kwargs)
+        self.ef_search = ef_search
+        self.m = m
+        self.ef_construction = ef_construction
+        self._graph = None
+        self._labels: dict[uuid.UUID, int] = {}
+        self._label_keys: dict[int, uuid.UUID] = {}
+        self._next_label = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._graph = None
+            self._labels = {}
+            self._label_keys = {}
+            self._next_label = 0
+
+    def _ensure_graph(self) -> None:
+        if self._graph is None:
+            self._graph = hnswlib.Index(space="l2", dim=self._dim)
+            self._graph.init_index(max_elements=1024, ef_construction=self.ef_construction, M=self.m, allow_replace_deleted=True)
+            self._graph.set_ef(self.ef_search)
+
+    def _on_upsert(self, key: uuid.UUID, row: int, vec: np.ndarray) -> None:
+        self._ensure_graph()
+        label = self._labels.get(key)
+        if label is None:
+            label = self._next_label
+            self._next_label += 1
+            self._labels[key] = label
+            self._label_keys[label] = key
+        if self._graph.get_current_count() >= self._graph.get_max_elements():
+            self._graph.resize_index(self._graph.get_max_elements() * 2)
+        self._graph.add_items(vec.reshape(1, -1), np.array([label]), replace_deleted=True)
+
+    def _on_remove(self, key: uuid.UUID) -> None:
+        label = self._labels.pop(key, None)
+        if label is not None and self._graph is not None:
+            self._label_keys.pop(label, None)
+            self._graph.mark_deleted(label)
+
+    def search(self, db: Session, vector: Iterable[float], top_k: int = 20) -> list[tuple[uuid.UUID, float]]:
+        self.refresh(db)
+        with self._lock:
+            n = len(self._keys)
+            if self._graph is None or n < self.EXACT_SEARCH_BELOW:
+                return super().search(db, vector, top_k)
+            q = parse_pg_vector(vector)
+            if q is None or q.shape[0] != self._dim or top_k <= 0:
+                return []
+            k = min(top_k, n)
+            self._graph.set_ef(max(self.ef_search, k))
+            labels, sq = self._graph.knn_query(q.reshape(1, -1), k=k)
+            return [
+                (self._label_keys[int(label)], float(np.sqrt(max(d, 0.0))))
+                for label, d in zip(labels[0].tolist(), sq[0].tolist())
+                if int(label) in self._label_keys
+            ]
+
+
+class PgVectorIndex(VectorIndex):
+    """Delegates search to pgvector so Postgres can use an ivfflat/hnsw index.
+
+    Note that `<->` is L2 distance; an index only serves it when built with
+    `vector_l2_ops` (see `app/database/ensure_pgvector_tables.py`).
+    """
+
+    name = "pgvector"
+
+    def __init__(self, table: str = "expert_embeddings", key_column: str = "user_id", where: Optional[str] = None):
+        self.table = table
+        self.key_column = key_column
+        self.where = where
+
+    def search(self, db: Session, vector: Iterable[float], top_k: int = 20) -> list[tuple[uuid.UUID, float]]:
+        q = parse_pg_vector(vector)
+        if q is None or top_k <= 0:
+            return []
+        emb = "[" + ",".join(f"{x:.6f}" for x in q.tolist()) + "]"
+        sql = text(
+            f"SELECT {self.key_column}, embedding <-> CAST(:emb AS vector) AS dist "
+            f"FROM {self.table} WHERE embedding IS NOT NULL {f'AND {self.where} ' if self.where else ''}"
+            f"ORDER BY embedding <-> CAST(:emb AS vector) LIMIT :k"
+        )
+        rows = db.execute(sql, {"emb": emb, "k": top_k}).fetchall()
+        return [(r[0], float(r[1])) for r in rows]
+
+
+def create_vector_index(backend: str, table: str, key_column: str, where: Optional[str] = None) -> VectorIndex:
+    backend = (backend or "memory").strip().lower()
+    if backend == "pgvector":
+        return PgVectorIndex(table=table, key_column=key_column, where=where)
+    refresh = settings.VECTOR_INDEX_REFRESH_SECONDS
+    if backend == "hnsw":
+        if hnswlib is not None:
+            return HnswVectorIndex(table=table, key_column=key_column, where=where, refresh_seconds=refresh)
+        logger.warning("hnswlib not installed; falling back to exact in-memory vector index")
+    return NumpyVectorIndex(table=table, key_column=key_column, where=where, refresh_seconds=refresh)
+
+
+# session.info key of the changes staged by the session's open transaction
+PENDING_CHANGES = "vector_index_changes"
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_staged_changes(session: Session) -> None:
+    for (index, _), (version, changes) in session.info.pop(PENDING_CHANGES, {}).items():
+        try:
+            index.apply(version, changes)
+        except Exception as e:
+            logger.error(f"Could not apply {len(changes)} committed changes to vector index '{index.name}': {e}")
+
+
+def _within(transaction, ancestor) -> bool:
+    while transaction is not None:
+        if transaction is ancestor:
+            return True
+        transaction = transaction.parent
+    return False
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_staged_changes(session: Session, previous_transaction) -> None:
+    pending = session.info.get(PENDING_CHANGES)
+    if not pending:
+        return
+    if not previous_transaction.nested:
+        session.info.pop(PENDING_CHANGES, None)
+        return
+    for key in [key for key in pending if _within(key[1], previous_transaction)]:
+        del pending[key]
+
+
+# Global expert index instance; only active accounts are searchable
+expert_index: VectorIndex = create_vector_index(
+    settings.VECTOR_INDEX_BACKEND,
+    "expert_embeddings",
+    "user_id",
+    where=f"user_id IN (SELECT id FROM users WHERE status = '{UserStatus.active.name}')",
+)
+
+
+@event.listens_for(Session, "before_flush")
+def _track_expert_accounts(session: Session, flush_context, instances) -> None:
+    """Drop experts from the index when their account is deactivated or deleted, re-add on activation"""
+    for user in session.deleted:
+        if isinstance(user, User):
+            expert_index.stage_remove(session, user.id)
+    for user in session.dirty:
+        if not isinstance(user, User):
+            continue
+        history = inspect(user).attrs.status.history
+        if not history.has_changes():
+            continue
+        if user.status == UserStatus.active:
+            expert_index.stage_reload(session, user.id)
+        else:
+            expert_index.stage_remove(session, user.id)
+
+
+def load_expert_index(db: Session) -> int:
+    """Load the expert index from the database (no-op for pgvector)"""
+    return expert_index.load(db)
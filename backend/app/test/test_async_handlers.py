@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core import loop_guard
+from app.core.loop_guard import LoopWatchdog
+from app.models.chat_model import Conversation, ConversationParticipant
+from app.models.communication_log_model import CommunicationLog
+from app.models.notification_model import Notification
+from app.test.test_helpers import create_admin_user, create_test_user, get_admin_headers
+
+
+def test_send_message_on_async_session(client: TestClient, db: Session):
+    sender, recipient, outsider = create_test_user(db), create_test_user(db), create_test_user(db)
+    conv = Conversation()
+    db.add(conv)
+    db.flush()
+    db.add_all([ConversationParticipant(conversation_id=conv.id, user_id=u.id) for u in (sender, recipient)])
+    db.commit()
+
+    url = f"/api/v1/chat/conversations/{conv.id}/messages"
+    r = client.post(url, json={"content": "Hello there"}, headers=get_admin_headers(client, sender))
+    assert r.status_code == 200, r.text
+    assert r.json()["sender_id"] == str(sender.id) and r.json()["sender_name"] == sender.profile.full_name
+
+    notif = db.query(Notification).filter(Notification.recipient_id == recipient.id).one()
+    assert notif.content.startswith(f"New message from {sender.profile.full_name}: Hello there")
+    assert db.query(Notification).filter(Notification.recipient_id == sender.id).count() == 0
+
+    assert client.post(url, json={"content": "x"}, headers=get_admin_headers(client, outsider)).status_code == 403
+
+
+def test_admin_broadcasts_on_async_session(client: TestClient, db: Session):
+    admin = create_admin_user(db)
+    headers = get_admin_headers(client, admin)
+    user = create_test_user(db)
+
+    r = client.post(
+        "/api/v1/admin/notifications/broadcast",
+        json={"title": "T", "content": "Maintenance tonight", "target_user_id": str(user.id)},
+        headers=headers,
+    )
+    assert r.status_code == 202 and r.json()["count"] == 1
+    notif = db.query(Notification).filter(Notification.recipient_id == user.id).one()
+    assert notif.content == "Maintenance tonight" and notif.created_at is not None
+
+    r = client.post(
+        "/api/v1/admin/email-templates/broadcast",
+        json={"template_name": "none", "variables": {"subject": "Hi"}, "target_user_id": str(user.id)},
+        headers=headers,
+    )
+    assert r.status_code == 200 and r.json() == {"count": 1}
+    assert db.query(CommunicationLog).filter(CommunicationLog.recipient == user.email).one().subject == "Hi"
+
+
+def test_sync_query_on_the_loop_is_logged(db: Session, caplog, monkeypatch):
+    monkeypatch.setattr(loop_guard, "_reported_call_sites", set())
+    loop_guard.install_sync_db_guard()
+
+    db.execute(text("SELECT 1"))  # off the loop: fine
+
+    async def handler():
+        for _ in range(2):
+            db.execute(text("SELECT 1"))
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_guard"):
+        asyncio.run(handler())
+    warnings = [r.getMessage() for r in caplog.records]
+    # Once per call site
+    assert len(warnings) == 1 and "test_async_handlers.py" in warnings[0] and "in handler" in warnings[0]
+
+
+def test_watchdog_reports_stalls(caplog):
+    watchdog = LoopWatchdog(threshold_ms=40)
+
+    async def run():
+        await watchdog.start()
+        await asyncio.sleep(0.1)
+        time.sleep(0.2)  # blocks the loop
+        await asyncio.sleep(0.05)
+        await watchdog.stop()
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_guard"):
+        asyncio.run(run())
+    assert watchdog.stats()["stalls"] == 1 and watchdog.longest_ms >= 100
+    assert "time.sleep(0.2)" in caplog.records[0].getMessage()
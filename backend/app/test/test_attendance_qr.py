@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.routers.event_router import _verify_attendance_token
+from app.services import qr_service
+from app.services.qr_service import qr_cache
+from app.test.test_helpers import create_test_event, create_test_user, get_admin_headers
+
+
+def test_rotation_window():
+    now = datetime(2026, 5, 1, 10, 7, 30, tzinfo=timezone.utc)
+    expires_at, rollover = qr_service.rotation_window(15, now)
+    assert rollover == datetime(2026, 5, 1, 10, 15, tzinfo=timezone.utc)
+    # Still valid for a full window after the image changes
+    assert expires_at == datetime(2026, 5, 1, 10, 30, tzinfo=timezone.utc)
+    assert qr_service.rotation_window(15, datetime(2026, 5, 1, 10, 14, 59, tzinfo=timezone.utc)) == (expires_at, rollover)
+
+
+def test_attendance_qr_is_cached_until_rollover(client: TestClient, db: Session):
+    organizer = create_test_user(db)
+    event = create_test_event(db, organizer.id)
+    headers = get_admin_headers(client, organizer)
+    url = f"/api/v1/events/{event.id}/attendance/qr"
+    qr_cache.clear()
+
+    r = client.get(url + ".png", headers=headers)
+    assert r.status_code == 200 and r.headers["content-type"] == "image/png"
+    assert r.content.startswith(b"\x89PNG")
+    max_age = int(r.headers["cache-control"].removeprefix("private, max-age="))
+    assert 0 <= max_age <= 15 * 60
+
+    # Same window: same image from the cache, or nothing at all if the client has it
+    again = client.get(url + ".png", headers=headers)
+    assert again.content == r.content and again.headers["etag"] == r.headers["etag"]
+    assert qr_cache.stats()["hits"] == 1
+    not_modified = client.get(url + ".png", headers={**headers, "If-None-Match": r.headers["etag"]})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+
+    svg = client.get(url + ".svg", headers=headers)
+    assert svg.status_code == 200 and svg.headers["content-type"] == "image/svg+xml"
+    assert b"<svg" in svg.content and svg.headers["etag"] != r.headers["etag"]
+    assert client.get(url + ".gif", headers=headers).status_code == 422
+
+    # The cached token is the one a scan verifies
+    (token, fmt), = [k for k in qr_cache._entries if k[1] == "png"]
+    assert _verify_attendance_token(token) == event.id
+
+    outsider = get_admin_headers(client, create_test_user(db))
+    assert client.get(url + ".png", headers=outsider).status_code == 403
+
+
+def test_user_attendance_qr(client: TestClient, db: Session):
+    organizer = create_test_user(db)
+    event = create_test_event(db, organizer.id)
+    headers = get_admin_headers(client, organizer)
+    r = client.get(f"/api/v1/events/{event.id}/attendance/user_qr.svg", headers=headers)
+    assert r.status_code == 200 and r.headers["etag"]
+
+    outsider = get_admin_headers(client, create_test_user(db))
+    assert client.get(f"/api/v1/events/{event.id}/attendance/user_qr.png", headers=outsider).status_code == 403
@@ -0,0 +1,180 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.config import settings
+from app.models.chat_model import Conversation, ConversationParticipant, Message, StreamSyncJob
+from app.services.chat_realtime import ChatSocket, typing_event
+from app.services.stream_sync import enqueue_message_sync, process_stream_sync
+from app.test.test_helpers import create_test_user, get_admin_headers
+
+
+def _conversation(db: Session, *users) -> Conversation:
+    conv = Conversation()
+    db.add(conv)
+    db.flush()
+    db.add_all([ConversationParticipant(conversation_id=conv.id, user_id=u.id) for u in users])
+    db.commit()
+    return conv
+
+
+def _token(headers: dict) -> str:
+    return headers["Authorization"].removeprefix("Bearer ")
+
+
+def _receive_until(ws, kind: str, seen: list | None = None) -> dict:
+    while True:
+        for event in ws.receive_json():
+            if seen is not None:
+                seen.append(event["type"])
+            if event["type"] == kind:
+                return event
+
+
+def test_websocket_delivers_messages_typing_and_receipts(client: TestClient, db: Session):
+    alice, bob, outsider = create_test_user(db), create_test_user(db), create_test_user(db)
+    conv = _conversation(db, alice, bob)
+    h_alice, h_bob = get_admin_headers(client, alice), get_admin_headers(client, bob)
+    subscribe = {"type": "subscribe", "conversation_id": str(conv.id)}
+
+    with client.websocket_connect(f"/api/v1/chat/ws?token={_token(h_bob)}") as bob_ws, \
+            client.websocket_connect(f"/api/v1/chat/ws?token={_token(h_alice)}") as alice_ws:
+        bob_ws.send_json(subscribe)
+        alice_ws.send_json(subscribe)
+        assert _receive_until(bob_ws, "subscribed")["conversation_id"] == str(conv.id)
+        _receive_until(alice_ws, "subscribed")
+
+        r = client.post(f"/api/v1/chat/conversations/{conv.id}/messages", json={"content": "Hi Bob"}, headers=h_alice)
+        assert r.status_code == 200, r.text
+        event = _receive_until(bob_ws, "chat.message")
+        assert event["message"]["id"] == r.json()["id"] and event["message"]["content"] == "Hi Bob"
+
+        # Typing reaches the others, not the typist
+        alice_ws.send_json({"type": "typing", "conversation_id": str(conv.id)})
+        assert _receive_until(bob_ws, "chat.typing")["user_id"] == str(alice.id)
+
+        bob_ws.send_json({"type": "read", "conversation_id": str(conv.id)})
+        seen = []
+        receipt = _receive_until(alice_ws, "chat.read", seen)
+        assert receipt["user_id"] == str(bob.id) and receipt["read_at"]
+        assert "chat.message" in seen and "chat.typing" not in seen
+    db.expire_all()
+    assert db.get(ConversationParticipant, (conv.id, bob.id)).unread_count == 0
+
+    with client.websocket_connect(f"/api/v1/chat/ws?token={_token(get_admin_headers(client, outsider))}") as ws:
+        ws.send_json(subscribe)
+        assert _receive_until(ws, "error")["detail"] == "Not a participant"
+        ws.send_json({"type": "typing", "conversation_id": str(conv.id)})
+        assert _receive_until(ws, "error")["detail"] == "Not subscribed"
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/api/v1/chat/ws?token=invalid") as ws:
+            ws.receive_json()
+
+
+def test_read_after_leaving_reports_an_error(client: TestClient, db: Session):
+    alice, bob = create_test_user(db), create_test_user(db)
+    conv = _conversation(db, alice, bob)
+    h_bob = get_admin_headers(client, bob)
+
+    with client.websocket_connect(f"/api/v1/chat/ws?token={_token(h_bob)}") as ws:
+        ws.send_json({"type": "subscribe", "conversation_id": str(conv.id)})
+        _receive_until(ws, "subscribed")
+        db.delete(db.get(ConversationParticipant, (conv.id, bob.id)))
+        db.commit()
+
+        ws.send_json({"type": "read", "conversation_id": str(conv.id)})
+        assert _receive_until(ws, "error")["detail"] == "Not a participant"
+        # The socket keeps serving frames
+        ws.send_json({"type": "typing", "conversation_id": str(conv.id)})
+        assert _receive_until(ws, "error")["detail"] == "Not subscribed"
+
+
+def test_socket_batches_and_coalesces():
+    async def scenario():
+        socket = ChatSocket(uuid.uuid4(), max_queue=10)
+        conv, typist = uuid.uuid4(), uuid.uuid4()
+        socket.offer({"type": "chat.message", "n": 1})
+        socket.offer(typing_event(conv, typist))
+        socket.offer(typing_event(conv, typist))
+        asyncio.get_running_loop().call_later(0.01, socket.offer, {"type": "chat.message", "n": 2})
+        batch = await socket.next_batch(window=0.05, limit=10)
+        assert [e["type"] for e in batch] == ["chat.message", "chat.typing", "chat.message"]
+        assert socket.coalesced == 1 and len(socket) == 0
+
+    asyncio.run(scenario())
+
+
+class FakeStream:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.sent = []
+
+    def send_message(self, channel_type, channel_id, user_id, text):
+        if self.fail:
+            raise RuntimeError("GetStream down")
+        self.sent.append((channel_id, user_id, text))
+
+
+def test_getstream_mirror_is_queued_and_retried(client: TestClient, db: Session, monkeypatch):
+    monkeypatch.setattr(settings, "GET_STREAM_API_KEY", "key")
+    monkeypatch.setattr(settings, "GET_STREAM_SECRET_KEY", "secret")
+    alice, bob = create_test_user(db), create_test_user(db)
+    conv = _conversation(db, alice, bob)
+
+    # The handler only queues the mirror
+    r = client.post(f"/api/v1/chat/conversations/{conv.id}/messages", json={"content": "Hello"}, headers=get_admin_headers(client, alice))
+    assert r.status_code == 200, r.text
+    message_id = uuid.UUID(r.json()["id"])
+    job = db.get(StreamSyncJob, message_id)
+    assert job is not None and job.status == "pending"
+
+    assert process_stream_sync(db, service=FakeStream(fail=True)) == {"claimed": 1, "sent": 0, "failed": 1}
+    db.expire_all()
+    job = db.get(StreamSyncJob, message_id)
+    assert job.attempts == 1 and job.last_error == "GetStream down"
+    assert job.available_at > datetime.now(timezone.utc)
+    assert process_stream_sync(db, service=FakeStream())["claimed"] == 0  # backing off
+
+    job.available_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    stream = FakeStream()
+    assert process_stream_sync(db, service=stream)["sent"] == 1
+    assert stream.sent == [(f"legacy_{conv.id}", str(alice.id), "Hello")]
+    db.expire_all()
+    assert db.get(StreamSyncJob, message_id) is None
+
+
+def test_getstream_mirror_gives_up(db: Session, monkeypatch):
+    monkeypatch.setattr(settings, "GET_STREAM_API_KEY", "key")
+    monkeypatch.setattr(settings, "GET_STREAM_SECRET_KEY", "secret")
+    monkeypatch.setattr(settings, "STREAM_SYNC_MAX_ATTEMPTS", 1)
+    alice, bob = create_test_user(db), create_test_user(db)
+    conv = _conversation(db, alice, bob)
+    msg = Message(conversation_id=conv.id, sender_id=alice.id, content="x")
+    db.add(msg)
+    db.flush()
+    enqueue_message_sync(db, msg.id)
+    db.commit()
+
+    process_stream_sync(db, service=FakeStream(fail=True))
+    db.expire_all()
+    assert db.get(StreamSyncJob, msg.id).status == "failed"
+    assert process_stream_sync(db, service=FakeStream())["claimed"] == 0
+
+
+def test_no_mirror_without_getstream(db: Session, monkeypatch):
+    monkeypatch.setattr(settings, "GET_STREAM_API_KEY", "")
+    alice, bob = create_test_user(db), create_test_user(db)
+    conv = _conversation(db, alice, bob)
+    msg = Message(conversation_id=conv.id, sender_id=alice.id, content="x")
+    db.add(msg)
+    db.flush()
+    enqueue_message_sync(db, msg.id)
+    db.commit()
+    assert db.query(StreamSyncJob).count() == 0
@@ -0,0 +1,106 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.chat_model import Conversation, ConversationParticipant
+from app.services.conversation_service import get_or_create_direct_conversation, participant_key
+from app.test.test_helpers import create_test_user, get_admin_headers
+
+
+def test_direct_conversation_is_unique_per_pair(client: TestClient, db: Session):
+    alice, bob, carol = create_test_user(db), create_test_user(db), create_test_user(db)
+    h_alice, h_bob = get_admin_headers(client, alice), get_admin_headers(client, bob)
+
+    r = client.post("/api/v1/chat/conversations", json={"participant_ids": [str(bob.id)]}, headers=h_alice)
+    assert r.status_code == 200, r.text
+    conv_id = r.json()["id"]
+    # Either side gets the same conversation back
+    again = client.post("/api/v1/chat/conversations", json={"participant_ids": [str(alice.id)]}, headers=h_bob)
+    assert again.json()["id"] == conv_id
+    conv = db.get(Conversation, conv_id)
+    assert conv.participant_key == participant_key([bob.id, alice.id])
+    assert {p.user_id for p in conv.participants} == {alice.id, bob.id}
+
+    # Group chats are not keyed and always new
+    group = {"participant_ids": [str(bob.id), str(carol.id)]}
+    first = client.post("/api/v1/chat/conversations", json=group, headers=h_alice).json()["id"]
+    assert client.post("/api/v1/chat/conversations", json=group, headers=h_alice).json()["id"] != first
+
+    # A booking reuses the pair's chat
+    start = datetime.now(timezone.utc) + timedelta(days=3)
+    r = client.post(
+        "/api/v1/bookings",
+        json={"expert_id": str(bob.id), "start_datetime": start.isoformat(), "end_datetime": (start + timedelta(hours=1)).isoformat(), "message": "Hi"},
+        headers=h_alice,
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["conversation_id"] == conv_id
+
+
+def test_concurrent_get_or_create(db: Session):
+    alice, bob = create_test_user(db), create_test_user(db)
+    make_session = sessionmaker(bind=db.get_bind())
+    barrier = threading.Barrier(4)
+    results = []
+
+    def create():
+        session = make_session()
+        try:
+            barrier.wait()
+            results.append(get_or_create_direct_conversation(session, alice.id, bob.id))
+            session.commit()
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=create) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(results)) == 1
+    assert db.query(Conversation).filter(Conversation.participant_key == participant_key([alice.id, bob.id])).count() == 1
+    assert db.query(ConversationParticipant).filter(ConversationParticipant.conversation_id == results[0]).count() == 2
+
+
+def test_inbox_projection(client: TestClient, db: Session):
+    me, others = create_test_user(db), [create_test_user(db) for _ in range(3)]
+    h_me = get_admin_headers(client, me)
+    conv_ids = []
+    for other in others:
+        conv_id = client.post("/api/v1/chat/conversations", json={"participant_ids": [str(other.id)]}, headers=h_me).json()["id"]
+        conv_ids.append(conv_id)
+        h_other = get_admin_headers(client, other)
+        for text in ("one", "two"):
+            assert client.post(f"/api/v1/chat/conversations/{conv_id}/messages", json={"content": text}, headers=h_other).status_code == 200
+    client.post(f"/api/v1/chat/conversations/{conv_ids[0]}/messages", json={"content": "reply"}, headers=h_me)
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        inbox = client.get("/api/v1/chat/conversations", headers=h_me).json()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    # Not per conversation: the inbox query and its eager loads (plus auth)
+    assert len(statements) <= 4
+
+    by_id = {c["id"]: c for c in inbox}
+    assert [c["id"] for c in inbox][0] == conv_ids[0]  # most recent activity first
+    assert by_id[conv_ids[0]]["last_message"]["content"] == "reply" and by_id[conv_ids[0]]["unread_count"] == 2
+    assert by_id[conv_ids[1]]["last_message"]["content"] == "two" and by_id[conv_ids[1]]["last_message_at"]
+
+    # Reading resets my counter only
+    client.get(f"/api/v1/chat/conversations/{conv_ids[1]}/messages", headers=h_me)
+    inbox = {c["id"]: c for c in client.get("/api/v1/chat/conversations", headers=h_me).json()}
+    assert inbox[conv_ids[1]]["unread_count"] == 0 and inbox[conv_ids[2]]["unread_count"] == 2
+    h_first = get_admin_headers(client, others[0])
+    theirs = client.get("/api/v1/chat/conversations", headers=h_first).json()
+    assert theirs[0]["unread_count"] == 1
@@ -0,0 +1,112 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import resend
+from sqlalchemy.orm import Session
+
+from app.models.communication_log_model import CommunicationLog, CommunicationStatus
+from app.services import email_outbox
+from app.services.email_outbox import EmailTransport, FileTransport, ResendTransport, process_batch
+from app.services.email_service import enqueue_email
+
+
+class RecordingTransport(EmailTransport):
+    name = "recording"
+
+    def __init__(self, max_batch: int = 2, fail: bool = False):
+        self.max_batch = max_batch
+        self.fail = fail
+        self.batches = []
+
+    def send_batch(self, messages):
+        self.batches.append([m["to"][0] for m in messages])
+        if self.fail:
+            raise RuntimeError("provider down")
+        return [None] * len(messages)
+
+
+def _logs(db: Session):
+    db.expire_all()
+    return db.query(CommunicationLog).order_by(CommunicationLog.created_at).all()
+
+
+def test_enqueue_joins_caller_transaction(db: Session, monkeypatch):
+    wakeups = []
+    monkeypatch.setattr(email_outbox.outbox_worker, "notify", lambda: wakeups.append(1))
+
+    enqueue_email("a@example.com", "Hi", "<p>hi</p>", {"type": "test"}, db=db)
+    db.rollback()
+    assert _logs(db) == []
+    db.commit()
+    assert wakeups == []
+
+    # One wakeup per commit, however many emails it queued
+    for _ in range(3):
+        enqueue_email("a@example.com", "Hi", "<p>hi</p>", {"type": "test"}, db=db)
+    db.commit()
+    assert wakeups == [1]
+    log = _logs(db)[0]
+    assert log.status == CommunicationStatus.PENDING
+    assert log.attempts == 0
+
+
+def test_process_batch_sends_in_chunks(db: Session, tmp_path):
+    for i in range(5):
+        enqueue_email(f"user{i}@example.com", f"Subject {i}", "<p>x</p>", db=db)
+    db.commit()
+
+    transport = RecordingTransport(max_batch=2)
+    assert process_batch(db, transport) == 5
+    assert [len(b) for b in transport.batches] == [2, 2, 1]
+    assert all(log.status == CommunicationStatus.SENT for log in _logs(db))
+    assert process_batch(db, transport) == 0
+
+    out = tmp_path / "outbox.jsonl"
+    enqueue_email("file@example.com", "To file", "<p>f</p>", db=db)
+    db.commit()
+    process_batch(db, FileTransport(str(out)))
+    [line] = out.read_text().splitlines()
+    assert json.loads(line)["to"] == ["file@example.com"]
+
+
+def test_failures_back_off_then_give_up(db: Session, monkeypatch):
+    monkeypatch.setattr(email_outbox.settings, "EMAIL_MAX_ATTEMPTS", 2)
+    enqueue_email("retry@example.com", "Retry", "<p>r</p>", db=db)
+    db.commit()
+    transport = RecordingTransport(fail=True)
+
+    assert process_batch(db, transport) == 1
+    [log] = _logs(db)
+    assert log.status == CommunicationStatus.PENDING
+    assert log.attempts == 1
+    assert log.error_message == "provider down"
+    assert log.next_attempt_at > datetime.now(timezone.utc)
+
+    # Not due yet
+    assert process_batch(db, transport) == 0
+
+    log.next_attempt_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+    db.commit()
+    assert process_batch(db, transport) == 1
+    [log] = _logs(db)
+    assert log.status == CommunicationStatus.FAILED
+    assert log.attempts == 2
+
+
+def test_resend_rejected_batch_falls_back_to_single_sends(monkeypatch):
+    def reject_batch(messages):
+        raise resend.exceptions.ValidationError("Invalid `to` field", "validation_error", 422)
+
+    def send(message):
+        if message["to"] == ["not-an-email"]:
+            raise resend.exceptions.ValidationError("Invalid `to` field", "validation_error", 422)
+        sent.append(message["to"][0])
+
+    sent = []
+    monkeypatch.setattr(resend.Batch, "send", reject_batch)
+    monkeypatch.setattr(resend.Emails, "send", send)
+    messages = [{"from": "x@example.com", "to": [to], "subject": "s", "html": "h"} for to in ("a@example.com", "not-an-email", "b@example.com")]
+
+    errors = ResendTransport(api_key="test").send_batch(messages)
+    assert errors == [None, "Invalid `to` field", None]
+    assert sent == ["a@example.com", "b@example.com"]
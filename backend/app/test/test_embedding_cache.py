@@ -0,0 +1,71 @@
+import threading
+import time
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.services import ai_service
+from app.services.embedding_cache import EmbeddingCache, QUERY_TASK, DOCUMENT_TASK, embedding_cache
+
+
+def test_normalized_queries_share_an_entry():
+    cache = EmbeddingCache(ttl_seconds=60, max_size=10, persist=False)
+    calls = []
+    compute = lambda text: calls.append(text) or [1.0, 2.0]
+
+    assert cache.get_or_compute("gemini", "m", QUERY_TASK, "Python  Expert ", compute) == [1.0, 2.0]
+    assert cache.get_or_compute("gemini", "m", QUERY_TASK, "python expert", compute) == [1.0, 2.0]
+    assert calls == ["python expert"]
+    # Task type and model are part of the key; documents keep their case
+    cache.get_or_compute("gemini", "m", DOCUMENT_TASK, "Python Expert", compute)
+    cache.get_or_compute("gemini", "other", QUERY_TASK, "python expert", compute)
+    assert calls == ["python expert", "Python Expert", "python expert"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_failures_are_not_cached_and_lru_evicts():
+    cache = EmbeddingCache(ttl_seconds=60, max_size=2, persist=False)
+    calls = []
+    assert cache.get_or_compute("p", "m", QUERY_TASK, "down", lambda t: calls.append(t)) is None
+    assert cache.get_or_compute("p", "m", QUERY_TASK, "down", lambda t: calls.append(t)) is None
+    assert len(calls) == 2
+
+    for q in ("a", "b", "c"):
+        cache.get_or_compute("p", "m", QUERY_TASK, q, lambda t: [0.5])
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+
+
+def test_concurrent_misses_are_coalesced():
+    cache = EmbeddingCache(ttl_seconds=60, max_size=10, persist=False)
+    calls = []
+
+    def slow(text):
+        calls.append(text)
+        time.sleep(0.2)
+        return [3.0]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("p", "m", QUERY_TASK, "popular", slow)))
+        for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [[3.0]] * 5
+    assert len(calls) == 1
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_semantic_search_hit_skips_provider(client: TestClient, monkeypatch):
+    calls = []
+    original = ai_service._request_embedding
+    monkeypatch.setattr(ai_service, "_request_embedding", lambda *a: calls.append(a) or original(*a))
+    q = f"embedding cache {uuid.uuid4().hex[:8]}"
+
+    assert client.get("/api/v1/events/semantic-search", params={"q_text": q}).status_code == 200
+    assert client.get("/api/v1/events/semantic-search", params={"q_text": q.upper()}).status_code == 200
+    assert client.get("/api/v1/profiles/semantic-search", params={"q_text": q}).status_code == 200
+    assert len(calls) == 1
+    assert embedding_cache.stats()["hits"] >= 2
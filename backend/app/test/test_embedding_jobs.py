@@ -0,0 +1,99 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.ai_model import EmbeddingJob
+from app.models.event_model import EventStatus
+from app.services import ai_service, embedding_jobs
+from app.services.embedding_jobs import enqueue_event, process_embedding_jobs
+from app.services.embedding_pipeline import event_source_text
+from app.test.test_helpers import create_admin_user, create_test_event, create_test_user, get_admin_headers
+
+
+def _job(db: Session, entity_id) -> EmbeddingJob | None:
+    db.expire_all()
+    return db.query(EmbeddingJob).filter(EmbeddingJob.entity_id == entity_id).first()
+
+
+def test_publish_enqueues_and_worker_embeds(client: TestClient, db: Session, monkeypatch):
+    admin = create_admin_user(db)
+    headers = get_admin_headers(client, admin)
+    token = f"zq{uuid.uuid4().hex[:8]}"
+    event = create_test_event(db, create_test_user(db).id, title=f"{token} workshop")
+
+    calls = []
+    monkeypatch.setattr(ai_service, "_request_embedding", lambda *a, **kw: calls.append(a) or [0.0] * 768)
+    assert client.put(f"/api/v1/admin/events/{event.id}/publish", headers=headers).status_code == 200
+    # The request only queued the work
+    assert calls == []
+    job = _job(db, event.id)
+    source_text = event_source_text(event.title, event.description, event.format, event.type)
+    assert job.status == "pending" and job.source_text == source_text
+
+    # Not indexed yet, but semantic search still finds it by text
+    found = client.get("/api/v1/events/semantic-search", params={"q_text": token, "top_k": 1000}).json()
+    assert str(event.id) in [e["id"] for e in found]
+
+    stats = process_embedding_jobs(db)
+    assert stats["embedded"] >= 1 and stats["failed"] == 0
+    # Kept as the text fallback until every worker's index has the vector
+    assert _job(db, event.id).status == "done"
+    found = client.get("/api/v1/events/semantic-search", params={"q_text": token, "top_k": 1000}).json()
+    assert str(event.id) in [e["id"] for e in found]
+    monkeypatch.setattr(settings, "VECTOR_INDEX_REFRESH_SECONDS", 0)
+    process_embedding_jobs(db)
+    assert _job(db, event.id) is None
+    stored = db.execute(text("SELECT source_text FROM event_embeddings WHERE event_id = :id"), {"id": event.id}).scalar()
+    assert stored == source_text
+
+    # Re-enqueueing unchanged text does not call the provider again
+    enqueue_event(db, event)
+    db.commit()
+    assert process_embedding_jobs(db)["unchanged"] == 1
+    assert _job(db, event.id) is None
+
+
+def test_repeated_edits_coalesce_and_failures_back_off(db: Session, monkeypatch):
+    event = create_test_event(db, create_test_user(db).id, status=EventStatus.published)
+    for title in ("First", "Second", "Third"):
+        event.title = title
+        enqueue_event(db, event)
+        db.commit()
+    job = _job(db, event.id)
+    assert db.query(EmbeddingJob).filter(EmbeddingJob.entity_id == event.id).count() == 1
+    assert job.source_text.startswith("Third\n")
+
+    db.query(EmbeddingJob).filter(EmbeddingJob.entity_id != event.id).delete()
+    db.commit()
+    monkeypatch.setattr(ai_service, "generate_text_embeddings", lambda texts, is_document=True: [None] * len(texts))
+    monkeypatch.setattr(settings, "EMBEDDING_JOB_MAX_ATTEMPTS", 2)
+
+    assert process_embedding_jobs(db)["failed"] == 1
+    job = _job(db, event.id)
+    assert job.status == "pending" and job.attempts == 1 and job.last_error
+    # Backed off: not due again yet
+    assert process_embedding_jobs(db)["claimed"] == 0
+
+    db.query(EmbeddingJob).filter(EmbeddingJob.id == job.id).update({"available_at": job.created_at})
+    db.commit()
+    process_embedding_jobs(db)
+    assert _job(db, event.id).status == "failed"
+
+
+def test_failed_upsert_backs_off(db: Session, monkeypatch):
+    event = create_test_event(db, create_test_user(db).id, status=EventStatus.published)
+    db.query(EmbeddingJob).delete()
+    enqueue_event(db, event)
+    db.commit()
+
+    def broken_upsert(*args):
+        raise RuntimeError("vector dimension mismatch")
+
+    monkeypatch.setattr(embedding_jobs, "upsert_embeddings", broken_upsert)
+    assert process_embedding_jobs(db)["failed"] == 1
+    job = _job(db, event.id)
+    assert job.status == "pending" and job.attempts == 1 and job.last_error == "vector dimension mismatch"
+    assert process_embedding_jobs(db)["claimed"] == 0
@@ -0,0 +1,122 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.core.security import get_password_hash
+from app.models.ai_model import EmbeddingCheckpoint
+from app.models.event_model import Event, EventFormat, EventRegistrationType, EventStatus, EventType
+from app.models.user_model import User, UserStatus
+from app.services import ai_service
+from app.services.embedding_pipeline import event_source_text, reindex, source_hash
+
+
+def _seed_events(db: Session, count: int) -> list[Event]:
+    organizer = User(
+        email=f"embed-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(organizer)
+    db.flush()
+    now = datetime.now(timezone.utc)
+    events = [
+        Event(
+            organizer_id=organizer.id,
+            title=f"Embed {i}",
+            format=EventFormat.workshop,
+            type=EventType.online,
+            start_datetime=now + timedelta(days=1),
+            end_datetime=now + timedelta(days=2),
+            registration_type=EventRegistrationType.free,
+            status=EventStatus.published,
+        )
+        for i in range(count)
+    ]
+    db.add_all(events)
+    db.commit()
+    return events
+
+
+def _batch_calls(monkeypatch) -> list[int]:
+    calls = []
+    original = ai_service.generate_text_embeddings
+
+    def counting(texts, is_document=True):
+        calls.append(len(texts))
+        return original(texts, is_document)
+
+    monkeypatch.setattr(ai_service, "generate_text_embeddings", counting)
+    return calls
+
+
+def test_source_text_and_hash():
+    assert event_source_text("T", None, EventFormat.workshop, "online") == "T\n\nformat:workshop type:online"
+    assert source_hash("abc") == "900150983cd24fb0d6963f7d28e17f72"
+
+
+def test_reindex_batches_skips_unchanged_and_resumes(db: Session, monkeypatch):
+    db.execute(text("DELETE FROM event_embeddings"))
+    db.query(EmbeddingCheckpoint).delete()
+    db.commit()
+    events = _seed_events(db, 5)
+    total = db.execute(text("SELECT count(*) FROM events WHERE visibility = 'public' AND deleted_at IS NULL")).scalar()
+    calls = _batch_calls(monkeypatch)
+
+    # Interrupted run: only part of the rows, but the checkpoint is committed
+    first = reindex(db, "events", chunk_size=2, limit=3)
+    assert first["scanned"] == 3 and first["embedded"] == 3 and not first["completed"]
+    assert calls == [2, 1]
+
+    resumed = reindex(db, "events", chunk_size=2)
+    assert resumed["resumed_after"] is not None
+    assert resumed["completed"] and first["scanned"] + resumed["scanned"] == total
+    assert db.execute(text("SELECT count(*) FROM event_embeddings")).scalar() == total
+
+    # Nothing changed: every row is skipped and the provider is not called
+    calls.clear()
+    again = reindex(db, "events", chunk_size=10)
+    assert again["skipped"] == total and again["embedded"] == 0
+    assert all(n == 0 for n in calls)
+
+    # Only the edited row is re-embedded
+    events[0].title = "Embed renamed"
+    db.commit()
+    changed = reindex(db, "events", chunk_size=10)
+    assert changed["embedded"] == 1 and changed["skipped"] == total - 1
+    src = db.execute(text("SELECT source_text FROM event_embeddings WHERE event_id = :id"), {"id": events[0].id}).scalar()
+    assert src.startswith("Embed renamed\n")
+
+
+def test_pool_provider_fails_per_item(monkeypatch):
+    monkeypatch.delenv("TESTING")
+    monkeypatch.setattr(ai_service.settings, "AI_PROVIDER", "ollama")
+    monkeypatch.setattr(ai_service.settings, "EMBEDDING_MAX_RETRIES", 1)
+    monkeypatch.setattr(ai_service.time, "sleep", lambda s: None)
+
+    def request(provider, text, task, raise_rate_limit=False):
+        if "bad" in text:
+            raise ai_service.EmbeddingRateLimited()
+        return [1.0, 2.0]
+
+    monkeypatch.setattr(ai_service, "_request_embedding", request)
+    assert ai_service.generate_text_embeddings(["good one", "bad one", "good two"]) == [[1.0, 2.0], None, [1.0, 2.0]]
+
+
+def test_batch_response_without_indexes_keeps_order(monkeypatch):
+    monkeypatch.delenv("TESTING")
+    monkeypatch.setattr(ai_service.settings, "AI_PROVIDER", "groq")
+
+    class Response:
+        status_code = 200
+
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"data": [{"embedding": [1.0]}, {"embedding": [2.0]}, {"embedding": [3.0]}]}
+
+    monkeypatch.setattr(ai_service.requests, "post", lambda *args, **kwargs: Response())
+    assert ai_service.generate_text_embeddings(["a", "b", "c"]) == [[1.0], [2.0], [3.0]]
@@ -0,0 +1,93 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User, UserStatus
+from app.models.profile_model import Profile, ProfileVisibility
+from app.models.review_model import Review
+from app.models.event_model import (
+    Category, Event, EventCategory, EventFormat, EventParticipant, EventParticipantRole,
+    EventParticipantStatus, EventPicture, EventRegistrationType, EventStatus, EventType,
+)
+from app.core.security import get_password_hash
+
+# Statements allowed for one page of EventDetails, whatever its size
+QUERY_BUDGET = 10
+
+
+def _user(db: Session, name: str) -> User:
+    u = User(
+        email=f"read-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(u)
+    db.flush()
+    db.add(Profile(user_id=u.id, full_name=name, visibility=ProfileVisibility.public))
+    return u
+
+
+def _seed_events(db: Session, count: int) -> list[Event]:
+    now = datetime.now(timezone.utc)
+    category = Category(name=f"cat-{uuid.uuid4().hex[:6]}")
+    db.add(category)
+    guest, sponsor = _user(db, "Guest"), _user(db, "Sponsor")
+    events = []
+    for i in range(count):
+        organizer = _user(db, f"Organizer {i}")
+        ev = Event(
+            organizer_id=organizer.id,
+            title=f"Read Model {i}",
+            format=EventFormat.workshop,
+            type=EventType.online,
+            start_datetime=now + timedelta(days=1, hours=i),
+            end_datetime=now + timedelta(days=2, hours=i),
+            registration_type=EventRegistrationType.free,
+            status=EventStatus.published,
+        )
+        db.add(ev)
+        db.flush()
+        db.add_all([
+            EventCategory(event_id=ev.id, category_id=category.id),
+            EventPicture(event_id=ev.id, url=f"https://example.com/{i}.png"),
+            EventParticipant(event_id=ev.id, user_id=guest.id, role=EventParticipantRole.audience, status=EventParticipantStatus.accepted),
+            EventParticipant(event_id=ev.id, user_id=sponsor.id, role=EventParticipantRole.sponsor, status=EventParticipantStatus.accepted),
+            Review(event_id=ev.id, reviewer_id=guest.id, reviewee_id=organizer.id, rating=4),
+        ])
+        events.append(ev)
+    db.commit()
+    return events
+
+
+def _list_events(client: TestClient, db: Session) -> tuple[list, int]:
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        r = client.get("/api/v1/events", params={"page_size": 50})
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert r.status_code == 200
+    return r.json(), len(statements)
+
+
+def test_event_list_within_query_budget(client: TestClient, db: Session):
+    _seed_events(db, 3)
+    small, small_count = _list_events(client, db)
+    _seed_events(db, 12)
+    large, large_count = _list_events(client, db)
+
+    assert len(small) == 3 and len(large) == 15
+    assert large_count <= QUERY_BUDGET
+    assert large_count == small_count
+
+    item = next(e for e in large if e["title"] == "Read Model 0")
+    assert item["organizer_name"] == "Organizer 0"
+    assert (item["participant_count"], item["reviews_count"], item["average_rating"]) == (2, 1, 4.0)
+    assert [c["name"] for c in item["categories"]] and len(item["pictures"]) == 1
+    assert len(item["sponsors"]) == 1
@@ -0,0 +1,147 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User, UserStatus
+from app.models.event_model import (
+    Event, EventFormat, EventType, EventRegistrationType, EventRegistrationStatus, EventStatus,
+    EventParticipant, EventParticipantRole, EventParticipantStatus, EventReminder,
+)
+from app.models.notification_model import Notification
+from app.core.security import get_password_hash
+from app.core.scheduler import JobRunner, LeaderLock
+from app.services.event_scheduler_service import process_due_reminders, run_event_transitions
+from app.services.sse_manager import sse_manager
+
+
+def _user(db: Session) -> User:
+    u = User(
+        email=f"sched-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(u)
+    db.flush()
+    return u
+
+
+def _event(db: Session, organizer: User, start: datetime, end: datetime) -> Event:
+    ev = Event(
+        organizer_id=organizer.id,
+        title="Scheduled Event",
+        format=EventFormat.workshop,
+        type=EventType.online,
+        start_datetime=start,
+        end_datetime=end,
+        registration_type=EventRegistrationType.free,
+        registration_status=EventRegistrationStatus.opened,
+        status=EventStatus.published,
+    )
+    db.add(ev)
+    db.flush()
+    return ev
+
+
+def test_transitions_run_in_batches(db: Session):
+    now = datetime.now(timezone.utc)
+    organizer, guest = _user(db), _user(db)
+    started = [_event(db, organizer, now - timedelta(hours=1), now + timedelta(hours=1)) for _ in range(3)]
+    finished = _event(db, organizer, now - timedelta(days=2), now - timedelta(days=1))
+    upcoming = _event(db, organizer, now + timedelta(days=1), now + timedelta(days=2))
+    db.add(EventParticipant(
+        event_id=finished.id, user_id=guest.id,
+        role=EventParticipantRole.audience, status=EventParticipantStatus.accepted,
+    ))
+    db.commit()
+
+    counts = run_event_transitions(db, batch_size=2)
+    assert counts == {"registration_closed": 4, "events_ended": 1, "participants_absent": 1}
+
+    db.expire_all()
+    assert all(e.registration_status == EventRegistrationStatus.closed for e in started)
+    assert finished.status == EventStatus.ended
+    assert upcoming.registration_status == EventRegistrationStatus.opened
+    participant = db.query(EventParticipant).filter(EventParticipant.event_id == finished.id).one()
+    assert participant.status == EventParticipantStatus.absent
+
+    # Nothing left to do on a second run
+    assert run_event_transitions(db) == {"registration_closed": 0, "events_ended": 0, "participants_absent": 0}
+
+
+def test_transitions_respect_max_events(db: Session):
+    now = datetime.now(timezone.utc)
+    organizer = _user(db)
+    guests = [_user(db) for _ in range(5)]
+    finished = [_event(db, organizer, now - timedelta(days=2), now - timedelta(days=1)) for _ in range(3)]
+    for ev in finished:
+        for g in guests:
+            db.add(EventParticipant(
+                event_id=ev.id, user_id=g.id,
+                role=EventParticipantRole.audience, status=EventParticipantStatus.accepted,
+            ))
+    db.commit()
+
+    first = run_event_transitions(db, max_events=2)
+    assert (first["events_ended"], first["participants_absent"]) == (2, 10)
+    rest = run_event_transitions(db)
+    assert (rest["events_ended"], rest["participants_absent"]) == (1, 5)
+
+
+def test_due_reminders_for_all_users_sent_once(db: Session, monkeypatch):
+    now = datetime.now(timezone.utc)
+    organizer = _user(db)
+    users = [_user(db) for _ in range(3)]
+    ev = _event(db, organizer, now + timedelta(days=1), now + timedelta(days=1, hours=2))
+    for u in users:
+        db.add(EventReminder(event_id=ev.id, user_id=u.id, option="one_day", remind_at=now - timedelta(minutes=5)))
+    future = EventReminder(event_id=ev.id, user_id=users[0].id, option="one_week", remind_at=now + timedelta(days=1))
+    db.add(future)
+    db.commit()
+
+    inserts, batches = [], []
+
+    def count(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO notifications "):
+            inserts.append(statement)
+
+    monkeypatch.setattr(sse_manager, "publish_notifications", lambda notifications: batches.append(len(notifications)))
+    event.listen(db.get_bind(), "before_cursor_execute", count)
+    try:
+        processed = process_due_reminders(db, batch_size=2)
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", count)
+    assert len(processed) == 3
+    # One multi-row insert and one publish per batch
+    assert len(inserts) == 2 and batches == [2, 1]
+    assert process_due_reminders(db) == []
+
+    recipients = {n.recipient_id for n in db.query(Notification).filter(Notification.link_url == f"/main/events/{ev.id}")}
+    assert recipients == {u.id for u in users}
+    db.refresh(future)
+    assert future.is_sent is False
+
+
+def test_only_the_lock_holder_runs_jobs(db: Session):
+    key = int(uuid.uuid4().int % 1_000_000_000)
+    bind = db.get_bind()
+    first, second = LeaderLock(key=key, bind=bind), LeaderLock(key=key, bind=bind)
+    try:
+        assert first.is_leader() is True
+        assert second.is_leader() is False
+
+        runner = JobRunner(leader=second)
+        runner.add_job("noop", lambda session: {"ok": True}, 60)
+        assert runner.run_job("noop") is None
+        assert runner.status()["jobs"]["noop"]["skipped_not_leader"] == 1
+
+        # Leadership moves once the holder lets go
+        first.release()
+        assert runner.run_job("noop") == {"ok": True}
+        job = runner.status()["jobs"]["noop"]
+        assert job["runs"] == 1 and job["last_duration_ms"] is not None
+    finally:
+        first.release()
+        second.release()
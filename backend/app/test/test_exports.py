@@ -0,0 +1,78 @@
+import csv
+import gzip
+import io
+import json
+import uuid
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User, UserStatus, Role
+from app.models.profile_model import Profile, ProfileVisibility
+from app.core.security import get_password_hash
+from app.dependencies import get_current_user
+from app.main import app
+from app.services import export_service
+from app.services.user_service import assign_role_to_user
+
+
+def _admin_headers(client: TestClient, db: Session) -> tuple[User, dict]:
+    # Authenticate for real, even if an earlier module left an override behind
+    app.dependency_overrides.pop(get_current_user, None)
+    if db.query(Role).filter(Role.name == "admin").first() is None:
+        db.add(Role(name="admin"))
+        db.commit()
+    admin = User(
+        email=f"admin-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    db.add(Profile(user_id=admin.id, full_name="Export Admin", visibility=ProfileVisibility.public))
+    db.commit()
+    assign_role_to_user(db, admin, "admin")
+    r = client.post("/api/v1/auth/login", data={"username": admin.email, "password": "pw"})
+    assert r.status_code == 200
+    return admin, {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_users_export_formats(client: TestClient, db: Session):
+    admin, headers = _admin_headers(client, db)
+
+    r = client.get("/api/v1/admin/export/users", headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    rows = list(csv.reader(io.StringIO(r.text)))
+    assert rows[0] == ['ID', 'Email', 'Full Name', 'Status', 'Verified', 'Roles', 'Created At']
+    mine = next(row for row in rows[1:] if row[0] == str(admin.id))
+    assert mine[1:6] == [admin.email, "Export Admin", "active", "True", "admin"]
+
+    r = client.get("/api/v1/admin/export/users?format=ndjson&gzip=true", headers=headers)
+    assert r.status_code == 200
+    assert "users_export.ndjson.gz" in r.headers["content-disposition"]
+    records = [json.loads(line) for line in gzip.decompress(r.content).decode().splitlines()]
+    assert {"Email": admin.email, "Roles": "admin", "Verified": True}.items() <= next(
+        rec for rec in records if rec["ID"] == str(admin.id)
+    ).items()
+
+    r = client.get("/api/v1/admin/export/users?format=xlsx", headers=headers)
+    assert r.status_code == 422
+
+
+def test_csv_is_emitted_in_chunks(db: Session, monkeypatch):
+    monkeypatch.setattr(export_service, "CHUNK_BYTES", 10)
+    batches = ([[i, f"name-{i}"]] for i in range(5))
+    chunks = list(export_service._csv_chunks(["ID", "Name"], batches))
+    assert len(chunks) > 1
+    assert b"".join(chunks).decode().splitlines() == ["ID,Name"] + [f"{i},name-{i}" for i in range(5)]
+
+
+def test_events_and_organizations_export(client: TestClient, db: Session):
+    _, headers = _admin_headers(client, db)
+    for path, header in [("events", "Title"), ("organizations", "Name")]:
+        r = client.get(f"/api/v1/admin/export/{path}", headers=headers)
+        assert r.status_code == 200
+        assert next(csv.reader(io.StringIO(r.text)))[1] == header
@@ -0,0 +1,67 @@
+import uuid
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.security import get_password_hash
+from app.dependencies import get_current_user
+from app.main import app
+from app.models.notification_model import Notification, NotificationType
+from app.models.user_model import User, UserStatus
+
+
+def _login(client: TestClient, db: Session) -> tuple[User, dict]:
+    app.dependency_overrides.pop(get_current_user, None)
+    u = User(
+        email=f"cursor-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(u)
+    db.commit()
+    r = client.post("/api/v1/auth/login", data={"username": u.email, "password": "pw"})
+    assert r.status_code == 200
+    return u, {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_cursor_round_trip():
+    ts = datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    row_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(ts, row_id)) == (ts, row_id)
+
+
+def test_notifications_walk_with_cursor(client: TestClient, db: Session):
+    user, headers = _login(client, db)
+    # Identical timestamps: the id tiebreaker must keep pages disjoint
+    created_at = datetime.now(timezone.utc)
+    for i in range(5):
+        db.add(Notification(
+            recipient_id=user.id, actor_id=user.id, type=NotificationType.event,
+            content=f"n{i}", is_read=False, created_at=created_at,
+        ))
+    db.commit()
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"page_size": 2}
+        if cursor:
+            params["cursor"] = cursor
+        r = client.get("/api/v1/notifications/me", params=params, headers=headers)
+        assert r.status_code == 200
+        seen.extend(n["id"] for n in r.json())
+        pages += 1
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 5
+
+    # Page parameters keep working and match the first cursor page
+    r = client.get("/api/v1/notifications/me", params={"page": 1, "page_size": 2}, headers=headers)
+    assert [n["id"] for n in r.json()] == seen[:2]
+
+    r = client.get("/api/v1/notifications/me", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert r.status_code == 400
@@ -0,0 +1,83 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.security import get_password_hash
+from app.models.event_model import (
+    Category, Event, EventCategory, EventFormat, EventRegistrationType, EventStatus, EventType,
+)
+from app.models.user_model import User, UserStatus
+
+
+def _seed(db: Session, count: int) -> str:
+    organizer = User(
+        email=f"total-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    category = Category(name=f"total-{uuid.uuid4().hex[:6]}")
+    db.add_all([organizer, category])
+    db.flush()
+    now = datetime.now(timezone.utc)
+    for i in range(count):
+        ev = Event(
+            organizer_id=organizer.id,
+            title=f"Totals {i}",
+            format=EventFormat.workshop,
+            type=EventType.online,
+            start_datetime=now + timedelta(days=1, hours=i),
+            end_datetime=now + timedelta(days=2, hours=i),
+            registration_type=EventRegistrationType.free,
+            status=EventStatus.published,
+        )
+        db.add(ev)
+        db.flush()
+        db.add(EventCategory(event_id=ev.id, category_id=category.id))
+    db.commit()
+    return category.name
+
+
+def _statements(client: TestClient, db: Session, url: str, params: dict) -> tuple[dict | list, list[str]]:
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        r = client.get(url, params=params)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert r.status_code == 200
+    return r.json(), statements
+
+
+def test_events_with_total_matches_count(client: TestClient, db: Session):
+    category_name = _seed(db, 5)
+    filters = {"category_name": category_name}
+
+    count = client.get("/api/v1/events/count", params=filters).json()["total_count"]
+    assert count == 5
+
+    body, statements = _statements(client, db, "/api/v1/events", {**filters, "page_size": 2, "with_total": True})
+    assert body["total"] == count
+    assert len(body["items"]) == 2
+    # The total rides on the page query instead of a separate count statement
+    assert not [s for s in statements if "count(*) AS count_1" in s]
+
+    # Past the last page the total still comes back
+    body = client.get("/api/v1/events", params={**filters, "page": 9, "page_size": 2, "with_total": True}).json()
+    assert body == {"items": [], "total": 5}
+
+    # Without the flag the response stays a plain list
+    assert len(client.get("/api/v1/events", params=filters).json()) == 5
+
+
+def test_profiles_and_organizations_with_total(client: TestClient):
+    for url in ("/api/v1/profiles/discover", "/api/v1/organizations"):
+        count = client.get(f"{url}/count").json()["total_count"]
+        body = client.get(url, params={"with_total": True, "page_size": 1}).json()
+        assert body["total"] == count
+        assert len(body["items"]) == min(count, 1)
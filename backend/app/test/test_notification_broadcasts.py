@@ -0,0 +1,128 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.notification_model import Notification, NotificationBroadcast, NotificationType
+from app.services.notification_broadcast import process_notification_broadcasts
+from app.services.notification_service import NotificationService
+from app.services.sse_manager import SSEConnectionManager
+from app.services.sse_pubsub import InMemoryPubSub, PostgresPubSub
+from app.test.test_helpers import create_admin_user, create_test_user, get_admin_headers
+
+
+def test_broadcast_runs_in_chunks_and_reports_progress(client: TestClient, db: Session, monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_BULK_CHUNK_SIZE", 2)
+    admin = create_admin_user(db)
+    headers = get_admin_headers(client, admin)
+    students = [create_test_user(db, roles=["student"]) for _ in range(5)]
+    create_test_user(db)  # not a student
+
+    inserts = []
+
+    def count(conn, cursor, statement, *args):
+        if statement.startswith("INSERT INTO notifications "):
+            inserts.append(statement)
+
+    # The job runs on the app's own engine
+    event.listen(Engine, "before_cursor_execute", count)
+    try:
+        r = client.post(
+            "/api/v1/admin/notifications/broadcast",
+            json={"title": "T", "content": "Exams next week", "target_role": "Student"},
+            headers=headers,
+        )
+    finally:
+        event.remove(Engine, "before_cursor_execute", count)
+    assert r.status_code == 202, r.text
+    queued = r.json()
+    assert queued["status"] == "queued" and queued["total"] == queued["count"] == 5
+    # Multi-row inserts, one per chunk
+    assert len(inserts) == 3
+
+    progress = client.get(f"/api/v1/admin/notifications/broadcasts/{queued['id']}", headers=headers).json()
+    assert progress["status"] == "completed" and progress["sent"] == 5 and progress["finished_at"]
+    recipients = {n.recipient_id for n in db.query(Notification).filter(Notification.content == "Exams next week")}
+    assert recipients == {s.id for s in students}
+
+    assert client.get(f"/api/v1/admin/notifications/broadcasts/{uuid.uuid4()}", headers=headers).status_code == 404
+    assert client.get(
+        f"/api/v1/admin/notifications/broadcasts/{queued['id']}", headers=get_admin_headers(client, students[0])
+    ).status_code == 403
+
+
+def test_abandoned_broadcast_resumes_after_last_chunk(db: Session):
+    admin = create_admin_user(db)
+    students = sorted((create_test_user(db, roles=["student"]) for _ in range(5)), key=lambda u: u.id)
+    now = datetime.now(timezone.utc)
+    # A worker died after committing the first two recipients; another one still holds its lease
+    abandoned = NotificationBroadcast(
+        created_by_id=admin.id, title="T", content="Resumed", target_role="student", total=5,
+        status="running", sent=2, last_recipient_id=students[1].id, lease_until=now - timedelta(seconds=1), attempts=1,
+    )
+    leased = NotificationBroadcast(
+        created_by_id=admin.id, title="T", content="Leased", target_role="student", total=5,
+        status="running", sent=0, lease_until=now + timedelta(minutes=5), attempts=1,
+    )
+    db.add_all([abandoned, leased])
+    db.add_all([Notification(**row) for row in NotificationService.rows_for([s.id for s in students[:2]], admin.id, NotificationType.system, "Resumed")])
+    db.commit()
+
+    assert process_notification_broadcasts(db, chunk_size=2) == {"claimed": 1, "completed": 1, "failed": 0}
+    db.refresh(abandoned)
+    db.refresh(leased)
+    assert abandoned.status == "completed" and abandoned.sent == 5 and abandoned.attempts == 2
+    assert abandoned.last_recipient_id == students[-1].id and abandoned.lease_until is None
+    # Nobody got it twice
+    rows = db.query(Notification.recipient_id).filter(Notification.content == "Resumed").all()
+    assert sorted(r[0] for r in rows) == [s.id for s in students]
+    assert leased.status == "running" and db.query(Notification).filter(Notification.content == "Leased").count() == 0
+
+
+def test_bulk_create_publishes_one_batch(db: Session):
+    actor, alice, bob = create_test_user(db), create_test_user(db), create_test_user(db)
+
+    async def scenario():
+        manager = SSEConnectionManager(backend=InMemoryPubSub())
+        stream = await manager.connect(alice.id)
+        rows = NotificationService.rows_for([alice.id, bob.id], actor.id, NotificationType.system, "Hello")
+        created = await asyncio.to_thread(NotificationService.add_notifications, db, rows)
+        db.commit()
+        assert [n.recipient_id for n in created] == [alice.id, bob.id] and created[0].created_at is not None
+
+        batches = []
+        publish_many = manager.backend.publish_many
+        manager.backend.publish_many = lambda messages: (batches.append(len(messages)), publish_many(messages))
+        manager.publish_notifications(created)
+        assert batches == [2]
+        received = await stream.get(timeout=2)
+        assert received["id"] == str(created[0].id) and received["type"] == "system"
+        await manager.stop()
+
+    asyncio.run(scenario())
+    assert db.query(Notification).filter(Notification.content == "Hello").count() == 2
+
+
+def test_postgres_publish_many_between_workers(db: Session):
+    engine = db.get_bind()
+    channel = f"sse_test_{uuid.uuid4().hex[:8]}"
+    users = [uuid.uuid4() for _ in range(3)]
+
+    async def scenario():
+        worker_a = SSEConnectionManager(backend=PostgresPubSub(channel=channel, engine=engine))
+        worker_b = SSEConnectionManager(backend=PostgresPubSub(channel=channel, engine=engine))
+        await worker_a.start()
+        streams = [await worker_b.connect(uid) for uid in users]
+        try:
+            await asyncio.to_thread(worker_a.backend.publish_many, [(uid, {"n": i}) for i, uid in enumerate(users)])
+            assert [await s.get(timeout=5) for s in streams] == [{"n": 0}, {"n": 1}, {"n": 2}]
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+
+    asyncio.run(scenario())
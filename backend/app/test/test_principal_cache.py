@@ -0,0 +1,80 @@
+import uuid
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User, UserStatus, Role
+from app.core.security import get_password_hash
+from app.dependencies import get_current_user
+from app.main import app
+from app.services.principal_cache import PrincipalCache, principal_cache
+from app.services.user_service import assign_role_to_user, remove_role_from_user
+
+
+def _admin(client: TestClient, db: Session) -> tuple[User, dict]:
+    app.dependency_overrides.pop(get_current_user, None)
+    if db.query(Role).filter(Role.name == "admin").first() is None:
+        db.add(Role(name="admin"))
+        db.commit()
+    admin = User(
+        email=f"admin-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(admin)
+    db.commit()
+    assign_role_to_user(db, admin, "admin")
+    r = client.post("/api/v1/auth/login", data={"username": admin.email, "password": "pw"})
+    assert r.status_code == 200
+    return admin, {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_cache_hit_skips_user_and_role_queries(client: TestClient, db: Session):
+    admin, headers = _admin(client, db)
+    assert client.get("/api/v1/admin/auth/principal-cache/stats", headers=headers).status_code == 200
+
+    statements = []
+    engine = db.get_bind()
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        before = principal_cache.stats()["hits"]
+        r = client.get("/api/v1/admin/auth/principal-cache/stats", headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert r.status_code == 200
+    assert r.json()["hits"] > before
+    assert not [s for s in statements if "FROM users" in s or "FROM roles" in s]
+
+
+def test_role_and_status_changes_invalidate(client: TestClient, db: Session):
+    admin, headers = _admin(client, db)
+    assert client.get("/api/v1/admin/auth/principal-cache/stats", headers=headers).status_code == 200
+
+    remove_role_from_user(db, admin, "admin")
+    assert client.get("/api/v1/admin/auth/principal-cache/stats", headers=headers).status_code == 403
+
+    assign_role_to_user(db, admin, "admin")
+    assert client.get("/api/v1/admin/auth/principal-cache/stats", headers=headers).status_code == 200
+
+    invalidations = principal_cache.stats()["invalidations"]
+    admin.status = UserStatus.suspended
+    db.commit()
+    assert principal_cache.stats()["invalidations"] == invalidations + 1
+    assert principal_cache.get(admin.id) is None
+
+
+def test_ttl_and_lru_eviction():
+    cache = PrincipalCache(ttl_seconds=60, max_size=2)
+    users = [User(id=uuid.uuid4(), status=UserStatus.active) for _ in range(3)]
+    for u in users:
+        cache.put(u, roles=["student"])
+    assert cache.get(users[0].id) is None
+    assert cache.get(users[2].id).roles == frozenset({"student"})
+    assert cache.stats()["evictions"] == 1
+
+    expired = PrincipalCache(ttl_seconds=0, max_size=10)
+    assert expired.put(users[0]) is None
+    assert expired.get(users[0].id) is None
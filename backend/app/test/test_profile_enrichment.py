@@ -0,0 +1,111 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.user_model import User, UserStatus
+from app.models.profile_model import Profile, ProfileVisibility
+from app.models.review_model import Review
+from app.models.follows_model import Follow
+from app.models.event_model import (
+    Event, EventFormat, EventType, EventRegistrationType, EventStatus,
+    EventParticipant, EventParticipantRole, EventParticipantStatus,
+)
+from app.core.security import get_password_hash
+from app.services import profile_service
+
+
+def _user(db: Session, name: str) -> User:
+    u = User(
+        email=f"enrich-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(u)
+    db.flush()
+    db.add(Profile(user_id=u.id, full_name=name, visibility=ProfileVisibility.public))
+    return u
+
+
+def _seed(db: Session, n: int) -> list[User]:
+    users = [_user(db, f"Enrich {i}") for i in range(n)]
+    now = datetime.now(timezone.utc)
+    ev = Event(
+        organizer_id=users[0].id,
+        title="Enrichment Event",
+        format=EventFormat.workshop,
+        type=EventType.online,
+        start_datetime=now - timedelta(days=2),
+        end_datetime=now - timedelta(days=1),
+        registration_type=EventRegistrationType.free,
+        status=EventStatus.ended,
+    )
+    db.add(ev)
+    db.flush()
+    # users[1]: two reviews (4, 2) + one deleted review that must be ignored
+    db.add(Review(event_id=ev.id, reviewer_id=users[0].id, reviewee_id=users[1].id, rating=4))
+    db.add(Review(event_id=ev.id, reviewer_id=users[2].id, reviewee_id=users[1].id, rating=2))
+    db.add(Review(event_id=ev.id, reviewer_id=users[2].id, reviewee_id=users[1].id, rating=5, deleted_at=now))
+    # users[1] followed by 0 and 2, follows 0
+    db.add(Follow(follower_id=users[0].id, followee_id=users[1].id))
+    db.add(Follow(follower_id=users[2].id, followee_id=users[1].id))
+    db.add(Follow(follower_id=users[1].id, followee_id=users[0].id))
+    # users[2]: accepted sponsor once (Bronze); a pending sponsorship does not count
+    db.add(EventParticipant(event_id=ev.id, user_id=users[2].id, role=EventParticipantRole.sponsor, status=EventParticipantStatus.accepted))
+    db.add(EventParticipant(event_id=ev.id, user_id=users[1].id, role=EventParticipantRole.sponsor, status=EventParticipantStatus.pending))
+    db.commit()
+    return users
+
+
+def test_load_profile_stats_batches_aggregates(db: Session):
+    users = _seed(db, 3)
+    stats = profile_service.load_profile_stats(db, [u.id for u in users])
+
+    assert stats[users[1].id]["reviews_count"] == 2
+    assert stats[users[1].id]["average_rating"] == 3.0
+    assert stats[users[1].id]["followers_count"] == 2
+    assert stats[users[1].id]["following_count"] == 1
+    assert stats[users[1].id]["sponsor_tier"] is None
+    assert stats[users[2].id]["sponsor_tier"] == "Bronze"
+    assert stats[users[0].id]["reviews_count"] == 0
+    assert stats[users[0].id]["followers_count"] == 1
+
+
+def test_sponsor_tier_thresholds():
+    assert profile_service.sponsor_tier_for_count(0) is None
+    assert profile_service.sponsor_tier_for_count(1) == "Bronze"
+    assert profile_service.sponsor_tier_for_count(5) == "Silver"
+    assert profile_service.sponsor_tier_for_count(10) == "Gold"
+
+
+def test_discover_query_count_does_not_grow_with_page(client: TestClient, db: Session):
+    _seed(db, 3)
+    engine = db.get_bind()
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    def _run(page_size: int) -> int:
+        statements.clear()
+        event.listen(engine, "before_cursor_execute", _count)
+        try:
+            r = client.get("/api/v1/profiles/discover", params={"page_size": page_size})
+        finally:
+            event.remove(engine, "before_cursor_execute", _count)
+        assert r.status_code == 200, r.text
+        assert len(r.json()) == page_size
+        return len(statements)
+
+    small = _run(1)
+    large = _run(3)
+    assert large == small
+
+    r = client.get("/api/v1/profiles/discover", params={"name": "Enrich 1"})
+    card = r.json()[0]
+    assert card["reviews_count"] == 2
+    assert card["average_rating"] == 3.0
+    assert card["followers_count"] == 2
@@ -0,0 +1,194 @@
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from app.models.user_model import User, UserStatus
+from app.models.profile_model import Profile, ProfileStats, ProfileVisibility
+from app.models.review_model import Review
+from app.models.follows_model import Follow
+from app.models.event_model import (
+    Event, EventFormat, EventType, EventRegistrationType, EventStatus,
+    EventParticipant, EventParticipantRole, EventParticipantStatus,
+)
+from app.core.security import get_password_hash
+from app.services import profile_stats_service
+
+
+def _user(db: Session, name: str) -> User:
+    u = User(
+        email=f"stats-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(u)
+    db.flush()
+    db.add(Profile(user_id=u.id, full_name=name, visibility=ProfileVisibility.public))
+    return u
+
+
+def _event(db: Session, organizer: User) -> Event:
+    now = datetime.now(timezone.utc)
+    ev = Event(
+        organizer_id=organizer.id,
+        title="Stats Event",
+        format=EventFormat.workshop,
+        type=EventType.online,
+        start_datetime=now - timedelta(days=2),
+        end_datetime=now - timedelta(days=1),
+        registration_type=EventRegistrationType.free,
+        status=EventStatus.ended,
+    )
+    db.add(ev)
+    db.flush()
+    return ev
+
+
+def _stats(db: Session, user_id: uuid.UUID) -> ProfileStats:
+    return profile_stats_service.get_profile_stats(db, [user_id])[user_id]
+
+
+def test_counters_follow_source_changes(db: Session):
+    a, b, c = _user(db, "A"), _user(db, "B"), _user(db, "C")
+    ev = _event(db, a)
+    db.commit()
+
+    r1 = Review(event_id=ev.id, reviewer_id=a.id, reviewee_id=b.id, rating=4)
+    r2 = Review(event_id=ev.id, reviewer_id=c.id, reviewee_id=b.id, rating=1)
+    db.add_all([r1, r2, Follow(follower_id=a.id, followee_id=b.id)])
+    db.commit()
+    s = _stats(db, b.id)
+    assert (s.reviews_count, s.rating_sum, s.followers_count) == (2, 5, 1)
+    assert _stats(db, a.id).following_count == 1
+    assert db.query(Profile).filter(Profile.user_id == b.id).one().average_rating == 2.5
+
+    # Soft delete, exactly as the review routes do it
+    r2.deleted_at = func.now()
+    db.commit()
+    s = _stats(db, b.id)
+    assert (s.reviews_count, s.rating_sum, s.average_rating) == (1, 4, 4.0)
+
+    follow = db.query(Follow).filter(Follow.follower_id == a.id).one()
+    db.delete(follow)
+    db.commit()
+    assert _stats(db, b.id).followers_count == 0
+    assert _stats(db, a.id).following_count == 0
+
+
+def test_sponsor_count_tracks_accepted_status(db: Session):
+    a, b = _user(db, "A"), _user(db, "B")
+    ev = _event(db, a)
+    p = EventParticipant(event_id=ev.id, user_id=b.id, role=EventParticipantRole.sponsor)
+    db.add(p)
+    db.commit()
+    assert _stats(db, b.id).sponsor_count == 0
+
+    # Attributes are expired after commit, so the old status is unknown in memory
+    p.status = EventParticipantStatus.accepted
+    db.commit()
+    assert _stats(db, b.id).sponsor_count == 1
+
+    p.status = EventParticipantStatus.rejected
+    db.commit()
+    assert _stats(db, b.id).sponsor_count == 0
+
+
+def test_failed_flush_does_not_leak_deltas(db: Session):
+    a, b = _user(db, "A"), _user(db, "B")
+    db.commit()
+    db.add(Follow(follower_id=a.id, followee_id=b.id))
+    db.add(Follow(follower_id=a.id, followee_id=uuid.uuid4()))  # FK violation
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+    db.add(Review(reviewer_id=a.id, reviewee_id=b.id, rating=5))
+    db.commit()
+    s = _stats(db, b.id)
+    assert (s.followers_count, s.reviews_count) == (0, 1)
+
+
+def test_rebuild_repairs_drift(db: Session):
+    a, b = _user(db, "A"), _user(db, "B")
+    db.add(Follow(follower_id=a.id, followee_id=b.id))
+    db.commit()
+    # Bulk updates bypass the flush hook
+    db.query(ProfileStats).update({ProfileStats.followers_count: 42}, synchronize_session=False)
+    db.commit()
+    assert _stats(db, b.id).followers_count == 42
+
+    assert profile_stats_service.rebuild_profile_stats(db) >= 2
+    assert _stats(db, b.id).followers_count == 1
+    assert _stats(db, a.id).following_count == 1
+
+
+def test_rebuild_keeps_concurrent_deltas(db: Session):
+    a, b, c = _user(db, "A"), _user(db, "B"), _user(db, "C")
+    db.add(Follow(follower_id=a.id, followee_id=b.id))
+    db.commit()
+    db.query(ProfileStats).update({ProfileStats.followers_count: 42}, synchronize_session=False)
+    db.commit()
+
+    # A follow flushed (its +1 applied) but not committed while the job runs
+    other = Session(bind=db.get_bind())
+    other.add(Follow(follower_id=c.id, followee_id=b.id))
+    other.flush()
+    job = threading.Thread(target=profile_stats_service.rebuild_profile_stats, args=(Session(bind=db.get_bind()), [b.id]))
+    job.start()
+    job.join(timeout=0.5)
+    assert job.is_alive()  # waiting on the row lock
+    other.commit()
+    other.close()
+    job.join(timeout=5)
+
+    assert _stats(db, b.id).followers_count == 2
+
+
+def test_mutual_follows_do_not_deadlock(db: Session):
+    a, b = _user(db, "A"), _user(db, "B")
+    db.commit()
+    engine = db.get_bind()
+
+    # Hold each flush after its first counter update until the other has taken one too
+    barrier = threading.Barrier(2)
+    updates: dict[int, int] = {}
+
+    def pause(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE profile_stats"):
+            updates[id(conn)] = updates.get(id(conn), 0) + 1
+            if updates[id(conn)] == 2:
+                try:
+                    barrier.wait(timeout=1)
+                except threading.BrokenBarrierError:
+                    pass  # the other flush is queued behind our first lock
+
+    errors = []
+
+    def follow(follower: User, followee: User):
+        session = Session(bind=engine)
+        try:
+            session.add(Follow(follower_id=follower.id, followee_id=followee.id))
+            session.commit()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    event.listen(engine, "before_cursor_execute", pause)
+    try:
+        threads = [threading.Thread(target=follow, args=pair) for pair in ((a, b), (b, a))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+    finally:
+        event.remove(engine, "before_cursor_execute", pause)
+
+    assert errors == []
+    for u in (a, b):
+        stats = _stats(db, u.id)
+        assert stats.followers_count == 1 and stats.following_count == 1
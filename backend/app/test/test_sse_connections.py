@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+from sqlalchemy.orm import Session
+
+from app.models.notification_model import NotificationType
+from app.services.notification_service import NotificationService
+from app.services.sse_manager import SSEConnection, SSEConnectionManager
+from app.services.sse_pubsub import InMemoryPubSub
+from app.models.user_model import User, UserStatus
+from app.core.security import get_password_hash
+
+
+def test_every_tab_of_a_user_receives_messages():
+    async def scenario():
+        manager = SSEConnectionManager(backend=InMemoryPubSub())
+        user_id = uuid.uuid4()
+        first = await manager.connect(user_id)
+        second = await manager.connect(user_id)
+        assert manager.connection_count() == 2
+
+        manager.publish(user_id, {"content": "both"})
+        assert await first.get(timeout=2) == {"content": "both"}
+        assert await second.get(timeout=2) == {"content": "both"}
+
+        # Closing one tab must not tear down the other
+        manager.disconnect(first)
+        manager.publish(user_id, {"content": "second only"})
+        assert await second.get(timeout=2) == {"content": "second only"}
+        assert manager.is_connected(user_id)
+        manager.disconnect(second)
+        assert not manager.is_connected(user_id)
+        assert manager.stats()["delivered"] == 3
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_bounded_queue_drops_oldest_and_coalesces():
+    async def scenario():
+        conn = SSEConnection(uuid.uuid4(), max_queue=3)
+        for i in range(5):
+            conn.offer({"n": i})
+        assert len(conn) == 3
+        assert conn.dropped == 2
+        assert conn.high_water == 3
+
+        conn.offer({"type": "unread", "coalesce_key": "unread", "count": 1})
+        conn.offer({"type": "unread", "coalesce_key": "unread", "count": 2})
+        assert conn.coalesced == 1
+        received = [await conn.get(timeout=1) for _ in range(3)]
+        assert received == [{"n": 3}, {"n": 4}, {"type": "unread", "coalesce_key": "unread", "count": 2}]
+
+    asyncio.run(scenario())
+
+
+def test_replay_since_last_event_id(db: Session):
+    user = User(
+        email=f"replay-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(user)
+    db.commit()
+    notifs = [
+        NotificationService.create_notification(db, user.id, user.id, NotificationType.system, f"n{i}")
+        for i in range(4)
+    ]
+
+    replay = NotificationService.list_since(db, user.id, notifs[1].id, limit=10)
+    assert [n.content for n in replay] == ["n2", "n3"]
+    assert NotificationService.list_since(db, user.id, notifs[3].id, limit=10) == []
+    # Too far behind, or an id from someone else's stream: client must reload
+    assert NotificationService.list_since(db, user.id, notifs[0].id, limit=2) is None
+    assert NotificationService.list_since(db, uuid.uuid4(), notifs[0].id, limit=10) is None
@@ -0,0 +1,48 @@
+import asyncio
+import uuid
+from sqlalchemy.orm import Session
+
+from app.services.sse_manager import SSEConnectionManager
+from app.services.sse_pubsub import InMemoryPubSub, PostgresPubSub
+
+
+def test_in_memory_publish_from_worker_thread():
+    async def scenario():
+        manager = SSEConnectionManager(backend=InMemoryPubSub())
+        user_id = uuid.uuid4()
+        connection = await manager.connect(user_id)
+        assert manager.stats()["connections"] == 1
+
+        # Sync route handlers publish from threadpool threads
+        await asyncio.to_thread(manager.publish, user_id, {"content": "hello"})
+        assert await connection.get(timeout=2) == {"content": "hello"}
+
+        # Messages for users without a local stream are dropped
+        manager.publish(uuid.uuid4(), {"content": "nobody"})
+        manager.disconnect(connection)
+        assert manager.connection_count() == 0
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+
+def test_postgres_fan_out_between_workers(db: Session):
+    engine = db.get_bind()
+    channel = f"sse_test_{uuid.uuid4().hex[:8]}"
+
+    async def scenario():
+        # Two managers with their own listeners stand in for two worker processes
+        worker_a = SSEConnectionManager(backend=PostgresPubSub(channel=channel, engine=engine))
+        worker_b = SSEConnectionManager(backend=PostgresPubSub(channel=channel, engine=engine))
+        await worker_a.start()
+        user_id = uuid.uuid4()
+        connection = await worker_b.connect(user_id)
+        try:
+            await asyncio.to_thread(worker_a.publish, user_id, {"content": "cross-worker"})
+            assert await connection.get(timeout=5) == {"content": "cross-worker"}
+            assert worker_a.is_connected(user_id) is False
+        finally:
+            await worker_a.stop()
+            await worker_b.stop()
+
+    asyncio.run(scenario())
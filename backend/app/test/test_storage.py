@@ -0,0 +1,160 @@
+import asyncio
+import io
+import logging
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from app.core import loop_guard
+from app.core.config import settings
+from app.services import storage_service
+from app.services.image_service import SQUARE, WIDE, backfill_image_derivatives, render_derivatives
+from app.test.test_helpers import create_test_event, create_test_user, get_admin_headers
+
+
+def _png(width: int, height: int) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(buf, "PNG")
+    return buf.getvalue()
+
+
+PNG = _png(300, 200)
+PDF = b"%PDF-1.7\n" + b"x" * 5000
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    backend = storage_service.LocalStorage(tmp_path, "http://testserver/media")
+    monkeypatch.setattr(storage_service, "storage", backend)
+    return backend
+
+
+def _stored(local_storage, url: str) -> bytes:
+    return (local_storage.root / url.removeprefix(local_storage.base_url + "/")).read_bytes()
+
+
+def test_detect_content_type():
+    assert storage_service.detect_content_type(PNG, "text/plain") == "image/png"
+    assert storage_service.detect_content_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    docx = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    assert storage_service.detect_content_type(b"PK\x03\x04rest", docx) == docx
+    assert storage_service.detect_content_type(b"PK\x03\x04rest", "image/png") is None
+    assert storage_service.detect_content_type(b"hello", "image/png") is None
+
+
+def test_local_fetch_of_missing_file_is_404(local_storage):
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(local_storage.fetch("http://testserver/media/event_logos/missing.png", 1000))
+    assert exc.value.status_code == 404
+
+
+def test_event_logo_upload_is_validated_and_stored(client: TestClient, db: Session, local_storage, monkeypatch):
+    organizer = create_test_user(db)
+    event = create_test_event(db, organizer.id)
+    headers = get_admin_headers(client, organizer)
+    url = f"/api/v1/events/{event.id}/images/logo"
+
+    r = client.put(url, files={"file": ("logo.png", io.BytesIO(PNG), "image/png")}, headers=headers)
+    assert r.status_code == 200
+    logo_url = r.json()["logo_url"]
+    assert logo_url.startswith("http://testserver/media/event_logos/") and logo_url.endswith(".png")
+    assert _stored(local_storage, logo_url) == PNG
+    r_variants = r.json()["logo_variants"]
+
+    # The declared type is not trusted
+    r = client.put(url, files={"file": ("logo.png", io.BytesIO(b"<html>"), "image/png")}, headers=headers)
+    assert r.status_code == 415
+    # Documents are not accepted as images
+    r = client.put(url, files={"file": ("logo.pdf", io.BytesIO(PDF), "application/pdf")}, headers=headers)
+    assert r.status_code == 415
+
+    monkeypatch.setattr(settings, "UPLOAD_MAX_IMAGE_BYTES", 100)
+    r = client.put(url, files={"file": ("logo.png", io.BytesIO(PNG), "image/png")}, headers=headers)
+    assert r.status_code == 413
+    # The first upload only: original plus its derivatives
+    assert len(list((local_storage.root / "event_logos").iterdir())) == 1 + len(r_variants)
+
+
+def test_uploads_keep_db_work_off_the_loop(client: TestClient, db: Session, local_storage, monkeypatch, caplog):
+    monkeypatch.setattr(loop_guard, "_reported_call_sites", set())
+    loop_guard.install_sync_db_guard()
+    organizer = create_test_user(db)
+    event = create_test_event(db, organizer.id)
+    headers = get_admin_headers(client, organizer)
+
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_guard"):
+        r = client.put(f"/api/v1/events/{event.id}/images/logo", files={"file": ("logo.png", io.BytesIO(PNG), "image/png")}, headers=headers)
+        assert r.status_code == 200
+        r = client.put("/api/v1/profiles/me/avatar", files={"avatar": ("me.png", io.BytesIO(PNG), "image/png")}, headers=headers)
+        assert r.status_code == 200
+    assert [r.getMessage() for r in caplog.records if r.name == "app.core.loop_guard"] == []
+
+
+def test_direct_proposal_upload(client: TestClient, db: Session, local_storage, monkeypatch):
+    organizer = create_test_user(db)
+    event = create_test_event(db, organizer.id)
+    headers = get_admin_headers(client, organizer)
+
+    outsider = get_admin_headers(client, create_test_user(db))
+    assert client.post(f"/api/v1/events/{event.id}/proposals/upload-url", headers=outsider).status_code == 403
+
+    form = client.post(f"/api/v1/events/{event.id}/proposals/upload-url", headers=headers).json()
+    assert form["backend"] == "local" and form["max_bytes"] == settings.UPLOAD_MAX_DIRECT_BYTES
+    r = client.put(form["url"], content=PDF, headers={"Content-Type": "application/pdf"})
+    assert r.status_code == 200
+    file_url = r.json()["url"]
+    assert file_url.endswith(".pdf") and _stored(local_storage, file_url) == PDF
+
+    r = client.post(f"/api/v1/events/{event.id}/proposals", json={"title": "Deck", "file_url": file_url}, headers=headers)
+    assert r.status_code == 200 and r.json()["file_url"] == file_url
+
+    # Tampered tokens are rejected; oversized bodies are cut off and leave nothing behind
+    assert client.put(form["url"] + "x", content=PDF).status_code == 403
+    monkeypatch.setattr(settings, "UPLOAD_MAX_DIRECT_BYTES", 1000)
+    assert client.put(form["url"], content=PDF).status_code == 413
+    assert len(list((local_storage.root / "event_proposals").iterdir())) == 1
+
+
+def test_image_derivatives(client: TestClient, db: Session, local_storage):
+    # Sizes above the source are skipped; the smallest is always produced
+    assert sorted(render_derivatives(_png(300, 200), SQUARE)) == [64, 128]
+    assert sorted(render_derivatives(_png(100, 100), WIDE)) == [480]
+    covers = render_derivatives(_png(2000, 1000), WIDE)
+    assert [Image.open(io.BytesIO(covers[w])).size for w in sorted(covers)] == [(480, 240), (960, 480), (1600, 800)]
+    assert Image.open(io.BytesIO(covers[480])).format == "WEBP"
+
+    user = create_test_user(db)
+    headers = get_admin_headers(client, user)
+    r = client.put("/api/v1/profiles/me/avatar", files={"avatar": ("me.png", io.BytesIO(_png(400, 300)), "image/png")}, headers=headers)
+    assert r.status_code == 200
+    variants = r.json()["avatar_variants"]
+    assert sorted(variants, key=int) == ["64", "128", "256"]
+    assert Image.open(io.BytesIO(_stored(local_storage, variants["64"]))).size == (64, 64)
+
+    # Replacing the URL by other means drops derivatives of the old image
+    db.refresh(user)
+    user.profile.avatar_url = "http://example.com/elsewhere.png"
+    db.commit()
+    assert user.profile.avatar_variants is None
+
+
+def test_backfill_image_derivatives(db: Session, local_storage):
+    organizer = create_test_user(db)
+    with_image, broken = create_test_event(db, organizer.id), create_test_event(db, organizer.id)
+    original = local_storage.url_for("event_covers/old.png")
+    (local_storage.root / "event_covers").mkdir(parents=True)
+    (local_storage.root / "event_covers" / "old.png").write_bytes(_png(1000, 500))
+    with_image.cover_url = original
+    broken.cover_url = local_storage.url_for("event_covers/missing.png")
+    db.commit()
+
+    stats = backfill_image_derivatives(db, batch_size=1)
+    assert stats == {"processed": 2, "derived": 1, "failed": 1}
+    db.expire_all()
+    assert sorted(with_image.cover_variants, key=int) == ["480", "960"]
+    assert broken.cover_variants == {}
+    # Already processed rows are skipped
+    assert backfill_image_derivatives(db)["processed"] == 0
@@ -0,0 +1,92 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select, text
+from sqlalchemy.orm import Session
+
+from app.core.search import search_terms, text_search
+from app.core.security import get_password_hash
+from app.models.event_model import (
+    EVENT_SEARCH, Event, EventFormat, EventRegistrationType, EventStatus, EventType,
+)
+from app.models.user_model import User, UserStatus
+
+
+def _seed(db: Session, token: str) -> dict[str, Event]:
+    organizer = User(
+        email=f"search-{uuid.uuid4().hex[:8]}@example.com",
+        password=get_password_hash("pw"),
+        is_verified=True,
+        status=UserStatus.active,
+        referral_code=uuid.uuid4().hex[:8],
+    )
+    db.add(organizer)
+    db.flush()
+    now = datetime.now(timezone.utc)
+    events = {}
+    for key, title, description in [
+        ("title", f"{token}computing night", None),
+        ("description", "Friday meetup", f"Talks about {token}computing and more"),
+        ("other", "Unrelated", "Nothing to see"),
+    ]:
+        events[key] = Event(
+            organizer_id=organizer.id,
+            title=title,
+            description=description,
+            format=EventFormat.workshop,
+            type=EventType.online,
+            start_datetime=now + timedelta(days=1),
+            end_datetime=now + timedelta(days=2),
+            registration_type=EventRegistrationType.free,
+            status=EventStatus.published,
+        )
+        db.add(events[key])
+    db.commit()
+    return events
+
+
+def test_search_terms():
+    assert search_terms("Data-Sci, 2026!") == ["data", "sci", "2026"]
+    assert search_terms("__") == []
+
+
+def test_ranked_prefix_search(db: Session):
+    token = f"zq{uuid.uuid4().hex[:6]}"
+    events = _seed(db, token)
+
+    predicate, rank = text_search(db, token[:-2], EVENT_SEARCH)
+    found = db.query(Event).filter(predicate).order_by(rank.desc()).all()
+    # Title (weight A) outranks description (weight B); non-matches are excluded
+    assert [e.id for e in found] == [events["title"].id, events["description"].id]
+
+    predicate, _ = text_search(db, f"{token}computing friday", EVENT_SEARCH)
+    assert [e.id for e in db.query(Event).filter(predicate)] == [events["description"].id]
+
+
+def test_event_filter_uses_search_index(client: TestClient, db: Session):
+    token = f"zq{uuid.uuid4().hex[:6]}"
+    events = _seed(db, token)
+
+    r = client.get("/api/v1/events", params={"q_text": token})
+    assert sorted(e["id"] for e in r.json()) == sorted(str(events[k].id) for k in ("title", "description"))
+    assert client.get("/api/v1/events/count", params={"q_text": token}).json()["total_count"] == 2
+
+    # Test databases are built with create_all, which skips indexes on existing tables
+    for index in Event.__table__.indexes:
+        if index.name == "ix_events_search":
+            index.create(db.get_bind(), checkfirst=True)
+    predicate, _ = text_search(db, token, EVENT_SEARCH)
+    # EXPLAIN the statement as the driver sends it, bound parameters included
+    conn = db.connection()
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        return f"EXPLAIN {statement}", parameters
+
+    conn.execute(text("SET LOCAL enable_seqscan = off"))
+    event.listen(conn, "before_cursor_execute", explain, retval=True)
+    try:
+        plan = "\n".join(row[0] for row in conn.execute(select(func.count()).select_from(Event).where(predicate)))
+    finally:
+        event.remove(conn, "before_cursor_execute", explain)
+    db.rollback()
+    assert "ix_events_search" in plan
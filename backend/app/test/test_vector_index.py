@@ -0,0 +1,136 @@
+import math
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.models.user_model import UserStatus
+from app.services.ai_service import _vec_to_pg
+from app.services.vector_index import NumpyVectorIndex, expert_index, parse_pg_vector
+from app.test.test_helpers import create_test_user
+
+
+def _index_with(vectors: dict) -> NumpyVectorIndex:
+    idx = NumpyVectorIndex()
+    idx.loaded = True  # skip lazy DB load
+    for key, vec in vectors.items():
+        idx.upsert(key, vec)
+    return idx
+
+
+def test_parse_pg_vector_text_literal():
+    vec = parse_pg_vector("[0.5,-1,2.25]")
+    assert vec.tolist() == [0.5, -1.0, 2.25]
+    assert parse_pg_vector("[]") is None
+    assert parse_pg_vector(None) is None
+
+
+def test_search_orders_by_l2_distance():
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    idx = _index_with({a: [0.0, 0.0], b: [3.0, 4.0], c: [1.0, 0.0]})
+
+    results = idx.search(None, [0.0, 0.0], top_k=2)
+    assert [k for k, _ in results] == [a, c]
+    assert math.isclose(results[0][1], 0.0, abs_tol=1e-6)
+    assert math.isclose(results[1][1], 1.0, abs_tol=1e-6)
+
+    results = idx.search(None, [0.0, 0.0], top_k=10)
+    assert [k for k, _ in results] == [a, c, b]
+    assert math.isclose(results[2][1], 5.0, abs_tol=1e-5)
+
+
+def test_upsert_replaces_and_remove_keeps_index_dense():
+    keys = [uuid.uuid4() for _ in range(100)]
+    idx = _index_with({k: [float(i), 0.0] for i, k in enumerate(keys)})
+    assert len(idx) == 100
+
+    idx.upsert(keys[50], [-1.0, 0.0])
+    assert len(idx) == 100
+    assert idx.search(None, [-1.0, 0.0], top_k=1)[0][0] == keys[50]
+
+    idx.remove(keys[0])
+    idx.remove(keys[0])
+    assert len(idx) == 99
+    nearest = [k for k, _ in idx.search(None, [-0.5, 0.0], top_k=3)]
+    assert keys[0] not in nearest
+    assert nearest[0] == keys[50]
+    # The key swapped into the freed row must still resolve to its own vector
+    assert idx.search(None, [99.0, 0.0], top_k=1)[0][0] == keys[99]
+
+
+def test_dimension_mismatch_is_ignored():
+    a = uuid.uuid4()
+    idx = _index_with({a: [1.0, 2.0, 3.0]})
+    idx.upsert(uuid.uuid4(), [1.0, 2.0])
+    assert len(idx) == 1
+    assert idx.search(None, [1.0, 2.0], top_k=5) == []
+
+
+def _store(db: Session, user_id: uuid.UUID, vec: list[float]) -> None:
+    db.execute(
+        text("INSERT INTO expert_embeddings (user_id, embedding) VALUES (:k, CAST(:e AS vector))"),
+        {"k": user_id, "e": _vec_to_pg(vec)},
+    )
+
+
+def test_changes_apply_after_commit_and_reach_other_workers(db: Session):
+    expert = create_test_user(db)
+    vec = [1.0] + [0.0] * 767
+    # Two workers' copies of the index, checking for changes on every search
+    worker_a = NumpyVectorIndex(where=expert_index.where, refresh_seconds=0)
+    worker_b = NumpyVectorIndex(where=expert_index.where, refresh_seconds=0)
+    worker_a.load(db)
+    worker_b.load(db)
+
+    _store(db, expert.id, vec)
+    worker_a.stage_upsert(db, expert.id, vec)
+    assert expert.id not in worker_a._rows
+    db.rollback()
+    assert expert.id not in worker_a._rows
+
+    _store(db, expert.id, vec)
+    worker_a.stage_upsert(db, expert.id, vec)
+    db.commit()
+    assert expert.id in worker_a._rows
+    version = worker_a.version
+    assert worker_b.search(db, vec, top_k=1)[0][0] == expert.id
+    assert worker_b.version == version
+
+    # Deactivating the account drops the expert everywhere
+    expert.status = UserStatus.suspended
+    db.commit()
+    assert worker_b.search(db, vec, top_k=1) == []
+    expert.status = UserStatus.active
+    db.commit()
+    assert worker_b.search(db, vec, top_k=1)[0][0] == expert.id
+
+
+def test_savepoint_rollback_drops_its_changes(db: Session):
+    kept, dropped = create_test_user(db), create_test_user(db)
+    index = NumpyVectorIndex(where=expert_index.where, refresh_seconds=0)
+    index.load(db)
+    vec = [0.0, 1.0] + [0.0] * 766
+
+    _store(db, kept.id, vec)
+    index.stage_upsert(db, kept.id, vec)
+    try:
+        with db.begin_nested():
+            _store(db, dropped.id, vec)
+            index.stage_upsert(db, dropped.id, vec)
+            raise RuntimeError("rolled back")
+    except RuntimeError:
+        pass
+    db.commit()
+    assert kept.id in index._rows and dropped.id not in index._rows
+
+
+def test_non_expert_status_changes_do_not_bump_the_version(db: Session):
+    student = create_test_user(db)
+
+    def version():
+        return db.execute(text("SELECT version FROM vector_index_versions WHERE name = 'expert_embeddings'")).scalar()
+
+    before = version()
+    student.status = UserStatus.suspended
+    db.commit()
+    assert version() == before
@@ -28,25 +28,13 @@ export default function AuditLogsPage() {
         actor_user_id: selectedActor?.id || undefined,
     }
 
-    const { data: logs, mutate } = useSWR(
+    // One request for the page and its total
+    const { data: logsPage, mutate } = useSWR(
         ['/admin/audit-logs', queryParams],
-        () => adminService.getAuditLogs(queryParams)
-    )
-
-    const { data: totalCount } = useSWR(
-        ['/admin/audit-logs/count', {
-            action: queryParams.action,
-            actor_user_id: queryParams.actor_user_id,
-            start_after: queryParams.start_after,
-            end_before: queryParams.end_before,
-        }],
-        () => adminService.getAuditLogsCount({
-            action: queryParams.action,
-            actor_user_id: queryParams.actor_user_id,
-            start_after: queryParams.start_after,
-            end_before: queryParams.end_before,
-        })
+        () => adminService.getAuditLogsPage(queryParams)
     )
+    const logs = logsPage?.items
+    const totalCount = logsPage?.total
 
     const totalPages = totalCount ? Math.ceil(totalCount / pageSize) : 0
 
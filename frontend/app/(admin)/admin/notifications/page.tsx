@@ -22,15 +22,12 @@ export default function AdminNotificationsPage() {
         page_size: pageSize,
     }
 
-    const { data: logs, mutate } = useSWR(
+    const { data: logsPage, mutate } = useSWR(
         ['/admin/audit-logs', queryParams],
-        () => adminService.getAuditLogs(queryParams)
-    )
-
-    const { data: totalCount } = useSWR(
-        ['/admin/audit-logs/count', { action: 'broadcast_notification' }],
-        () => adminService.getAuditLogsCount({ action: 'broadcast_notification' })
+        () => adminService.getAuditLogsPage(queryParams)
     )
+    const logs = logsPage?.items
+    const totalCount = logsPage?.total
 
     // Parse audit logs to extract notification details
     const notifications = useMemo(() => {
@@ -37,20 +37,13 @@ export default function UsersPage() {
         is_verified: verifiedFilter === '' ? undefined : verifiedFilter === 'true'
     }
 
-    const { data: users, mutate } = useSWR(
+    // One request for the page and its total
+    const { data: usersPage, mutate } = useSWR(
         ['/users', queryParams],
-        () => adminService.getUsers(queryParams)
-    )
-
-    const { data: totalCount } = useSWR(
-        ['/users/count', { ...queryParams, page: undefined }],
-        () => adminService.getUsersCount({
-            email: queryParams.email,
-            role: queryParams.role,
-            status: queryParams.status,
-            is_verified: queryParams.is_verified
-        })
+        () => adminService.getUsersPage(queryParams)
     )
+    const users = usersPage?.items
+    const totalCount = usersPage?.total
 
     const totalPages = totalCount ? Math.ceil(totalCount / pageSize) : 0
 
@@ -3,7 +3,7 @@
 import React, { useEffect, useState, useCallback, useRef } from 'react'
 import Link from 'next/link'
 import { useRouter, useSearchParams } from 'next/navigation'
-import { getPublicEvents, getPublicOrganizations, findProfiles, getMyEvents, semanticSearchEvents, semanticSearchProfiles, getMe, getEventsCount, getOrganizationsCount, discoverProfiles, discoverProfilesCount } from '@/services/api'
+import { getPublicEvents, getPublicEventsPage, getPublicOrganizationsPage, findProfiles, getMyEvents, semanticSearchEvents, semanticSearchProfiles, getMe, discoverProfilesPage } from '@/services/api'
 import { EventDetails, OrganizationResponse, ProfileResponse, EventType, EventRegistrationType, EventRegistrationStatus, MyEventItem } from '@/services/api.types'
 import { toast } from 'react-hot-toast'
 import { SponsorBadge } from '@/components/ui/SponsorBadge'
@@ -204,13 +204,10 @@ export default function DiscoverPage() {
                 setEvents(data)
                 setEventTotal(data.length)
             } else {
-                const [data, countRes] = await Promise.all([
-                    // @ts-ignore
-                    getPublicEvents({ ...params, page: eventPage }),
-                    getEventsCount(params)
-                ])
-                setEvents(data)
-                setEventTotal(countRes.total_count)
+                // @ts-ignore
+                const res = await getPublicEventsPage({ ...params, page: eventPage })
+                setEvents(res.items)
+                setEventTotal(res.total)
             }
         } catch (err) {
             console.error('Failed to load events', err)
@@ -227,12 +224,9 @@ export default function DiscoverPage() {
                 q: orgSearch,
                 type: filterOrgType || undefined
             }
-            const [data, countRes] = await Promise.all([
-                getPublicOrganizations({ ...params, page: orgPage }),
-                getOrganizationsCount(params)
-            ])
-            setOrgs(data)
-            setOrgTotal(countRes.total_count)
+            const res = await getPublicOrganizationsPage({ ...params, page: orgPage })
+            setOrgs(res.items)
+            setOrgTotal(res.total)
         } catch (err: any) {
             console.error(err)
             toast.error(err?.response?.data?.detail || 'Failed to load organizations')
@@ -250,13 +244,10 @@ export default function DiscoverPage() {
                 skill: peopleSkill || undefined,
             }
 
-            const [profiles, countRes] = await Promise.all([
-                discoverProfiles({ ...params, page: peoplePage }),
-                discoverProfilesCount(params)
-            ])
+            const res = await discoverProfilesPage({ ...params, page: peoplePage })
 
-            setPeople(profiles)
-            setPeopleTotal(countRes.total_count)
+            setPeople(res.items)
+            setPeopleTotal(res.total)
         } catch (err) {
             console.error(err)
         } finally {
@@ -45,7 +45,7 @@ export function SendNotificationModal({ isOpen, onClose, onSuccess }: SendNotifi
                 target_role: formData.target_role || undefined,
                 link_url: formData.link_url || undefined
             })
-            toast.success(`Notification sent to ${res.count} users`)
+            toast.success(`Sending notification to ${res.count} users`)
 
             // Optionally send email if checkbox checked and template selected
             if (alsoSendEmail && selectedTemplateId) {
@@ -18,6 +18,8 @@ export function useNotificationStream() {
     const [isConnected, setIsConnected] = useState(false);
     const [latestNotification, setLatestNotification] = useState<NotificationData | null>(null);
     const eventSourceRef = useRef<EventSource | null>(null);
+    // Id of the last notification received; sent on reconnect to replay missed ones
+    const lastEventIdRef = useRef<string | null>(null);
 
     useEffect(() => {
         // Simple cookie check without libraries
@@ -46,7 +48,8 @@ export function useNotificationStream() {
 
             // Create EventSource connection
             const API_URL = process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000';
-            const url = `${API_URL}/api/v1/notifications/stream?token=${token}`;
+            const resume = lastEventIdRef.current ? `&last_event_id=${lastEventIdRef.current}` : '';
+            const url = `${API_URL}/api/v1/notifications/stream?token=${token}${resume}`;
 
             try {
                 const es = new EventSource(url, { withCredentials: true });
@@ -57,11 +60,17 @@ export function useNotificationStream() {
                 };
 
                 es.onmessage = (event) => {
+                    if (event.lastEventId) {
+                        lastEventIdRef.current = event.lastEventId;
+                    }
                     try {
                         const data = JSON.parse(event.data);
 
                         if (data.type === 'connected') {
                             console.log('SSE stream confirmed:', data.message);
+                        } else if (data.type === 'resync') {
+                            // Missed more than the server can replay; start fresh
+                            lastEventIdRef.current = null;
                         } else {
                             // It's a real notification
                             console.log('Received notification via SSE:', data);
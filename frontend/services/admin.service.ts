@@ -6,7 +6,8 @@ import {
     OrganizationType,
     AuditLog,
     EventDetails,
-    BroadcastNotificationRequest
+    BroadcastNotificationRequest,
+    NotificationBroadcast
 } from './api.types'
 
 export interface AdminStats {
@@ -112,6 +113,27 @@ export const adminService = {
         }))
     },
 
+    getUsersPage: async (params?: {
+        page?: number
+        page_size?: number
+        email?: string
+        name?: string
+        status?: string
+        role?: string
+        is_verified?: boolean
+    }) => {
+        const response = await api.get<import('./api.types').Page<UserResponse>>('/users', { params: { ...params, with_total: true } })
+        return {
+            ...response.data,
+            items: response.data.items.map(u => ({
+                ...u,
+                roles: Array.isArray(u.roles)
+                    ? u.roles.map(r => typeof r === 'string' ? r : r.name)
+                    : []
+            }))
+        }
+    },
+
     getUser: async (userId: string) => {
         const response = await api.get<UserResponse>(`/users/${userId}`)
         return response.data
@@ -227,6 +249,20 @@ export const adminService = {
         return response.data
     },
 
+    getAuditLogsPage: async (params?: {
+        page?: number
+        page_size?: number
+        action?: string
+        actor_user_id?: string
+        target_type?: string
+        target_id?: string
+        start_after?: string
+        end_before?: string
+    }) => {
+        const response = await api.get<import('./api.types').Page<AuditLog>>('/admin/audit-logs', { params: { ...params, with_total: true } })
+        return response.data
+    },
+
     // --- Events ---
     getEvents: async (params?: {
         page?: number
@@ -307,7 +343,13 @@ export const adminService = {
 
     // --- Notifications ---
     broadcastNotification: async (data: BroadcastNotificationRequest) => {
-        const response = await api.post<{ count: number }>('/admin/notifications/broadcast', data)
+        // Delivered in the background; poll getNotificationBroadcast for progress
+        const response = await api.post<NotificationBroadcast & { count: number }>('/admin/notifications/broadcast', data)
+        return response.data
+    },
+
+    getNotificationBroadcast: async (broadcastId: string) => {
+        const response = await api.get<NotificationBroadcast>(`/admin/notifications/broadcasts/${broadcastId}`)
         return response.data
     },
 
@@ -356,18 +398,6 @@ export const adminService = {
         return response.data.total_count
     },
 
-    getAuditLogsCount: async (params?: {
-        action?: string
-        actor_user_id?: string
-        target_type?: string
-        target_id?: string
-        start_after?: string
-        end_before?: string
-    }) => {
-        const response = await api.get<{ total_count: number }>('/admin/audit-logs/count', { params })
-        return response.data.total_count
-    },
-
     // --- Email Templates ---
     getEmailTemplates: async () => {
         const response = await api.get<import('./api.types').EmailTemplate[]>('/admin/email-templates')
@@ -223,6 +223,11 @@ export const getPublicEvents = async (params?: {
   return response.data
 }
 
+export const getPublicEventsPage = async (params?: Parameters<typeof getPublicEvents>[0]) => {
+  const response = await api.get<import('./api.types').Page<EventDetails>>('/events', { params: { ...params, with_total: true } })
+  return response.data
+}
+
 export const getEventsCount = async (params?: {
   upcoming?: boolean
   q_text?: string
@@ -548,6 +553,11 @@ export const discoverProfiles = async (params: { name?: string; role?: string; s
   return response.data
 }
 
+export const discoverProfilesPage = async (params: Parameters<typeof discoverProfiles>[0]) => {
+  const response = await api.get<import('./api.types').Page<import('./api.types').ProfileResponse>>(`/profiles/discover`, { params: { ...params, with_total: true } })
+  return response.data
+}
+
 export const discoverProfilesCount = async (params: { name?: string; role?: string; skill?: string; tag_ids?: string[]; skill_ids?: string[] }) => {
   const response = await api.get<{ total_count: number }>(`/profiles/discover/count`, { params })
   return response.data
@@ -603,6 +613,11 @@ export const getPublicOrganizations = async (params?: { q?: string; type?: strin
   return response.data
 }
 
+export const getPublicOrganizationsPage = async (params?: Parameters<typeof getPublicOrganizations>[0]) => {
+  const response = await api.get<import('./api.types').Page<import('./api.types').OrganizationResponse>>(`/organizations`, { params: { ...params, with_total: true } })
+  return response.data
+}
+
 export const getOrganizationsCount = async (params?: { q?: string; type?: string }) => {
   const response = await api.get<{ total_count: number }>('/organizations/count', { params })
   return response.data
@@ -16,6 +16,12 @@ export interface ApiErrorResponse {
     detail: string
 }
 
+// List endpoints called with `with_total: true`
+export interface Page<T> {
+    items: T[]
+    total: number
+}
+
 export interface PasswordResetRequest {
     email: string
 }
@@ -649,6 +655,18 @@ export interface BroadcastNotificationRequest {
     link_url?: string
 }
 
+export interface NotificationBroadcast {
+    id: string
+    title: string
+    status: 'queued' | 'running' | 'completed' | 'failed'
+    total: number
+    sent: number
+    error?: string | null
+    created_at: string
+    started_at?: string | null
+    finished_at?: string | null
+}
+
 export interface BroadcastEmailTemplateRequest {
     template_id: string
     variables: Record<string, string>